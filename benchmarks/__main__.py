@@ -0,0 +1,143 @@
+import argparse
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict
+from typing import Iterator, Optional, Sequence
+
+from benchmarks.corpus import CorpusSpec, generate_corpus, seed_mailbox
+from benchmarks.harness import BenchmarkReport, compare, load_results
+from inbox_zero.shared.email_reader import ImapConfig
+
+
+GREENMAIL_IMAGE = "greenmail/standalone:2.1.0-alpha-2"
+GREENMAIL_OPTS = (
+    "-Dgreenmail.setup.test.all -Dgreenmail.hostname=0.0.0.0 "
+    "-Dgreenmail.auth.disabled=false -Dgreenmail.users=bench:bench@bench.test"
+)
+
+
+@contextmanager
+def greenmail(memory: str) -> Iterator[ImapConfig]:
+    from testcontainers.core.container import DockerContainer
+
+    container = DockerContainer(GREENMAIL_IMAGE)
+    container.with_exposed_ports(3143)
+    container.with_env("GREENMAIL_OPTS", GREENMAIL_OPTS)
+    container.with_env("JAVA_OPTS", f"-Xmx{memory}")
+    container.start()
+    try:
+        time.sleep(5)
+        port = int(container.get_exposed_port(3143))
+        yield ImapConfig(host="localhost", port=port, username="bench", password="bench", use_ssl=False)
+    finally:
+        container.stop()
+
+
+@contextmanager
+def fake_server(arguments: argparse.Namespace, spec: CorpusSpec) -> Iterator[ImapConfig]:
+    from benchmarks.fake_imap_server import FakeImapServer
+    from benchmarks.fake_mailstore import FakeMailStore
+
+    store = FakeMailStore({arguments.username: arguments.password})
+    store.create("Archive")
+    if arguments.mbox:
+        store.load_mbox(arguments.mbox, arguments.folder)
+    elif arguments.maildir:
+        store.load_maildir(arguments.maildir)
+    else:
+        for date, raw in generate_corpus(spec):
+            store.append(arguments.folder, raw, internal_date=date)
+    with FakeImapServer(store, latency=arguments.latency / 1000, bandwidth=arguments.bandwidth) as server:
+        yield server.config(arguments.username, arguments.password)
+        print(f"fake server commands: {dict(server.commands)}", file=sys.stderr)
+
+
+@contextmanager
+def imap_server(arguments: argparse.Namespace, spec: CorpusSpec) -> Iterator[ImapConfig]:
+    if arguments.fake or arguments.mbox or arguments.maildir:
+        with fake_server(arguments, spec) as config:
+            yield config
+        return
+    if arguments.host is None:
+        with greenmail(arguments.greenmail_memory) as config:
+            yield config
+        return
+    yield ImapConfig(
+        host=arguments.host,
+        port=arguments.port,
+        username=arguments.username,
+        password=arguments.password,
+        use_ssl=arguments.ssl,
+    )
+
+
+def run(arguments: argparse.Namespace) -> int:
+    from benchmarks.suites import run_suite
+
+    spec = CorpusSpec(messages=arguments.messages, attachment_ratio=arguments.attachment_ratio, seed=arguments.seed)
+    report = BenchmarkReport(corpus={**asdict(spec), "folder": arguments.folder})
+    with imap_server(arguments, spec) as config:
+        if not (arguments.mbox or arguments.maildir):
+            started = time.perf_counter()
+            seed_mailbox(config, arguments.folder, spec)
+            report.corpus["seed_seconds"] = round(time.perf_counter() - started, 3)
+        for result in run_suite(config, arguments.folder, spec.messages, arguments.sample, arguments.bulk):
+            report.results.append(result)
+            print(
+                f"{result.name:<24} {result.messages_per_second:>12.1f} msg/s"
+                f"  p50 {result.p50_ms:>9.2f} ms  p99 {result.p99_ms:>9.2f} ms"
+                f"  rss {result.peak_rss_bytes / 2**20:>7.1f} MiB",
+                file=sys.stderr,
+            )
+    report.save(arguments.output)
+    return 0
+
+
+def run_compare(arguments: argparse.Namespace) -> int:
+    regressions = compare(load_results(arguments.baseline), load_results(arguments.current), arguments.threshold)
+    for regression in regressions:
+        print(
+            f"{regression.name} {regression.metric}: {regression.baseline} -> {regression.current} "
+            f"({regression.change:+.1%})"
+        )
+    return 1 if regressions else 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="seed an IMAP server and measure the readers and use cases")
+    run_parser.add_argument("--messages", type=int, default=10_000)
+    run_parser.add_argument("--attachment-ratio", type=float, default=0.2)
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--folder", default="INBOX")
+    run_parser.add_argument("--sample", type=int, default=200, help="emails archived one by one")
+    run_parser.add_argument("--bulk", type=int, default=5_000, help="emails archived by archive_many")
+    run_parser.add_argument("--output", default="bench_output.json")
+    run_parser.add_argument("--host", help="existing IMAP server instead of a GreenMail container")
+    run_parser.add_argument("--port", type=int, default=143)
+    run_parser.add_argument("--username", default="bench")
+    run_parser.add_argument("--password", default="bench")
+    run_parser.add_argument("--ssl", action="store_true")
+    run_parser.add_argument("--greenmail-memory", default="4g")
+    run_parser.add_argument("--fake", action="store_true", help="in-process fake IMAP server instead of GreenMail")
+    run_parser.add_argument("--mbox", help="serve this mbox file from the fake server")
+    run_parser.add_argument("--maildir", help="serve this Maildir from the fake server")
+    run_parser.add_argument("--latency", type=float, default=0.0, help="fake server latency per command, in ms")
+    run_parser.add_argument("--bandwidth", type=int, help="fake server bandwidth, in bytes per second")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="exit 1 when current results regress against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.1)
+    compare_parser.set_defaults(handler=run_compare)
+
+    arguments = parser.parse_args(argv)
+    return int(arguments.handler(arguments))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
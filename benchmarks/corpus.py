@@ -0,0 +1,113 @@
+import base64
+import imaplib
+import random
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from email.header import Header
+from email.utils import format_datetime
+from typing import Iterator, Tuple
+
+from inbox_zero.shared.email_reader import ImapConfig
+
+
+WORDS = (
+    "facture commande livraison rappel réunion projet rapport newsletter promo offre compte sécurité "
+    "mise à jour semaine bilan contrat devis relance invitation confirmation ticket support"
+).split()
+ATTACHMENT_TYPES = (("application", "pdf", ".pdf"), ("image", "png", ".png"), ("text", "csv", ".csv"))
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@dataclass(frozen=True)
+class CorpusSpec:
+    messages: int = 10_000
+    attachment_ratio: float = 0.2
+    body_sizes: Tuple[Tuple[int, int], ...] = ((1_000, 70), (10_000, 25), (100_000, 5))
+    attachment_sizes: Tuple[Tuple[int, int], ...] = ((20_000, 80), (500_000, 18), (5_000_000, 2))
+    senders: int = 500
+    seed: int = 42
+    list_ratio: float = 0.3
+    start: datetime = field(default=EPOCH)
+
+
+def pick_size(rng: random.Random, distribution: Tuple[Tuple[int, int], ...]) -> int:
+    sizes, weights = zip(*distribution)
+    return max(1, int(rng.choices(sizes, weights)[0] * rng.uniform(0.5, 1.5)))
+
+
+def body_text(rng: random.Random, size: int) -> bytes:
+    lines = []
+    remaining = size
+    while remaining > 0:
+        line = " ".join(rng.choices(WORDS, k=12))
+        lines.append(line)
+        remaining -= len(line) + 2
+    return "\r\n".join(lines).encode("utf-8")
+
+
+def generate_message(spec: CorpusSpec, rng: random.Random, index: int) -> Tuple[datetime, bytes]:
+    sender_index = rng.randrange(spec.senders)
+    domain = f"sender{sender_index % 97}.example"
+    date = spec.start + timedelta(minutes=index * 3 + rng.randrange(3))
+    subject = " ".join(rng.choices(WORDS, k=rng.randint(2, 8))) + f" #{index}"
+
+    headers = [
+        f"From: user{sender_index}@{domain}",
+        "To: bench@bench.test",
+        f"Subject: {Header(subject, 'utf-8').encode()}",
+        f"Date: {format_datetime(date)}",
+        f"Message-ID: <{index}.{spec.seed}@bench.test>",
+        "MIME-Version: 1.0",
+    ]
+    if rng.random() < spec.list_ratio:
+        headers.append(f"List-Id: <list{sender_index % 20}.{domain}>")
+    text = body_text(rng, pick_size(rng, spec.body_sizes))
+    text_headers = b'Content-Type: text/plain; charset="utf-8"\r\nContent-Transfer-Encoding: 8bit\r\n\r\n'
+
+    if rng.random() >= spec.attachment_ratio:
+        return date, "\r\n".join(headers).encode() + b"\r\n" + text_headers + text + b"\r\n"
+
+    maintype, subtype, suffix = rng.choice(ATTACHMENT_TYPES)
+    boundary = f"=_bench_{spec.seed}_{index}".encode()
+    headers.append(f'Content-Type: multipart/mixed; boundary="{boundary.decode()}"')
+    payload = base64.encodebytes(rng.randbytes(pick_size(rng, spec.attachment_sizes))).replace(b"\n", b"\r\n")
+    parts = [
+        "\r\n".join(headers).encode() + b"\r\n\r\n",
+        b"--" + boundary + b"\r\n" + text_headers + text + b"\r\n",
+        b"--" + boundary + b"\r\n",
+        f"Content-Type: {maintype}/{subtype}\r\n".encode(),
+        b"Content-Transfer-Encoding: base64\r\n",
+        f'Content-Disposition: attachment; filename="piece-{index}{suffix}"\r\n\r\n'.encode(),
+        payload,
+        b"--" + boundary + b"--\r\n",
+    ]
+    return date, b"".join(parts)
+
+
+def generate_corpus(spec: CorpusSpec) -> Iterator[Tuple[datetime, bytes]]:
+    rng = random.Random(spec.seed)
+    for index in range(spec.messages):
+        yield generate_message(spec, rng, index)
+
+
+def seed_mailbox(config: ImapConfig, folder: str, spec: CorpusSpec, progress_every: int = 10_000) -> int:
+    client = imaplib.IMAP4_SSL(config.host, config.port) if config.use_ssl else imaplib.IMAP4(config.host, config.port)
+    try:
+        client.login(config.username, config.password)
+        client.create(folder)
+        client.create("Archive")
+        typ, data = client.select(folder)
+        existing = int(data[0] or 0) if typ == "OK" else 0
+        if existing >= spec.messages:
+            return existing
+
+        for index, (date, raw) in enumerate(generate_corpus(spec)):
+            if index < existing:
+                continue
+            client.append(folder, "", imaplib.Time2Internaldate(date), raw)
+            if (index + 1) % progress_every == 0:
+                print(f"seeded {index + 1}/{spec.messages}", file=sys.stderr, flush=True)
+        return spec.messages
+    finally:
+        client.logout()
@@ -0,0 +1,769 @@
+import fnmatch
+import imaplib
+import queue
+import re
+import socket
+import socketserver
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from benchmarks.fake_mailstore import FakeFolder, FakeMailStore, FakeMessage, imap_string
+from inbox_zero.shared.email_reader import ImapConfig
+from inbox_zero.shared.imap_parser import ImapParseError, ImapValue, decode_text, format_uid_set, parse_values
+
+
+CAPABILITIES = "IMAP4rev1 IDLE UIDPLUS MOVE CONDSTORE ENABLE"
+PERMANENT_FLAGS = "\\Answered \\Flagged \\Deleted \\Seen \\Draft"
+LITERAL = re.compile(rb"\{(\d+)\}\r\n$")
+PARTIAL = re.compile(r"<(\d+)(?:\.(\d+))?>$")
+SEQUENCE_SET = re.compile(r"^[0-9*:,]+$")
+
+
+class CommandFailed(Exception):
+    def __init__(self, status: str, text: str) -> None:
+        super().__init__(text)
+        self.status = status
+        self.text = text
+
+
+def text(value: ImapValue) -> str:
+    if isinstance(value, bytes):
+        return value.decode("utf-8", "replace")
+    return "" if value is None else str(value)
+
+
+def parse_sequence_set(sequence_set: str, largest: int) -> Set[int]:
+    numbers: Set[int] = set()
+    for item in sequence_set.split(","):
+        first, _, last = item.partition(":")
+        low = largest if first == "*" else int(first)
+        high = largest if last == "*" else int(last or first)
+        low, high = sorted((low, high))
+        if high - low > 10_000_000:
+            raise CommandFailed("BAD", "sequence set too large")
+        numbers.update(range(low, high + 1))
+    return numbers
+
+
+def internal_date(value: datetime) -> bytes:
+    return imaplib.Time2Internaldate(value).encode()
+
+
+def parse_internal_date(value: str) -> datetime:
+    return datetime.strptime(value.strip(), "%d-%b-%Y %H:%M:%S %z")
+
+
+def sort_date(message: FakeMessage) -> datetime:
+    date = message.sent_date() or message.internal_date
+    return date if date.tzinfo is not None else date.replace(tzinfo=timezone.utc)
+
+
+def parse_search_date(value: str) -> datetime:
+    return datetime.strptime(value, "%d-%b-%Y").replace(tzinfo=timezone.utc)
+
+
+class FakeImapServer:
+    def __init__(
+        self,
+        store: Optional[FakeMailStore] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        bandwidth: Optional[int] = None,
+        capabilities: str = CAPABILITIES,
+    ) -> None:
+        self.store = store or FakeMailStore()
+        self.capabilities = capabilities
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.commands: Counter[str] = Counter()
+        self.connections = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._server = _ThreadingServer((host, port), _SessionHandler, self)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def host(self) -> str:
+        return str(self._server.server_address[0])
+
+    @property
+    def port(self) -> int:
+        return int(self._server.server_address[1])
+
+    def config(self, username: str = "bench", password: str = "bench") -> ImapConfig:
+        return ImapConfig(host=self.host, port=self.port, username=username, password=password, use_ssl=False)
+
+    def start(self) -> "FakeImapServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-imap", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self.store.notify()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "FakeImapServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def count(self, command: str, sent: int = 0) -> None:
+        with self._lock:
+            if command:
+                self.commands[command] += 1
+            self.bytes_sent += sent
+
+    def connected(self) -> None:
+        with self._lock:
+            self.connections += 1
+
+
+class _ThreadingServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: Tuple[str, int], handler: Any, fake: FakeImapServer) -> None:
+        self.fake = fake
+        super().__init__(address, handler)
+
+
+class _SessionHandler(socketserver.StreamRequestHandler):
+    server: _ThreadingServer
+
+    def setup(self) -> None:
+        super().setup()
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.fake = self.server.fake
+        self.store = self.fake.store
+        self.selected: Optional[FakeFolder] = None
+        self.command = ""
+        self.completed = False
+        self.logged_out = False
+        self.authenticated = False
+        self.condstore = False
+        self.view: List[int] = []
+        self.seen_modseq = 0
+        self.incoming: "queue.Queue[Optional[Tuple[float, bytes]]]" = queue.Queue()
+        self.wake = threading.Event()
+        self.handlers: Dict[str, Callable[[str, List[ImapValue], bool], None]] = {
+            "CAPABILITY": self.do_capability,
+            "NOOP": self.do_noop,
+            "CHECK": self.do_noop,
+            "LOGOUT": self.do_logout,
+            "LOGIN": self.do_login,
+            "ENABLE": self.do_enable,
+            "SELECT": self.do_select,
+            "EXAMINE": self.do_select,
+            "CLOSE": self.do_close,
+            "UNSELECT": self.do_close,
+            "LIST": self.do_list,
+            "LSUB": self.do_list,
+            "CREATE": self.do_create,
+            "STATUS": self.do_status,
+            "APPEND": self.do_append,
+            "FETCH": self.do_fetch,
+            "SEARCH": self.do_search,
+            "SORT": self.do_sort,
+            "STORE": self.do_store,
+            "COPY": self.do_copy,
+            "MOVE": self.do_copy,
+            "EXPUNGE": self.do_expunge,
+            "IDLE": self.do_idle,
+        }
+
+    def handle(self) -> None:
+        self.fake.connected()
+        reader = threading.Thread(target=self.read_commands, name="fake-imap-reader", daemon=True)
+        reader.start()
+        self.send(f"* OK [CAPABILITY {self.fake.capabilities}] fake IMAP4rev1 server ready\r\n".encode())
+        try:
+            while not self.logged_out:
+                item = self.incoming.get()
+                if item is None:
+                    break
+                self.execute(*item)
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.store.unsubscribe(self.wake)
+
+    def read_commands(self) -> None:
+        try:
+            while True:
+                line = self.rfile.readline()
+                if not line:
+                    break
+                received = time.monotonic()
+                chunks = [line]
+                match = LITERAL.search(line)
+                while match is not None:
+                    self.send(b"+ Ready for literal data\r\n")
+                    chunks.append(self.rfile.read(int(match.group(1))))
+                    line = self.rfile.readline()
+                    chunks.append(line)
+                    match = LITERAL.search(line)
+                self.incoming.put((received, b"".join(chunks)))
+                self.wake.set()
+        except (ConnectionError, OSError, ValueError):
+            pass
+        finally:
+            self.incoming.put(None)
+            self.wake.set()
+
+    def send(self, data: bytes) -> None:
+        if self.fake.bandwidth:
+            time.sleep(len(data) / self.fake.bandwidth)
+        self.wfile.write(data)
+        self.fake.count("", len(data))
+
+    def untagged(self, data: bytes) -> None:
+        self.send(b"* " + data + b"\r\n")
+
+    def execute(self, received: float, raw: bytes) -> None:
+        tag = raw.split(b" ", 1)[0].decode("ascii", "replace").strip() or "*"
+        status, message = "OK", "completed"
+        try:
+            values = parse_values(raw)
+            if len(values) < 2:
+                raise CommandFailed("BAD", "missing command")
+            name = text(values[1]).upper()
+            args = values[2:]
+            uid = name == "UID"
+            if uid:
+                if not args:
+                    raise CommandFailed("BAD", "missing UID command")
+                name, args = text(args[0]).upper(), args[1:]
+            handler = self.handlers.get(name)
+            if handler is None:
+                raise CommandFailed("BAD", f"unknown command {name}")
+            if name not in ("CAPABILITY", "NOOP", "LOGOUT", "LOGIN") and not self.authenticated:
+                raise CommandFailed("NO", "not authenticated")
+            self.fake.count(f"UID {name}" if uid else name)
+            self.command = name
+            self.delay(received)
+            handler(tag, args, uid)
+            message = f"{'UID ' if uid else ''}{name} completed"
+        except CommandFailed as failure:
+            status, message = failure.status, failure.text
+        except (ImapParseError, ValueError, IndexError) as error:
+            status, message = "BAD", str(error)
+        if tag != "*" and not self.completed:
+            self.send(f"{tag} {status} {message}\r\n".encode())
+        self.completed = False
+
+    def delay(self, received: float) -> None:
+        remaining = received + self.fake.latency - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+
+    def complete(self, tag: str, status: str, message: str) -> None:
+        self.send(f"{tag} {status} {message}\r\n".encode())
+        self.completed = True
+
+    def folder(self) -> FakeFolder:
+        if self.selected is None:
+            raise CommandFailed("BAD", "no folder selected")
+        return self.selected
+
+    def do_capability(self, tag: str, args: List[ImapValue], uid: bool) -> None:
+        self.untagged(f"CAPABILITY {self.fake.capabilities}".encode())
+
+    def do_noop(self, tag: str, args: List[ImapValue], uid: bool) -> None:
+        if self.selected is not None:
+            self.report_changes()
+
+    def do_logout(self, tag: str, args: List[ImapValue], uid: bool) -> None:
+        self.untagged(b"BYE logging out")
+        self.complete(tag, "OK", "LOGOUT completed")
+        self.logged_out = True
+
+    def do_login(self, tag: str, args: List[ImapValue], uid: bool) -> None:
+        if not self.store.authenticate(text(args[0]), text(args[1])):
+            raise CommandFailed("NO", "[AUTHENTICATIONFAILED] invalid credentials")
+        self.authenticated = True
+        self.store.subscribe(self.wake)
+        self.complete(tag, "OK", f"[CAPABILITY {self.fake.capabilities}] LOGIN completed")
+
+    def do_enable(self, tag: str, args: List[ImapValue], uid: bool) -> None:
+        enabled = [text(arg).upper() for arg in args if text(arg).upper() == "CONDSTORE"]
+        self.condstore = self.condstore or bool(enabled)
+        self.untagged(" ".join(["ENABLED", *enabled]).encode())
+
+    def do_select(self, tag: str, args: List[ImapValue], uid: bool) -> None:
+        name = text(args[0])
+        with self.store.lock:
+            folder = self.store.folders.get(name)
+            if folder is None:
+                self.selected = None
+                raise CommandFailed("NO", f"[NONEXISTENT] unknown folder {name}")
+            self.selected = folder
+            if len(args) > 1 and isinstance(args[1], list) and "CONDSTORE" in map(str.upper, map(text, args[1])):
+                self.condstore = True
+            self.view = [message.uid for message in folder.messages]
+            self.seen_modseq = folder.highest_modseq
+            self.untagged(f"FLAGS ({PERMANENT_FLAGS})".encode())
+            self.untagged(f"OK [PERMANENTFLAGS ({PERMANENT_FLAGS} \\*)] flags permitted".encode())
+            self.untagged(f"{len(folder.messages)} EXISTS".encode())
+            self.untagged(b"0 RECENT")
+            self.untagged(f"OK [UIDVALIDITY {folder.uid_validity}] UIDs valid".encode())
+            self.untagged(f"OK [UIDNEXT {folder.uid_next}] predicted next UID".encode())
+            self.untagged(f"OK [HIGHESTMODSEQ {folder.highest_modseq}] highest".encode())
+        self.complete(tag, "OK", "[READ-WRITE] SELECT completed")
+
+    def do_close(self, tag: str, args: List[ImapValue], uid: bool) -> None:
+        self.selected = None
+        self.view = []
+
+    def do_list(self, tag: str, args: List[ImapValue], uid: bool) -> None:
+        pattern = text(args[0]) + text(args[1])
+        glob = pattern.replace("%", "*")
+        with self.store.lock:
+            names = sorted(self.store.folders)
+        for name in names:
+            if fnmatch.fnmatchcase(name, glob) or (pattern == "" and name == "INBOX"):
+                self.untagged(b'LIST (\\HasNoChildren) "/" ' + imap_string(name))
+
+    def do_create(self, tag: str, args: List[ImapValue], uid: bool) -> None:
+        name = text(args[0])
+        with self.store.lock:
+            if name in self.store.folders:
+                raise CommandFailed("NO", "[ALREADYEXISTS] folder exists")
+            self.store.create(name)
+
+    def do_status(self, tag: str, args: List[ImapValue], uid: bool) -> None:
+        name = text(args[0])
+        items = [text(item).upper() for item in args[1]] if isinstance(args[1], list) else [text(args[1]).upper()]
+        with self.store.lock:
+            folder = self.store.folders.get(name)
+            if folder is None:
+                raise CommandFailed("NO", f"[NONEXISTENT] unknown folder {name}")
+            values = {
+                "MESSAGES": len(folder.messages),
+                "RECENT": 0,
+                "UIDNEXT": folder.uid_next,
+                "UIDVALIDITY": folder.uid_validity,
+                "UNSEEN": sum(1 for message in folder.messages if "\\Seen" not in message.flags),
+                "HIGHESTMODSEQ": folder.highest_modseq,
+            }
+        attributes = " ".join(f"{item} {values[item]}" for item in items if item in values)
+        self.untagged(b"STATUS " + imap_string(name) + f" ({attributes})".encode())
+
+    def do_append(self, tag: str, args: List[ImapValue], uid: bool) -> None:
+        name = text(args[0])
+        flags: List[str] = []
+        date: Optional[datetime] = None
+        for arg in args[1:-1]:
+            if isinstance(arg, list):
+                flags = [text(flag) for flag in arg]
+            else:
+                date = parse_internal_date(text(arg))
+        raw = args[-1]
+        if not isinstance(raw, bytes):
+            raise CommandFailed("BAD", "APPEND expects a literal")
+        with self.store.lock:
+            folder = self.store.folders.get(name)
+            if folder is None:
+                raise CommandFailed("NO", "[TRYCREATE] unknown folder")
+            new_uid = self.store.append(name, raw, flags, date)
+        self.complete(tag, "OK", f"[APPENDUID {folder.uid_validity} {new_uid}] APPEND completed")
+
+    def messages(self, sequence_set: str, uid: bool) -> List[Tuple[int, FakeMessage]]:
+        folder = self.folder()
+        if uid:
+            largest = folder.messages[-1].uid if folder.messages else 0
+            wanted = parse_sequence_set(sequence_set, largest)
+            return [
+                (position, message)
+                for position, message in enumerate(folder.messages, start=1)
+                if message.uid in wanted
+            ]
+        wanted = parse_sequence_set(sequence_set, len(folder.messages))
+        return [
+            (position, folder.messages[position - 1])
+            for position in sorted(wanted)
+            if position <= len(folder.messages)
+        ]
+
+    def do_fetch(self, tag: str, args: List[ImapValue], uid: bool) -> None:
+        items = args[1] if isinstance(args[1], list) else [args[1]]
+        names = self.expand_fetch_items([text(item) for item in items], uid)
+        changed_since: Optional[int] = None
+        if len(args) > 2 and isinstance(args[2], list):
+            modifiers = [text(value).upper() for value in args[2]]
+            if "CHANGEDSINCE" in modifiers:
+                changed_since = int(modifiers[modifiers.index("CHANGEDSINCE") + 1])
+                self.condstore = True
+                if "MODSEQ" not in names:
+                    names.append("MODSEQ")
+        with self.store.lock:
+            selected = self.messages(text(args[0]), uid)
+            responses = []
+            for position, message in selected:
+                if changed_since is not None and message.modseq <= changed_since:
+                    continue
+                responses.append(f"{position} FETCH ".encode() + self.fetch_attributes(message, names))
+        for response in responses:
+            self.untagged(response)
+
+    def expand_fetch_items(self, items: List[str], uid: bool) -> List[str]:
+        macros = {
+            "ALL": ["FLAGS", "INTERNALDATE", "RFC822.SIZE", "ENVELOPE"],
+            "FAST": ["FLAGS", "INTERNALDATE", "RFC822.SIZE"],
+            "FULL": ["FLAGS", "INTERNALDATE", "RFC822.SIZE", "ENVELOPE", "BODY"],
+        }
+        names: List[str] = []
+        for item in items:
+            names.extend(macros.get(item.upper(), [item]))
+        if uid and "UID" not in (name.upper() for name in names):
+            names.insert(0, "UID")
+        return names
+
+    def fetch_attributes(self, message: FakeMessage, names: Sequence[str]) -> bytes:
+        attributes: List[bytes] = []
+        for name in names:
+            upper = name.upper()
+            if upper == "UID":
+                attributes.append(f"UID {message.uid}".encode())
+            elif upper == "FLAGS":
+                attributes.append(f"FLAGS ({' '.join(sorted(message.flags))})".encode())
+            elif upper == "INTERNALDATE":
+                attributes.append(b"INTERNALDATE " + internal_date(message.internal_date))
+            elif upper == "RFC822.SIZE":
+                attributes.append(f"RFC822.SIZE {len(message.raw)}".encode())
+            elif upper == "ENVELOPE":
+                attributes.append(b"ENVELOPE " + message.envelope)
+            elif upper in ("BODYSTRUCTURE", "BODY"):
+                attributes.append(upper.encode() + b" " + message.body_structure)
+            elif upper == "MODSEQ":
+                attributes.append(f"MODSEQ ({message.modseq})".encode())
+            elif upper in ("RFC822", "RFC822.HEADER", "RFC822.TEXT"):
+                section = {"RFC822": "", "RFC822.HEADER": "HEADER", "RFC822.TEXT": "TEXT"}[upper]
+                attributes.append(upper.encode() + b" " + self.literal(message.section(section)))
+                if upper != "RFC822.HEADER":
+                    self.mark_seen(message)
+            elif upper.startswith(("BODY[", "BODY.PEEK[", "BINARY[", "BINARY.PEEK[")):
+                attributes.append(self.fetch_section(message, name))
+            else:
+                raise CommandFailed("BAD", f"unsupported FETCH item {name}")
+        if self.condstore and not any(name.upper() == "MODSEQ" for name in names):
+            attributes.append(f"MODSEQ ({message.modseq})".encode())
+        return b"(" + b" ".join(attributes) + b")"
+
+    def fetch_section(self, message: FakeMessage, name: str) -> bytes:
+        kind, _, rest = name.partition("[")
+        section, _, partial = rest.rpartition("]")
+        data = message.section(section)
+        label = f"{kind.upper().replace('.PEEK', '')}[{section}]"
+        match = PARTIAL.match(partial)
+        if match is not None:
+            offset = int(match.group(1))
+            length = int(match.group(2)) if match.group(2) is not None else len(data)
+            data = data[offset:offset + length]
+            label += f"<{offset}>"
+        if ".PEEK" not in kind.upper():
+            self.mark_seen(message)
+        return label.encode() + b" " + self.literal(data)
+
+    def literal(self, data: bytes) -> bytes:
+        return b"{%d}\r\n" % len(data) + data
+
+    def mark_seen(self, message: FakeMessage) -> None:
+        if "\\Seen" not in message.flags and self.selected is not None:
+            message.flags.add("\\Seen")
+            message.modseq = self.selected.next_modseq()
+
+    def do_search(self, tag: str, args: List[ImapValue], uid: bool) -> None:
+        criteria = list(args)
+        if criteria and text(criteria[0]).upper() == "RETURN":
+            raise CommandFailed("BAD", "ESEARCH is not supported")
+        if criteria and text(criteria[0]).upper() == "CHARSET":
+            criteria = criteria[2:]
+        with self.store.lock:
+            folder = self.folder()
+            matcher = SearchCriteria(criteria, folder)
+            found = [
+                (position, message)
+                for position, message in enumerate(folder.messages, start=1)
+                if matcher.matches(position, message)
+            ]
+        numbers = " ".join(str(message.uid if uid else position) for position, message in found)
+        suffix = ""
+        if matcher.uses_modseq and found:
+            suffix = f" (MODSEQ {max(message.modseq for _, message in found)})"
+        self.untagged(f"SEARCH {numbers}".rstrip().encode() + suffix.encode())
+
+    def do_sort(self, tag: str, args: List[ImapValue], uid: bool) -> None:
+        if "SORT" not in self.fake.capabilities.split():
+            raise CommandFailed("BAD", "SORT not supported")
+        if not isinstance(args[0], list) or [text(key).upper() for key in args[0]] != ["DATE"]:
+            raise CommandFailed("BAD", "only SORT (DATE) is supported")
+        with self.store.lock:
+            folder = self.folder()
+            matcher = SearchCriteria(list(args[2:]), folder)
+            found = [
+                (position, message)
+                for position, message in enumerate(folder.messages, start=1)
+                if matcher.matches(position, message)
+            ]
+        found.sort(key=lambda item: (sort_date(item[1]), item[0]))
+        numbers = " ".join(str(message.uid if uid else position) for position, message in found)
+        self.untagged(f"SORT {numbers}".rstrip().encode())
+
+    def do_store(self, tag: str, args: List[ImapValue], uid: bool) -> None:
+        position = 1
+        unchanged_since: Optional[int] = None
+        if isinstance(args[1], list):
+            modifiers = [text(value).upper() for value in args[1]]
+            if "UNCHANGEDSINCE" in modifiers:
+                unchanged_since = int(modifiers[modifiers.index("UNCHANGEDSINCE") + 1])
+                self.condstore = True
+            position = 2
+        item = text(args[position]).upper()
+        flags_value = args[position + 1] if len(args) > position + 1 else []
+        flags = {text(flag) for flag in flags_value} if isinstance(flags_value, list) else {text(flags_value)}
+        silent = item.endswith(".SILENT")
+        mode = item.replace(".SILENT", "")
+        responses: List[bytes] = []
+        modified: List[str] = []
+        with self.store.lock:
+            folder = self.folder()
+            for number, message in self.messages(text(args[0]), uid):
+                if unchanged_since is not None and message.modseq > unchanged_since:
+                    modified.append(str(message.uid if uid else number))
+                    continue
+                before = set(message.flags)
+                if mode == "+FLAGS":
+                    message.flags |= flags
+                elif mode == "-FLAGS":
+                    message.flags -= flags
+                elif mode == "FLAGS":
+                    message.flags = set(flags)
+                else:
+                    raise CommandFailed("BAD", f"unsupported STORE item {item}")
+                if message.flags != before:
+                    message.modseq = folder.next_modseq()
+                if not silent or (self.condstore and message.flags != before):
+                    names = ["UID", "FLAGS"] if uid else ["FLAGS"]
+                    responses.append(f"{number} FETCH ".encode() + self.fetch_attributes(message, names))
+            self.seen_modseq = folder.highest_modseq
+        for response in responses:
+            self.untagged(response)
+        self.store.notify()
+        if modified:
+            self.complete(tag, "OK", f"[MODIFIED {format_uid_set(modified)}] conditional STORE failed")
+
+    def do_copy(self, tag: str, args: List[ImapValue], uid: bool) -> None:
+        move = self.command == "MOVE"
+        destination_name = text(args[1])
+        with self.store.lock:
+            source = self.folder()
+            destination = self.store.folders.get(destination_name)
+            if destination is None:
+                raise CommandFailed("NO", "[TRYCREATE] unknown folder")
+            selected = self.messages(text(args[0]), uid)
+            source_uids: List[str] = []
+            destination_uids: List[str] = []
+            for _, message in selected:
+                copy = FakeMessage(
+                    uid=destination.uid_next,
+                    raw=message.raw,
+                    internal_date=message.internal_date,
+                    modseq=destination.next_modseq(),
+                    flags=set(message.flags),
+                )
+                destination.uid_next += 1
+                destination.messages.append(copy)
+                source_uids.append(str(message.uid))
+                destination_uids.append(str(copy.uid))
+            code = (
+                f"COPYUID {destination.uid_validity} {format_uid_set(source_uids)} {format_uid_set(destination_uids)}"
+                if source_uids else ""
+            )
+            if move:
+                if code:
+                    self.untagged(f"OK [{code}] moved".encode())
+                self.remove(source, {message.uid for _, message in selected})
+        self.store.notify()
+        if not move and code:
+            self.complete(tag, "OK", f"[{code}] COPY completed")
+
+    def do_expunge(self, tag: str, args: List[ImapValue], uid: bool) -> None:
+        with self.store.lock:
+            folder = self.folder()
+            candidates = self.messages(text(args[0]), True) if uid and args else list(enumerate(folder.messages, 1))
+            self.remove(folder, {message.uid for _, message in candidates if "\\Deleted" in message.flags})
+        self.store.notify()
+
+    def remove(self, folder: FakeFolder, uids: Set[int]) -> None:
+        if not uids:
+            return
+        positions = [position for position, message in enumerate(folder.messages, start=1) if message.uid in uids]
+        folder.messages = [message for message in folder.messages if message.uid not in uids]
+        folder.next_modseq()
+        for position in reversed(positions):
+            self.untagged(f"{position} EXPUNGE".encode())
+        self.view = [message.uid for message in folder.messages]
+
+    def report_changes(self) -> None:
+        with self.store.lock:
+            folder = self.folder()
+            current = folder.by_uid()
+            removed = [index for index, known in enumerate(self.view, start=1) if known not in current]
+            changed = [
+                (position, message)
+                for position, message in enumerate(folder.messages, start=1)
+                if message.modseq > self.seen_modseq and message.uid in set(self.view)
+            ]
+            self.view = [message.uid for message in folder.messages]
+            added = len(self.view)
+            self.seen_modseq = folder.highest_modseq
+        for index in reversed(removed):
+            self.untagged(f"{index} EXPUNGE".encode())
+        if removed or changed or added:
+            self.untagged(f"{added} EXISTS".encode())
+        for position, message in changed:
+            self.untagged(f"{position} FETCH ".encode() + self.fetch_attributes(message, ["UID", "FLAGS"]))
+
+    def do_idle(self, tag: str, args: List[ImapValue], uid: bool) -> None:
+        if "IDLE" not in self.fake.capabilities.split():
+            raise CommandFailed("BAD", "IDLE not supported")
+        self.send(b"+ idling\r\n")
+        known_count = len(self.view)
+        known_modseq = self.seen_modseq
+        while True:
+            self.wake.wait()
+            self.wake.clear()
+            if self.selected is not None:
+                with self.store.lock:
+                    has_changes = (
+                        self.selected.highest_modseq != known_modseq or len(self.selected.messages) != known_count
+                    )
+                if has_changes:
+                    self.report_changes()
+                    known_count, known_modseq = len(self.view), self.seen_modseq
+            pending = self.peek_done()
+            if pending is not None:
+                if pending.strip().upper() != b"DONE":
+                    self.complete(tag, "BAD", "expected DONE")
+                    return
+                break
+        self.complete(tag, "OK", "IDLE terminated")
+
+    def peek_done(self) -> Optional[bytes]:
+        try:
+            item = self.incoming.get_nowait()
+        except queue.Empty:
+            return None
+        if item is None:
+            raise ConnectionError("client disconnected during IDLE")
+        return item[1]
+
+
+class SearchCriteria:
+    def __init__(self, criteria: Iterable[ImapValue], folder: FakeFolder) -> None:
+        self._tokens = list(criteria)
+        self._folder = folder
+        self._largest_uid = folder.messages[-1].uid if folder.messages else 0
+        self.uses_modseq = False
+        self._position = 0
+        self._predicates: List[Callable[[int, FakeMessage], bool]] = []
+        while self._position < len(self._tokens):
+            self._predicates.append(self._parse())
+
+    def matches(self, position: int, message: FakeMessage) -> bool:
+        return all(predicate(position, message) for predicate in self._predicates)
+
+    def _next(self) -> ImapValue:
+        if self._position >= len(self._tokens):
+            raise CommandFailed("BAD", "incomplete SEARCH criteria")
+        value = self._tokens[self._position]
+        self._position += 1
+        return value
+
+    def _parse(self) -> Callable[[int, FakeMessage], bool]:
+        token = self._next()
+        if isinstance(token, list):
+            nested = SearchCriteria(token, self._folder)
+            self.uses_modseq = self.uses_modseq or nested.uses_modseq
+            return nested.matches
+        key = text(token).upper()
+        flag_keys = {
+            "ANSWERED": ("\\Answered", True), "UNANSWERED": ("\\Answered", False),
+            "DELETED": ("\\Deleted", True), "UNDELETED": ("\\Deleted", False),
+            "DRAFT": ("\\Draft", True), "UNDRAFT": ("\\Draft", False),
+            "FLAGGED": ("\\Flagged", True), "UNFLAGGED": ("\\Flagged", False),
+            "SEEN": ("\\Seen", True), "UNSEEN": ("\\Seen", False), "NEW": ("\\Seen", False), "OLD": ("\\Seen", True),
+        }
+        if key == "ALL" or key == "RECENT":
+            return lambda position, message: key == "ALL"
+        if key in flag_keys:
+            flag, present = flag_keys[key]
+            return lambda position, message: (flag in message.flags) == present
+        if key in ("KEYWORD", "UNKEYWORD"):
+            keyword = text(self._next())
+            return lambda position, message: (keyword in message.flags) == (key == "KEYWORD")
+        if key in ("FROM", "TO", "CC", "BCC", "SUBJECT"):
+            return self._header(key, text(self._next()))
+        if key == "HEADER":
+            return self._header(text(self._next()), text(self._next()))
+        if key in ("BODY", "TEXT"):
+            needle = text(self._next()).lower().encode("utf-8")
+            section = "TEXT" if key == "BODY" else ""
+            return lambda position, message: needle in message.section(section).lower()
+        if key in ("BEFORE", "ON", "SINCE", "SENTBEFORE", "SENTON", "SENTSINCE"):
+            return self._date(key, parse_search_date(text(self._next())))
+        if key in ("LARGER", "SMALLER"):
+            size = int(text(self._next()))
+            if key == "LARGER":
+                return lambda position, message: len(message.raw) > size
+            return lambda position, message: len(message.raw) < size
+        if key == "UID":
+            uids = parse_sequence_set(text(self._next()), self._largest_uid)
+            return lambda position, message: message.uid in uids
+        if key == "NOT":
+            inner = self._parse()
+            return lambda position, message: not inner(position, message)
+        if key == "OR":
+            left, right = self._parse(), self._parse()
+            return lambda position, message: left(position, message) or right(position, message)
+        if key == "MODSEQ":
+            self.uses_modseq = True
+            value = self._next()
+            while self._position < len(self._tokens) and not text(value).isdigit():
+                value = self._next()
+            modseq = int(text(value))
+            return lambda position, message: message.modseq >= modseq
+        if SEQUENCE_SET.match(key):
+            positions = parse_sequence_set(key, len(self._folder.messages))
+            return lambda position, message: position in positions
+        raise CommandFailed("BAD", f"unsupported SEARCH key {key}")
+
+    def _header(self, name: str, value: str) -> Callable[[int, FakeMessage], bool]:
+        needle = value.lower()
+
+        def matches(position: int, message: FakeMessage) -> bool:
+            return any(needle in decode_text(str(header)).lower() for header in message.message.get_all(name) or [])
+
+        return matches
+
+    def _date(self, key: str, day: datetime) -> Callable[[int, FakeMessage], bool]:
+        def matches(position: int, message: FakeMessage) -> bool:
+            date = message.sent_date() if key.startswith("SENT") else message.internal_date
+            if date is None:
+                return False
+            value = date.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+            if key.endswith("BEFORE"):
+                return value < day
+            if key.endswith("SINCE"):
+                return value >= day
+            return value == day
+
+        return matches
@@ -0,0 +1,345 @@
+import mailbox
+import re
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email import message_from_bytes
+from email.message import Message
+from email.utils import collapse_rfc2231_value, getaddresses, parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+
+HEADER_END = b"\r\n\r\n"
+MAILDIR_FLAGS = {"S": "\\Seen", "F": "\\Flagged", "R": "\\Answered", "T": "\\Deleted", "D": "\\Draft"}
+MBOX_FLAGS = {"R": "\\Seen", "F": "\\Flagged", "A": "\\Answered", "D": "\\Deleted"}
+LINE_ENDINGS = re.compile(rb"\r?\n")
+
+
+def crlf(raw: bytes) -> bytes:
+    return LINE_ENDINGS.sub(b"\r\n", raw)
+
+
+def imap_string(value: Optional[Union[str, bytes]]) -> bytes:
+    if value is None:
+        return b"NIL"
+    data = value.encode("utf-8", "surrogateescape") if isinstance(value, str) else value
+    if len(data) < 1024 and not any(byte > 126 or byte in (0, 10, 13) for byte in data):
+        return b'"' + data.replace(b"\\", b"\\\\").replace(b'"', b'\\"') + b'"'
+    return b"{%d}\r\n" % len(data) + data
+
+
+def imap_list(items: Sequence[bytes]) -> bytes:
+    return b"(" + b" ".join(items) + b")" if items else b"NIL"
+
+
+def subparts(part: Message) -> List[Message]:
+    payload = part.get_payload()
+    return [child for child in payload if isinstance(child, Message)] if isinstance(payload, list) else []
+
+
+def part_body(part: Message) -> bytes:
+    if part.is_multipart():
+        return b"".join(part_body(child) for child in subparts(part))
+    payload = part.get_payload(decode=False)
+    if not isinstance(payload, str):
+        return b""
+    try:
+        return crlf(payload.encode(part.get_content_charset() or "ascii", "surrogateescape"))
+    except (LookupError, UnicodeEncodeError):
+        return crlf(payload.encode("utf-8", "surrogateescape"))
+
+
+def split_header(raw: bytes) -> Tuple[bytes, bytes]:
+    end = raw.find(HEADER_END)
+    if end < 0:
+        return raw, b""
+    return raw[:end + len(HEADER_END)], raw[end + len(HEADER_END):]
+
+
+def header_fields(header: bytes) -> List[Tuple[str, bytes]]:
+    fields: List[Tuple[str, bytes]] = []
+    for line in header.split(b"\r\n"):
+        if not line:
+            continue
+        if line[:1] in (b" ", b"\t") and fields:
+            name, value = fields[-1]
+            fields[-1] = (name, value + b"\r\n" + line)
+        else:
+            fields.append((line.split(b":", 1)[0].decode("ascii", "replace").strip().lower(), line))
+    return fields
+
+
+def select_header_fields(header: bytes, names: Iterable[str], exclude: bool = False) -> bytes:
+    wanted = {name.lower() for name in names}
+    lines = [line for name, line in header_fields(header) if (name in wanted) != exclude]
+    return b"".join(line + b"\r\n" for line in lines) + b"\r\n"
+
+
+def addresses(message: Message, name: str, default: Optional[str] = None) -> bytes:
+    values = message.get_all(name) or ([message[default]] if default and message[default] else [])
+    items = []
+    for display, address in getaddresses([str(value) for value in values]):
+        local, _, host = address.rpartition("@") if "@" in address else (address, "", "")
+        fields = [imap_string(display or None), b"NIL", imap_string(local or None), imap_string(host or None)]
+        items.append(imap_list(fields))
+    return imap_list(items)
+
+
+def envelope(message: Message) -> bytes:
+    def header(name: str) -> bytes:
+        value = message[name]
+        return imap_string(str(value) if value is not None else None)
+
+    return imap_list([
+        header("Date"),
+        header("Subject"),
+        addresses(message, "From"),
+        addresses(message, "Sender", "From"),
+        addresses(message, "Reply-To", "From"),
+        addresses(message, "To"),
+        addresses(message, "Cc"),
+        addresses(message, "Bcc"),
+        header("In-Reply-To"),
+        header("Message-ID"),
+    ])
+
+
+def parameters(part: Message, header: str = "content-type") -> bytes:
+    params = part.get_params(header=header) or []
+    items: List[bytes] = []
+    for name, value in params[1:]:
+        items.extend((imap_string(name.upper()), imap_string(collapse_rfc2231_value(value))))
+    return imap_list(items)
+
+
+def disposition(part: Message) -> bytes:
+    params = part.get_params(header="content-disposition")
+    if not params:
+        return b"NIL"
+    return imap_list([imap_string(params[0][0]), parameters(part, "content-disposition")])
+
+
+def body_structure(part: Message) -> bytes:
+    maintype, subtype = part.get_content_maintype(), part.get_content_subtype()
+    if maintype == "multipart":
+        children = b"".join(body_structure(child) for child in subparts(part))
+        extension = (imap_string(subtype), parameters(part), disposition(part), b"NIL NIL")
+        return b"(" + children + b" " + b" ".join(extension) + b")"
+
+    body = part_body(part)
+    fields = [
+        imap_string(maintype),
+        imap_string(subtype),
+        parameters(part),
+        imap_string(part["Content-ID"]),
+        imap_string(part["Content-Description"]),
+        imap_string(str(part.get("Content-Transfer-Encoding", "7BIT")).upper()),
+        str(len(body)).encode(),
+    ]
+    if maintype == "message" and subtype == "rfc822" and subparts(part):
+        inner = subparts(part)[0]
+        fields.extend((envelope(inner), body_structure(inner), str(body.count(b"\n")).encode()))
+    elif maintype == "text":
+        fields.append(str(body.count(b"\n")).encode())
+    fields.extend((b"NIL", disposition(part), b"NIL", b"NIL"))
+    return imap_list(fields)
+
+
+@dataclass
+class FakeMessage:
+    uid: int
+    raw: bytes
+    internal_date: datetime
+    modseq: int
+    flags: Set[str] = field(default_factory=set)
+    _parsed: Optional[Message] = field(default=None, repr=False)
+    _envelope: Optional[bytes] = field(default=None, repr=False)
+    _structure: Optional[bytes] = field(default=None, repr=False)
+
+    @property
+    def message(self) -> Message:
+        if self._parsed is None:
+            self._parsed = message_from_bytes(self.raw)
+        return self._parsed
+
+    @property
+    def envelope(self) -> bytes:
+        if self._envelope is None:
+            self._envelope = envelope(self.message)
+        return self._envelope
+
+    @property
+    def body_structure(self) -> bytes:
+        if self._structure is None:
+            self._structure = body_structure(self.message)
+        return self._structure
+
+    def sent_date(self) -> Optional[datetime]:
+        try:
+            return parsedate_to_datetime(str(self.message["Date"]))
+        except (TypeError, ValueError):
+            return None
+
+    def section(self, spec: str) -> bytes:
+        header, text = split_header(self.raw)
+        upper = spec.upper()
+        if not spec:
+            return self.raw
+        if upper == "HEADER":
+            return header
+        if upper == "TEXT":
+            return text
+        if upper.startswith("HEADER.FIELDS"):
+            names = upper.partition("(")[2].rstrip(")").split()
+            return select_header_fields(header, names, exclude=upper.startswith("HEADER.FIELDS.NOT"))
+
+        if not spec[0].isdigit():
+            return b""
+        path, suffix = self._split_path(spec)
+        part = self._part(path)
+        if part is None:
+            return b""
+        if suffix.upper() in ("MIME", "HEADER"):
+            part_header, _ = split_header(crlf(part.as_bytes()))
+            return part_header
+        return part_body(part)
+
+    def _split_path(self, spec: str) -> Tuple[str, str]:
+        numbers: List[str] = []
+        rest = spec.split(".")
+        while rest and rest[0].isdigit():
+            numbers.append(rest.pop(0))
+        return ".".join(numbers), ".".join(rest)
+
+    def _part(self, path: str) -> Optional[Message]:
+        part = self.message
+        for number in (int(value) for value in path.split(".") if value):
+            if part.get_content_type() == "message/rfc822" and subparts(part):
+                part = subparts(part)[0]
+            if not part.is_multipart():
+                return part if number == 1 else None
+            children = subparts(part)
+            if not 0 < number <= len(children):
+                return None
+            part = children[number - 1]
+        return part
+
+
+@dataclass
+class FakeFolder:
+    name: str
+    uid_validity: int
+    uid_next: int = 1
+    highest_modseq: int = 1
+    messages: List[FakeMessage] = field(default_factory=list)
+
+    def next_modseq(self) -> int:
+        self.highest_modseq += 1
+        return self.highest_modseq
+
+    def by_uid(self) -> Dict[int, FakeMessage]:
+        return {message.uid: message for message in self.messages}
+
+
+class FakeMailStore:
+    def __init__(self, users: Optional[Dict[str, str]] = None) -> None:
+        self.users = users or {}
+        self.lock = threading.RLock()
+        self.folders: Dict[str, FakeFolder] = {}
+        self._listeners: Set[threading.Event] = set()
+        self._next_validity = 1
+        self.create("INBOX")
+
+    def create(self, name: str) -> FakeFolder:
+        with self.lock:
+            folder = self.folders.get(name)
+            if folder is None:
+                folder = FakeFolder(name, uid_validity=self._next_validity)
+                self._next_validity += 1
+                self.folders[name] = folder
+            return folder
+
+    def authenticate(self, username: str, password: str) -> bool:
+        return not self.users or self.users.get(username) == password
+
+    def append(
+        self,
+        folder_name: str,
+        raw: bytes,
+        flags: Iterable[str] = (),
+        internal_date: Optional[datetime] = None,
+    ) -> int:
+        with self.lock:
+            folder = self.create(folder_name)
+            message = FakeMessage(
+                uid=folder.uid_next,
+                raw=crlf(raw),
+                internal_date=internal_date or datetime.now(timezone.utc),
+                modseq=folder.next_modseq(),
+                flags=set(flags),
+            )
+            folder.uid_next += 1
+            folder.messages.append(message)
+        self.notify()
+        return message.uid
+
+    def subscribe(self, event: threading.Event) -> None:
+        with self.lock:
+            self._listeners.add(event)
+
+    def unsubscribe(self, event: threading.Event) -> None:
+        with self.lock:
+            self._listeners.discard(event)
+
+    def notify(self) -> None:
+        with self.lock:
+            listeners = list(self._listeners)
+        for event in listeners:
+            event.set()
+
+    def load_mbox(self, path: Union[str, Path], folder: str = "INBOX") -> int:
+        box = mailbox.mbox(str(path), create=False)
+        count = 0
+        for key, message in box.iteritems():
+            flags = {MBOX_FLAGS[flag] for flag in message.get_flags() if flag in MBOX_FLAGS}
+            self.append(folder, box.get_bytes(key), flags, _message_date(message))
+            count += 1
+        return count
+
+    def load_maildir(self, path: Union[str, Path]) -> int:
+        root = mailbox.Maildir(str(path), factory=None, create=False)
+        count = self._load_maildir_folder(root, "INBOX")
+        for name in root.list_folders():
+            count += self._load_maildir_folder(root.get_folder(name), name.lstrip("."))
+        return count
+
+    def _load_maildir_folder(self, box: mailbox.Maildir, folder: str) -> int:
+        self.create(folder)
+        keys = sorted(box.keys(), key=lambda key: (box.get_message(key).get_date(), key))
+        for key in keys:
+            message = box.get_message(key)
+            flags = {MAILDIR_FLAGS[flag] for flag in message.get_flags() if flag in MAILDIR_FLAGS}
+            date = datetime.fromtimestamp(message.get_date(), timezone.utc)
+            self.append(folder, box.get_bytes(key), flags, date)
+        return len(keys)
+
+    @classmethod
+    def from_mbox(cls, path: Union[str, Path], folder: str = "INBOX") -> "FakeMailStore":
+        store = cls()
+        store.load_mbox(path, folder)
+        return store
+
+    @classmethod
+    def from_maildir(cls, path: Union[str, Path]) -> "FakeMailStore":
+        store = cls()
+        store.load_maildir(path)
+        return store
+
+
+def _message_date(message: mailbox.mboxMessage) -> Optional[datetime]:
+    try:
+        date = parsedate_to_datetime(str(message["Date"]))
+    except (TypeError, ValueError):
+        return None
+    return date if date.tzinfo is not None else date.replace(tzinfo=timezone.utc)
@@ -0,0 +1,143 @@
+import json
+import platform
+import resource
+import subprocess
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+
+PAGE_SIZE = resource.getpagesize()
+
+
+def current_rss() -> int:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * PAGE_SIZE
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class RssSampler:
+    def __init__(self, interval: float = 0.01) -> None:
+        self._interval = interval
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+        self.peak = current_rss()
+
+    def __enter__(self) -> "RssSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._stopped.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss())
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self._interval):
+            self.peak = max(self.peak, current_rss())
+
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = fraction * (len(ordered) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    calls: int
+    messages: int
+    seconds: float
+    messages_per_second: float
+    p50_ms: float
+    p99_ms: float
+    peak_rss_bytes: int
+
+
+def measure(name: str, calls: Iterable[Callable[[], int]]) -> BenchmarkResult:
+    latencies: List[float] = []
+    messages = 0
+    with RssSampler() as sampler:
+        started = time.perf_counter()
+        for call in calls:
+            call_started = time.perf_counter()
+            messages += call()
+            latencies.append(time.perf_counter() - call_started)
+        seconds = time.perf_counter() - started
+    return BenchmarkResult(
+        name=name,
+        calls=len(latencies),
+        messages=messages,
+        seconds=round(seconds, 6),
+        messages_per_second=round(messages / seconds, 2) if seconds else 0.0,
+        p50_ms=round(percentile(latencies, 0.50) * 1000, 3),
+        p99_ms=round(percentile(latencies, 0.99) * 1000, 3),
+        peak_rss_bytes=sampler.peak,
+    )
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@dataclass
+class BenchmarkReport:
+    corpus: Dict[str, Any]
+    results: List[BenchmarkResult] = field(default_factory=list)
+    commit: Optional[str] = field(default_factory=git_commit)
+    created_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat(timespec="seconds"))
+    python: str = field(default_factory=platform.python_version)
+    machine: str = field(default_factory=platform.platform)
+
+    def save(self, path: Union[str, Path]) -> None:
+        Path(path).write_text(json.dumps(asdict(self), indent=2, default=str) + "\n", encoding="utf-8")
+
+
+def load_results(path: Union[str, Path]) -> Dict[str, Dict[str, Any]]:
+    report = json.loads(Path(path).read_text(encoding="utf-8"))
+    return {result["name"]: result for result in report["results"]}
+
+
+@dataclass(frozen=True)
+class Regression:
+    name: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        return (self.current - self.baseline) / self.baseline if self.baseline else 0.0
+
+
+def compare(
+    baseline: Dict[str, Dict[str, Any]], current: Dict[str, Dict[str, Any]], threshold: float = 0.1
+) -> List[Regression]:
+    regressions: List[Regression] = []
+    for name, result in current.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if result["messages_per_second"] < previous["messages_per_second"] * (1 - threshold):
+            regressions.append(
+                Regression(name, "messages_per_second", previous["messages_per_second"], result["messages_per_second"])
+            )
+        for metric in ("p99_ms", "peak_rss_bytes"):
+            if result[metric] > previous[metric] * (1 + threshold):
+                regressions.append(Regression(name, metric, previous[metric], result[metric]))
+    return regressions
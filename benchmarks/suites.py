@@ -0,0 +1,142 @@
+import os
+import tempfile
+from contextlib import ExitStack, contextmanager
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List
+from unittest import mock
+
+from cryptography.fernet import Fernet
+from pyqure import PyqureMemory, pyqure
+
+from benchmarks.harness import BenchmarkResult, measure
+from inbox_zero.main import create_dependencies
+from inbox_zero.shared.account_store import AccountStore
+from inbox_zero.shared.email_query import EmailQuery
+from inbox_zero.shared.email_reader import EmailReader, EmailUid, ImapConfig
+from inbox_zero.shared.imap_pool import ImapConnectionPool
+from inbox_zero.archive_email.adapter import EmailArchiverImap
+from inbox_zero.archive_email.port import EMAIL_ARCHIVER_PORT_KEY
+from inbox_zero.archive_email.use_case import ArchiveEmailUseCase
+from inbox_zero.archive_many_emails.use_case import ArchiveManyEmailsUseCase
+from inbox_zero.list_emails.use_case import EmailCursor, ListEmailsUseCase
+from inbox_zero.query_emails.use_case import QueryEmailsUseCase
+from inbox_zero.read_email_body.adapter import EmailBodyReaderImap
+from inbox_zero.read_email_body.port import EMAIL_BODY_READER_PORT_KEY
+from inbox_zero.read_email_body.use_case import ReadEmailBodyUseCase
+from inbox_zero.read_first_envelope.adapter import EnvelopeReaderImap
+from inbox_zero.read_first_envelope.port import ENVELOPE_READER_PORT_KEY
+from inbox_zero.read_first_envelope.use_case import ReadFirstEnvelopeUseCase
+from inbox_zero.sync_folder.use_case import SyncFolderUseCase
+
+
+QUERIES = (
+    EmailQuery(sender="sender7.example"),
+    EmailQuery(subject="facture"),
+    EmailQuery(has_attachment=True),
+)
+
+
+def state_environment(state_directory: Path) -> Dict[str, str]:
+    return {
+        "INBOX_ZERO_CACHE": str(state_directory / "messages.sqlite3"),
+        "INBOX_ZERO_SYNC_STATE": str(state_directory / "sync.sqlite3"),
+        "INBOX_ZERO_SEARCH_INDEX": str(state_directory / "search.sqlite3"),
+        "INBOX_ZERO_MIRROR": str(state_directory / "mirror"),
+        "INBOX_ZERO_THREAD_INDEX": str(state_directory / "threads.sqlite3"),
+    }
+
+
+@contextmanager
+def benchmark_dependencies(config: ImapConfig, state_directory: Path) -> Iterator[PyqureMemory]:
+    with mock.patch.dict(os.environ, state_environment(state_directory)), ExitStack() as resources:
+        store = AccountStore(Fernet.generate_key())
+        store.save(config)
+        dependencies = create_dependencies(store, resources=resources)
+        (provide, _) = pyqure(dependencies)
+        pool = ImapConnectionPool()
+        resources.callback(pool.close)
+        provide(ENVELOPE_READER_PORT_KEY, EnvelopeReaderImap(pool))
+        provide(EMAIL_BODY_READER_PORT_KEY, EmailBodyReaderImap(pool))
+        provide(EMAIL_ARCHIVER_PORT_KEY, EmailArchiverImap(pool))
+        yield dependencies
+
+
+def repeat(call: Callable[[], int], times: int) -> Iterator[Callable[[], int]]:
+    for _ in range(times):
+        yield call
+
+
+def list_pages(
+    dependencies: PyqureMemory, config: ImapConfig, folder: str, page_size: int
+) -> Iterator[Callable[[], int]]:
+    use_case = ListEmailsUseCase(dependencies)
+    cursor: List[EmailCursor] = []
+
+    def next_page() -> int:
+        page = use_case.execute(config, folder, cursor[0] if cursor else None, limit=page_size)
+        cursor[:] = [page.next_cursor] if page.next_cursor is not None else []
+        return len(page.envelopes)
+
+    yield next_page
+    while cursor:
+        yield next_page
+
+
+def run_suite(
+    config: ImapConfig, folder: str, messages: int, sample: int = 200, bulk: int = 5_000
+) -> List[BenchmarkResult]:
+    reader = EmailReader.from_config(config, pool=ImapConnectionPool())
+    with tempfile.TemporaryDirectory(prefix="inbox-zero-bench-") as temporary:
+        directory = Path(temporary)
+        with benchmark_dependencies(config, directory) as dependencies:
+            sync = SyncFolderUseCase(dependencies)
+            query = QueryEmailsUseCase(dependencies)
+            read_first = ReadFirstEnvelopeUseCase(dependencies)
+            read_body = ReadEmailBodyUseCase(dependencies)
+            archive = ArchiveEmailUseCase(dependencies)
+            archive_many = ArchiveManyEmailsUseCase(dependencies)
+
+            def fetch_emails() -> int:
+                return len(reader.fetch_emails(folder, limit=sample))
+
+            def run_query(email_query: EmailQuery) -> int:
+                return query.execute(config, folder, email_query, page_size=50).total
+
+            def full_sync() -> int:
+                return len(sync.execute(config, folder).added)
+
+            def incremental_sync() -> int:
+                return messages if sync.execute(config, folder).is_empty else 0
+
+            def download_attachments() -> int:
+                reader.download_attachments(folder, save_dir=str(directory / "attachments"))
+                return messages
+
+            def triage() -> int:
+                envelope = read_first.execute(config, folder)
+                if envelope is None:
+                    return 0
+                read_body.execute(config, folder, envelope)
+                return int(archive.execute(config, folder, envelope.uid))
+
+            def archive_email(uid: EmailUid) -> int:
+                return int(reader.archive_email(folder, uid))
+
+            def archive_batch(uids: List[EmailUid]) -> int:
+                return sum(archive_many.execute(config, folder, uids).values())
+
+            results = [
+                measure("fetch_emails", repeat(fetch_emails, 3)),
+                measure("list_emails", list_pages(dependencies, config, folder, 500)),
+                measure("query_emails", (partial(run_query, email_query) for email_query in QUERIES)),
+                measure("sync_folder_full", repeat(full_sync, 1)),
+                measure("sync_folder_incremental", repeat(incremental_sync, 5)),
+                measure("download_attachments", repeat(download_attachments, 1)),
+                measure("triage", repeat(triage, sample)),
+            ]
+
+            uids = [EmailUid(str(uid)) for uid in reader.fetch_uids(folder)]
+            results.append(measure("archive_email", (partial(archive_email, uid) for uid in uids[:sample])))
+            results.append(measure("archive_many", repeat(partial(archive_batch, uids[sample:sample + bulk]), 1)))
+    return results
@@ -1,56 +1,252 @@
+import json
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
 import streamlit as st
-from pyqure import pyqure, PyqureMemory
-
-from inbox_zero.shared.email_reader import EmailData, ImapConfig
-from inbox_zero.read_first_email.port import EMAIL_READER_PORT_KEY
-from inbox_zero.read_first_email.adapter import EmailReaderImap
-from inbox_zero.archive_email.port import EMAIL_ARCHIVER_PORT_KEY
-from inbox_zero.archive_email.adapter import EmailArchiverImap
-from inbox_zero.read_first_email.use_case import ReadFirstEmailUseCase
+from pyqure import Key
+
+from inbox_zero.shared.email_reader import EmailBody, EmailEnvelope, EmailUid, ImapConfig
+from inbox_zero.shared.email_cache import EmailCache, account_key
+from inbox_zero.shared.event_bus import EventBus, MailboxEvent, MailboxEventKind
+from inbox_zero.shared.idle_watcher import IdleSupervisor
+from inbox_zero.shared.imap_parser import parse_uid_set
+from inbox_zero.shared.email_query import EmailQuery
+from inbox_zero.shared.folder_sync import FolderSyncStateStore
+from inbox_zero.shared.email_prefetcher import EmailPrefetcher, ImapPrefetchLoader
+from inbox_zero.shared.imap_pool import ImapConnectionPool
+from inbox_zero.shared.async_email_reader import AsyncEmailReaders
+from inbox_zero.shared.instrumentation import Instrumentation, instrument, otlp_metrics, otlp_traces, prometheus_text
+from inbox_zero.shared.account_store import AccountStore, open_account_store
+from inbox_zero.shared.container import Container, Scope
+from inbox_zero.shared.search_index import SearchIndex
+from inbox_zero.shared.settings import (
+    email_cache_path,
+    imap_backend,
+    search_index_path,
+    sync_state_path,
+    thread_index_path,
+)
+from inbox_zero.shared.thread_index import ThreadIndex
+from inbox_zero.shared.archive_rules import ArchiveRule, rule_from_dict
+from inbox_zero.shared.scheduler import Scheduler
+from inbox_zero.read_first_email.port import EMAIL_READER_PORT_KEY, EmailReaderPort
+from inbox_zero.read_first_email.adapter import EmailReaderAsync, EmailReaderCached
+from inbox_zero.archive_email.port import EMAIL_ARCHIVER_PORT_KEY, EmailArchiverPort
+from inbox_zero.archive_email.adapter import EmailArchiverAsync, EmailArchiverImap, EmailArchiverPrefetching
+from inbox_zero.read_first_envelope.port import ENVELOPE_READER_PORT_KEY
+from inbox_zero.read_first_envelope.adapter import EnvelopeReaderPrefetching
+from inbox_zero.read_first_envelope.use_case import ReadFirstEnvelopeUseCase
+from inbox_zero.read_email_body.port import EMAIL_BODY_READER_PORT_KEY, EmailBodyReaderPort
+from inbox_zero.read_email_body.adapter import (
+    EmailBodyReaderAsync,
+    EmailBodyReaderCached,
+    EmailBodyReaderImap,
+    EmailBodyReaderPrefetching,
+)
+from inbox_zero.read_email_body.use_case import ReadEmailBodyUseCase
 from inbox_zero.archive_email.use_case import ArchiveEmailUseCase
+from inbox_zero.archive_thread.port import THREAD_MAILBOX_PORT_KEY
+from inbox_zero.archive_thread.adapter import ThreadMailboxImap
+from inbox_zero.archive_thread.use_case import ArchiveThreadUseCase
+from inbox_zero.read_unified_inbox.port import ACCOUNT_ENVELOPES_READER_PORT_KEY
+from inbox_zero.read_unified_inbox.adapter import AccountEnvelopesReaderImap
+from inbox_zero.read_unified_inbox.use_case import ReadUnifiedInboxUseCase
+from inbox_zero.list_emails.port import EMAIL_LISTER_PORT_KEY
+from inbox_zero.list_emails.adapter import EmailListerImap
+from inbox_zero.list_emails.use_case import EmailCursor, ListEmailsUseCase
+from inbox_zero.query_emails.port import EMAIL_SEARCH_PORT_KEY
+from inbox_zero.query_emails.adapter import EmailSearchImap
+from inbox_zero.query_emails.use_case import QueryEmailsUseCase
+from inbox_zero.search_emails.port import EMAIL_INDEX_PORT_KEY
+from inbox_zero.search_emails.adapter import EmailIndexSqlite
+from inbox_zero.search_emails.use_case import SearchEmailsUseCase
+from inbox_zero.sync_folder.port import FOLDER_SYNCHRONIZER_PORT_KEY
+from inbox_zero.sync_folder.adapter import FolderSynchronizerImap
+from inbox_zero.sync_folder.use_case import SyncFolderUseCase
+from inbox_zero.apply_archive_rules.port import RULE_MAILBOX_PORT_KEY
+from inbox_zero.apply_archive_rules.adapter import RuleMailboxImap
+from inbox_zero.apply_archive_rules.use_case import ApplyArchiveRulesUseCase, RuleRunReport
 from inbox_zero.create_imap_account.port import IMAP_ACCOUNT_REPOSITORY_PORT_KEY
-from inbox_zero.create_imap_account.adapter import ImapAccountRepositoryInMemory
+from inbox_zero.create_imap_account.adapter import ImapAccountRepositorySqlite
 from inbox_zero.create_imap_account.use_case import CreateImapAccountUseCase
 from inbox_zero.list_imap_accounts.port import IMAP_ACCOUNT_READER_PORT_KEY
-from inbox_zero.list_imap_accounts.adapter import ImapAccountReaderInMemory
+from inbox_zero.list_imap_accounts.adapter import ImapAccountReaderSqlite
 from inbox_zero.list_imap_accounts.use_case import ListImapAccountsUseCase
 
 
-def get_account_repository() -> ImapAccountRepositoryInMemory:
-    if "account_repository" not in st.session_state:
-        st.session_state.account_repository = ImapAccountRepositoryInMemory()
-    return st.session_state.account_repository  # type: ignore[no-any-return]
+UNIFIED_INBOX = "Tous les comptes"
+EMAIL_LIST_PAGE_SIZE = 50
+RULES_INTERVAL_SECONDS = 15 * 60
+RULES_EXAMPLE = '[{"name": "newsletters", "domains": ["newsletter.example.com"], "older_than_days": 7}]'
+SCOPE_SESSION_KEY = "inbox_zero_scope"
+
+
+@st.cache_resource
+def get_account_store() -> AccountStore:
+    return open_account_store()
+
+
+@st.cache_resource
+def get_instrumentation() -> Instrumentation:
+    return Instrumentation()
+
+
+@st.cache_resource
+def get_connection_pool() -> ImapConnectionPool:
+    return ImapConnectionPool(instrumentation=get_instrumentation())
+
+
+@st.cache_resource
+def get_search_index() -> SearchIndex:
+    return SearchIndex(search_index_path())
+
+
+@st.cache_resource
+def get_thread_index() -> ThreadIndex:
+    return ThreadIndex(thread_index_path())
+
+
+@st.cache_resource
+def get_email_cache() -> EmailCache:
+    return EmailCache(email_cache_path(), index=get_search_index())
+
+
+@st.cache_resource
+def get_folder_sync_store() -> FolderSyncStateStore:
+    return FolderSyncStateStore(sync_state_path())
+
+
+@st.cache_resource
+def get_prefetcher() -> EmailPrefetcher:
+    return EmailPrefetcher(ImapPrefetchLoader(get_connection_pool(), get_email_cache()))
+
+
+@st.cache_resource
+def get_email_lister() -> EmailListerImap:
+    return EmailListerImap(get_connection_pool())
+
 
+@st.cache_resource
+def get_event_bus() -> EventBus:
+    bus = EventBus()
+    prefetcher = get_prefetcher()
+    cache = get_email_cache()
 
-def create_dependencies() -> PyqureMemory:
-    memory: PyqureMemory = {}
-    (provide, _) = pyqure(memory)
+    def on_mailbox_event(event: MailboxEvent) -> None:
+        if event.kind == MailboxEventKind.VANISHED:
+            uids = parse_uid_set(event.value)
+            cache.discard(account_key(event.config), event.folder, uids)
+            for uid in uids:
+                prefetcher.discard(event.config, event.folder, EmailUid(str(uid)))
+        elif event.kind == MailboxEventKind.EXPUNGE and prefetcher.expunged(event.config, event.folder):
+            return
+        elif event.kind != MailboxEventKind.FLAGS:
+            prefetcher.invalidate(event.config, event.folder)
 
-    provide(EMAIL_READER_PORT_KEY, EmailReaderImap())
-    provide(EMAIL_ARCHIVER_PORT_KEY, EmailArchiverImap())
+    bus.subscribe(on_mailbox_event)
+    return bus
 
-    account_repository = get_account_repository()
-    provide(IMAP_ACCOUNT_REPOSITORY_PORT_KEY, account_repository)
-    provide(IMAP_ACCOUNT_READER_PORT_KEY, ImapAccountReaderInMemory(account_repository.get_all()))
 
-    return memory
+@st.cache_resource
+def get_rule_scheduler() -> Scheduler:
+    return Scheduler()
 
 
-def display_email(email: EmailData) -> None:
-    st.subheader(email.subject)
-    st.text(f"De: {email.sender}")
-    st.text(f"Date: {email.date}")
+@st.cache_resource
+def get_rule_store() -> Dict[Tuple[str, str], List[ArchiveRule]]:
+    return {}
+
+
+@st.cache_resource
+def get_async_readers() -> AsyncEmailReaders:
+    return AsyncEmailReaders()
+
+
+@st.cache_resource
+def get_idle_supervisor() -> IdleSupervisor:
+    return IdleSupervisor(get_event_bus())
+
+
+@st.cache_resource
+def get_container() -> Container:
+    container = Container()
+    instrumentation = get_instrumentation()
+    use_asyncio = imap_backend() == "asyncio"
+
+    def first_email_reader(scope: Scope) -> EmailReaderPort:
+        if use_asyncio:
+            return EmailReaderAsync(get_async_readers())
+        return EmailReaderCached(get_email_cache(), get_connection_pool())
+
+    def body_reader(scope: Scope) -> EmailBodyReaderPrefetching:
+        pool = get_connection_pool()
+        imap_reader: EmailBodyReaderPort = (
+            EmailBodyReaderAsync(get_async_readers()) if use_asyncio else EmailBodyReaderImap(pool)
+        )
+        cached = EmailBodyReaderCached(get_email_cache(), instrument(imap_reader, instrumentation), pool)
+        return EmailBodyReaderPrefetching(get_prefetcher(), cached)
+
+    def archiver(scope: Scope) -> EmailArchiverPrefetching:
+        imap_archiver: EmailArchiverPort = (
+            EmailArchiverAsync(get_async_readers()) if use_asyncio else EmailArchiverImap(get_connection_pool())
+        )
+        return EmailArchiverPrefetching(instrument(imap_archiver, instrumentation), get_prefetcher())
+
+    def synchronizer(scope: Scope) -> FolderSynchronizerImap:
+        return FolderSynchronizerImap(get_folder_sync_store(), get_connection_pool(), get_thread_index())
+
+    factories: Dict[Key[Any], Callable[[Scope], Any]] = {
+        EMAIL_READER_PORT_KEY: first_email_reader,
+        ENVELOPE_READER_PORT_KEY: lambda scope: EnvelopeReaderPrefetching(get_prefetcher()),
+        EMAIL_BODY_READER_PORT_KEY: body_reader,
+        EMAIL_ARCHIVER_PORT_KEY: archiver,
+        THREAD_MAILBOX_PORT_KEY: lambda scope: ThreadMailboxImap(get_thread_index(), get_connection_pool()),
+        EMAIL_LISTER_PORT_KEY: lambda scope: get_email_lister(),
+        EMAIL_SEARCH_PORT_KEY: lambda scope: EmailSearchImap(get_connection_pool()),
+        EMAIL_INDEX_PORT_KEY: lambda scope: EmailIndexSqlite(get_search_index()),
+        ACCOUNT_ENVELOPES_READER_PORT_KEY: lambda scope: AccountEnvelopesReaderImap(get_connection_pool()),
+        FOLDER_SYNCHRONIZER_PORT_KEY: synchronizer,
+        RULE_MAILBOX_PORT_KEY: lambda scope: RuleMailboxImap(get_connection_pool()),
+        IMAP_ACCOUNT_REPOSITORY_PORT_KEY: lambda scope: ImapAccountRepositorySqlite(get_account_store()),
+        IMAP_ACCOUNT_READER_PORT_KEY: lambda scope: ImapAccountReaderSqlite(get_account_store()),
+    }
+    for key, factory in factories.items():
+        container.register(key, instrumented(factory, instrumentation))
+    return container
+
+
+def instrumented(factory: Callable[[Scope], Any], instrumentation: Instrumentation) -> Callable[[Scope], Any]:
+    return lambda scope: instrument(factory(scope), instrumentation)
+
+
+def get_scope() -> Scope:
+    container: Container = get_container()
+    session: Dict[Any, Any] = st.session_state.setdefault(SCOPE_SESSION_KEY, {})
+    return container.scope(session)
+
+
+def account_label(option: Union[str, ImapConfig]) -> str:
+    return option if isinstance(option, str) else f"{option.username} ({option.host})"
+
+
+def display_envelope(envelope: EmailEnvelope) -> None:
+    st.subheader(envelope.subject)
+    st.text(f"De: {envelope.sender}")
+    st.text(f"Date: {envelope.date}")
     st.divider()
-    st.markdown(email.body_text if email.body_text else email.body_html)
 
-    if email.attachments:
-        st.text(f"Pièces jointes: {', '.join(email.attachments)}")
+
+def display_body(envelope: EmailEnvelope, body: EmailBody) -> None:
+    st.markdown(body.text if body.text else body.html)
+
+    if envelope.attachments:
+        st.text(f"Pièces jointes: {', '.join(envelope.attachments)}")
 
 
-def display_accounts_page(dependencies: PyqureMemory) -> None:
+def display_accounts_page(scope: Scope) -> None:
     st.header("Comptes IMAP")
 
-    list_use_case = ListImapAccountsUseCase(dependencies)
+    list_use_case = scope.use_case(ListImapAccountsUseCase)
     accounts = list_use_case.execute()
 
     if accounts:
@@ -84,7 +280,7 @@ def display_accounts_page(dependencies: PyqureMemory) -> None:
                     password=str(password),
                     use_ssl=bool(use_ssl),
                 )
-                create_use_case = CreateImapAccountUseCase(dependencies)
+                create_use_case = scope.use_case(CreateImapAccountUseCase)
                 create_use_case.execute(config)
                 st.success(f"Compte {username} ajouté.")
                 st.rerun()
@@ -92,59 +288,319 @@ def display_accounts_page(dependencies: PyqureMemory) -> None:
                 st.error("Veuillez remplir l'email et le mot de passe.")
 
 
-def display_inbox_page(dependencies: PyqureMemory) -> None:
+def display_inbox_page(scope: Scope) -> None:
     st.header("Inbox")
 
-    list_use_case = ListImapAccountsUseCase(dependencies)
+    list_use_case = scope.use_case(ListImapAccountsUseCase)
     accounts = list_use_case.execute()
 
     if not accounts:
         st.warning("Aucun compte IMAP configuré. Ajoutez un compte dans l'onglet 'Comptes'.")
         return
 
-    account_names = [account.username for account in accounts]
-    selected_account = st.selectbox("Compte", account_names)
+    options: List[Union[str, ImapConfig]] = [*accounts]
+    if len(accounts) > 1:
+        options.insert(0, UNIFIED_INBOX)
+    selected_account = st.selectbox("Compte", options, format_func=account_label)
 
     if selected_account:
-        config = next(acc for acc in accounts if acc.username == selected_account)
         folder = st.text_input("Dossier", value="INBOX")
 
-        read_use_case = ReadFirstEmailUseCase(dependencies)
-        archive_use_case = ArchiveEmailUseCase(dependencies)
-
         try:
-            email = read_use_case.execute(config, str(folder))
-
-            if email is None:
+            if isinstance(selected_account, str):
+                unified = scope.use_case(ReadUnifiedInboxUseCase).execute(str(folder), limit=1)
+                for failed, error in unified.failures.items():
+                    st.warning(f"{failed.username}: {error}")
+                for config in accounts:
+                    get_idle_supervisor().watch(config, str(folder))
+                if unified.first is None:
+                    st.success("Inbox Zero atteint ! Aucun email à traiter.")
+                    return
+                st.caption(f"Compte: {unified.first.config.username}")
+                display_email(scope, unified.first.config, str(folder), unified.first.envelope)
+                return
+
+            config = selected_account
+            envelope = scope.use_case(ReadFirstEnvelopeUseCase).execute(config, str(folder))
+
+            if envelope is None:
                 st.success("Inbox Zero atteint ! Aucun email à traiter.")
             else:
-                display_email(email)
+                display_email(scope, config, str(folder), envelope)
 
-                col1, col2 = st.columns(2)
-                with col1:
-                    if st.button("Archiver", type="primary"):
-                        archive_use_case.execute(config, str(folder), email.uid)
-                        st.rerun()
-                with col2:
-                    if st.button("Rafraîchir"):
-                        st.rerun()
+            display_prefetch_metrics(get_prefetcher(), config, str(folder))
+            display_email_list(scope, config, str(folder))
+            get_idle_supervisor().watch(config, str(folder))
+            watch_mailbox(config, str(folder))
 
         except Exception as e:
             st.error(f"Erreur de connexion: {e}")
 
 
+def synced_key(config: ImapConfig, folder: str) -> str:
+    return f"folder_synced:{config.username}@{config.host}:{folder}"
+
+
+def display_email(scope: Scope, config: ImapConfig, folder: str, envelope: EmailEnvelope) -> None:
+    body_use_case = scope.use_case(ReadEmailBodyUseCase)
+    archive_use_case = scope.use_case(ArchiveEmailUseCase)
+    archive_thread_use_case = scope.use_case(ArchiveThreadUseCase)
+    sync_use_case = scope.use_case(SyncFolderUseCase)
+    if not st.session_state.get(synced_key(config, folder)):
+        sync_use_case.execute(config, folder)
+        st.session_state[synced_key(config, folder)] = True
+
+    display_envelope(envelope)
+    display_body(envelope, body_use_case.execute(config, folder, envelope))
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        if st.button("Archiver", type="primary"):
+            archive_use_case.execute(config, folder, envelope.uid)
+            st.rerun()
+    with col2:
+        if st.button("Archiver la conversation"):
+            report = archive_thread_use_case.execute(config, folder, envelope.uid)
+            for uid in report.archived:
+                get_prefetcher().discard(config, folder, uid)
+            st.rerun()
+    with col3:
+        if st.button("Rafraîchir"):
+            if not sync_use_case.execute(config, folder).is_empty:
+                get_prefetcher().invalidate(config, folder)
+            st.rerun()
+
+
+def display_email_list(scope: Scope, config: ImapConfig, folder: str) -> None:
+    with st.expander("Tous les emails du dossier"):
+        key = f"email_list_cursors:{config.username}@{config.host}:{folder}"
+        cursors: List[Optional[EmailCursor]] = st.session_state.setdefault(key, [None])
+        page = scope.use_case(ListEmailsUseCase).execute(config, folder, cursors[-1], limit=EMAIL_LIST_PAGE_SIZE)
+        if page.restarted:
+            cursors[:] = [None]
+
+        st.caption(
+            f"Emails {page.position + 1}-{page.position + len(page.envelopes)} sur {page.total}, "
+            f"{page.unseen} non lus sur cette page"
+        )
+        for envelope in page.envelopes:
+            marker = " " if "\\Seen" in envelope.flags else "●"
+            st.text(f"{marker} {envelope.date[:16]}  {envelope.sender}  {envelope.subject}")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            if len(cursors) > 1 and st.button("Page précédente"):
+                cursors.pop()
+                st.rerun()
+        with col2:
+            if page.next_cursor is not None and st.button("Page suivante"):
+                cursors.append(page.next_cursor)
+                st.rerun()
+
+
+def display_search_page(scope: Scope) -> None:
+    st.header("Recherche")
+
+    accounts = scope.use_case(ListImapAccountsUseCase).execute()
+    if not accounts:
+        st.warning("Aucun compte IMAP configuré. Ajoutez un compte dans l'onglet 'Comptes'.")
+        return
+
+    config = st.selectbox("Compte", accounts, format_func=account_label, key="search_account")
+    if config is None:
+        return
+
+    display_local_search(scope, config)
+
+    with st.form("search_form"):
+        folder = st.text_input("Dossier", value="INBOX")
+        sender = st.text_input("Expéditeur")
+        subject = st.text_input("Sujet")
+        col1, col2 = st.columns(2)
+        since = col1.date_input("Depuis", value=None)
+        before = col2.date_input("Avant", value=None)
+        unread_only = st.checkbox("Non lus uniquement")
+        with_attachments = st.checkbox("Avec pièces jointes")
+        page = st.number_input("Page", value=1, min_value=1)
+        submitted = st.form_submit_button("Rechercher")
+
+    if not submitted:
+        return
+
+    query = EmailQuery(
+        sender=str(sender),
+        subject=str(subject),
+        since=since if isinstance(since, date) else None,
+        before=before if isinstance(before, date) else None,
+        seen=False if unread_only else None,
+        has_attachment=True if with_attachments else None,
+    )
+    try:
+        result = scope.use_case(QueryEmailsUseCase).execute(config, str(folder), query, page=int(page) - 1)
+    except Exception as e:
+        st.error(f"Erreur de connexion: {e}")
+        return
+
+    st.caption(f"{result.total} email(s) trouvé(s)")
+    for envelope in result.envelopes:
+        with st.container(border=True):
+            display_envelope(envelope)
+
+
+def display_local_search(scope: Scope, config: ImapConfig) -> None:
+    text = st.text_input("Recherche locale", placeholder="Sujet, expéditeur, contenu, pièce jointe…")
+    if not text:
+        return
+    hits = scope.use_case(SearchEmailsUseCase).execute(config, str(text))
+    st.caption(f"{len(hits)} email(s) trouvé(s) dans l'index local")
+    for hit in hits:
+        with st.container(border=True):
+            st.text(f"{hit.date[:16]}  {hit.sender}  {hit.subject}")
+            st.caption(f"{hit.folder} · {hit.snippet}")
+
+
+def display_rules_page(scope: Scope) -> None:
+    st.header("Règles d'archivage")
+
+    accounts = scope.use_case(ListImapAccountsUseCase).execute()
+    if not accounts:
+        st.warning("Aucun compte IMAP configuré. Ajoutez un compte dans l'onglet 'Comptes'.")
+        return
+
+    config = st.selectbox("Compte", accounts, format_func=account_label, key="rules_account")
+    if config is None:
+        return
+    folder = str(st.text_input("Dossier", value="INBOX", key="rules_folder"))
+    rules_text = st.text_area("Règles (JSON)", value=RULES_EXAMPLE, height=200)
+
+    try:
+        rules = [rule_from_dict(data) for data in json.loads(rules_text)]
+    except (ValueError, KeyError, TypeError) as e:
+        st.error(f"Règles invalides: {e}")
+        return
+
+    use_case = scope.use_case(ApplyArchiveRulesUseCase)
+    col1, col2 = st.columns(2)
+    report: Optional[RuleRunReport] = None
+    try:
+        if col1.button("Simuler"):
+            report = use_case.execute(config, folder, rules, dry_run=True)
+        if col2.button("Appliquer"):
+            report = use_case.execute(config, folder, rules)
+            get_prefetcher().invalidate(config, folder)
+    except Exception as e:
+        st.error(f"Erreur de connexion: {e}")
+    if report is not None:
+        display_rule_report(report)
+
+    scheduler = get_rule_scheduler()
+    rule_store = get_rule_store()
+    job_key = (account_key(config), folder)
+    rule_store[job_key] = rules
+    job = scheduler.get(job_key)
+    if st.toggle("Appliquer automatiquement", value=job is not None, key="rules_scheduled"):
+        if job is None:
+            job = scheduler.schedule(
+                job_key, RULES_INTERVAL_SECONDS, lambda: use_case.execute(config, folder, rule_store.get(job_key, []))
+            )
+        st.caption(f"Exécutions: {job.runs}")
+        if job.last_error:
+            st.error(f"Dernière erreur: {job.last_error}")
+        elif isinstance(job.last_result, RuleRunReport):
+            display_rule_report(job.last_result)
+    elif job is not None:
+        scheduler.cancel(job_key)
+        rule_store.pop(job_key, None)
+
+
+def display_rule_report(report: RuleRunReport) -> None:
+    st.caption(f"{report.scanned} email(s) analysé(s)")
+    for name, count in report.matched.items():
+        st.text(f"{name}: {count} email(s)")
+    for destination, count in report.moved.items():
+        st.text(f"Déplacés vers {destination}: {count}")
+    if report.failed:
+        st.warning(f"{len(report.failed)} email(s) non déplacé(s)")
+
+
+@st.fragment(run_every=2)
+def watch_mailbox(config: ImapConfig, folder: str) -> None:
+    version = get_event_bus().version(config, folder)
+    key = f"mailbox_version:{config.username}@{config.host}:{folder}"
+    if st.session_state.setdefault(key, version) != version:
+        st.session_state[key] = version
+        st.session_state.pop(synced_key(config, folder), None)
+        st.rerun()
+
+
+def display_prefetch_metrics(prefetcher: EmailPrefetcher, config: ImapConfig, folder: str) -> None:
+    metrics = prefetcher.metrics
+    st.caption(
+        f"Emails préchargés: {prefetcher.queue_depth(config, folder)} · "
+        f"Succès du préchargement: {metrics.hit_rate:.0%}"
+    )
+
+
+def display_pool_metrics(pool: ImapConnectionPool) -> None:
+    metrics = pool.metrics
+    with st.sidebar:
+        st.subheader("Connexions IMAP")
+        st.text(f"Réutilisations: {metrics.hits}")
+        st.text(f"Nouvelles connexions: {metrics.misses}")
+        st.text(f"Reconnexions: {metrics.reconnects}")
+        st.text(f"Handshake moyen: {metrics.average_handshake_seconds * 1000:.0f} ms")
+
+
+def display_debug_panel(instrumentation: Instrumentation) -> None:
+    with st.sidebar.expander("Diagnostic"):
+        spans = instrumentation.spans()
+        totals: Dict[str, List[float]] = {}
+        for span in spans:
+            totals.setdefault(span.name, []).append(span.seconds)
+        st.dataframe(
+            [
+                {"Étape": name, "Appels": len(seconds), "Total (ms)": round(sum(seconds) * 1000, 1)}
+                for name, seconds in sorted(totals.items(), key=lambda item: -sum(item[1]))
+            ],
+            hide_index=True,
+        )
+        counters = instrumentation.counters()
+        received = sum(value for (name, _), value in counters.items() if name == "imap_bytes_received_total")
+        sent = sum(value for (name, _), value in counters.items() if name == "imap_bytes_sent_total")
+        st.text(f"Octets reçus: {received:.0f}")
+        st.text(f"Octets envoyés: {sent:.0f}")
+        st.download_button("Export Prometheus", prometheus_text(instrumentation), file_name="inbox_zero.prom")
+        st.download_button(
+            "Export OpenTelemetry",
+            json.dumps({**otlp_traces(instrumentation), **otlp_metrics(instrumentation)}),
+            file_name="inbox_zero_otlp.json",
+        )
+        if st.button("Réinitialiser les mesures"):
+            instrumentation.reset()
+
+
 def main() -> None:
     st.title("Inbox Zero")
 
-    dependencies = create_dependencies()
+    instrumentation = get_instrumentation()
+    scope = get_scope()
+
+    tab_inbox, tab_search, tab_rules, tab_accounts = st.tabs(["Inbox", "Recherche", "Règles", "Comptes"])
+
+    with tab_inbox, instrumentation.span("streamlit.render", page="inbox"):
+        display_inbox_page(scope)
+
+    with tab_search, instrumentation.span("streamlit.render", page="search"):
+        display_search_page(scope)
 
-    tab_inbox, tab_accounts = st.tabs(["Inbox", "Comptes"])
+    with tab_rules, instrumentation.span("streamlit.render", page="rules"):
+        display_rules_page(scope)
 
-    with tab_inbox:
-        display_inbox_page(dependencies)
+    with tab_accounts, instrumentation.span("streamlit.render", page="accounts"):
+        display_accounts_page(scope)
 
-    with tab_accounts:
-        display_accounts_page(dependencies)
+    display_pool_metrics(get_connection_pool())
+    display_debug_panel(instrumentation)
 
 
 if __name__ == "__main__":
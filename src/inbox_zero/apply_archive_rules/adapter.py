@@ -0,0 +1,23 @@
+from typing import Dict, Iterator, List, Optional
+from imap_tools.utils import chunked_crop
+from inbox_zero.shared.email_reader import EmailReader, EmailUid, ImapConfig
+from inbox_zero.shared.envelope_table import EnvelopeTable
+from inbox_zero.shared.imap_pool import ImapConnectionPool
+from inbox_zero.apply_archive_rules.port import RuleMailboxPort
+
+
+class RuleMailboxImap(RuleMailboxPort):
+    def __init__(self, pool: Optional[ImapConnectionPool] = None) -> None:
+        self._pool = pool
+
+    def get_envelope_batches(self, config: ImapConfig, folder: str, batch_size: int) -> Iterator[EnvelopeTable]:
+        email_reader = EmailReader.from_config(config, pool=self._pool)
+        for uids in chunked_crop(email_reader.fetch_uids(folder=folder), batch_size):
+            envelopes = email_reader.fetch_envelopes_by_uid(folder=folder, uids=[EmailUid(str(uid)) for uid in uids])
+            yield EnvelopeTable.from_envelopes(envelopes)
+
+    def move_many(
+        self, config: ImapConfig, folder: str, uids: List[EmailUid], destination: str
+    ) -> Dict[EmailUid, bool]:
+        email_reader = EmailReader.from_config(config, pool=self._pool)
+        return email_reader.move_many(folder=folder, uids=uids, destination=destination)
@@ -0,0 +1,20 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, List
+from inbox_zero.shared.email_reader import EmailUid, ImapConfig
+from inbox_zero.shared.envelope_table import EnvelopeTable
+from pyqure import Key
+
+
+class RuleMailboxPort(ABC):
+    @abstractmethod
+    def get_envelope_batches(self, config: ImapConfig, folder: str, batch_size: int) -> Iterator[EnvelopeTable]:
+        pass
+
+    @abstractmethod
+    def move_many(
+        self, config: ImapConfig, folder: str, uids: List[EmailUid], destination: str
+    ) -> Dict[EmailUid, bool]:
+        pass
+
+
+RULE_MAILBOX_PORT_KEY: Key[RuleMailboxPort] = Key("rule_mailbox_port", RuleMailboxPort)
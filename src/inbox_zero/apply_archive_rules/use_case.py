@@ -0,0 +1,51 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+from inbox_zero.shared.archive_rules import ArchiveRule, CompiledRules, RuleMatches
+from inbox_zero.shared.email_reader import EmailUid, ImapConfig
+from inbox_zero.apply_archive_rules.port import RuleMailboxPort, RULE_MAILBOX_PORT_KEY
+from pyqure import pyqure, PyqureMemory
+
+
+@dataclass
+class RuleRunReport:
+    scanned: int = 0
+    matched: Dict[str, int] = field(default_factory=dict)
+    moved: Dict[str, int] = field(default_factory=dict)
+    failed: List[EmailUid] = field(default_factory=list)
+
+
+class ApplyArchiveRulesUseCase:
+    mailbox: RuleMailboxPort
+
+    def __init__(self, dependencies: PyqureMemory) -> None:
+        (provide, inject) = pyqure(dependencies)
+        self.mailbox = inject(RULE_MAILBOX_PORT_KEY)
+
+    def execute(
+        self,
+        config: ImapConfig,
+        folder: str,
+        rules: Sequence[ArchiveRule],
+        dry_run: bool = False,
+        batch_size: int = 500,
+        now: Optional[datetime] = None,
+    ) -> RuleRunReport:
+        report = RuleRunReport()
+        if not rules:
+            return report
+
+        compiled = CompiledRules(rules)
+        matches = RuleMatches()
+        for table in self.mailbox.get_envelope_batches(config, folder, batch_size):
+            report.scanned += len(table)
+            matches.merge(compiled.evaluate_table(table, now))
+        report.matched = matches.by_rule
+
+        if dry_run:
+            return report
+        for destination, uids in matches.by_destination.items():
+            outcomes = self.mailbox.move_many(config, folder, uids, destination)
+            report.moved[destination] = sum(outcomes.values())
+            report.failed.extend(uid for uid, moved in outcomes.items() if not moved)
+        return report
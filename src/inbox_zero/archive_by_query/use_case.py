@@ -0,0 +1,39 @@
+from dataclasses import dataclass, field
+from typing import List
+from inbox_zero.shared.email_query import EmailQuery
+from inbox_zero.shared.email_reader import EmailUid, ImapConfig
+from inbox_zero.query_emails.port import EmailSearchPort, EMAIL_SEARCH_PORT_KEY
+from inbox_zero.archive_many_emails.port import EmailBatchArchiverPort, EMAIL_BATCH_ARCHIVER_PORT_KEY
+from pyqure import pyqure, PyqureMemory
+
+
+@dataclass
+class ArchiveByQueryReport:
+    matched: int = 0
+    archived: int = 0
+    failed: List[EmailUid] = field(default_factory=list)
+
+
+class ArchiveByQueryUseCase:
+    search: EmailSearchPort
+    batch_archiver: EmailBatchArchiverPort
+
+    def __init__(self, dependencies: PyqureMemory) -> None:
+        (provide, inject) = pyqure(dependencies)
+        self.search = inject(EMAIL_SEARCH_PORT_KEY)
+        self.batch_archiver = inject(EMAIL_BATCH_ARCHIVER_PORT_KEY)
+
+    def execute(
+        self, config: ImapConfig, folder: str, query: EmailQuery, dry_run: bool = False
+    ) -> ArchiveByQueryReport:
+        if query.is_empty:
+            raise ValueError("refusing to archive a whole folder with an empty query")
+
+        uids = self.search.search(config, folder, query)
+        report = ArchiveByQueryReport(matched=len(uids))
+        if dry_run or not uids:
+            return report
+        outcomes = self.batch_archiver.archive_many(config, folder, uids)
+        report.archived = sum(outcomes.values())
+        report.failed = [uid for uid, archived in outcomes.items() if not archived]
+        return report
@@ -1,10 +1,44 @@
+from typing import Optional
 from inbox_zero.shared.email_reader import EmailReader, EmailUid, ImapConfig
+from inbox_zero.shared.async_email_reader import AsyncEmailReaders
+from inbox_zero.shared.email_prefetcher import EmailPrefetcher
+from inbox_zero.shared.imap_pool import ImapConnectionPool
+from inbox_zero.shared.local_mirror import LocalMirror
 from inbox_zero.archive_email.port import EmailArchiverPort
 
 
 class EmailArchiverImap(EmailArchiverPort):
+    def __init__(self, pool: Optional[ImapConnectionPool] = None) -> None:
+        self._pool = pool
+
     def archive_email(self, config: ImapConfig, folder: str, uid: EmailUid) -> bool:
-        email_reader = EmailReader(
-            config.host, config.port, config.username, config.password, config.use_ssl
-        )
+        email_reader = EmailReader.from_config(config, pool=self._pool)
         return email_reader.archive_email(folder=folder, uid=uid)
+
+
+class EmailArchiverPrefetching(EmailArchiverPort):
+    def __init__(self, archiver: EmailArchiverPort, prefetcher: EmailPrefetcher) -> None:
+        self._archiver = archiver
+        self._prefetcher = prefetcher
+
+    def archive_email(self, config: ImapConfig, folder: str, uid: EmailUid) -> bool:
+        archived = self._archiver.archive_email(config, folder, uid)
+        if archived:
+            self._prefetcher.discard(config, folder, uid)
+        return archived
+
+
+class EmailArchiverMirror(EmailArchiverPort):
+    def __init__(self, mirror: LocalMirror) -> None:
+        self._mirror = mirror
+
+    def archive_email(self, config: ImapConfig, folder: str, uid: EmailUid) -> bool:
+        return self._mirror.archive(config, folder, uid)
+
+
+class EmailArchiverAsync(EmailArchiverPort):
+    def __init__(self, readers: AsyncEmailReaders) -> None:
+        self._readers = readers
+
+    def archive_email(self, config: ImapConfig, folder: str, uid: EmailUid) -> bool:
+        return self._readers.run(self._readers.reader(config).archive_email(folder=folder, uid=uid))
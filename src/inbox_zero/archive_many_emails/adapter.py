@@ -0,0 +1,22 @@
+from typing import Dict, List, Optional
+from inbox_zero.shared.email_reader import EmailReader, EmailUid, ImapConfig
+from inbox_zero.shared.async_email_reader import AsyncEmailReaders
+from inbox_zero.shared.imap_pool import ImapConnectionPool
+from inbox_zero.archive_many_emails.port import EmailBatchArchiverPort
+
+
+class EmailBatchArchiverImap(EmailBatchArchiverPort):
+    def __init__(self, pool: Optional[ImapConnectionPool] = None) -> None:
+        self._pool = pool
+
+    def archive_many(self, config: ImapConfig, folder: str, uids: List[EmailUid]) -> Dict[EmailUid, bool]:
+        email_reader = EmailReader.from_config(config, pool=self._pool)
+        return email_reader.archive_many(folder=folder, uids=uids)
+
+
+class EmailBatchArchiverAsync(EmailBatchArchiverPort):
+    def __init__(self, readers: AsyncEmailReaders) -> None:
+        self._readers = readers
+
+    def archive_many(self, config: ImapConfig, folder: str, uids: List[EmailUid]) -> Dict[EmailUid, bool]:
+        return self._readers.run(self._readers.reader(config).archive_many(folder=folder, uids=uids))
@@ -0,0 +1,15 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List
+from inbox_zero.shared.email_reader import EmailUid, ImapConfig
+from pyqure import Key
+
+
+class EmailBatchArchiverPort(ABC):
+    @abstractmethod
+    def archive_many(self, config: ImapConfig, folder: str, uids: List[EmailUid]) -> Dict[EmailUid, bool]:
+        pass
+
+
+EMAIL_BATCH_ARCHIVER_PORT_KEY: Key[EmailBatchArchiverPort] = Key(
+    "email_batch_archiver_port", EmailBatchArchiverPort
+)
@@ -0,0 +1,15 @@
+from typing import Dict, List
+from inbox_zero.archive_many_emails.port import EmailBatchArchiverPort, EMAIL_BATCH_ARCHIVER_PORT_KEY
+from inbox_zero.shared.email_reader import EmailUid, ImapConfig
+from pyqure import pyqure, PyqureMemory
+
+
+class ArchiveManyEmailsUseCase:
+    batch_archiver: EmailBatchArchiverPort
+
+    def __init__(self, dependencies: PyqureMemory) -> None:
+        (provide, inject) = pyqure(dependencies)
+        self.batch_archiver = inject(EMAIL_BATCH_ARCHIVER_PORT_KEY)
+
+    def execute(self, config: ImapConfig, folder: str, uids: List[EmailUid]) -> Dict[EmailUid, bool]:
+        return self.batch_archiver.archive_many(config, folder, uids)
@@ -0,0 +1,21 @@
+from typing import Dict, List, Optional
+from inbox_zero.shared.email_cache import account_key
+from inbox_zero.shared.email_reader import EmailReader, EmailUid, ImapConfig
+from inbox_zero.shared.imap_pool import ImapConnectionPool
+from inbox_zero.shared.thread_index import ThreadIndex
+from inbox_zero.archive_thread.port import ThreadMailboxPort
+
+
+class ThreadMailboxImap(ThreadMailboxPort):
+    def __init__(self, index: ThreadIndex, pool: Optional[ImapConnectionPool] = None) -> None:
+        self._index = index
+        self._pool = pool
+
+    def thread_of(self, config: ImapConfig, folder: str, uid: EmailUid) -> List[EmailUid]:
+        return [EmailUid(str(member)) for member in self._index.thread(account_key(config), folder, int(uid.value))]
+
+    def move(self, config: ImapConfig, folder: str, uids: List[EmailUid], destination: str) -> Dict[EmailUid, bool]:
+        reader = EmailReader.from_config(config, pool=self._pool)
+        outcomes = reader.move_many(folder=folder, uids=uids, destination=destination, verify=False)
+        self._index.discard(account_key(config), folder, [int(uid.value) for uid, moved in outcomes.items() if moved])
+        return outcomes
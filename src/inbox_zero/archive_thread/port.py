@@ -0,0 +1,17 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List
+from inbox_zero.shared.email_reader import EmailUid, ImapConfig
+from pyqure import Key
+
+
+class ThreadMailboxPort(ABC):
+    @abstractmethod
+    def thread_of(self, config: ImapConfig, folder: str, uid: EmailUid) -> List[EmailUid]:
+        pass
+
+    @abstractmethod
+    def move(self, config: ImapConfig, folder: str, uids: List[EmailUid], destination: str) -> Dict[EmailUid, bool]:
+        pass
+
+
+THREAD_MAILBOX_PORT_KEY: Key[ThreadMailboxPort] = Key("thread_mailbox_port", ThreadMailboxPort)
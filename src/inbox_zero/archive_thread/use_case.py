@@ -0,0 +1,26 @@
+from dataclasses import dataclass, field
+from typing import List
+from inbox_zero.archive_thread.port import ThreadMailboxPort, THREAD_MAILBOX_PORT_KEY
+from inbox_zero.shared.email_reader import EmailUid, ImapConfig
+from pyqure import pyqure, PyqureMemory
+
+
+@dataclass(frozen=True)
+class ThreadArchiveReport:
+    thread: List[EmailUid] = field(default_factory=list)
+    archived: List[EmailUid] = field(default_factory=list)
+
+
+class ArchiveThreadUseCase:
+    mailbox: ThreadMailboxPort
+
+    def __init__(self, dependencies: PyqureMemory) -> None:
+        (provide, inject) = pyqure(dependencies)
+        self.mailbox = inject(THREAD_MAILBOX_PORT_KEY)
+
+    def execute(
+        self, config: ImapConfig, folder: str, uid: EmailUid, archive_folder: str = "Archive"
+    ) -> ThreadArchiveReport:
+        thread = self.mailbox.thread_of(config, folder, uid) or [uid]
+        outcomes = self.mailbox.move(config, folder, thread, archive_folder)
+        return ThreadArchiveReport(thread=thread, archived=[member for member in thread if outcomes.get(member)])
@@ -1,3 +1,4 @@
+from inbox_zero.shared.account_store import AccountStore
 from inbox_zero.shared.email_reader import ImapConfig
 from inbox_zero.create_imap_account.port import ImapAccountRepositoryPort
 
@@ -11,3 +12,11 @@ class ImapAccountRepositoryInMemory(ImapAccountRepositoryPort):
 
     def get_all(self) -> list[ImapConfig]:
         return self._accounts.copy()
+
+
+class ImapAccountRepositorySqlite(ImapAccountRepositoryPort):
+    def __init__(self, store: AccountStore) -> None:
+        self._store = store
+
+    def save(self, config: ImapConfig) -> None:
+        self._store.save(config)
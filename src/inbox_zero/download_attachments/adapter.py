@@ -0,0 +1,14 @@
+from pathlib import Path
+from typing import List, Optional
+from inbox_zero.shared.email_reader import EmailReader, ImapConfig
+from inbox_zero.shared.imap_pool import ImapConnectionPool
+from inbox_zero.download_attachments.port import AttachmentDownloaderPort
+
+
+class AttachmentDownloaderImap(AttachmentDownloaderPort):
+    def __init__(self, pool: Optional[ImapConnectionPool] = None) -> None:
+        self._pool = pool
+
+    def download(self, config: ImapConfig, folder: str, directory: Path) -> List[Path]:
+        email_reader = EmailReader.from_config(config, pool=self._pool)
+        return email_reader.download_attachments(folder=folder, save_dir=str(directory))
@@ -0,0 +1,16 @@
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import List
+from inbox_zero.shared.email_reader import ImapConfig
+from pyqure import Key
+
+
+class AttachmentDownloaderPort(ABC):
+    @abstractmethod
+    def download(self, config: ImapConfig, folder: str, directory: Path) -> List[Path]:
+        pass
+
+
+ATTACHMENT_DOWNLOADER_PORT_KEY: Key[AttachmentDownloaderPort] = Key(
+    "attachment_downloader_port", AttachmentDownloaderPort
+)
@@ -0,0 +1,16 @@
+from pathlib import Path
+from typing import List
+from inbox_zero.shared.email_reader import ImapConfig
+from inbox_zero.download_attachments.port import AttachmentDownloaderPort, ATTACHMENT_DOWNLOADER_PORT_KEY
+from pyqure import pyqure, PyqureMemory
+
+
+class DownloadAttachmentsUseCase:
+    downloader: AttachmentDownloaderPort
+
+    def __init__(self, dependencies: PyqureMemory) -> None:
+        (provide, inject) = pyqure(dependencies)
+        self.downloader = inject(ATTACHMENT_DOWNLOADER_PORT_KEY)
+
+    def execute(self, config: ImapConfig, folder: str, directory: Path) -> List[Path]:
+        return self.downloader.download(config, folder, directory)
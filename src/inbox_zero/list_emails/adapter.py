@@ -0,0 +1,31 @@
+import threading
+from array import array
+from typing import Dict, List, Optional, Tuple
+from inbox_zero.shared.email_reader import EmailReader, EmailEnvelope, EmailUid, ImapConfig
+from inbox_zero.shared.imap_pool import ImapConnectionPool
+from inbox_zero.list_emails.port import EmailListerPort, FolderUidIndex
+
+
+class EmailListerImap(EmailListerPort):
+    def __init__(self, pool: Optional[ImapConnectionPool] = None) -> None:
+        self._pool = pool
+        self._lock = threading.Lock()
+        self._indexes: Dict[Tuple[ImapConfig, str], Tuple[Tuple[int, int, int], FolderUidIndex]] = {}
+
+    def get_uid_index(self, config: ImapConfig, folder: str) -> FolderUidIndex:
+        email_reader = EmailReader.from_config(config, pool=self._pool)
+        status = email_reader.folder_status(folder=folder)
+        version = (status["UIDVALIDITY"], status["UIDNEXT"], status["MESSAGES"])
+        with self._lock:
+            cached = self._indexes.get((config, folder))
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        index = FolderUidIndex(uid_validity=version[0], uids=array("I", email_reader.fetch_uids(folder=folder)))
+        with self._lock:
+            self._indexes[(config, folder)] = (version, index)
+        return index
+
+    def get_envelopes(self, config: ImapConfig, folder: str, uids: List[EmailUid]) -> List[EmailEnvelope]:
+        email_reader = EmailReader.from_config(config, pool=self._pool)
+        return email_reader.fetch_envelopes_by_uid(folder=folder, uids=uids)
@@ -0,0 +1,24 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import List, Sequence
+from inbox_zero.shared.email_reader import EmailEnvelope, EmailUid, ImapConfig
+from pyqure import Key
+
+
+@dataclass(frozen=True)
+class FolderUidIndex:
+    uid_validity: int
+    uids: Sequence[int]
+
+
+class EmailListerPort(ABC):
+    @abstractmethod
+    def get_uid_index(self, config: ImapConfig, folder: str) -> FolderUidIndex:
+        pass
+
+    @abstractmethod
+    def get_envelopes(self, config: ImapConfig, folder: str, uids: List[EmailUid]) -> List[EmailEnvelope]:
+        pass
+
+
+EMAIL_LISTER_PORT_KEY: Key[EmailListerPort] = Key("email_lister_port", EmailListerPort)
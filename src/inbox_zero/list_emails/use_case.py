@@ -0,0 +1,59 @@
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import List, Optional
+from inbox_zero.shared.email_reader import EmailEnvelope, EmailUid, ImapConfig
+from inbox_zero.shared.envelope_table import EnvelopeFlag, EnvelopeTable
+from inbox_zero.list_emails.port import EmailListerPort, EMAIL_LISTER_PORT_KEY
+from pyqure import pyqure, PyqureMemory
+
+
+@dataclass(frozen=True)
+class EmailCursor:
+    uid_validity: int = 0
+    after_uid: int = 0
+
+
+@dataclass(frozen=True)
+class EmailListPage:
+    envelopes: List[EmailEnvelope]
+    position: int
+    total: int
+    next_cursor: Optional[EmailCursor]
+    restarted: bool = False
+    unseen: int = 0
+
+
+class ListEmailsUseCase:
+    lister: EmailListerPort
+
+    def __init__(self, dependencies: PyqureMemory) -> None:
+        (provide, inject) = pyqure(dependencies)
+        self.lister = inject(EMAIL_LISTER_PORT_KEY)
+
+    def execute(
+        self,
+        config: ImapConfig,
+        folder: str,
+        cursor: Optional[EmailCursor] = None,
+        limit: int = 50,
+        order: str = "uid",
+        descending: bool = False,
+    ) -> EmailListPage:
+        index = self.lister.get_uid_index(config, folder)
+        restarted = cursor is not None and cursor.uid_validity != index.uid_validity
+        after_uid = cursor.after_uid if cursor is not None and not restarted else 0
+
+        position = bisect_right(index.uids, after_uid)
+        window = index.uids[position:position + limit]
+        uids = [EmailUid(str(uid)) for uid in window]
+        envelopes = self.lister.get_envelopes(config, folder, uids) if uids else []
+        table = EnvelopeTable.from_envelopes(envelopes)
+        has_more = position + len(window) < len(index.uids)
+        return EmailListPage(
+            envelopes=[envelopes[row] for row in table.order(by=order, descending=descending)],
+            position=position,
+            total=len(index.uids),
+            next_cursor=EmailCursor(index.uid_validity, window[-1]) if has_more else None,
+            restarted=restarted,
+            unseen=len(table.select(without_flags=EnvelopeFlag.SEEN)),
+        )
@@ -1,3 +1,5 @@
+from typing import Optional
+from inbox_zero.shared.account_store import AccountStore
 from inbox_zero.shared.email_reader import ImapConfig
 from inbox_zero.list_imap_accounts.port import ImapAccountReaderPort
 
@@ -8,3 +10,17 @@ class ImapAccountReaderInMemory(ImapAccountReaderPort):
 
     def get_all(self) -> list[ImapConfig]:
         return self._accounts.copy()
+
+    def get_by_id(self, account_id: int) -> Optional[ImapConfig]:
+        return self._accounts[account_id - 1] if 0 < account_id <= len(self._accounts) else None
+
+
+class ImapAccountReaderSqlite(ImapAccountReaderPort):
+    def __init__(self, store: AccountStore) -> None:
+        self._store = store
+
+    def get_all(self) -> list[ImapConfig]:
+        return self._store.get_all()
+
+    def get_by_id(self, account_id: int) -> Optional[ImapConfig]:
+        return self._store.get(account_id)
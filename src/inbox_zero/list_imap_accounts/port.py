@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Optional
 from inbox_zero.shared.email_reader import ImapConfig
 from pyqure import Key
 
@@ -8,6 +9,10 @@ class ImapAccountReaderPort(ABC):
     def get_all(self) -> list[ImapConfig]:
         pass
 
+    @abstractmethod
+    def get_by_id(self, account_id: int) -> Optional[ImapConfig]:
+        pass
+
 
 IMAP_ACCOUNT_READER_PORT_KEY: Key[ImapAccountReaderPort] = Key(
     "imap_account_reader_port", ImapAccountReaderPort
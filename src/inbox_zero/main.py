@@ -1,6 +1,505 @@
-def main() -> None:
-    print("Hello from hello-world!")
+import argparse
+import json
+import os
+import sys
+import time
+from contextlib import ExitStack
+from datetime import date
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Sequence, TextIO
+
+if TYPE_CHECKING:
+    from pyqure import PyqureMemory
+
+    from inbox_zero.shared.account_store import AccountStore
+    from inbox_zero.shared.email_query import EmailQuery
+    from inbox_zero.shared.email_reader import EmailEnvelope
+    from inbox_zero.shared.imap_config import ImapConfig
+    from inbox_zero.shared.instrumentation import Instrumentation
+
+
+ORDER_COLUMNS = ("uid", "date", "size", "sender", "subject")
+
+
+class CommandError(Exception):
+    pass
+
+
+def emit(record: Dict[str, Any], output: Optional[TextIO] = None) -> None:
+    stream = output or sys.stdout
+    stream.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+    stream.flush()
+
+
+def envelope_record(envelope: "EmailEnvelope") -> Dict[str, Any]:
+    return {
+        "event": "email",
+        "uid": int(envelope.uid.value),
+        "date": envelope.date,
+        "sender": envelope.sender,
+        "subject": envelope.subject,
+        "size": envelope.size,
+        "attachments": envelope.attachments,
+        "list_id": envelope.list_id,
+        "flags": list(envelope.flags),
+    }
+
+
+def account_record(account_id: int, config: "ImapConfig") -> Dict[str, Any]:
+    return {
+        "event": "account",
+        "id": account_id,
+        "host": config.host,
+        "port": config.port,
+        "username": config.username,
+        "use_ssl": config.use_ssl,
+    }
+
+
+def open_store() -> "AccountStore":
+    from inbox_zero.shared.account_store import open_account_store
+
+    return open_account_store()
+
+
+def create_dependencies(
+    store: "AccountStore",
+    instrumentation: Optional["Instrumentation"] = None,
+    resources: Optional[ExitStack] = None,
+) -> "PyqureMemory":
+    from pyqure import pyqure
+
+    from inbox_zero.shared.folder_sync import FolderSyncStateStore
+    from inbox_zero.shared.imap_pool import ImapConnectionPool
+    from inbox_zero.shared.instrumentation import NO_INSTRUMENTATION, instrument
+    from inbox_zero.shared.local_mirror import LocalMirror
+    from inbox_zero.shared.search_index import SearchIndex
+    from inbox_zero.shared.async_email_reader import AsyncEmailReaders
+    from inbox_zero.shared.settings import (
+        imap_backend,
+        mirror_path,
+        search_index_path,
+        sync_state_path,
+        thread_index_path,
+    )
+    from inbox_zero.shared.thread_index import ThreadIndex
+    from inbox_zero.apply_archive_rules.adapter import RuleMailboxImap
+    from inbox_zero.apply_archive_rules.port import RULE_MAILBOX_PORT_KEY
+    from inbox_zero.archive_many_emails.adapter import EmailBatchArchiverAsync, EmailBatchArchiverImap
+    from inbox_zero.archive_many_emails.port import EmailBatchArchiverPort
+    from inbox_zero.archive_many_emails.port import EMAIL_BATCH_ARCHIVER_PORT_KEY
+    from inbox_zero.archive_thread.adapter import ThreadMailboxImap
+    from inbox_zero.archive_thread.port import THREAD_MAILBOX_PORT_KEY
+    from inbox_zero.create_imap_account.adapter import ImapAccountRepositorySqlite
+    from inbox_zero.create_imap_account.port import IMAP_ACCOUNT_REPOSITORY_PORT_KEY
+    from inbox_zero.download_attachments.adapter import AttachmentDownloaderImap
+    from inbox_zero.download_attachments.port import ATTACHMENT_DOWNLOADER_PORT_KEY
+    from inbox_zero.list_emails.adapter import EmailListerImap
+    from inbox_zero.list_emails.port import EMAIL_LISTER_PORT_KEY
+    from inbox_zero.list_imap_accounts.adapter import ImapAccountReaderSqlite
+    from inbox_zero.list_imap_accounts.port import IMAP_ACCOUNT_READER_PORT_KEY
+    from inbox_zero.query_emails.adapter import EmailSearchImap
+    from inbox_zero.query_emails.port import EMAIL_SEARCH_PORT_KEY
+    from inbox_zero.read_folder_stats.adapter import FolderStatsReaderImap
+    from inbox_zero.read_folder_stats.port import FOLDER_STATS_READER_PORT_KEY
+    from inbox_zero.search_emails.adapter import EmailIndexSqlite
+    from inbox_zero.search_emails.port import EMAIL_INDEX_PORT_KEY
+    from inbox_zero.sync_folder.adapter import FolderSynchronizerImap
+    from inbox_zero.sync_folder.port import FOLDER_SYNCHRONIZER_PORT_KEY
+    from inbox_zero.sync_mirror.adapter import MirrorSynchronizerLocal
+    from inbox_zero.sync_mirror.port import MIRROR_SYNCHRONIZER_PORT_KEY
+
+    memory: PyqureMemory = {}
+    (provide, _) = pyqure(memory)
+
+    instrumentation = instrumentation or NO_INSTRUMENTATION
+    pool = ImapConnectionPool(instrumentation=instrumentation)
+    sync_states = FolderSyncStateStore(sync_state_path())
+    threads = ThreadIndex(thread_index_path())
+    provide(IMAP_ACCOUNT_REPOSITORY_PORT_KEY, instrument(ImapAccountRepositorySqlite(store), instrumentation))
+    provide(IMAP_ACCOUNT_READER_PORT_KEY, instrument(ImapAccountReaderSqlite(store), instrumentation))
+    synchronizer = FolderSynchronizerImap(sync_states, pool, threads)
+    provide(FOLDER_SYNCHRONIZER_PORT_KEY, instrument(synchronizer, instrumentation))
+    provide(EMAIL_LISTER_PORT_KEY, instrument(EmailListerImap(pool), instrumentation))
+    provide(EMAIL_SEARCH_PORT_KEY, instrument(EmailSearchImap(pool), instrumentation))
+    if resources is not None:
+        resources.callback(pool.close)
+        resources.callback(sync_states.close)
+    batch_archiver: EmailBatchArchiverPort = EmailBatchArchiverImap(pool)
+    if imap_backend() == "asyncio":
+        readers = AsyncEmailReaders()
+        if resources is not None:
+            resources.callback(readers.close)
+        batch_archiver = EmailBatchArchiverAsync(readers)
+    provide(EMAIL_BATCH_ARCHIVER_PORT_KEY, instrument(batch_archiver, instrumentation))
+    provide(ATTACHMENT_DOWNLOADER_PORT_KEY, instrument(AttachmentDownloaderImap(pool), instrumentation))
+    provide(FOLDER_STATS_READER_PORT_KEY, instrument(FolderStatsReaderImap(pool), instrumentation))
+    provide(RULE_MAILBOX_PORT_KEY, instrument(RuleMailboxImap(pool), instrumentation))
+    index = SearchIndex(search_index_path())
+    provide(EMAIL_INDEX_PORT_KEY, instrument(EmailIndexSqlite(index), instrumentation))
+    provide(THREAD_MAILBOX_PORT_KEY, instrument(ThreadMailboxImap(threads, pool), instrumentation))
+    mirror = LocalMirror(mirror_path(), pool)
+    provide(MIRROR_SYNCHRONIZER_PORT_KEY, instrument(MirrorSynchronizerLocal(mirror), instrumentation))
+    if resources is not None:
+        for resource in (index, threads, mirror):
+            resources.callback(resource.close)
+    return memory
+
+
+def create_index_dependencies(store: "AccountStore", resources: ExitStack) -> "PyqureMemory":
+    from pyqure import pyqure
+
+    from inbox_zero.shared.search_index import SearchIndex
+    from inbox_zero.shared.settings import search_index_path
+    from inbox_zero.list_imap_accounts.adapter import ImapAccountReaderSqlite
+    from inbox_zero.list_imap_accounts.port import IMAP_ACCOUNT_READER_PORT_KEY
+    from inbox_zero.search_emails.adapter import EmailIndexSqlite
+    from inbox_zero.search_emails.port import EMAIL_INDEX_PORT_KEY
+
+    memory: PyqureMemory = {}
+    (provide, _) = pyqure(memory)
+
+    index = SearchIndex(search_index_path())
+    resources.callback(index.close)
+    provide(IMAP_ACCOUNT_READER_PORT_KEY, ImapAccountReaderSqlite(store))
+    provide(EMAIL_INDEX_PORT_KEY, EmailIndexSqlite(index))
+    return memory
+
+
+def select_account(dependencies: "PyqureMemory", account_id: Optional[int]) -> "ImapConfig":
+    from inbox_zero.list_imap_accounts.use_case import ListImapAccountsUseCase
+    from inbox_zero.list_imap_accounts.port import IMAP_ACCOUNT_READER_PORT_KEY
+    from pyqure import pyqure
+
+    if account_id is None:
+        accounts = ListImapAccountsUseCase(dependencies).execute()
+        if len(accounts) != 1:
+            raise CommandError(f"{len(accounts)} accounts configured, choose one with --account")
+        return accounts[0]
+
+    (_, inject) = pyqure(dependencies)
+    config: Optional["ImapConfig"] = inject(IMAP_ACCOUNT_READER_PORT_KEY).get_by_id(account_id)
+    if config is None:
+        raise CommandError(f"unknown account {account_id}")
+    return config
+
+
+def parse_query(arguments: argparse.Namespace) -> "EmailQuery":
+    from inbox_zero.shared.email_query import EmailQuery
+
+    return EmailQuery(
+        sender=arguments.sender,
+        subject=arguments.subject,
+        text=arguments.text,
+        since=arguments.since,
+        before=arguments.before,
+        larger_than=arguments.larger_than,
+        smaller_than=arguments.smaller_than,
+        seen=arguments.seen,
+        flagged=arguments.flagged,
+        has_attachment=arguments.has_attachment,
+    )
+
+
+def command_accounts(arguments: argparse.Namespace) -> None:
+    store = open_store()
+    for account_id, config in store.get_all_by_id().items():
+        emit(account_record(account_id, config))
+
+
+def command_add_account(arguments: argparse.Namespace) -> None:
+    from inbox_zero.shared.imap_config import ImapConfig
+
+    password = os.environ.get("INBOX_ZERO_PASSWORD") or sys.stdin.readline().rstrip("\r\n")
+    if not password:
+        raise CommandError("password expected in INBOX_ZERO_PASSWORD or on stdin")
+    config = ImapConfig(
+        host=arguments.host,
+        port=arguments.port,
+        username=arguments.username,
+        password=password,
+        use_ssl=not arguments.no_ssl,
+    )
+    store = open_store()
+    emit(account_record(store.save(config), config))
+
+
+def command_sync(arguments: argparse.Namespace, dependencies: "PyqureMemory", config: "ImapConfig") -> None:
+    from inbox_zero.sync_folder.use_case import SyncFolderUseCase
+
+    delta = SyncFolderUseCase(dependencies).execute(config, arguments.folder)
+    emit({
+        "event": "sync",
+        "folder": arguments.folder,
+        "added": len(delta.added),
+        "changed": len(delta.changed),
+        "vanished": len(delta.vanished),
+        "full_resync": delta.full_resync,
+    })
+
+
+def command_mirror(arguments: argparse.Namespace, dependencies: "PyqureMemory", config: "ImapConfig") -> None:
+    from inbox_zero.sync_mirror.use_case import SyncMirrorUseCase
+
+    report = SyncMirrorUseCase(dependencies).execute(config, arguments.folder)
+    emit({
+        "event": "mirror",
+        "folder": arguments.folder,
+        "added": report.added,
+        "removed": report.removed,
+        "replayed": report.replayed,
+        "pending": report.pending,
+        "discarded": report.discarded,
+        "abandoned": report.abandoned,
+        "full_resync": report.full_resync,
+    })
+
+
+def command_list(arguments: argparse.Namespace, dependencies: "PyqureMemory", config: "ImapConfig") -> None:
+    from inbox_zero.list_emails.use_case import EmailCursor, ListEmailsUseCase
+
+    use_case = ListEmailsUseCase(dependencies)
+    cursor = None
+    if arguments.cursor:
+        uid_validity, _, after_uid = arguments.cursor.partition(":")
+        cursor = EmailCursor(int(uid_validity), int(after_uid))
+    unseen = 0
+    while True:
+        page = use_case.execute(
+            config,
+            arguments.folder,
+            cursor,
+            limit=arguments.limit,
+            order=arguments.order,
+            descending=arguments.descending,
+        )
+        unseen += page.unseen
+        for envelope in page.envelopes:
+            emit(envelope_record(envelope))
+        cursor = page.next_cursor
+        if cursor is None or not arguments.all:
+            break
+    emit({
+        "event": "page",
+        "total": page.total,
+        "unseen": unseen,
+        "next_cursor": f"{cursor.uid_validity}:{cursor.after_uid}" if cursor is not None else None,
+    })
+
+
+def command_archive(arguments: argparse.Namespace, dependencies: "PyqureMemory", config: "ImapConfig") -> None:
+    from inbox_zero.archive_by_query.use_case import ArchiveByQueryUseCase
+
+    report = ArchiveByQueryUseCase(dependencies).execute(
+        config, arguments.folder, parse_query(arguments), dry_run=arguments.dry_run
+    )
+    emit({
+        "event": "archive",
+        "folder": arguments.folder,
+        "dry_run": arguments.dry_run,
+        "matched": report.matched,
+        "archived": report.archived,
+        "failed": [int(uid.value) for uid in report.failed],
+    })
+
+
+def command_archive_thread(arguments: argparse.Namespace, dependencies: "PyqureMemory", config: "ImapConfig") -> None:
+    from inbox_zero.archive_thread.use_case import ArchiveThreadUseCase
+    from inbox_zero.shared.email_reader import EmailUid
+
+    report = ArchiveThreadUseCase(dependencies).execute(config, arguments.folder, EmailUid(str(arguments.uid)))
+    emit({
+        "event": "archive_thread",
+        "folder": arguments.folder,
+        "uid": arguments.uid,
+        "thread": [int(uid.value) for uid in report.thread],
+        "archived": len(report.archived),
+    })
+
+
+def command_download_attachments(
+    arguments: argparse.Namespace, dependencies: "PyqureMemory", config: "ImapConfig"
+) -> None:
+    from inbox_zero.download_attachments.use_case import DownloadAttachmentsUseCase
+
+    for path in DownloadAttachmentsUseCase(dependencies).execute(config, arguments.folder, arguments.output):
+        emit({"event": "attachment", "path": str(path), "size": path.stat().st_size})
+
+
+def command_stats(arguments: argparse.Namespace, dependencies: "PyqureMemory", config: "ImapConfig") -> None:
+    from inbox_zero.read_folder_stats.use_case import ReadFolderStatsUseCase
+
+    for folder, stats in ReadFolderStatsUseCase(dependencies).execute(config, arguments.folders or ["INBOX"]).items():
+        emit({
+            "event": "stats",
+            "folder": folder,
+            "messages": stats.messages,
+            "unseen": stats.unseen,
+            "uid_next": stats.uid_next,
+            "uid_validity": stats.uid_validity,
+        })
+
+
+def command_find(arguments: argparse.Namespace) -> None:
+    from inbox_zero.search_emails.use_case import SearchEmailsUseCase
+
+    with ExitStack() as resources:
+        dependencies = create_index_dependencies(open_store(), resources)
+        config = select_account(dependencies, arguments.account)
+        folder = None if arguments.all_folders else arguments.folder
+        hits = SearchEmailsUseCase(dependencies).execute(config, arguments.text, folder, limit=arguments.limit)
+    for hit in hits:
+        emit({
+            "event": "hit",
+            "folder": hit.folder,
+            "uid": int(hit.uid.value),
+            "date": hit.date,
+            "sender": hit.sender,
+            "subject": hit.subject,
+            "snippet": hit.snippet,
+        })
+
+
+def command_rules(arguments: argparse.Namespace, dependencies: "PyqureMemory", config: "ImapConfig") -> None:
+    from inbox_zero.shared.archive_rules import load_rules
+    from inbox_zero.apply_archive_rules.use_case import ApplyArchiveRulesUseCase
+
+    rules = load_rules(arguments.rules)
+    use_case = ApplyArchiveRulesUseCase(dependencies)
+    while True:
+        report = use_case.execute(config, arguments.folder, rules, dry_run=arguments.dry_run)
+        emit({
+            "event": "rules",
+            "folder": arguments.folder,
+            "dry_run": arguments.dry_run,
+            "scanned": report.scanned,
+            "matched": report.matched,
+            "moved": report.moved,
+            "failed": [int(uid.value) for uid in report.failed],
+        })
+        if arguments.every is None:
+            return
+        time.sleep(arguments.every)
+
+
+def optional_flag(parser: argparse.ArgumentParser, name: str, negation: str, help_text: str) -> None:
+    dest = name.replace("-", "_")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument(f"--{name}", dest=dest, action="store_const", const=True, default=None, help=help_text)
+    group.add_argument(f"--{negation}", dest=dest, action="store_const", const=False)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="inbox-zero", description="Headless IMAP triage, one JSON object per line.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("accounts", help="list stored accounts").set_defaults(handler=command_accounts)
+
+    add_account = commands.add_parser("add-account", help="store an account, password read from stdin")
+    add_account.add_argument("--host", required=True)
+    add_account.add_argument("--port", type=int, default=993)
+    add_account.add_argument("--username", required=True)
+    add_account.add_argument("--no-ssl", action="store_true")
+    add_account.set_defaults(handler=command_add_account)
+
+    mailbox = argparse.ArgumentParser(add_help=False)
+    mailbox.add_argument("--account", type=int, help="account id, optional when only one account is stored")
+    mailbox.add_argument("--folder", default="INBOX")
+    mailbox.add_argument("--trace", type=Path, help="write OpenTelemetry JSON spans and metrics to this file")
+    mailbox.add_argument("--metrics", type=Path, help="write Prometheus text metrics to this file")
+
+    sync = commands.add_parser("sync", parents=[mailbox], help="synchronise a folder incrementally")
+    sync.set_defaults(network_handler=command_sync)
+
+    mirror = commands.add_parser("mirror", parents=[mailbox], help="replay queued archives, mirror a folder to disk")
+    mirror.set_defaults(network_handler=command_mirror)
+
+    listing = commands.add_parser("list", parents=[mailbox], help="list envelopes page by page")
+    listing.add_argument("--limit", type=int, default=100)
+    listing.add_argument("--cursor", help="resume after UIDVALIDITY:UID")
+    listing.add_argument("--all", action="store_true", help="follow cursors until the end of the folder")
+    listing.add_argument("--order", choices=ORDER_COLUMNS, default="uid", help="sort each page by this column")
+    listing.add_argument("--descending", action="store_true")
+    listing.set_defaults(network_handler=command_list)
+
+    archive = commands.add_parser("archive", parents=[mailbox], help="archive every email matching a query")
+    archive.add_argument("--from", dest="sender", default="")
+    archive.add_argument("--subject", default="")
+    archive.add_argument("--text", default="")
+    archive.add_argument("--since", type=date.fromisoformat)
+    archive.add_argument("--before", type=date.fromisoformat)
+    archive.add_argument("--larger-than", type=int)
+    archive.add_argument("--smaller-than", type=int)
+    optional_flag(archive, "seen", "unseen", "only read emails")
+    optional_flag(archive, "flagged", "unflagged", "only flagged emails")
+    optional_flag(archive, "has-attachment", "no-attachment", "only emails with attachments")
+    archive.add_argument("--dry-run", action="store_true")
+    archive.set_defaults(network_handler=command_archive)
+
+    archive_thread = commands.add_parser(
+        "archive-thread", parents=[mailbox], help="archive a conversation from the local thread index (run sync first)"
+    )
+    archive_thread.add_argument("--uid", type=int, required=True)
+    archive_thread.set_defaults(network_handler=command_archive_thread)
+
+    download = commands.add_parser("download-attachments", parents=[mailbox], help="save attachments to a directory")
+    download.add_argument("--output", type=Path, default=Path("attachments"))
+    download.set_defaults(network_handler=command_download_attachments)
+
+    stats = commands.add_parser("stats", parents=[mailbox], help="message counts per folder")
+    stats.add_argument("folders", nargs="*")
+    stats.set_defaults(network_handler=command_stats)
+
+    find = commands.add_parser("find", parents=[mailbox], help="full-text search in the local index, offline")
+    find.add_argument("text")
+    find.add_argument("--limit", type=int, default=50)
+    find.add_argument("--all-folders", action="store_true")
+    find.set_defaults(handler=command_find)
+
+    rules = commands.add_parser("rules", parents=[mailbox], help="apply archive rules from a JSON file")
+    rules.add_argument("--rules", type=Path, required=True)
+    rules.add_argument("--dry-run", action="store_true")
+    rules.add_argument("--every", type=float, help="run again every N seconds instead of exiting")
+    rules.set_defaults(network_handler=command_rules)
+
+    return parser
+
+
+def run(arguments: argparse.Namespace) -> None:
+    handler: Optional[Callable[[argparse.Namespace], None]] = getattr(arguments, "handler", None)
+    if handler is not None:
+        handler(arguments)
+        return
+
+    from inbox_zero.shared.instrumentation import Instrumentation, otlp_metrics, otlp_traces, prometheus_text
+
+    instrumentation = Instrumentation(enabled=bool(arguments.trace or arguments.metrics))
+    store = open_store()
+    try:
+        with ExitStack() as resources:
+            dependencies = create_dependencies(store, instrumentation, resources)
+            config = select_account(dependencies, arguments.account)
+            with instrumentation.span(f"cli.{arguments.command}", folder=arguments.folder):
+                arguments.network_handler(arguments, dependencies, config)
+    finally:
+        if arguments.trace:
+            trace = {**otlp_traces(instrumentation), **otlp_metrics(instrumentation)}
+            arguments.trace.write_text(json.dumps(trace), encoding="utf-8")
+        if arguments.metrics:
+            arguments.metrics.write_text(prometheus_text(instrumentation), encoding="utf-8")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    arguments = build_parser().parse_args(argv)
+    try:
+        run(arguments)
+    except KeyboardInterrupt:
+        return 130
+    except Exception as error:
+        emit({"event": "error", "command": arguments.command, "error": str(error)}, sys.stderr)
+        return 1
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
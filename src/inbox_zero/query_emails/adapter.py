@@ -0,0 +1,18 @@
+from typing import List, Optional
+from inbox_zero.shared.email_query import EmailQuery
+from inbox_zero.shared.email_reader import EmailReader, EmailEnvelope, EmailUid, ImapConfig
+from inbox_zero.shared.imap_pool import ImapConnectionPool
+from inbox_zero.query_emails.port import EmailSearchPort
+
+
+class EmailSearchImap(EmailSearchPort):
+    def __init__(self, pool: Optional[ImapConnectionPool] = None) -> None:
+        self._pool = pool
+
+    def search(self, config: ImapConfig, folder: str, query: EmailQuery) -> List[EmailUid]:
+        email_reader = EmailReader.from_config(config, pool=self._pool)
+        return email_reader.search(folder=folder, query=query)
+
+    def get_envelopes(self, config: ImapConfig, folder: str, uids: List[EmailUid]) -> List[EmailEnvelope]:
+        email_reader = EmailReader.from_config(config, pool=self._pool)
+        return email_reader.fetch_envelopes_by_uid(folder=folder, uids=uids)
@@ -0,0 +1,18 @@
+from abc import ABC, abstractmethod
+from typing import List
+from inbox_zero.shared.email_query import EmailQuery
+from inbox_zero.shared.email_reader import EmailEnvelope, EmailUid, ImapConfig
+from pyqure import Key
+
+
+class EmailSearchPort(ABC):
+    @abstractmethod
+    def search(self, config: ImapConfig, folder: str, query: EmailQuery) -> List[EmailUid]:
+        pass
+
+    @abstractmethod
+    def get_envelopes(self, config: ImapConfig, folder: str, uids: List[EmailUid]) -> List[EmailEnvelope]:
+        pass
+
+
+EMAIL_SEARCH_PORT_KEY: Key[EmailSearchPort] = Key("email_search_port", EmailSearchPort)
@@ -0,0 +1,34 @@
+from dataclasses import dataclass
+from typing import List
+from inbox_zero.shared.email_query import EmailQuery
+from inbox_zero.shared.email_reader import EmailEnvelope, ImapConfig
+from inbox_zero.query_emails.port import EmailSearchPort, EMAIL_SEARCH_PORT_KEY
+from pyqure import pyqure, PyqureMemory
+
+
+@dataclass(frozen=True)
+class EmailPage:
+    envelopes: List[EmailEnvelope]
+    total: int
+    page: int
+    page_size: int
+
+    @property
+    def has_next(self) -> bool:
+        return (self.page + 1) * self.page_size < self.total
+
+
+class QueryEmailsUseCase:
+    search: EmailSearchPort
+
+    def __init__(self, dependencies: PyqureMemory) -> None:
+        (provide, inject) = pyqure(dependencies)
+        self.search = inject(EMAIL_SEARCH_PORT_KEY)
+
+    def execute(
+        self, config: ImapConfig, folder: str, query: EmailQuery, page: int = 0, page_size: int = 20
+    ) -> EmailPage:
+        uids = self.search.search(config, folder, query)
+        selected = uids[page * page_size:(page + 1) * page_size]
+        envelopes = self.search.get_envelopes(config, folder, selected) if selected else []
+        return EmailPage(envelopes=envelopes, total=len(uids), page=page, page_size=page_size)
@@ -0,0 +1,55 @@
+from typing import Optional
+from inbox_zero.shared.email_reader import EmailReader, EmailBody, EmailEnvelope, ImapConfig
+from inbox_zero.shared.async_email_reader import AsyncEmailReaders
+from inbox_zero.shared.email_prefetcher import EmailPrefetcher
+from inbox_zero.shared.email_cache import EmailCache, account_key
+from inbox_zero.shared.imap_pool import ImapConnectionPool
+from inbox_zero.read_email_body.port import EmailBodyReaderPort
+
+
+class EmailBodyReaderImap(EmailBodyReaderPort):
+    def __init__(self, pool: Optional[ImapConnectionPool] = None) -> None:
+        self._pool = pool
+
+    def get_body(self, config: ImapConfig, folder: str, envelope: EmailEnvelope) -> EmailBody:
+        email_reader = EmailReader.from_config(config, pool=self._pool)
+        return email_reader.fetch_body(envelope, folder=folder)
+
+
+class EmailBodyReaderPrefetching(EmailBodyReaderPort):
+    def __init__(self, prefetcher: EmailPrefetcher, body_reader: EmailBodyReaderPort) -> None:
+        self._prefetcher = prefetcher
+        self._body_reader = body_reader
+
+    def get_body(self, config: ImapConfig, folder: str, envelope: EmailEnvelope) -> EmailBody:
+        prefetched = self._prefetcher.find(config, folder, envelope.uid)
+        if prefetched is None:
+            return self._body_reader.get_body(config, folder, envelope)
+        return prefetched.body
+
+
+class EmailBodyReaderCached(EmailBodyReaderPort):
+    def __init__(
+        self, cache: EmailCache, body_reader: EmailBodyReaderPort, pool: Optional[ImapConnectionPool] = None
+    ) -> None:
+        self._cache = cache
+        self._body_reader = body_reader
+        self._pool = pool
+
+    def get_body(self, config: ImapConfig, folder: str, envelope: EmailEnvelope) -> EmailBody:
+        uid_validity = EmailReader.from_config(config, pool=self._pool).uid_validity(folder=folder)
+        cached = self._cache.get(account_key(config), folder, uid_validity, envelope.uid)
+        if cached is not None:
+            return EmailBody(text=cached.body_text, html=cached.body_html)
+
+        body = self._body_reader.get_body(config, folder, envelope)
+        self._cache.put(account_key(config), folder, uid_validity, envelope.to_email_data(body))
+        return body
+
+
+class EmailBodyReaderAsync(EmailBodyReaderPort):
+    def __init__(self, readers: AsyncEmailReaders) -> None:
+        self._readers = readers
+
+    def get_body(self, config: ImapConfig, folder: str, envelope: EmailEnvelope) -> EmailBody:
+        return self._readers.run(self._readers.reader(config).fetch_body(envelope, folder=folder))
@@ -0,0 +1,12 @@
+from abc import ABC, abstractmethod
+from inbox_zero.shared.email_reader import EmailBody, EmailEnvelope, ImapConfig
+from pyqure import Key
+
+
+class EmailBodyReaderPort(ABC):
+    @abstractmethod
+    def get_body(self, config: ImapConfig, folder: str, envelope: EmailEnvelope) -> EmailBody:
+        pass
+
+
+EMAIL_BODY_READER_PORT_KEY: Key[EmailBodyReaderPort] = Key("email_body_reader_port", EmailBodyReaderPort)
@@ -0,0 +1,14 @@
+from inbox_zero.shared.email_reader import EmailBody, EmailEnvelope, ImapConfig
+from inbox_zero.read_email_body.port import EmailBodyReaderPort, EMAIL_BODY_READER_PORT_KEY
+from pyqure import pyqure, PyqureMemory
+
+
+class ReadEmailBodyUseCase:
+    body_reader: EmailBodyReaderPort
+
+    def __init__(self, dependencies: PyqureMemory) -> None:
+        (provide, inject) = pyqure(dependencies)
+        self.body_reader = inject(EMAIL_BODY_READER_PORT_KEY)
+
+    def execute(self, config: ImapConfig, folder: str, envelope: EmailEnvelope) -> EmailBody:
+        return self.body_reader.get_body(config, folder, envelope)
@@ -1,14 +1,59 @@
 from typing import Optional
 from inbox_zero.shared.email_reader import EmailReader, EmailData, ImapConfig
+from inbox_zero.shared.async_email_reader import AsyncEmailReaders
+from inbox_zero.shared.email_cache import EmailCache, account_key
+from inbox_zero.shared.imap_pool import ImapConnectionPool
+from inbox_zero.shared.local_mirror import LocalMirror
 from inbox_zero.read_first_email.port import EmailReaderPort
 
 
 class EmailReaderImap(EmailReaderPort):
+    def __init__(self, pool: Optional[ImapConnectionPool] = None) -> None:
+        self._pool = pool
+
     def get_first_email(self, config: ImapConfig, folder: str) -> Optional[EmailData]:
-        email_reader = EmailReader(
-            config.host, config.port, config.username, config.password, config.use_ssl
-        )
+        email_reader = EmailReader.from_config(config, pool=self._pool)
         emails = email_reader.fetch_emails(folder=folder, limit=1)
         if len(emails) == 0:
             return None
         return emails[0]
+
+
+class EmailReaderCached(EmailReaderPort):
+    def __init__(self, cache: EmailCache, pool: Optional[ImapConnectionPool] = None) -> None:
+        self._cache = cache
+        self._pool = pool
+
+    def get_first_email(self, config: ImapConfig, folder: str) -> Optional[EmailData]:
+        email_reader = EmailReader.from_config(config, pool=self._pool)
+        uid_validity, uid = email_reader.fetch_first_uid(folder=folder)
+        if uid is None:
+            return None
+
+        cached = self._cache.get(account_key(config), folder, uid_validity, uid)
+        if cached is not None:
+            return cached
+
+        email = email_reader.fetch_email(folder=folder, uid=uid)
+        if email is not None:
+            self._cache.put(account_key(config), folder, uid_validity, email)
+        return email
+
+
+class EmailReaderMirror(EmailReaderPort):
+    def __init__(self, mirror: LocalMirror) -> None:
+        self._mirror = mirror
+
+    def get_first_email(self, config: ImapConfig, folder: str) -> Optional[EmailData]:
+        return self._mirror.first_email(config, folder)
+
+
+class EmailReaderAsync(EmailReaderPort):
+    def __init__(self, readers: AsyncEmailReaders) -> None:
+        self._readers = readers
+
+    def get_first_email(self, config: ImapConfig, folder: str) -> Optional[EmailData]:
+        emails = self._readers.run(self._readers.reader(config).fetch_emails(folder=folder, limit=1))
+        if len(emails) == 0:
+            return None
+        return emails[0]
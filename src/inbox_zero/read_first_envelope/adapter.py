@@ -0,0 +1,40 @@
+from typing import Optional
+from inbox_zero.shared.email_reader import EmailReader, EmailEnvelope, ImapConfig
+from inbox_zero.shared.async_email_reader import AsyncEmailReaders
+from inbox_zero.shared.email_prefetcher import EmailPrefetcher
+from inbox_zero.shared.imap_pool import ImapConnectionPool
+from inbox_zero.read_first_envelope.port import EnvelopeReaderPort
+
+
+class EnvelopeReaderImap(EnvelopeReaderPort):
+    def __init__(self, pool: Optional[ImapConnectionPool] = None) -> None:
+        self._pool = pool
+
+    def get_first_envelope(self, config: ImapConfig, folder: str) -> Optional[EmailEnvelope]:
+        email_reader = EmailReader.from_config(config, pool=self._pool)
+        envelopes = email_reader.fetch_envelopes(folder=folder, limit=1)
+        if len(envelopes) == 0:
+            return None
+        return envelopes[0]
+
+
+class EnvelopeReaderPrefetching(EnvelopeReaderPort):
+    def __init__(self, prefetcher: EmailPrefetcher) -> None:
+        self._prefetcher = prefetcher
+
+    def get_first_envelope(self, config: ImapConfig, folder: str) -> Optional[EmailEnvelope]:
+        prefetched = self._prefetcher.first(config, folder)
+        if prefetched is None:
+            return None
+        return prefetched.envelope
+
+
+class EnvelopeReaderAsync(EnvelopeReaderPort):
+    def __init__(self, readers: AsyncEmailReaders) -> None:
+        self._readers = readers
+
+    def get_first_envelope(self, config: ImapConfig, folder: str) -> Optional[EmailEnvelope]:
+        envelopes = self._readers.run(self._readers.reader(config).fetch_envelopes(folder=folder, limit=1))
+        if len(envelopes) == 0:
+            return None
+        return envelopes[0]
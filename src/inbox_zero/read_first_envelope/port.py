@@ -0,0 +1,13 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+from inbox_zero.shared.email_reader import EmailEnvelope, ImapConfig
+from pyqure import Key
+
+
+class EnvelopeReaderPort(ABC):
+    @abstractmethod
+    def get_first_envelope(self, config: ImapConfig, folder: str) -> Optional[EmailEnvelope]:
+        pass
+
+
+ENVELOPE_READER_PORT_KEY: Key[EnvelopeReaderPort] = Key("envelope_reader_port", EnvelopeReaderPort)
@@ -0,0 +1,15 @@
+from typing import Optional
+from inbox_zero.shared.email_reader import EmailEnvelope, ImapConfig
+from inbox_zero.read_first_envelope.port import EnvelopeReaderPort, ENVELOPE_READER_PORT_KEY
+from pyqure import pyqure, PyqureMemory
+
+
+class ReadFirstEnvelopeUseCase:
+    envelope_reader: EnvelopeReaderPort
+
+    def __init__(self, dependencies: PyqureMemory) -> None:
+        (provide, inject) = pyqure(dependencies)
+        self.envelope_reader = inject(ENVELOPE_READER_PORT_KEY)
+
+    def execute(self, config: ImapConfig, folder: str = "INBOX") -> Optional[EmailEnvelope]:
+        return self.envelope_reader.get_first_envelope(config, folder)
@@ -0,0 +1,19 @@
+from typing import Optional
+from inbox_zero.shared.email_reader import EmailReader, ImapConfig
+from inbox_zero.shared.imap_pool import ImapConnectionPool
+from inbox_zero.read_folder_stats.port import FolderStats, FolderStatsReaderPort
+
+
+class FolderStatsReaderImap(FolderStatsReaderPort):
+    def __init__(self, pool: Optional[ImapConnectionPool] = None) -> None:
+        self._pool = pool
+
+    def get_stats(self, config: ImapConfig, folder: str) -> FolderStats:
+        email_reader = EmailReader.from_config(config, pool=self._pool)
+        status = email_reader.folder_status(folder, items=("MESSAGES", "UNSEEN", "UIDNEXT", "UIDVALIDITY"))
+        return FolderStats(
+            messages=status.get("MESSAGES", 0),
+            unseen=status.get("UNSEEN", 0),
+            uid_next=status.get("UIDNEXT", 0),
+            uid_validity=status.get("UIDVALIDITY", 0),
+        )
@@ -0,0 +1,21 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from inbox_zero.shared.email_reader import ImapConfig
+from pyqure import Key
+
+
+@dataclass(frozen=True)
+class FolderStats:
+    messages: int
+    unseen: int
+    uid_next: int
+    uid_validity: int
+
+
+class FolderStatsReaderPort(ABC):
+    @abstractmethod
+    def get_stats(self, config: ImapConfig, folder: str) -> FolderStats:
+        pass
+
+
+FOLDER_STATS_READER_PORT_KEY: Key[FolderStatsReaderPort] = Key("folder_stats_reader_port", FolderStatsReaderPort)
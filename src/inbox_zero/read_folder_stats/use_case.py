@@ -0,0 +1,15 @@
+from typing import Dict, Sequence
+from inbox_zero.shared.email_reader import ImapConfig
+from inbox_zero.read_folder_stats.port import FolderStats, FolderStatsReaderPort, FOLDER_STATS_READER_PORT_KEY
+from pyqure import pyqure, PyqureMemory
+
+
+class ReadFolderStatsUseCase:
+    reader: FolderStatsReaderPort
+
+    def __init__(self, dependencies: PyqureMemory) -> None:
+        (provide, inject) = pyqure(dependencies)
+        self.reader = inject(FOLDER_STATS_READER_PORT_KEY)
+
+    def execute(self, config: ImapConfig, folders: Sequence[str]) -> Dict[str, FolderStats]:
+        return {folder: self.reader.get_stats(config, folder) for folder in folders}
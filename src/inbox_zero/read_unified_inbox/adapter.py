@@ -0,0 +1,13 @@
+from typing import List, Optional
+from inbox_zero.shared.email_reader import EmailReader, EmailEnvelope, ImapConfig
+from inbox_zero.shared.imap_pool import ImapConnectionPool
+from inbox_zero.read_unified_inbox.port import AccountEnvelopesReaderPort
+
+
+class AccountEnvelopesReaderImap(AccountEnvelopesReaderPort):
+    def __init__(self, pool: Optional[ImapConnectionPool] = None) -> None:
+        self._pool = pool
+
+    def get_oldest_envelopes(self, config: ImapConfig, folder: str, limit: int, timeout: float) -> List[EmailEnvelope]:
+        email_reader = EmailReader.from_config(config, pool=self._pool)
+        return email_reader.fetch_oldest_envelopes(folder=folder, limit=limit, timeout=timeout)
@@ -0,0 +1,15 @@
+from abc import ABC, abstractmethod
+from typing import List
+from inbox_zero.shared.email_reader import EmailEnvelope, ImapConfig
+from pyqure import Key
+
+
+class AccountEnvelopesReaderPort(ABC):
+    @abstractmethod
+    def get_oldest_envelopes(self, config: ImapConfig, folder: str, limit: int, timeout: float) -> List[EmailEnvelope]:
+        pass
+
+
+ACCOUNT_ENVELOPES_READER_PORT_KEY: Key[AccountEnvelopesReaderPort] = Key(
+    "account_envelopes_reader_port", AccountEnvelopesReaderPort
+)
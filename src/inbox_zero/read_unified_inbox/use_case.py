@@ -0,0 +1,84 @@
+import heapq
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from inbox_zero.shared.email_reader import EmailEnvelope, ImapConfig
+from inbox_zero.list_imap_accounts.use_case import ListImapAccountsUseCase
+from inbox_zero.read_unified_inbox.port import AccountEnvelopesReaderPort, ACCOUNT_ENVELOPES_READER_PORT_KEY
+from pyqure import pyqure, PyqureMemory
+
+
+UNKNOWN_DATE = datetime.max.replace(tzinfo=timezone.utc)
+
+
+@dataclass(frozen=True)
+class UnifiedEnvelope:
+    config: ImapConfig
+    envelope: EmailEnvelope
+
+
+@dataclass
+class UnifiedInbox:
+    envelopes: List[UnifiedEnvelope] = field(default_factory=list)
+    failures: Dict[ImapConfig, str] = field(default_factory=dict)
+
+    @property
+    def first(self) -> Optional[UnifiedEnvelope]:
+        return self.envelopes[0] if self.envelopes else None
+
+
+def envelope_date(envelope: EmailEnvelope) -> datetime:
+    if not envelope.date:
+        return UNKNOWN_DATE
+    try:
+        date = datetime.fromisoformat(envelope.date)
+    except ValueError:
+        return UNKNOWN_DATE
+    return date if date.tzinfo is not None else date.replace(tzinfo=timezone.utc)
+
+
+class ReadUnifiedInboxUseCase:
+    envelopes_reader: AccountEnvelopesReaderPort
+
+    def __init__(self, dependencies: PyqureMemory, max_workers: int = 8, timeout: float = 10.0) -> None:
+        (provide, inject) = pyqure(dependencies)
+        self.envelopes_reader = inject(ACCOUNT_ENVELOPES_READER_PORT_KEY)
+        self.accounts = ListImapAccountsUseCase(dependencies)
+        self.max_workers = max_workers
+        self.timeout = timeout
+
+    def execute(self, folder: str = "INBOX", limit: int = 1) -> UnifiedInbox:
+        configs = self.accounts.execute()
+        inbox = UnifiedInbox()
+        if not configs:
+            return inbox
+
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(configs)), thread_name_prefix="unified")
+        futures: Dict[Future[List[EmailEnvelope]], ImapConfig] = {
+            executor.submit(self.envelopes_reader.get_oldest_envelopes, config, folder, limit, self.timeout): config
+            for config in configs
+        }
+        done, pending = wait(futures, timeout=self.timeout)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        streams: List[List[Tuple[datetime, int, int, UnifiedEnvelope]]] = []
+        for index, (future, config) in enumerate(futures.items()):
+            if future in pending:
+                inbox.failures[config] = f"Timeout after {self.timeout:g}s"
+                continue
+            error = future.exception()
+            if error is not None:
+                inbox.failures[config] = str(error)
+                continue
+            streams.append(sorted(
+                (
+                    (envelope_date(envelope), index, int(envelope.uid.value), UnifiedEnvelope(config, envelope))
+                    for envelope in future.result()
+                ),
+                key=lambda item: item[:3],
+            ))
+
+        merged = heapq.merge(*streams, key=lambda item: item[:3])
+        inbox.envelopes = [item[3] for _, item in zip(range(limit), merged)]
+        return inbox
@@ -0,0 +1,13 @@
+from typing import List, Optional
+from inbox_zero.shared.email_cache import account_key
+from inbox_zero.shared.email_reader import ImapConfig
+from inbox_zero.shared.search_index import SearchHit, SearchIndex
+from inbox_zero.search_emails.port import EmailIndexPort
+
+
+class EmailIndexSqlite(EmailIndexPort):
+    def __init__(self, index: SearchIndex) -> None:
+        self._index = index
+
+    def search(self, config: ImapConfig, text: str, folder: Optional[str], limit: int) -> List[SearchHit]:
+        return self._index.search(account_key(config), text, folder=folder, limit=limit)
@@ -0,0 +1,14 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional
+from inbox_zero.shared.email_reader import ImapConfig
+from inbox_zero.shared.search_index import SearchHit
+from pyqure import Key
+
+
+class EmailIndexPort(ABC):
+    @abstractmethod
+    def search(self, config: ImapConfig, text: str, folder: Optional[str], limit: int) -> List[SearchHit]:
+        pass
+
+
+EMAIL_INDEX_PORT_KEY: Key[EmailIndexPort] = Key("email_index_port", EmailIndexPort)
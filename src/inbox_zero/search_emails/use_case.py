@@ -0,0 +1,18 @@
+from typing import List, Optional
+from inbox_zero.shared.email_reader import ImapConfig
+from inbox_zero.shared.search_index import SearchHit
+from inbox_zero.search_emails.port import EmailIndexPort, EMAIL_INDEX_PORT_KEY
+from pyqure import pyqure, PyqureMemory
+
+
+class SearchEmailsUseCase:
+    index: EmailIndexPort
+
+    def __init__(self, dependencies: PyqureMemory) -> None:
+        (provide, inject) = pyqure(dependencies)
+        self.index = inject(EMAIL_INDEX_PORT_KEY)
+
+    def execute(self, config: ImapConfig, text: str, folder: Optional[str] = None, limit: int = 50) -> List[SearchHit]:
+        if not text.strip():
+            return []
+        return self.index.search(config, text.strip(), folder, limit)
@@ -0,0 +1,103 @@
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from cryptography.fernet import Fernet, InvalidToken
+
+from inbox_zero.shared.imap_config import ImapConfig
+from inbox_zero.shared.settings import accounts_path, secret_key_path
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS imap_account (
+    id INTEGER PRIMARY KEY,
+    host TEXT NOT NULL,
+    port INTEGER NOT NULL,
+    username TEXT NOT NULL,
+    password BLOB NOT NULL,
+    use_ssl INTEGER NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS imap_account_host_username ON imap_account (host, username);
+"""
+
+
+class AccountStoreError(Exception):
+    pass
+
+
+def load_or_create_key(path: Union[str, Path]) -> bytes:
+    path = Path(path)
+    if path.exists():
+        return path.read_bytes().strip()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    key = Fernet.generate_key()
+    handle = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(handle, "wb") as file:
+        file.write(key)
+    return key
+
+
+class AccountStore:
+    def __init__(self, key: bytes, path: Union[str, Path] = ":memory:") -> None:
+        self._cipher = Fernet(key)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(SCHEMA)
+        self._accounts = self._load()
+
+    def save(self, config: ImapConfig) -> int:
+        password = self._cipher.encrypt(config.password.encode("utf-8"))
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO imap_account (host, port, username, password, use_ssl) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (host, username) DO UPDATE SET "
+                "port = excluded.port, password = excluded.password, use_ssl = excluded.use_ssl",
+                (config.host, config.port, config.username, password, int(config.use_ssl)),
+            )
+            (account_id,) = self._connection.execute(
+                "SELECT id FROM imap_account WHERE host = ? AND username = ?", (config.host, config.username)
+            ).fetchone()
+            self._accounts[account_id] = config
+        return int(account_id)
+
+    def get(self, account_id: int) -> Optional[ImapConfig]:
+        return self._accounts.get(account_id)
+
+    def get_all(self) -> List[ImapConfig]:
+        return list(self._accounts.values())
+
+    def get_all_by_id(self) -> Dict[int, ImapConfig]:
+        return dict(self._accounts)
+
+    def delete(self, account_id: int) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM imap_account WHERE id = ?", (account_id,))
+            self._accounts.pop(account_id, None)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _load(self) -> Dict[int, ImapConfig]:
+        rows = self._connection.execute(
+            "SELECT id, host, port, username, password, use_ssl FROM imap_account ORDER BY id"
+        ).fetchall()
+        accounts: Dict[int, ImapConfig] = {}
+        for account_id, host, port, username, password, use_ssl in rows:
+            try:
+                decrypted = self._cipher.decrypt(password).decode("utf-8")
+            except InvalidToken:
+                raise AccountStoreError(f"cannot decrypt credentials of {username}@{host}: wrong key") from None
+            accounts[account_id] = ImapConfig(
+                host=host, port=port, username=username, password=decrypted, use_ssl=bool(use_ssl)
+            )
+        return accounts
+
+
+def open_account_store() -> AccountStore:
+    secret = os.environ.get("INBOX_ZERO_SECRET_KEY")
+    key = secret.encode() if secret else load_or_create_key(secret_key_path())
+    return AccountStore(key, accounts_path())
@@ -0,0 +1,166 @@
+import json
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Pattern, Sequence, Tuple, Union
+
+from inbox_zero.shared.email_reader import EmailEnvelope, EmailUid
+from inbox_zero.shared.envelope_table import NO_DATE, EnvelopeTable, epoch_seconds
+
+
+ARCHIVE_FOLDER = "Archive"
+
+
+@dataclass(frozen=True)
+class ArchiveRule:
+    name: str
+    destination: str = ARCHIVE_FOLDER
+    senders: Tuple[str, ...] = ()
+    domains: Tuple[str, ...] = ()
+    subject_patterns: Tuple[str, ...] = ()
+    list_ids: Tuple[str, ...] = ()
+    older_than_days: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class _CompiledRule:
+    rule: ArchiveRule
+    senders: FrozenSet[str]
+    domains: FrozenSet[str]
+    subject: Optional[Pattern[str]]
+    list_ids: FrozenSet[str]
+    max_age: Optional[timedelta]
+
+
+@dataclass
+class RuleMatches:
+    by_destination: Dict[str, List[EmailUid]] = field(default_factory=dict)
+    by_rule: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, rule: ArchiveRule, uid: EmailUid) -> None:
+        self.by_destination.setdefault(rule.destination, []).append(uid)
+        self.by_rule[rule.name] = self.by_rule.get(rule.name, 0) + 1
+
+    def merge(self, other: "RuleMatches") -> None:
+        for destination, uids in other.by_destination.items():
+            self.by_destination.setdefault(destination, []).extend(uids)
+        for name, count in other.by_rule.items():
+            self.by_rule[name] = self.by_rule.get(name, 0) + count
+
+
+def sender_domains(sender: str) -> List[str]:
+    domain = sender.rpartition("@")[2].lower()
+    labels = domain.split(".")
+    return [".".join(labels[index:]) for index in range(len(labels) - 1)] if domain else []
+
+
+class CompiledRules:
+    def __init__(self, rules: Sequence[ArchiveRule]) -> None:
+        self._rules = [self._compile(rule) for rule in rules]
+        self._by_sender: Dict[str, List[int]] = {}
+        self._by_domain: Dict[str, List[int]] = {}
+        self._by_list_id: Dict[str, List[int]] = {}
+        self._unindexed: List[int] = []
+        for index, compiled in enumerate(self._rules):
+            for sender in compiled.senders:
+                self._by_sender.setdefault(sender, []).append(index)
+            for domain in compiled.domains:
+                self._by_domain.setdefault(domain, []).append(index)
+            for list_id in compiled.list_ids:
+                self._by_list_id.setdefault(list_id, []).append(index)
+            if not (compiled.senders or compiled.domains or compiled.list_ids):
+                self._unindexed.append(index)
+
+    def match(self, envelope: EmailEnvelope, now: datetime) -> Optional[ArchiveRule]:
+        date = epoch_seconds(envelope.date)
+        for index in self._candidates(envelope.sender.lower(), envelope.list_id):
+            if self._matches(self._rules[index], envelope.subject, date, int(now.timestamp())):
+                return self._rules[index].rule
+        return None
+
+    def evaluate(self, envelopes: Iterable[EmailEnvelope], now: Optional[datetime] = None) -> RuleMatches:
+        return self.evaluate_table(EnvelopeTable.from_envelopes(envelopes), now)
+
+    def evaluate_table(self, table: EnvelopeTable, now: Optional[datetime] = None) -> RuleMatches:
+        timestamp = int((now or datetime.now(timezone.utc)).timestamp())
+        candidates: Dict[Tuple[int, int], List[int]] = {}
+        matches = RuleMatches()
+        for row, (sender_id, list_id) in enumerate(zip(table.senders, table.list_ids)):
+            if (sender_id, list_id) not in candidates:
+                sender = table.sender_names.value(sender_id).lower()
+                candidates[sender_id, list_id] = self._candidates(sender, table.list_names.value(list_id))
+            for index in candidates[sender_id, list_id]:
+                compiled = self._rules[index]
+                subject = table.subject(row) if compiled.subject is not None else ""
+                if self._matches(compiled, subject, table.dates[row], timestamp):
+                    matches.add(compiled.rule, table.uid(row))
+                    break
+        return matches
+
+    def _candidates(self, sender: str, list_id: str) -> List[int]:
+        candidates = set(self._unindexed)
+        candidates.update(self._by_sender.get(sender, ()))
+        for domain in sender_domains(sender):
+            candidates.update(self._by_domain.get(domain, ()))
+        if list_id:
+            candidates.update(self._by_list_id.get(list_id, ()))
+        return [index for index in sorted(candidates) if self._matches_sender(self._rules[index], sender, list_id)]
+
+    def _compile(self, rule: ArchiveRule) -> _CompiledRule:
+        subject = None
+        if rule.subject_patterns:
+            subject = re.compile("|".join(f"(?:{pattern})" for pattern in rule.subject_patterns), re.IGNORECASE)
+        return _CompiledRule(
+            rule=rule,
+            senders=frozenset(sender.lower() for sender in rule.senders),
+            domains=frozenset(domain.lower().lstrip("@.") for domain in rule.domains),
+            subject=subject,
+            list_ids=frozenset(list_id.lower().strip("<>") for list_id in rule.list_ids),
+            max_age=timedelta(days=rule.older_than_days) if rule.older_than_days is not None else None,
+        )
+
+    def _matches_sender(self, compiled: _CompiledRule, sender: str, list_id: str) -> bool:
+        if compiled.senders and sender not in compiled.senders:
+            return False
+        if compiled.domains and compiled.domains.isdisjoint(sender_domains(sender)):
+            return False
+        if compiled.list_ids and list_id not in compiled.list_ids:
+            return False
+        return True
+
+    def _matches(self, compiled: _CompiledRule, subject: str, date: int, now: int) -> bool:
+        if compiled.subject is not None and compiled.subject.search(subject) is None:
+            return False
+        if compiled.max_age is not None:
+            if date == NO_DATE or now - date < compiled.max_age.total_seconds():
+                return False
+        return True
+
+
+def rule_from_dict(data: Dict[str, Any]) -> ArchiveRule:
+    name = str(data["name"])
+    older_than_days = data.get("older_than_days")
+    if older_than_days is not None and (isinstance(older_than_days, bool) or not isinstance(older_than_days, int)):
+        raise ValueError(f"rule {name!r}: older_than_days must be an integer, got {older_than_days!r}")
+    return ArchiveRule(
+        name=name,
+        destination=str(data.get("destination", ARCHIVE_FOLDER)),
+        senders=_strings(name, data, "senders"),
+        domains=_strings(name, data, "domains"),
+        subject_patterns=_strings(name, data, "subject_patterns"),
+        list_ids=_strings(name, data, "list_ids"),
+        older_than_days=older_than_days,
+    )
+
+
+def _strings(name: str, data: Dict[str, Any], key: str) -> Tuple[str, ...]:
+    values = data.get(key, [])
+    if not isinstance(values, list) or not all(isinstance(value, str) for value in values):
+        raise ValueError(f"rule {name!r}: {key} must be a list of strings, got {values!r}")
+    return tuple(values)
+
+
+def load_rules(path: Union[str, Path]) -> List[ArchiveRule]:
+    with open(path, encoding="utf-8") as file:
+        return [rule_from_dict(data) for data in json.load(file)]
@@ -0,0 +1,221 @@
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from imap_tools.utils import chunked_crop
+
+from inbox_zero.shared.async_imap import AsyncImapClient, AsyncImapSessions, folder_argument, open_client
+from inbox_zero.shared.email_reader import (
+    ENVELOPE_ITEMS,
+    MESSAGE_ITEMS,
+    MOVE_CHUNK_SIZE,
+    EmailBody,
+    EmailData,
+    EmailEnvelope,
+    EmailUid,
+    ImapConfig,
+    LazyEmailData,
+    body_sections,
+    decode_body,
+    parse_envelope,
+)
+from inbox_zero.shared.event_bus import MailboxEventKind
+from inbox_zero.shared.idle_watcher import RENEW_INTERVAL, parse_idle_response
+from inbox_zero.shared.imap_parser import ImapValue, format_uid_set, parse_values
+
+
+T = TypeVar("T")
+
+
+def parse_fetch_lines(lines: Sequence[bytes]) -> List[Dict[str, ImapValue]]:
+    items: List[Dict[str, ImapValue]] = []
+    for line in lines:
+        values = parse_values(line)
+        if len(values) < 4 or str(values[2]).upper() != "FETCH" or not isinstance(values[3], list):
+            continue
+        attributes = values[3]
+        items.append({
+            str(attributes[position]).upper(): attributes[position + 1]
+            for position in range(0, len(attributes) - 1, 2)
+        })
+    return items
+
+
+def parse_search_lines(lines: Sequence[bytes]) -> List[str]:
+    uids: List[str] = []
+    for line in lines:
+        if line.upper().startswith(b"* SEARCH"):
+            uids.extend(line[len(b"* SEARCH"):].decode().split())
+    return uids
+
+
+class AsyncEmailReader:
+    def __init__(self, config: ImapConfig, sessions: Optional[AsyncImapSessions] = None) -> None:
+        self._config = config
+        self._sessions = sessions
+
+    @property
+    def config(self) -> ImapConfig:
+        return self._config
+
+    @asynccontextmanager
+    async def _session(self, folder: str) -> AsyncIterator[AsyncImapClient]:
+        if self._sessions is not None:
+            async with self._sessions.session(self._config, folder) as client:
+                yield client
+            return
+        client = await open_client(self._config)
+        try:
+            await client.select(folder)
+            yield client
+        finally:
+            await client.logout()
+
+    async def fetch_uids(self, folder: str = "INBOX") -> List[str]:
+        async with self._session(folder) as client:
+            return await self._search(client, "ALL")
+
+    async def fetch_emails(self, folder: str = "INBOX", limit: Optional[int] = None) -> List[EmailData]:
+        async with self._session(folder) as client:
+            uids = await self._search(client, "ALL")
+            return await self._fetch_messages(client, uids[:limit] if limit is not None else uids)
+
+    async def _fetch_messages(self, client: AsyncImapClient, uids: Sequence[str]) -> List[EmailData]:
+        if not uids:
+            return []
+        response = (await client.uid("FETCH", format_uid_set(uids), MESSAGE_ITEMS)).check()
+        messages: Dict[int, bytes] = {}
+        for item in parse_fetch_lines(response.untagged):
+            raw = item.get("BODY[]")
+            if isinstance(raw, bytes):
+                messages[int(str(item["UID"]))] = raw
+        return [LazyEmailData(EmailUid(uid), messages[int(uid)]) for uid in uids if int(uid) in messages]
+
+    async def fetch_envelopes(self, folder: str = "INBOX", limit: Optional[int] = None) -> List[EmailEnvelope]:
+        async with self._session(folder) as client:
+            uids = await self._search(client, "ALL")
+            return await self._fetch_envelopes(client, uids[:limit] if limit is not None else uids)
+
+    async def _fetch_envelopes(self, client: AsyncImapClient, uids: Sequence[str]) -> List[EmailEnvelope]:
+        if not uids:
+            return []
+        response = (await client.uid("FETCH", format_uid_set(uids), ENVELOPE_ITEMS)).check()
+        envelopes = [parse_envelope(item) for item in parse_fetch_lines(response.untagged)]
+        return sorted(envelopes, key=lambda envelope: int(envelope.uid.value))
+
+    async def fetch_body(self, envelope: EmailEnvelope, folder: str = "INBOX") -> EmailBody:
+        return (await self.fetch_bodies([envelope], folder=folder))[0]
+
+    async def fetch_bodies(self, envelopes: Sequence[EmailEnvelope], folder: str = "INBOX") -> List[EmailBody]:
+        if not any(envelope.text_parts or envelope.html_parts for envelope in envelopes):
+            return [EmailBody(text="", html="") for _ in envelopes]
+        async with self._session(folder) as client:
+            return [await self._fetch_body(client, envelope) for envelope in envelopes]
+
+    async def _fetch_body(self, client: AsyncImapClient, envelope: EmailEnvelope) -> EmailBody:
+        if not envelope.text_parts and not envelope.html_parts:
+            return EmailBody(text="", html="")
+        response = (await client.uid("FETCH", envelope.uid.value, body_sections(envelope))).check()
+        items = parse_fetch_lines(response.untagged)
+        return decode_body(envelope, items[0] if items else {})
+
+    async def archive_email(
+        self, folder: str = "INBOX", uid: EmailUid = EmailUid(""), archive_folder: str = "Archive"
+    ) -> bool:
+        return (await self.move_many(folder=folder, uids=[uid], destination=archive_folder))[uid]
+
+    async def archive_many(
+        self,
+        folder: str = "INBOX",
+        uids: Sequence[EmailUid] = (),
+        archive_folder: str = "Archive",
+        chunk_size: int = MOVE_CHUNK_SIZE,
+    ) -> Dict[EmailUid, bool]:
+        return await self.move_many(folder=folder, uids=uids, destination=archive_folder, chunk_size=chunk_size)
+
+    async def move_many(
+        self,
+        folder: str = "INBOX",
+        uids: Sequence[EmailUid] = (),
+        destination: str = "Archive",
+        chunk_size: int = MOVE_CHUNK_SIZE,
+    ) -> Dict[EmailUid, bool]:
+        outcomes = {uid: False for uid in uids}
+        if not outcomes:
+            return outcomes
+
+        async with self._session(folder) as client:
+            for chunk in chunked_crop(sorted({uid.value for uid in outcomes}, key=int), chunk_size):
+                existing = await self._search(client, "UID", format_uid_set(chunk))
+                if existing and await self._move_chunk(client, format_uid_set(existing), destination):
+                    outcomes.update({EmailUid(uid): True for uid in existing})
+        return outcomes
+
+    async def idle(
+        self, folder: str = "INBOX", timeout: float = RENEW_INTERVAL
+    ) -> AsyncIterator[Tuple[MailboxEventKind, str]]:
+        client = await open_client(self._config)
+        try:
+            await client.select(folder)
+            while True:
+                for response in await client.idle(min(timeout, RENEW_INTERVAL)):
+                    parsed = parse_idle_response(response)
+                    if parsed is not None:
+                        yield parsed
+        finally:
+            await client.logout()
+
+    async def _search(self, client: AsyncImapClient, *criteria: str) -> List[str]:
+        response = (await client.uid("SEARCH", *criteria)).check()
+        return parse_search_lines(response.untagged)
+
+    async def _move_chunk(self, client: AsyncImapClient, uid_set: str, destination: str) -> bool:
+        encoded_destination = folder_argument(destination)
+        if "MOVE" in client.capabilities:
+            return (await client.uid("MOVE", uid_set, encoded_destination)).ok
+
+        if not (await client.uid("COPY", uid_set, encoded_destination)).ok:
+            return False
+        if not (await client.uid("STORE", uid_set, "+FLAGS.SILENT", r"(\Deleted)")).ok:
+            return False
+        if "UIDPLUS" in client.capabilities:
+            return (await client.uid("EXPUNGE", uid_set)).ok
+        return (await client.command("EXPUNGE")).ok
+
+
+class BackgroundEventLoop:
+    def __init__(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="imap-event-loop", daemon=True)
+        self._thread.start()
+
+    def run(self, coroutine: Awaitable[T], timeout: Optional[float] = None) -> T:
+        return asyncio.run_coroutine_threadsafe(_await(coroutine), self._loop).result(timeout)
+
+    def close(self) -> None:
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+async def _await(awaitable: Awaitable[T]) -> T:
+    return await awaitable
+
+
+class AsyncEmailReaders:
+    def __init__(self, loop: Optional[BackgroundEventLoop] = None, max_sessions_per_account: int = 2) -> None:
+        self._owns_loop = loop is None
+        self._loop = loop or BackgroundEventLoop()
+        self._sessions = AsyncImapSessions(max_sessions_per_account)
+
+    def reader(self, config: ImapConfig) -> AsyncEmailReader:
+        return AsyncEmailReader(config, self._sessions)
+
+    def run(self, coroutine: Awaitable[T]) -> T:
+        return self._loop.run(coroutine)
+
+    def close(self) -> None:
+        self._loop.run(self._sessions.close())
+        if self._owns_loop:
+            self._loop.close()
@@ -0,0 +1,219 @@
+import asyncio
+import re
+import ssl
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional, Set
+
+from imap_tools.utils import encode_folder
+
+from inbox_zero.shared.email_reader import ImapConfig
+from inbox_zero.shared.imap_parser import quote
+
+
+LITERAL_SUFFIX = re.compile(rb"\{(\d+)\}\r\n$")
+CAPABILITY_RESPONSE = re.compile(
+    rb"^(?:\* CAPABILITY |(?:\* )?(?:OK |PREAUTH )?\[CAPABILITY )([^\]\r\n]*)", re.IGNORECASE
+)
+
+
+class AsyncImapError(Exception):
+    pass
+
+
+@dataclass
+class ImapResponse:
+    status: str
+    text: str
+    untagged: List[bytes] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "OK"
+
+    def check(self) -> "ImapResponse":
+        if not self.ok:
+            raise AsyncImapError(f"{self.status} {self.text}")
+        return self
+
+
+def folder_argument(folder: str) -> str:
+    return encode_folder(folder).decode("ascii")
+
+
+class AsyncImapClient:
+    def __init__(self, host: str, port: int, use_ssl: bool = True, timeout: float = 30.0) -> None:
+        self._host = host
+        self._port = port
+        self._use_ssl = use_ssl
+        self._timeout = timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock = asyncio.Lock()
+        self._tag = 0
+        self.capabilities: Set[str] = set()
+        self.selected: Optional[str] = None
+
+    @classmethod
+    def from_config(cls, config: ImapConfig) -> "AsyncImapClient":
+        return cls(config.host, config.port, config.use_ssl)
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def connect(self) -> None:
+        context = ssl.create_default_context() if self._use_ssl else None
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self._host, self._port, ssl=context), self._timeout
+        )
+        greeting = await self._read_response()
+        if not greeting.startswith((b"* OK", b"* PREAUTH")):
+            raise AsyncImapError(greeting.decode(errors="replace").strip())
+        self._update_capabilities(greeting)
+        if not self.capabilities:
+            await self.command("CAPABILITY")
+
+    async def login(self, username: str, password: str) -> None:
+        response = (await self.command("LOGIN", quote(username), quote(password))).check()
+        self._update_capabilities(response.text.encode())
+        if "QRESYNC" in self.capabilities:
+            await self.command("ENABLE", "QRESYNC")
+
+    async def select(self, folder: str) -> ImapResponse:
+        if self.selected == folder:
+            return ImapResponse("OK", "already selected")
+        self.selected = None
+        response = (await self.command("SELECT", folder_argument(folder))).check()
+        self.selected = folder
+        return response
+
+    async def uid(self, command: str, *args: str) -> ImapResponse:
+        return await self.command("UID", command, *args)
+
+    async def command(self, name: str, *args: str) -> ImapResponse:
+        async with self._lock:
+            tag = self._next_tag()
+            await self._send(" ".join((tag, name, *args)))
+            return await self._read_until_tagged(tag)
+
+    async def idle(self, timeout: float) -> List[bytes]:
+        async with self._lock:
+            tag = self._next_tag()
+            await self._send(f"{tag} IDLE")
+            continuation = await self._read_response()
+            if not continuation.startswith(b"+"):
+                raise AsyncImapError(continuation.decode(errors="replace").strip())
+            responses: List[bytes] = []
+            try:
+                responses.append(await asyncio.wait_for(self._read_response(), timeout))
+            except asyncio.TimeoutError:
+                pass
+            await self._send("DONE")
+            responses.extend((await self._read_until_tagged(tag)).untagged)
+            return [response.rstrip(b"\r\n") for response in responses]
+
+    async def logout(self) -> None:
+        if not self.connected:
+            return
+        try:
+            await self.command("LOGOUT")
+        except (AsyncImapError, ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = None
+        self._writer = None
+        self.selected = None
+
+    def _next_tag(self) -> str:
+        self._tag += 1
+        return f"A{self._tag:04d}"
+
+    async def _send(self, line: str) -> None:
+        if self._writer is None:
+            raise ConnectionError("IMAP client is not connected")
+        self._writer.write(line.encode("utf-8") + b"\r\n")
+        await self._writer.drain()
+
+    async def _read_until_tagged(self, tag: str) -> ImapResponse:
+        prefix = f"{tag} ".encode()
+        untagged: List[bytes] = []
+        while True:
+            response = await self._read_response()
+            if response.startswith(prefix):
+                status, _, text = response[len(prefix):].decode(errors="replace").strip().partition(" ")
+                return ImapResponse(status.upper(), text, untagged)
+            if response.startswith(b"* BYE"):
+                self.close()
+                raise ConnectionError(response.decode(errors="replace").strip())
+            self._update_capabilities(response)
+            untagged.append(response)
+
+    async def _read_response(self) -> bytes:
+        if self._reader is None:
+            raise ConnectionError("IMAP client is not connected")
+        line = await self._reader.readline()
+        if not line:
+            self.close()
+            raise ConnectionError("IMAP connection closed by server")
+        chunks = [line]
+        match = LITERAL_SUFFIX.search(line)
+        while match is not None:
+            chunks.append(await self._reader.readexactly(int(match.group(1))))
+            line = await self._reader.readline()
+            chunks.append(line)
+            match = LITERAL_SUFFIX.search(line)
+        return b"".join(chunks)
+
+    def _update_capabilities(self, response: bytes) -> None:
+        match = CAPABILITY_RESPONSE.search(response)
+        if match is not None:
+            self.capabilities = {capability.upper() for capability in match.group(1).decode().split()}
+
+
+class AsyncImapSessions:
+    def __init__(self, max_sessions_per_account: int = 2) -> None:
+        self._max_sessions_per_account = max_sessions_per_account
+        self._idle: Dict[ImapConfig, List[AsyncImapClient]] = {}
+        self._limits: Dict[ImapConfig, asyncio.Semaphore] = {}
+
+    @asynccontextmanager
+    async def session(self, config: ImapConfig, folder: str) -> AsyncIterator[AsyncImapClient]:
+        limit = self._limits.setdefault(config, asyncio.Semaphore(self._max_sessions_per_account))
+        async with limit:
+            idle = self._idle.setdefault(config, [])
+            client = idle.pop() if idle else None
+            if client is None or not client.connected:
+                client = await open_client(config)
+            try:
+                await client.select(folder)
+                yield client
+            except AsyncImapError:
+                idle.append(client)
+                raise
+            except BaseException:
+                client.close()
+                raise
+            else:
+                idle.append(client)
+
+    async def close(self) -> None:
+        clients = [client for idle in self._idle.values() for client in idle]
+        self._idle.clear()
+        await asyncio.gather(*(client.logout() for client in clients))
+
+
+async def open_client(config: ImapConfig) -> AsyncImapClient:
+    client = AsyncImapClient.from_config(config)
+    await client.connect()
+    try:
+        await client.login(config.username, config.password)
+    except BaseException:
+        client.close()
+        raise
+    return client
@@ -0,0 +1,150 @@
+import base64
+import binascii
+import hashlib
+import os
+import quopri
+import re
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional
+
+
+HASH_CHUNK_SIZE = 1024 * 1024
+WHITESPACE = re.compile(rb"\s+")
+
+
+class StreamDecoder:
+    def decode(self, chunk: bytes) -> bytes:
+        return chunk
+
+    def flush(self) -> bytes:
+        return b""
+
+
+class Base64StreamDecoder(StreamDecoder):
+    def __init__(self) -> None:
+        self._pending = b""
+
+    def decode(self, chunk: bytes) -> bytes:
+        data = self._pending + WHITESPACE.sub(b"", chunk)
+        complete = len(data) - len(data) % 4
+        self._pending = data[complete:]
+        return base64.b64decode(data[:complete])
+
+    def flush(self) -> bytes:
+        if not self._pending.rstrip(b"="):
+            return b""
+        try:
+            return base64.b64decode(self._pending + b"=" * (-len(self._pending) % 4))
+        except binascii.Error:
+            return b""
+
+
+class QuotedPrintableStreamDecoder(StreamDecoder):
+    def __init__(self) -> None:
+        self._pending = b""
+
+    def decode(self, chunk: bytes) -> bytes:
+        data = self._pending + chunk
+        end = data.rfind(b"\n") + 1
+        self._pending = data[end:]
+        return quopri.decodestring(data[:end])
+
+    def flush(self) -> bytes:
+        data, self._pending = self._pending, b""
+        return quopri.decodestring(data)
+
+
+def stream_decoder(encoding: str) -> StreamDecoder:
+    if encoding == "base64":
+        return Base64StreamDecoder()
+    if encoding == "quoted-printable":
+        return QuotedPrintableStreamDecoder()
+    return StreamDecoder()
+
+
+def safe_filename(filename: str, fallback: str) -> str:
+    name = Path(filename.replace("\\", "/")).name.strip()
+    return name if name not in ("", ".", "..") else fallback
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class AttachmentWriter:
+    def __init__(self, directory: Path) -> None:
+        self._directory = directory
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._known: Dict[str, Path] = {}
+        self._sizes: Dict[int, list[Path]] = {}
+        for existing in self._directory.iterdir():
+            if existing.is_file():
+                self._sizes.setdefault(existing.stat().st_size, []).append(existing)
+
+    def open(self, filename: str, encoding: str) -> "AttachmentFile":
+        return AttachmentFile(self, filename, encoding)
+
+    def _commit(self, temporary: Path, filename: str, size: int, digest: str) -> Path:
+        duplicate = self._find_duplicate(size, digest)
+        if duplicate is not None:
+            temporary.unlink()
+            return duplicate
+
+        target = self._available_path(filename)
+        os.replace(temporary, target)
+        self._known[digest] = target
+        self._sizes.setdefault(size, []).append(target)
+        return target
+
+    def _find_duplicate(self, size: int, digest: str) -> Optional[Path]:
+        if digest in self._known:
+            return self._known[digest]
+        for candidate in self._sizes.get(size, []):
+            if candidate not in self._known.values() and file_digest(candidate) == digest:
+                self._known[digest] = candidate
+                return candidate
+        return None
+
+    def _available_path(self, filename: str) -> Path:
+        target = self._directory / filename
+        stem, suffix = target.stem, target.suffix
+        index = 1
+        while target.exists():
+            target = self._directory / f"{stem} ({index}){suffix}"
+            index += 1
+        return target
+
+
+class AttachmentFile:
+    def __init__(self, writer: AttachmentWriter, filename: str, encoding: str) -> None:
+        self._writer = writer
+        self._filename = filename
+        self._decoder = stream_decoder(encoding)
+        self._digest = hashlib.sha256()
+        self._size = 0
+        handle, name = tempfile.mkstemp(prefix=".partial-", dir=writer._directory)
+        self._temporary = Path(name)
+        self._file: BinaryIO = os.fdopen(handle, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        self._append(self._decoder.decode(chunk))
+
+    def close(self) -> Path:
+        self._append(self._decoder.flush())
+        self._file.close()
+        return self._writer._commit(self._temporary, self._filename, self._size, self._digest.hexdigest())
+
+    def abort(self) -> None:
+        self._file.close()
+        self._temporary.unlink(missing_ok=True)
+
+    def _append(self, data: bytes) -> None:
+        if data:
+            self._file.write(data)
+            self._digest.update(data)
+            self._size += len(data)
@@ -0,0 +1,79 @@
+import threading
+from collections import Counter
+from enum import IntEnum
+from typing import Any, Callable, Dict, MutableMapping, Tuple, Type, TypeVar
+
+from pyqure import Key, PyqureMemory, pyqure
+
+T = TypeVar("T")
+
+MEMORY = "memory"
+
+
+class Lifetime(IntEnum):
+    SINGLETON = 0
+    SESSION = 1
+    REQUEST = 2
+
+
+class Container:
+    def __init__(self) -> None:
+        self._registrations: Dict[Any, Tuple[Lifetime, Callable[["Scope"], Any]]] = {}
+        self._singletons: Dict[Any, Any] = {}
+        self._lock = threading.RLock()
+        self.builds: Counter[str] = Counter()
+
+    def register(self, key: Key[T], factory: Callable[["Scope"], T], lifetime: Lifetime = Lifetime.SINGLETON) -> None:
+        with self._lock:
+            self._registrations[key] = (lifetime, factory)
+            self._singletons.clear()
+
+    def scope(self, session: MutableMapping[Any, Any]) -> "Scope":
+        return Scope(self, session)
+
+    @property
+    def lifetime(self) -> Lifetime:
+        return max((lifetime for lifetime, _ in self._registrations.values()), default=Lifetime.SINGLETON)
+
+    def _registration(self, key: Key[T]) -> Tuple[Lifetime, Callable[["Scope"], T]]:
+        if key not in self._registrations:
+            raise KeyError(f"nothing registered for {key!r}")
+        return self._registrations[key]
+
+
+class Scope:
+    def __init__(self, container: Container, session: MutableMapping[Any, Any]) -> None:
+        self._container = container
+        self._session = session
+        self._request: Dict[Any, Any] = {}
+
+    def get(self, key: Key[T]) -> T:
+        lifetime, factory = self._container._registration(key)
+        return self._cached(lifetime, key, lambda: factory(self))
+
+    def memory(self) -> PyqureMemory:
+        return self._cached(self._container.lifetime, MEMORY, self._build_memory)
+
+    def use_case(self, use_case: Type[T]) -> T:
+        build: Callable[[PyqureMemory], T] = use_case
+        return self._cached(self._container.lifetime, use_case, lambda: build(self.memory()))
+
+    def _build_memory(self) -> PyqureMemory:
+        memory: PyqureMemory = {}
+        (provide, _) = pyqure(memory)
+        for key in list(self._container._registrations):
+            provide(key, self.get(key))
+        return memory
+
+    def _cached(self, lifetime: Lifetime, key: Any, build: Callable[[], T]) -> T:
+        if lifetime == Lifetime.SINGLETON:
+            with self._container._lock:
+                return self._lookup(self._container._singletons, key, build)
+        return self._lookup(self._session if lifetime == Lifetime.SESSION else self._request, key, build)
+
+    def _lookup(self, cache: MutableMapping[Any, Any], key: Any, build: Callable[[], T]) -> T:
+        if key not in cache:
+            cache[key] = build()
+            self._container.builds[str(getattr(key, "name", None) or getattr(key, "__name__", key))] += 1
+        value: T = cache[key]
+        return value
@@ -0,0 +1,165 @@
+import json
+import sqlite3
+import threading
+from dataclasses import asdict
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+from inbox_zero.shared.email_reader import EmailData, EmailUid, ImapConfig
+from inbox_zero.shared.search_index import SearchIndex
+
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS folders (
+    account TEXT NOT NULL,
+    folder TEXT NOT NULL,
+    uid_validity INTEGER NOT NULL,
+    PRIMARY KEY (account, folder)
+);
+CREATE TABLE IF NOT EXISTS messages (
+    account TEXT NOT NULL,
+    folder TEXT NOT NULL,
+    uid INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_access INTEGER NOT NULL,
+    PRIMARY KEY (account, folder, uid)
+);
+CREATE INDEX IF NOT EXISTS messages_last_access ON messages (last_access);
+"""
+
+
+def account_key(config: ImapConfig) -> str:
+    return f"{config.username}@{config.host}:{config.port}"
+
+
+class EmailCache:
+    def __init__(
+        self,
+        path: Union[str, Path] = ":memory:",
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        index: Optional[SearchIndex] = None,
+    ) -> None:
+        self._max_bytes = max_bytes
+        self._index = index
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(SCHEMA)
+        self._total_bytes = self._stored_bytes()
+        self._clock: int = self._connection.execute("SELECT COALESCE(MAX(last_access), 0) FROM messages").fetchone()[0]
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._total_bytes
+
+    def get(self, account: str, folder: str, uid_validity: int, uid: EmailUid) -> Optional[EmailData]:
+        with self._lock:
+            if not self._check_uid_validity(account, folder, uid_validity):
+                return None
+            row = self._connection.execute(
+                "SELECT data FROM messages WHERE account = ? AND folder = ? AND uid = ?",
+                (account, folder, int(uid.value)),
+            ).fetchone()
+            if row is None:
+                return None
+            self._clock += 1
+            self._connection.execute(
+                "UPDATE messages SET last_access = ? WHERE account = ? AND folder = ? AND uid = ?",
+                (self._clock, account, folder, int(uid.value)),
+            )
+        fields = json.loads(row[0])
+        fields["uid"] = EmailUid(fields["uid"]["value"])
+        return EmailData(**fields)
+
+    def put(self, account: str, folder: str, uid_validity: int, email: EmailData) -> None:
+        data = json.dumps(asdict(email)).encode("utf-8")
+        with self._lock:
+            self._check_uid_validity(account, folder, uid_validity)
+            self._clock += 1
+            self._connection.execute("BEGIN")
+            try:
+                previous = self._connection.execute(
+                    "SELECT size FROM messages WHERE account = ? AND folder = ? AND uid = ?",
+                    (account, folder, int(email.uid.value)),
+                ).fetchone()
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO messages (account, folder, uid, data, size, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (account, folder, int(email.uid.value), data, len(data), self._clock),
+                )
+                self._total_bytes += len(data) - (previous[0] if previous else 0)
+                self._evict()
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                self._total_bytes = self._stored_bytes()
+                raise
+            self._connection.execute("COMMIT")
+        if self._index is not None:
+            self._index.add(account, folder, uid_validity, [email])
+
+    def discard(self, account: str, folder: str, uids: Iterable[int]) -> None:
+        uids = list(uids)
+        if self._index is not None:
+            self._index.discard(account, folder, uids)
+        with self._lock:
+            for uid in uids:
+                row = self._connection.execute(
+                    "SELECT size FROM messages WHERE account = ? AND folder = ? AND uid = ?", (account, folder, uid)
+                ).fetchone()
+                if row is None:
+                    continue
+                self._connection.execute(
+                    "DELETE FROM messages WHERE account = ? AND folder = ? AND uid = ?", (account, folder, uid)
+                )
+                self._total_bytes -= row[0]
+
+    def invalidate(self, account: str, folder: str) -> None:
+        with self._lock:
+            self._drop_folder(account, folder)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _stored_bytes(self) -> int:
+        return int(self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM messages").fetchone()[0])
+
+    def _check_uid_validity(self, account: str, folder: str, uid_validity: int) -> bool:
+        row = self._connection.execute(
+            "SELECT uid_validity FROM folders WHERE account = ? AND folder = ?", (account, folder)
+        ).fetchone()
+        if row is not None and row[0] == uid_validity:
+            return True
+        self._drop_folder(account, folder)
+        self._connection.execute(
+            "INSERT INTO folders (account, folder, uid_validity) VALUES (?, ?, ?)",
+            (account, folder, uid_validity),
+        )
+        return False
+
+    def _drop_folder(self, account: str, folder: str) -> None:
+        row = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM messages WHERE account = ? AND folder = ?", (account, folder)
+        ).fetchone()
+        self._connection.execute("DELETE FROM messages WHERE account = ? AND folder = ?", (account, folder))
+        self._connection.execute("DELETE FROM folders WHERE account = ? AND folder = ?", (account, folder))
+        self._total_bytes -= row[0]
+
+    def _evict(self) -> None:
+        while self._total_bytes > self._max_bytes:
+            rows = self._connection.execute(
+                "SELECT account, folder, uid, size FROM messages ORDER BY last_access LIMIT 64"
+            ).fetchall()
+            if not rows:
+                return
+            for account, folder, uid, size in rows:
+                if self._total_bytes <= self._max_bytes:
+                    return
+                self._connection.execute(
+                    "DELETE FROM messages WHERE account = ? AND folder = ? AND uid = ?", (account, folder, uid)
+                )
+                self._total_bytes -= size
@@ -0,0 +1,175 @@
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from inbox_zero.shared.email_cache import EmailCache, account_key
+from inbox_zero.shared.email_reader import EmailBody, EmailEnvelope, EmailReader, EmailUid, ImapConfig
+from inbox_zero.shared.imap_pool import ImapConnectionPool
+
+
+@dataclass(frozen=True)
+class PrefetchedEmail:
+    envelope: EmailEnvelope
+    body: EmailBody
+
+
+@dataclass
+class PrefetchMetrics:
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+PrefetchLoader = Callable[[ImapConfig, str, int], List[PrefetchedEmail]]
+PrefetchKey = Tuple[ImapConfig, str]
+
+
+class ImapPrefetchLoader:
+    def __init__(self, pool: Optional[ImapConnectionPool] = None, cache: Optional[EmailCache] = None) -> None:
+        self._pool = pool
+        self._cache = cache
+
+    def __call__(self, config: ImapConfig, folder: str, limit: int) -> List[PrefetchedEmail]:
+        email_reader = EmailReader.from_config(config, pool=self._pool)
+        envelopes = email_reader.fetch_envelopes(folder=folder, limit=limit)
+        if self._cache is None:
+            bodies = email_reader.fetch_bodies(envelopes, folder=folder)
+            return [PrefetchedEmail(envelope, body) for envelope, body in zip(envelopes, bodies)]
+
+        account = account_key(config)
+        uid_validity = email_reader.uid_validity(folder=folder)
+        cached: Dict[EmailUid, EmailBody] = {}
+        for envelope in envelopes:
+            email = self._cache.get(account, folder, uid_validity, envelope.uid)
+            if email is not None:
+                cached[envelope.uid] = EmailBody(text=email.body_text, html=email.body_html)
+
+        missing = [envelope for envelope in envelopes if envelope.uid not in cached]
+        for envelope, body in zip(missing, email_reader.fetch_bodies(missing, folder=folder)):
+            self._cache.put(account, folder, uid_validity, envelope.to_email_data(body))
+            cached[envelope.uid] = body
+        return [PrefetchedEmail(envelope, cached[envelope.uid]) for envelope in envelopes]
+
+
+class EmailPrefetcher:
+    def __init__(self, load: PrefetchLoader, depth: int = 5, executor: Optional[Executor] = None) -> None:
+        self._load = load
+        self._depth = depth
+        self._executor = executor or ThreadPoolExecutor(max_workers=2, thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        self._queues: Dict[PrefetchKey, List[PrefetchedEmail]] = {}
+        self._archived: Dict[PrefetchKey, Set[EmailUid]] = {}
+        self._refills: Dict[PrefetchKey, Future[None]] = {}
+        self._generations: Dict[PrefetchKey, int] = {}
+        self._expected_expunges: Dict[PrefetchKey, int] = {}
+        self._metrics = PrefetchMetrics()
+
+    @property
+    def metrics(self) -> PrefetchMetrics:
+        with self._lock:
+            return replace(self._metrics)
+
+    def queue_depth(self, config: ImapConfig, folder: str) -> int:
+        with self._lock:
+            return len(self._queues.get((config, folder), []))
+
+    def first(self, config: ImapConfig, folder: str) -> Optional[PrefetchedEmail]:
+        key = (config, folder)
+        missed = False
+        while True:
+            load_here = False
+            with self._lock:
+                queue = self._queues.get(key)
+                pending = self._refills.get(key)
+                if queue:
+                    if not missed:
+                        self._metrics.hits += 1
+                    if len(queue) < self._depth:
+                        self._schedule_refill(key)
+                    return queue[0]
+                if not missed:
+                    self._metrics.misses += 1
+                    missed = True
+                generation = self._generations.get(key, 0)
+                if pending is None:
+                    pending = Future()
+                    self._refills[key] = pending
+                    load_here = True
+
+            if load_here:
+                self._refill(key, pending)
+            pending.result()
+            with self._lock:
+                queue = self._queues.get(key)
+                if queue:
+                    return queue[0]
+                if self._generations.get(key, 0) == generation:
+                    return None
+
+    def find(self, config: ImapConfig, folder: str, uid: EmailUid) -> Optional[PrefetchedEmail]:
+        with self._lock:
+            for prefetched in self._queues.get((config, folder), []):
+                if prefetched.envelope.uid == uid:
+                    return prefetched
+        return None
+
+    def discard(self, config: ImapConfig, folder: str, uid: EmailUid) -> None:
+        key = (config, folder)
+        with self._lock:
+            archived = self._archived.setdefault(key, set())
+            if uid not in archived:
+                archived.add(uid)
+                self._expected_expunges[key] = self._expected_expunges.get(key, 0) + 1
+            if key in self._queues:
+                self._queues[key] = [item for item in self._queues[key] if item.envelope.uid != uid]
+                self._schedule_refill(key)
+
+    def expunged(self, config: ImapConfig, folder: str) -> bool:
+        key = (config, folder)
+        with self._lock:
+            expected = self._expected_expunges.get(key, 0)
+            if not expected:
+                return False
+            self._expected_expunges[key] = expected - 1
+            return True
+
+    def invalidate(self, config: ImapConfig, folder: str) -> None:
+        key = (config, folder)
+        with self._lock:
+            self._queues.pop(key, None)
+            self._refills.pop(key, None)
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+    def _schedule_refill(self, key: PrefetchKey) -> None:
+        if key not in self._refills:
+            future: Future[None] = Future()
+            self._refills[key] = future
+            self._executor.submit(self._refill, key, future)
+
+    def _refill(self, key: PrefetchKey, future: Future[None]) -> None:
+        with self._lock:
+            generation = self._generations.get(key, 0)
+        try:
+            loaded = self._load(key[0], key[1], self._depth)
+        except BaseException as error:
+            with self._lock:
+                self._forget_refill(key, future)
+            future.set_exception(error)
+            return
+        with self._lock:
+            if self._generations.get(key, 0) == generation:
+                loaded_uids = {item.envelope.uid for item in loaded}
+                archived = self._archived.get(key, set()) & loaded_uids
+                self._archived[key] = archived
+                self._queues[key] = [item for item in loaded if item.envelope.uid not in archived]
+            self._forget_refill(key, future)
+        future.set_result(None)
+
+    def _forget_refill(self, key: PrefetchKey, future: Future[None]) -> None:
+        if self._refills.get(key) is future:
+            del self._refills[key]
@@ -0,0 +1,88 @@
+from dataclasses import dataclass
+from datetime import date
+from typing import List, Optional, Union
+
+from inbox_zero.shared.imap_parser import quote
+
+
+SearchArgument = Union[str, bytes]
+
+MONTH_NAMES = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+
+@dataclass(frozen=True)
+class EmailQuery:
+    sender: str = ""
+    subject: str = ""
+    text: str = ""
+    since: Optional[date] = None
+    before: Optional[date] = None
+    larger_than: Optional[int] = None
+    smaller_than: Optional[int] = None
+    seen: Optional[bool] = None
+    flagged: Optional[bool] = None
+    has_attachment: Optional[bool] = None
+
+    @property
+    def is_empty(self) -> bool:
+        return self == EmailQuery()
+
+
+def imap_date(value: date) -> str:
+    return f"{value.day:02d}-{MONTH_NAMES[value.month - 1]}-{value.year}"
+
+
+def search_string(value: str) -> SearchArgument:
+    return quote(value) if value.isascii() else value.encode("utf-8")
+
+
+def compile_search(query: EmailQuery) -> List[SearchArgument]:
+    criteria: List[SearchArgument] = []
+    if query.sender:
+        criteria.extend(("FROM", search_string(query.sender)))
+    if query.subject:
+        criteria.extend(("SUBJECT", search_string(query.subject)))
+    if query.text:
+        criteria.extend(("TEXT", search_string(query.text)))
+    if query.since is not None:
+        criteria.extend(("SINCE", imap_date(query.since)))
+    if query.before is not None:
+        criteria.extend(("BEFORE", imap_date(query.before)))
+    if query.larger_than is not None:
+        criteria.extend(("LARGER", str(query.larger_than)))
+    if query.smaller_than is not None:
+        criteria.extend(("SMALLER", str(query.smaller_than)))
+    if query.seen is not None:
+        criteria.append("SEEN" if query.seen else "UNSEEN")
+    if query.flagged is not None:
+        criteria.append("FLAGGED" if query.flagged else "UNFLAGGED")
+    return criteria or ["ALL"]
+
+
+def compile_gmail_raw(query: EmailQuery) -> str:
+    terms: List[str] = []
+    if query.sender:
+        terms.append(f"from:({_gmail_text(query.sender)})")
+    if query.subject:
+        terms.append(f"subject:({_gmail_text(query.subject)})")
+    if query.text:
+        terms.append(f"({_gmail_text(query.text)})")
+    if query.since is not None:
+        terms.append(f"after:{query.since:%Y/%m/%d}")
+    if query.before is not None:
+        terms.append(f"before:{query.before:%Y/%m/%d}")
+    if query.larger_than is not None:
+        terms.append(f"larger:{query.larger_than}")
+    if query.smaller_than is not None:
+        terms.append(f"smaller:{query.smaller_than}")
+    if query.seen is not None:
+        terms.append("is:read" if query.seen else "is:unread")
+    if query.flagged is not None:
+        terms.append("is:starred" if query.flagged else "-is:starred")
+    if query.has_attachment is not None:
+        terms.append("has:attachment" if query.has_attachment else "-has:attachment")
+    return " ".join(terms)
+
+
+def _gmail_text(value: str) -> str:
+    return value.replace('"', " ").replace("(", " ").replace(")", " ").strip()
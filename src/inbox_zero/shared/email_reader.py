@@ -1,25 +1,57 @@
-from dataclasses import dataclass
+import base64
+import quopri
+import re
+import socket
+import ssl
+from email.message import Message
+from email.parser import HeaderParser
+from email.utils import getaddresses
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import List, Optional, Any
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Any, Sequence, Set, Tuple
 from imap_tools import MailBox, BaseMailBox, MailMessage  # type: ignore[attr-defined]
+from imap_tools.consts import DEFAULT_EMAIL_DATE
+from imap_tools.errors import MailboxFetchError, MailboxFolderStatusError, MailboxUidsError
+from imap_tools.utils import (
+    check_command_status,
+    chunked_crop,
+    decode_value,
+    encode_folder,
+    parse_email_date,
+    replace_html_ct_charset,
+)
 import imaplib
 
+from inbox_zero.shared.email_query import EmailQuery, SearchArgument, compile_gmail_raw, compile_search, search_string
+from inbox_zero.shared.attachment_stream import AttachmentWriter, safe_filename
+from inbox_zero.shared.imap_config import ImapConfig as ImapConfig
+from inbox_zero.shared.imap_pipeline import ImapPipeline, PipelinedCommand
+from inbox_zero.shared.instrumentation import NO_INSTRUMENTATION, Instrumentation, instrument_client
+from inbox_zero.shared.raw_message import RawPart, index_parts, split_headers
+from inbox_zero.shared.imap_parser import (
+    BodyPart,
+    ImapValue,
+    decode_text,
+    first_address,
+    format_uid_set,
+    join_response,
+    parse_bodystructure,
+    parse_fetch_response,
+    parse_uid_set,
+    parse_values,
+)
 
-@dataclass(frozen=True)
-class EmailUid:
-    value: str
+if TYPE_CHECKING:
+    from inbox_zero.shared.imap_pool import ImapConnectionPool
 
 
 @dataclass(frozen=True)
-class ImapConfig:
-    host: str
-    port: int
-    username: str
-    password: str
-    use_ssl: bool = True
+class EmailUid:
+    value: str
 
 
-@dataclass
+@dataclass(slots=True)
 class EmailData:
     uid: EmailUid
     subject: str
@@ -28,62 +60,639 @@ class EmailData:
     body_text: str
     body_html: str
     attachments: List[str]
+    message_id: str = ""
+    in_reply_to: str = ""
+    references: List[str] = field(default_factory=list)
+
+
+class LazyEmailData(EmailData):
+    __slots__ = ("_raw", "_parts", "_text", "_html", "_attachments")
+
+    def __init__(self, uid: EmailUid, raw: bytes) -> None:
+        headers, _ = split_headers(raw)
+        date = decode_text(headers.get("Date", ""))
+        self.uid = uid
+        self.subject = decode_text(headers.get("Subject", ""))
+        senders = getaddresses([decode_text(headers.get("From", ""))])
+        self.sender = next((address for _, address in senders if address), "")
+        self.date = iso_date(date)
+        self.message_id = next(iter(message_ids(headers.get("Message-ID", ""))), "")
+        self.in_reply_to = next(iter(message_ids(headers.get("In-Reply-To", ""))), "")
+        self.references = message_ids(headers.get("References", ""))
+        self._raw = raw
+        self._parts: Optional[List[RawPart]] = None
+        self._text: Optional[str] = None
+        self._html: Optional[str] = None
+        self._attachments: Optional[List[str]] = None
+
+    @property
+    def body_text(self) -> str:
+        if self._text is None:
+            self._text = self._decode("text/plain")
+        return self._text
+
+    @body_text.setter
+    def body_text(self, value: str) -> None:
+        self._text = value
+
+    @property
+    def body_html(self) -> str:
+        if self._html is None:
+            self._html = replace_html_ct_charset(self._decode("text/html"), "utf-8")
+        return self._html
+
+    @body_html.setter
+    def body_html(self, value: str) -> None:
+        self._html = value
+
+    @property
+    def attachments(self) -> List[str]:
+        if self._attachments is None:
+            self._attachments = [raw_part.part.filename for raw_part in self.parts() if raw_part.part.is_attachment]
+        return self._attachments
+
+    @attachments.setter
+    def attachments(self, value: List[str]) -> None:
+        self._attachments = value
+
+    def parts(self) -> List[RawPart]:
+        if self._parts is None:
+            self._parts = index_parts(self._raw)
+        return self._parts
+
+    def payload(self, raw_part: RawPart) -> memoryview:
+        return memoryview(self._raw)[raw_part.start:raw_part.end]
+
+    def _decode(self, content_type: str) -> str:
+        return "".join(
+            decode_part(bytes(self.payload(raw_part)), raw_part.part)
+            for raw_part in self.parts()
+            if raw_part.part.content_type == content_type and not raw_part.part.is_attachment
+        )
+
+
+@dataclass
+class EmailEnvelope:
+    uid: EmailUid
+    subject: str
+    sender: str
+    date: str
+    size: int
+    attachments: List[str]
+    text_parts: List[BodyPart] = field(default_factory=list)
+    html_parts: List[BodyPart] = field(default_factory=list)
+    list_id: str = ""
+    message_id: str = ""
+    in_reply_to: str = ""
+    references: List[str] = field(default_factory=list)
+    flags: Tuple[str, ...] = ()
+
+    def to_email_data(self, body: "EmailBody") -> EmailData:
+        return EmailData(
+            uid=self.uid,
+            subject=self.subject,
+            sender=self.sender,
+            date=self.date,
+            body_text=body.text,
+            body_html=body.html,
+            attachments=list(self.attachments),
+            message_id=self.message_id,
+            in_reply_to=self.in_reply_to,
+            references=list(self.references),
+        )
+
+
+@dataclass(frozen=True)
+class EmailBody:
+    text: str
+    html: str
+
+
+@dataclass(frozen=True)
+class FolderSyncState:
+    uid_validity: int
+    uid_next: int
+    highest_modseq: int
+    messages: int
+    uids: Tuple[int, ...]
+
+
+@dataclass(frozen=True)
+class FolderDelta:
+    added: List[EmailUid] = field(default_factory=list)
+    changed: Dict[EmailUid, Tuple[str, ...]] = field(default_factory=dict)
+    vanished: List[EmailUid] = field(default_factory=list)
+    full_resync: bool = False
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.added or self.changed or self.vanished or self.full_resync)
+
+
+ENVELOPE_ITEMS = "(UID FLAGS ENVELOPE BODYSTRUCTURE RFC822.SIZE BODY.PEEK[HEADER.FIELDS (LIST-ID REFERENCES)])"
+MESSAGE_ITEMS = "(UID BODY[])"
+MESSAGE_PEEK_ITEMS = "(UID BODY.PEEK[])"
+MESSAGE_CHUNK_SIZE = 100
+LIST_ID = re.compile(r"<([^>]+)>")
+MESSAGE_ID = re.compile(r"<[^<>\s]+>")
+MOVE_CHUNK_SIZE = 1000
+STRUCTURE_CHUNK_SIZE = 500
+ATTACHMENT_CHUNK_SIZE = 1024 * 1024
+ATTACHMENT_PIPELINE_WINDOW = 4
+
+
+class TracedIMAP4(imaplib.IMAP4):
+    def __init__(self, host: str, port: int, timeout: Optional[float], instrumentation: Instrumentation) -> None:
+        self._instrumentation = instrumentation
+        super().__init__(host, port, timeout=timeout)
+
+    def _create_socket(self, timeout: Optional[float]) -> socket.socket:
+        with self._instrumentation.span("imap.tcp", host=self.host, port=self.port):
+            sock: socket.socket = super()._create_socket(timeout)  # type: ignore[misc]
+        return sock
+
+
+class TracedIMAP4_SSL(imaplib.IMAP4_SSL):
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        timeout: Optional[float],
+        instrumentation: Instrumentation,
+        ssl_context: Optional[ssl.SSLContext] = None,
+    ) -> None:
+        self._instrumentation = instrumentation
+        super().__init__(host, port, ssl_context=ssl_context, timeout=timeout)
+
+    def _create_socket(self, timeout: Optional[float]) -> socket.socket:
+        with self._instrumentation.span("imap.tcp", host=self.host, port=self.port):
+            sock: socket.socket = imaplib.IMAP4._create_socket(self, timeout)  # type: ignore[attr-defined]
+        with self._instrumentation.span("imap.tls", host=self.host):
+            secure: ssl.SSLSocket = self.ssl_context.wrap_socket(sock, server_hostname=self.host)
+        return secure
+
+
+class MailBoxSSL(MailBox):
+    def __init__(self, host: str, port: int = 993, instrumentation: Instrumentation = NO_INSTRUMENTATION) -> None:
+        self._instrumentation = instrumentation
+        super().__init__(host, port=port)  # type: ignore[no-untyped-call]
+
+    def _get_mailbox_client(self) -> imaplib.IMAP4:
+        return TracedIMAP4_SSL(self._host, self._port, self._timeout, self._instrumentation, self._ssl_context)
 
 
 class MailBoxNoSSL(BaseMailBox):
-    def __init__(self, host: str = 'localhost', port: int = 143) -> None:
+    def __init__(
+        self, host: str = 'localhost', port: int = 143, instrumentation: Instrumentation = NO_INSTRUMENTATION
+    ) -> None:
         self._host = host
         self._port = port
         self._timeout: float | None = None
+        self._instrumentation = instrumentation
         super().__init__()  # type: ignore[no-untyped-call]
 
     def _get_mailbox_client(self) -> imaplib.IMAP4:
-        return imaplib.IMAP4(self._host, self._port, timeout=self._timeout)
+        return TracedIMAP4(self._host, self._port, self._timeout, self._instrumentation)
+
+
+def open_mailbox(config: ImapConfig, instrumentation: Instrumentation = NO_INSTRUMENTATION) -> Any:
+    with instrumentation.span("imap.connect", host=config.host, tls=config.use_ssl):
+        mailbox = EmailReader.from_config(config, instrumentation=instrumentation)._get_mailbox()
+        instrument_client(mailbox.client, instrumentation)
+        mailbox.login(config.username, config.password, initial_folder=None)
+    if "QRESYNC" in mailbox.client.capabilities:
+        mailbox.client.enable("QRESYNC")
+    return mailbox
+
+
+def iso_date(value: str) -> str:
+    date = parse_email_date(value) if value else DEFAULT_EMAIL_DATE
+    return "" if date == DEFAULT_EMAIL_DATE else date.isoformat()
+
+
+def message_ids(value: Any) -> List[str]:
+    return MESSAGE_ID.findall(str(value or ""))
+
+
+def parse_envelope(item: Dict[str, ImapValue]) -> EmailEnvelope:
+    envelope = item["ENVELOPE"]
+    assert isinstance(envelope, list), "FETCH response must contain an ENVELOPE"
+    parts = parse_bodystructure(item["BODYSTRUCTURE"])
+    date = decode_text(envelope[0])
+    headers = header_fields(item)
+    flags = item.get("FLAGS")
+
+    return EmailEnvelope(
+        uid=EmailUid(str(item["UID"])),
+        subject=decode_text(envelope[1]),
+        sender=first_address(envelope[2]),
+        date=iso_date(date),
+        size=int(str(item.get("RFC822.SIZE") or 0)),
+        attachments=[part.filename for part in parts if part.is_attachment],
+        text_parts=[part for part in parts if part.content_type == "text/plain" and not part.is_attachment],
+        html_parts=[part for part in parts if part.content_type == "text/html" and not part.is_attachment],
+        list_id=parse_list_id(item),
+        message_id=next(iter(message_ids(decode_text(envelope[9]) if len(envelope) > 9 else "")), ""),
+        in_reply_to=next(iter(message_ids(decode_text(envelope[8]) if len(envelope) > 8 else "")), ""),
+        references=message_ids(headers.get("References", "")),
+        flags=tuple(str(flag) for flag in flags) if isinstance(flags, list) else (),
+    )
+
+
+def header_fields(item: Dict[str, ImapValue]) -> Message:
+    headers = next((value for key, value in item.items() if key.startswith("BODY[HEADER.FIELDS")), None)
+    return HeaderParser().parsestr(headers.decode("utf-8", "replace") if isinstance(headers, bytes) else "")
+
+
+def parse_list_id(item: Dict[str, ImapValue]) -> str:
+    value = decode_text(header_fields(item).get("List-Id", ""))
+    match = LIST_ID.search(value)
+    return (match.group(1) if match else value).strip().lower()
+
+
+def body_sections(envelope: EmailEnvelope) -> str:
+    return "(" + " ".join(f"BODY.PEEK[{part.section}]" for part in envelope.text_parts + envelope.html_parts) + ")"
+
+
+def decode_body(envelope: EmailEnvelope, payloads: Dict[str, ImapValue]) -> EmailBody:
+    def decode_parts(selected: List[BodyPart]) -> str:
+        return "".join(decode_part(payloads.get(f"BODY[{part.section}]"), part) for part in selected)
+
+    return EmailBody(
+        text=decode_parts(envelope.text_parts),
+        html=replace_html_ct_charset(decode_parts(envelope.html_parts), "utf-8"),
+    )
+
+
+def decode_part(payload: ImapValue, part: BodyPart) -> str:
+    if not isinstance(payload, bytes):
+        return ""
+    if part.encoding == "base64":
+        payload = base64.b64decode(payload)
+    elif part.encoding == "quoted-printable":
+        payload = quopri.decodestring(payload)
+    return decode_value(payload, part.charset or None)
+
+
+def folder_status(client: imaplib.IMAP4, folder: str, items: Sequence[str]) -> Dict[str, int]:
+    result = client._simple_command("STATUS", encode_folder(folder), f"({' '.join(items)})")
+    check_command_status(result, MailboxFolderStatusError)
+    _, data = client._untagged_response(result[0], result[1], "STATUS")
+    values = parse_values(join_response(data))
+    attributes = values[-1] if values and isinstance(values[-1], list) else []
+    return {
+        str(attributes[index]).upper(): int(str(attributes[index + 1]))
+        for index in range(0, len(attributes) - 1, 2)
+    }
+
+
+class _LiteralChunks:
+    def __init__(self, chunks: List[bytes]) -> None:
+        self._chunks = chunks
+
+    def next_chunk(self, continuation: Any) -> bytes:
+        return self._chunks.pop(0) if self._chunks else b""
+
+
+def uid_with_literals(client: imaplib.IMAP4, command: str, arguments: Sequence[SearchArgument]) -> Tuple[str, Any]:
+    line: List[str] = []
+    chunks: List[bytes] = []
+    for argument in arguments:
+        if isinstance(argument, bytes):
+            marker = f"{{{len(argument)}}}"
+            if chunks:
+                chunks[-1] += b" " + marker.encode("ascii")
+            else:
+                line.append(marker)
+            chunks.append(argument)
+        elif chunks:
+            chunks[-1] += b" " + argument.encode("ascii")
+        else:
+            line.append(argument)
+    if chunks:
+        client.literal = _LiteralChunks(chunks).next_chunk  # type: ignore[assignment]
+    return client.uid(command, *line)
+
+
+def enabled_extensions(client: imaplib.IMAP4) -> Set[str]:
+    return {
+        extension.upper()
+        for response in client.untagged_responses.get("ENABLED", [])
+        if isinstance(response, bytes)
+        for extension in response.decode().split()
+    }
 
 
 class EmailReader:
-    def __init__(self, host: str, port: int, username: str, password: str, use_ssl: bool = True):
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str,
+        password: str,
+        use_ssl: bool = True,
+        pool: Optional["ImapConnectionPool"] = None,
+        instrumentation: Optional[Instrumentation] = None,
+    ):
         self.host = host
         self.port = port
         self.username = username
         self.password = password
         self.use_ssl = use_ssl
+        self.pool = pool
+        self.instrumentation = instrumentation or (pool.instrumentation if pool is not None else NO_INSTRUMENTATION)
+
+    @classmethod
+    def from_config(
+        cls,
+        config: ImapConfig,
+        pool: Optional["ImapConnectionPool"] = None,
+        instrumentation: Optional[Instrumentation] = None,
+    ) -> "EmailReader":
+        return cls(
+            config.host,
+            config.port,
+            config.username,
+            config.password,
+            config.use_ssl,
+            pool=pool,
+            instrumentation=instrumentation,
+        )
+
+    @property
+    def config(self) -> ImapConfig:
+        return ImapConfig(self.host, self.port, self.username, self.password, self.use_ssl)
 
     def _get_mailbox(self) -> Any:
         if self.use_ssl:
-            return MailBox(self.host, port=self.port)  # type: ignore[no-untyped-call]
+            return MailBoxSSL(self.host, port=self.port, instrumentation=self.instrumentation)
         else:
-            return MailBoxNoSSL(self.host, port=self.port)
+            return MailBoxNoSSL(self.host, port=self.port, instrumentation=self.instrumentation)
+
+    @contextmanager
+    def _session(self, folder: str) -> Iterator[Any]:
+        if self.pool is not None:
+            with self.pool.session(self.config, folder) as mailbox:
+                yield mailbox
+        else:
+            with self.instrumentation.span("imap.connect", host=self.host, tls=self.use_ssl):
+                mailbox = self._get_mailbox()
+                instrument_client(mailbox.client, self.instrumentation)
+                mailbox.login(self.username, self.password, initial_folder=None)
+            with mailbox:
+                mailbox.folder.set(folder)
+                yield mailbox
 
     def fetch_emails(self, folder: str = "INBOX", limit: Optional[int] = None) -> List[EmailData]:
-        emails = []
+        with self._session(folder) as mailbox:
+            uids = mailbox.uids()
+            return self._fetch_messages(mailbox.client, uids[:limit] if limit is not None else uids)
 
-        with self._get_mailbox().login(self.username, self.password, initial_folder=folder) as mailbox:
-            messages = mailbox.fetch(limit=limit, reverse=False)
+    def fetch_email(self, folder: str = "INBOX", uid: EmailUid = EmailUid("")) -> Optional[EmailData]:
+        with self._session(folder) as mailbox:
+            emails = self._fetch_messages(mailbox.client, [uid.value])
+        return emails[0] if emails else None
 
-            for msg in messages:
-                email_data = self._parse_message(msg)
-                emails.append(email_data)
+    def fetch_raw_messages(self, folder: str = "INBOX", uids: Sequence[int] = ()) -> Dict[int, bytes]:
+        if not uids:
+            return {}
+        with self._session(folder) as mailbox:
+            return self._fetch_raw(mailbox.client, [str(uid) for uid in uids], MESSAGE_PEEK_ITEMS)
 
-        return emails
+    def _fetch_messages(self, client: imaplib.IMAP4, uids: Sequence[str]) -> List[EmailData]:
+        if not uids:
+            return []
+        messages = self._fetch_raw(client, uids, MESSAGE_ITEMS)
+        with self.instrumentation.timer("mime_parse_seconds", kind="message"):
+            return [LazyEmailData(EmailUid(str(uid)), messages[int(uid)]) for uid in uids if int(uid) in messages]
 
-    def _parse_message(self, msg: Any) -> EmailData:
-        attachment_names = [att.filename for att in msg.attachments]
+    def _fetch_raw(self, client: imaplib.IMAP4, uids: Sequence[str], items: str) -> Dict[int, bytes]:
+        with ImapPipeline(client, instrumentation=self.instrumentation) as pipeline:
+            commands = [
+                pipeline.uid("FETCH", format_uid_set(chunk), items) for chunk in chunked_crop(uids, MESSAGE_CHUNK_SIZE)
+            ]
+        for command in commands:
+            check_command_status((command.status, command.data), MailboxFetchError)
+        messages: Dict[int, bytes] = {}
+        for uid, item in pipeline.fetched_by_uid().items():
+            raw = item.get("BODY[]")
+            if isinstance(raw, bytes):
+                messages[uid] = raw
+        return messages
 
-        assert msg.uid is not None, "Email message must have a UID"
+    def uid_validity(self, folder: str = "INBOX") -> int:
+        with self._session(folder) as mailbox:
+            return int(mailbox.folder.status(folder, ["UIDVALIDITY"])["UIDVALIDITY"])
 
-        return EmailData(
-            uid=EmailUid(msg.uid),
-            subject=msg.subject,
-            sender=msg.from_,
-            date=msg.date.isoformat() if msg.date else "",
-            body_text=msg.text or "",
-            body_html=msg.html or "",
-            attachments=attachment_names,
+    def fetch_first_uid(self, folder: str = "INBOX") -> Tuple[int, Optional[EmailUid]]:
+        with self._session(folder) as mailbox:
+            uid_validity = int(mailbox.folder.status(folder, ["UIDVALIDITY"])["UIDVALIDITY"])
+            uids = mailbox.uids()
+        return uid_validity, EmailUid(uids[0]) if uids else None
+
+    def folder_status(
+        self, folder: str = "INBOX", items: Sequence[str] = ("UIDVALIDITY", "UIDNEXT", "MESSAGES")
+    ) -> Dict[str, int]:
+        with self._session(folder) as mailbox:
+            return folder_status(mailbox.client, folder, items)
+
+    def fetch_uids(self, folder: str = "INBOX") -> List[int]:
+        with self._session(folder) as mailbox:
+            return sorted(int(uid) for uid in mailbox.uids())
+
+    def sync_folder(
+        self, folder: str = "INBOX", previous: Optional[FolderSyncState] = None
+    ) -> Tuple[FolderSyncState, FolderDelta]:
+        with self._session(folder) as mailbox:
+            client = mailbox.client
+            condstore = "CONDSTORE" in client.capabilities or "QRESYNC" in client.capabilities
+            items = ["UIDVALIDITY", "UIDNEXT", "MESSAGES"] + (["HIGHESTMODSEQ"] if condstore else [])
+            status = folder_status(client, folder, items)
+            uid_validity = int(status["UIDVALIDITY"])
+            uid_next = int(status["UIDNEXT"])
+            highest_modseq = int(status.get("HIGHESTMODSEQ", 0))
+            messages = int(status["MESSAGES"])
+
+            if previous is None or previous.uid_validity != uid_validity:
+                uids = tuple(int(uid) for uid in mailbox.uids())
+                state = FolderSyncState(uid_validity, uid_next, highest_modseq, messages, uids)
+                return state, FolderDelta(added=[EmailUid(str(uid)) for uid in uids], full_resync=True)
+
+            unchanged = previous.uid_next == uid_next and previous.messages == messages
+            if unchanged and (not condstore or previous.highest_modseq == highest_modseq):
+                return replace(previous, highest_modseq=highest_modseq), FolderDelta()
+
+            vanished: Optional[List[int]] = None
+            changed: Dict[EmailUid, Tuple[str, ...]] = {}
+            if condstore and previous.highest_modseq:
+                added, changed, vanished = self._fetch_changes(client, previous)
+            else:
+                added = self._search_new_uids(client, previous.uid_next)
+
+            known = set(previous.uids)
+            added = [uid for uid in added if uid not in known]
+            if vanished is None:
+                vanished = []
+                if messages != len(known) + len(added):
+                    current = {int(uid) for uid in mailbox.uids()}
+                    vanished = sorted(known - current)
+                    added = sorted(set(added) | (current - known))
+            vanished_set = set(vanished) & known
+
+        uids = tuple(sorted((known - vanished_set) | set(added)))
+        state = FolderSyncState(uid_validity, uid_next, highest_modseq, messages, uids)
+        return state, FolderDelta(
+            added=[EmailUid(str(uid)) for uid in added],
+            changed={uid: flags for uid, flags in changed.items() if int(uid.value) not in vanished_set},
+            vanished=[EmailUid(str(uid)) for uid in sorted(vanished_set)],
         )
 
+    def _fetch_changes(
+        self, client: imaplib.IMAP4, previous: FolderSyncState
+    ) -> Tuple[List[int], Dict[EmailUid, Tuple[str, ...]], Optional[List[int]]]:
+        qresync = "QRESYNC" in enabled_extensions(client)
+        modifiers = f"(CHANGEDSINCE {previous.highest_modseq}{' VANISHED' if qresync else ''})"
+        client.untagged_responses.pop("VANISHED", None)
+        result = client.uid("FETCH", "1:*", "(UID FLAGS)", modifiers)
+        check_command_status(result, MailboxFetchError)
+
+        added: List[int] = []
+        changed: Dict[EmailUid, Tuple[str, ...]] = {}
+        for item in parse_fetch_response(result[1]):
+            uid = int(str(item["UID"]))
+            flags = item.get("FLAGS")
+            if uid >= previous.uid_next:
+                added.append(uid)
+            else:
+                changed[EmailUid(str(uid))] = tuple(str(flag) for flag in flags) if isinstance(flags, list) else ()
+
+        if not qresync:
+            return added, changed, None
+        vanished: List[int] = []
+        for response in client.untagged_responses.pop("VANISHED", []):
+            if isinstance(response, bytes):
+                vanished.extend(parse_uid_set(response.decode().replace("(EARLIER)", "").strip()))
+        return added, changed, vanished
+
+    def _search_new_uids(self, client: imaplib.IMAP4, uid_next: int) -> List[int]:
+        result = client.uid("SEARCH", "UID", f"{uid_next}:*")
+        check_command_status(result, MailboxUidsError)
+        uids = result[1][0].decode().split() if result[1] and result[1][0] else []
+        return [int(uid) for uid in uids if int(uid) >= uid_next]
+
+    def fetch_envelopes(self, folder: str = "INBOX", limit: Optional[int] = None) -> List[EmailEnvelope]:
+        with self._session(folder) as mailbox:
+            uids = mailbox.uids()
+            return self._fetch_envelopes(mailbox, uids[:limit] if limit is not None else uids)
+
+    def fetch_oldest_envelopes(
+        self, folder: str = "INBOX", limit: int = 1, timeout: Optional[float] = None
+    ) -> List[EmailEnvelope]:
+        with self._session(folder) as mailbox:
+            client = mailbox.client
+            previous_timeout = client.sock.gettimeout()
+            client.sock.settimeout(timeout)
+            try:
+                if "SORT" in client.capabilities:
+                    result = client.uid("SORT", "(DATE)", "UTF-8", "ALL")
+                    check_command_status(result, MailboxUidsError)
+                    uids = [uid.decode("ascii") for uid in (result[1][0] or b"").split()]
+                else:
+                    uids = mailbox.uids()
+                return self._fetch_envelopes(mailbox, uids[:limit])
+            finally:
+                client.sock.settimeout(previous_timeout)
+
+    def _fetch_envelopes(self, mailbox: Any, uids: Sequence[str]) -> List[EmailEnvelope]:
+        if not uids:
+            return []
+        result = mailbox.client.uid("FETCH", format_uid_set(uids), ENVELOPE_ITEMS)
+        check_command_status(result, MailboxFetchError)
+        with self.instrumentation.timer("mime_parse_seconds", kind="envelopes"):
+            envelopes = [parse_envelope(item) for item in parse_fetch_response(result[1])]
+        self.instrumentation.count("envelopes_parsed_total", len(envelopes))
+        positions = {int(uid): position for position, uid in enumerate(uids)}
+        return sorted(envelopes, key=lambda envelope: positions.get(int(envelope.uid.value), len(positions)))
+
+    def fetch_envelopes_by_uid(self, folder: str = "INBOX", uids: Sequence[EmailUid] = ()) -> List[EmailEnvelope]:
+        if not uids:
+            return []
+        with self._session(folder) as mailbox:
+            return self._fetch_envelopes(mailbox, [uid.value for uid in uids])
+
+    def search(self, folder: str = "INBOX", query: EmailQuery = EmailQuery()) -> List[EmailUid]:
+        with self._session(folder) as mailbox:
+            client = mailbox.client
+            if query.is_empty:
+                uids = [int(uid) for uid in mailbox.uids()]
+            elif "X-GM-EXT-1" in client.capabilities:
+                uids = self._search(client, "X-GM-RAW", search_string(compile_gmail_raw(query)))
+            else:
+                if "ESEARCH" in client.capabilities:
+                    uids = self._esearch(client, *compile_search(query))
+                else:
+                    uids = self._search(client, *compile_search(query))
+                if query.has_attachment is not None:
+                    uids = self._with_attachments(client, uids, query.has_attachment)
+        return [EmailUid(str(uid)) for uid in sorted(uids)]
+
+    def _search(self, client: imaplib.IMAP4, *criteria: SearchArgument) -> List[int]:
+        result = uid_with_literals(client, "SEARCH", ("CHARSET", "UTF-8", *criteria))
+        check_command_status(result, MailboxUidsError)
+        return [int(uid) for uid in result[1][0].split()] if result[1] and result[1][0] else []
+
+    def _esearch(self, client: imaplib.IMAP4, *criteria: SearchArgument) -> List[int]:
+        client.untagged_responses.pop("ESEARCH", None)
+        result = uid_with_literals(client, "SEARCH", ("RETURN", "(ALL)", "CHARSET", "UTF-8", *criteria))
+        check_command_status(result, MailboxUidsError)
+        uids: List[int] = []
+        for response in client.untagged_responses.pop("ESEARCH", []):
+            if not isinstance(response, bytes):
+                continue
+            values = parse_values(response)
+            for index, value in enumerate(values[:-1]):
+                if isinstance(value, str) and value.upper() == "ALL":
+                    uids.extend(parse_uid_set(str(values[index + 1])))
+        return uids
+
+    def _with_attachments(self, client: imaplib.IMAP4, uids: List[int], has_attachment: bool) -> List[int]:
+        matching: List[int] = []
+        for chunk in chunked_crop(sorted(uids), STRUCTURE_CHUNK_SIZE):
+            result = client.uid("FETCH", format_uid_set(str(uid) for uid in chunk), "(UID BODYSTRUCTURE)")
+            check_command_status(result, MailboxFetchError)
+            for item in parse_fetch_response(result[1]):
+                parts = parse_bodystructure(item["BODYSTRUCTURE"])
+                if any(part.is_attachment for part in parts) == has_attachment:
+                    matching.append(int(str(item["UID"])))
+        return matching
+
+    def fetch_body(self, envelope: EmailEnvelope, folder: str = "INBOX") -> EmailBody:
+        return self.fetch_bodies([envelope], folder=folder)[0]
+
+    def fetch_bodies(self, envelopes: Sequence[EmailEnvelope], folder: str = "INBOX") -> List[EmailBody]:
+        if not any(envelope.text_parts or envelope.html_parts for envelope in envelopes):
+            return [EmailBody(text="", html="") for _ in envelopes]
+        with self._session(folder) as mailbox:
+            return self._fetch_bodies(mailbox.client, envelopes)
+
+    def _fetch_bodies(self, client: imaplib.IMAP4, envelopes: Sequence[EmailEnvelope]) -> List[EmailBody]:
+        with_parts = [envelope for envelope in envelopes if envelope.text_parts or envelope.html_parts]
+        with ImapPipeline(client, instrumentation=self.instrumentation) as pipeline:
+            commands = [pipeline.uid("FETCH", envelope.uid.value, body_sections(envelope)) for envelope in with_parts]
+        for command in commands:
+            check_command_status((command.status, command.data), MailboxFetchError)
+
+        items = pipeline.fetched_by_uid()
+        with self.instrumentation.timer("mime_parse_seconds", kind="body"):
+            return [
+                decode_body(envelope, items.get(int(envelope.uid.value), {}))
+                if envelope.text_parts or envelope.html_parts
+                else EmailBody(text="", html="")
+                for envelope in envelopes
+            ]
+
     def archive_first_email(self, folder: str = "INBOX", archive_folder: str = "Archive") -> bool:
-        with self._get_mailbox().login(self.username, self.password, initial_folder=folder) as mailbox:
+        with self._session(folder) as mailbox:
             messages = list(mailbox.fetch(limit=1, reverse=False))
 
             if not messages:
@@ -94,21 +703,129 @@ class EmailReader:
             return True
 
     def archive_email(self, folder: str = "INBOX", uid: EmailUid = EmailUid(""), archive_folder: str = "Archive") -> bool:
-        with self._get_mailbox().login(self.username, self.password, initial_folder=folder) as mailbox:
+        with self._session(folder) as mailbox:
             mailbox.move(uid.value, archive_folder)
             return True
 
-    def download_attachments(self, folder: str = "INBOX", save_dir: str = "./attachments") -> List[Path]:
-        saved_files = []
-        save_path = Path(save_dir)
-        save_path.mkdir(parents=True, exist_ok=True)
+    def archive_many(
+        self,
+        folder: str = "INBOX",
+        uids: Sequence[EmailUid] = (),
+        archive_folder: str = "Archive",
+        chunk_size: int = MOVE_CHUNK_SIZE,
+    ) -> Dict[EmailUid, bool]:
+        return self.move_many(folder=folder, uids=uids, destination=archive_folder, chunk_size=chunk_size)
+
+    def move_many(
+        self,
+        folder: str = "INBOX",
+        uids: Sequence[EmailUid] = (),
+        destination: str = "Archive",
+        chunk_size: int = MOVE_CHUNK_SIZE,
+        verify: bool = True,
+    ) -> Dict[EmailUid, bool]:
+        outcomes = {uid: False for uid in uids}
+        if not outcomes:
+            return outcomes
+
+        with self._session(folder) as mailbox:
+            client = mailbox.client
+            chunks = list(chunked_crop(sorted({uid.value for uid in outcomes}, key=int), chunk_size))
+            moves = chunks
+            if verify:
+                existing = self._search_existing(client, chunks)
+                moves = [[uid for uid in chunk if int(uid) in existing] for chunk in chunks]
+                moves = [chunk for chunk in moves if chunk]
+            moved_chunks = self._move_chunks(client, [format_uid_set(chunk) for chunk in moves], destination)
+            for chunk, moved in zip(moves, moved_chunks):
+                if moved:
+                    outcomes.update({EmailUid(uid): True for uid in chunk})
+        return outcomes
+
+    def _search_existing(self, client: imaplib.IMAP4, chunks: Sequence[Sequence[str]]) -> Set[int]:
+        with ImapPipeline(client, instrumentation=self.instrumentation) as pipeline:
+            commands = [pipeline.uid("SEARCH", "UID", format_uid_set(chunk)) for chunk in chunks]
+        for command in commands:
+            check_command_status((command.status, command.data), MailboxUidsError)
+        return set(pipeline.searched)
+
+    def _move_chunks(self, client: imaplib.IMAP4, uid_sets: Sequence[str], destination: str) -> List[bool]:
+        encoded_destination = encode_folder(destination).decode("ascii")
+        if "MOVE" in client.capabilities:
+            return [command.ok for command in self._pipeline(client, "MOVE", uid_sets, encoded_destination)]
+
+        copied = self._succeeded(uid_sets, self._pipeline(client, "COPY", uid_sets, encoded_destination))
+        stored = self._succeeded(copied, self._pipeline(client, "STORE", copied, "+FLAGS.SILENT", r"(\Deleted)"))
+        if "UIDPLUS" in client.capabilities:
+            expunged = self._succeeded(stored, self._pipeline(client, "EXPUNGE", stored))
+        elif stored:
+            typ, _ = client.expunge()
+            expunged = stored if typ == "OK" else []
+        else:
+            expunged = []
+        done = set(expunged)
+        return [uid_set in done for uid_set in uid_sets]
+
+    def _pipeline(
+        self, client: imaplib.IMAP4, command: str, uid_sets: Sequence[str], *args: str
+    ) -> List[PipelinedCommand]:
+        with ImapPipeline(client, instrumentation=self.instrumentation) as pipeline:
+            return [pipeline.uid(command, uid_set, *args) for uid_set in uid_sets]
+
+    def _succeeded(self, uid_sets: Sequence[str], commands: Sequence[PipelinedCommand]) -> List[str]:
+        return [uid_set for uid_set, command in zip(uid_sets, commands) if command.ok]
+
+    def download_attachments(
+        self, folder: str = "INBOX", save_dir: str = "./attachments", chunk_size: int = ATTACHMENT_CHUNK_SIZE
+    ) -> List[Path]:
+        writer = AttachmentWriter(Path(save_dir))
+        saved_files: Dict[Path, None] = {}
+
+        with self._session(folder) as mailbox:
+            for uids in chunked_crop(mailbox.uids(), STRUCTURE_CHUNK_SIZE):
+                result = mailbox.client.uid("FETCH", format_uid_set(uids), "(UID BODYSTRUCTURE)")
+                check_command_status(result, MailboxFetchError)
+                for item in parse_fetch_response(result[1]):
+                    uid = str(item["UID"])
+                    for part in parse_bodystructure(item["BODYSTRUCTURE"]):
+                        if not part.is_attachment:
+                            continue
+                        extension = ".eml" if part.content_type == "message/rfc822" else ""
+                        filename = safe_filename(part.filename, f"attachment-{uid}-{part.section}{extension}")
+                        attachment = writer.open(filename, part.encoding)
+                        try:
+                            self._stream_part(mailbox.client, uid, part, chunk_size, attachment.write)
+                        except BaseException:
+                            attachment.abort()
+                            raise
+                        saved_files[attachment.close()] = None
+
+        return list(saved_files)
 
-        with self._get_mailbox().login(self.username, self.password, initial_folder=folder) as mailbox:
-            for msg in mailbox.fetch():
-                for att in msg.attachments:
-                    file_path = save_path / att.filename
-                    with open(file_path, "wb") as f:
-                        f.write(att.payload)
-                    saved_files.append(file_path)
+    def _stream_part(
+        self, client: imaplib.IMAP4, uid: str, part: BodyPart, chunk_size: int, write: Callable[[bytes], None]
+    ) -> None:
+        section = part.section
+        offset = 0
+        while True:
+            remaining_chunks = -(-(part.size - offset) // chunk_size)
+            batch = max(1, min(ATTACHMENT_PIPELINE_WINDOW, remaining_chunks))
+            offsets = [offset + index * chunk_size for index in range(batch)]
+            with ImapPipeline(client, instrumentation=self.instrumentation) as pipeline:
+                commands = [
+                    pipeline.uid("FETCH", uid, f"(BODY.PEEK[{section}]<{start}.{chunk_size}>)") for start in offsets
+                ]
+            for command in commands:
+                check_command_status((command.status, command.data), MailboxFetchError)
 
-        return saved_files
+            chunks: Dict[str, ImapValue] = {}
+            for item in pipeline.fetched:
+                chunks.update(item)
+            for start in offsets:
+                chunk = chunks.get(f"BODY[{section}]<{start}>")
+                if not isinstance(chunk, bytes) or not chunk:
+                    return
+                write(chunk)
+                offset = start + len(chunk)
+                if len(chunk) < chunk_size:
+                    return
@@ -0,0 +1,188 @@
+from array import array
+from datetime import datetime, timezone
+from enum import IntFlag
+from itertools import compress
+from typing import Any, Callable, Collection, Dict, Iterable, List, Optional
+
+from inbox_zero.shared.email_reader import EmailEnvelope, EmailUid
+
+
+NO_DATE = -(2 ** 63)
+MAX_SIZE = 2 ** 32 - 1
+
+
+class EnvelopeFlag(IntFlag):
+    SEEN = 1
+    ANSWERED = 2
+    FLAGGED = 4
+    DELETED = 8
+    DRAFT = 16
+    ATTACHMENT = 32
+
+
+SYSTEM_FLAGS = {
+    "\\Seen": EnvelopeFlag.SEEN,
+    "\\Answered": EnvelopeFlag.ANSWERED,
+    "\\Flagged": EnvelopeFlag.FLAGGED,
+    "\\Deleted": EnvelopeFlag.DELETED,
+    "\\Draft": EnvelopeFlag.DRAFT,
+}
+
+
+def envelope_flags(envelope: EmailEnvelope) -> EnvelopeFlag:
+    bits = EnvelopeFlag(0)
+    for flag in envelope.flags:
+        bits |= SYSTEM_FLAGS.get(flag, EnvelopeFlag(0))
+    return bits | EnvelopeFlag.ATTACHMENT if envelope.attachments else bits
+
+
+def epoch_seconds(value: str) -> int:
+    try:
+        date = datetime.fromisoformat(value)
+    except ValueError:
+        return NO_DATE
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return int(date.timestamp())
+
+
+class Interner:
+    def __init__(self) -> None:
+        self._values: List[str] = []
+        self._ids: Dict[str, int] = {}
+
+    def intern(self, value: str) -> int:
+        if value not in self._ids:
+            self._ids[value] = len(self._values)
+            self._values.append(value)
+        return self._ids[value]
+
+    def value(self, value_id: int) -> str:
+        return self._values[value_id]
+
+    def ids(self, accept: Callable[[str], bool]) -> List[int]:
+        return [value_id for value_id, value in enumerate(self._values) if accept(value)]
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(value.encode("utf-8")) for value in self._values) + 8 * len(self._values)
+
+
+class EnvelopeTable:
+    def __init__(self) -> None:
+        self.uids = array("I")
+        self.dates = array("q")
+        self.sizes = array("I")
+        self.senders = array("I")
+        self.list_ids = array("I")
+        self.flags = array("B")
+        self._subject_offsets = array("I", [0])
+        self._subjects = bytearray()
+        self.sender_names = Interner()
+        self.list_names = Interner()
+
+    @classmethod
+    def from_envelopes(cls, envelopes: Iterable[EmailEnvelope]) -> "EnvelopeTable":
+        table = cls()
+        table.extend(envelopes)
+        return table
+
+    def extend(self, envelopes: Iterable[EmailEnvelope]) -> None:
+        for envelope in envelopes:
+            self.append(envelope)
+
+    def append(self, envelope: EmailEnvelope) -> None:
+        self.uids.append(int(envelope.uid.value))
+        self.dates.append(epoch_seconds(envelope.date))
+        self.sizes.append(min(envelope.size, MAX_SIZE))
+        self.senders.append(self.sender_names.intern(envelope.sender))
+        self.list_ids.append(self.list_names.intern(envelope.list_id))
+        self.flags.append(envelope_flags(envelope))
+        self._subjects += envelope.subject.encode("utf-8")
+        self._subject_offsets.append(len(self._subjects))
+
+    def __len__(self) -> int:
+        return len(self.uids)
+
+    def uid(self, row: int) -> EmailUid:
+        return EmailUid(str(self.uids[row]))
+
+    def sender(self, row: int) -> str:
+        return self.sender_names.value(self.senders[row])
+
+    def list_id(self, row: int) -> str:
+        return self.list_names.value(self.list_ids[row])
+
+    def subject(self, row: int) -> str:
+        return self._subjects[self._subject_offsets[row]:self._subject_offsets[row + 1]].decode("utf-8")
+
+    def envelope(self, row: int) -> EmailEnvelope:
+        date = self.dates[row]
+        return EmailEnvelope(
+            uid=self.uid(row),
+            subject=self.subject(row),
+            sender=self.sender(row),
+            date=datetime.fromtimestamp(date, timezone.utc).isoformat() if date != NO_DATE else "",
+            size=self.sizes[row],
+            attachments=[],
+            list_id=self.list_id(row),
+            flags=tuple(name for name, flag in SYSTEM_FLAGS.items() if self.flags[row] & flag),
+        )
+
+    def select(
+        self,
+        rows: Optional[Iterable[int]] = None,
+        senders: Optional[Collection[int]] = None,
+        list_ids: Optional[Collection[int]] = None,
+        before: Optional[int] = None,
+        with_flags: EnvelopeFlag = EnvelopeFlag(0),
+        without_flags: EnvelopeFlag = EnvelopeFlag(0),
+    ) -> "array[int]":
+        selected = array("I", range(len(self)) if rows is None else rows)
+        if senders is not None:
+            sender_mask = bytes(sender_id in senders for sender_id in range(len(self.sender_names)))
+            selected = array("I", compress(selected, [sender_mask[self.senders[row]] for row in selected]))
+        if list_ids is not None:
+            list_mask = bytes(list_id in list_ids for list_id in range(len(self.list_names)))
+            selected = array("I", compress(selected, [list_mask[self.list_ids[row]] for row in selected]))
+        if before is not None:
+            selected = array("I", (row for row in selected if NO_DATE < self.dates[row] <= before))
+        if with_flags or without_flags:
+            flags = self.flags
+            selected = array("I", (
+                row for row in selected if flags[row] & with_flags == with_flags and not flags[row] & without_flags
+            ))
+        return selected
+
+    def order(self, rows: Optional[Iterable[int]] = None, by: str = "date", descending: bool = False) -> List[int]:
+        keys: Dict[str, Callable[[int], Any]] = {
+            "uid": self.uids.__getitem__,
+            "date": self.dates.__getitem__,
+            "size": self.sizes.__getitem__,
+            "sender": lambda row: self.sender(row).lower(),
+            "subject": lambda row: self.subject(row).lower(),
+        }
+        if by not in keys:
+            raise ValueError(f"unknown column {by!r}")
+        return sorted(range(len(self)) if rows is None else rows, key=keys[by], reverse=descending)
+
+    def discard(self, uids: Collection[int]) -> None:
+        kept = [uid not in uids for uid in self.uids]
+        offsets = self._subject_offsets
+        subjects = [self._subjects[offsets[row]:offsets[row + 1]] for row in compress(range(len(self)), kept)]
+        for name in ("uids", "dates", "sizes", "senders", "list_ids", "flags"):
+            column = getattr(self, name)
+            setattr(self, name, array(column.typecode, compress(column, kept)))
+        self._subjects = bytearray(b"".join(subjects))
+        self._subject_offsets = array("I", [0])
+        for subject in subjects:
+            self._subject_offsets.append(self._subject_offsets[-1] + len(subject))
+
+    @property
+    def nbytes(self) -> int:
+        columns = (self.uids, self.dates, self.sizes, self.senders, self.list_ids, self.flags, self._subject_offsets)
+        arrays = sum(column.itemsize * len(column) for column in columns)
+        return arrays + len(self._subjects) + self.sender_names.nbytes + self.list_names.nbytes
@@ -0,0 +1,65 @@
+import threading
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Dict, List, Tuple
+
+from inbox_zero.shared.email_reader import ImapConfig
+
+
+class MailboxEventKind(Enum):
+    EXISTS = "exists"
+    EXPUNGE = "expunge"
+    VANISHED = "vanished"
+    FLAGS = "flags"
+    RESYNC = "resync"
+
+
+@dataclass(frozen=True)
+class MailboxEvent:
+    config: ImapConfig
+    folder: str
+    kind: MailboxEventKind
+    value: str = ""
+
+
+Subscriber = Callable[[MailboxEvent], None]
+
+
+class EventBus:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._subscribers: List[Subscriber] = []
+        self._versions: Dict[Tuple[ImapConfig, str], int] = {}
+        self._errors = 0
+
+    @property
+    def errors(self) -> int:
+        with self._lock:
+            return self._errors
+
+    def subscribe(self, subscriber: Subscriber) -> Callable[[], None]:
+        with self._lock:
+            self._subscribers.append(subscriber)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if subscriber in self._subscribers:
+                    self._subscribers.remove(subscriber)
+
+        return unsubscribe
+
+    def publish(self, event: MailboxEvent) -> None:
+        with self._lock:
+            key = (event.config, event.folder)
+            self._versions[key] = self._versions.get(key, 0) + 1
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber(event)
+            except Exception:
+                with self._lock:
+                    self._errors += 1
+
+    def version(self, config: ImapConfig, folder: str) -> int:
+        with self._lock:
+            return self._versions.get((config, folder), 0)
@@ -0,0 +1,69 @@
+import sqlite3
+import threading
+from array import array
+from pathlib import Path
+from typing import Optional, Union
+
+from inbox_zero.shared.email_reader import FolderSyncState
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS folder_sync (
+    account TEXT NOT NULL,
+    folder TEXT NOT NULL,
+    uid_validity INTEGER NOT NULL,
+    uid_next INTEGER NOT NULL,
+    highest_modseq INTEGER NOT NULL,
+    messages INTEGER NOT NULL,
+    uids BLOB NOT NULL,
+    PRIMARY KEY (account, folder)
+);
+"""
+
+
+class FolderSyncStateStore:
+    def __init__(self, path: Union[str, Path] = ":memory:") -> None:
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(SCHEMA)
+
+    def get(self, account: str, folder: str) -> Optional[FolderSyncState]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT uid_validity, uid_next, highest_modseq, messages, uids FROM folder_sync "
+                "WHERE account = ? AND folder = ?",
+                (account, folder),
+            ).fetchone()
+        if row is None:
+            return None
+        uids = array("I")
+        uids.frombytes(row[4])
+        return FolderSyncState(
+            uid_validity=row[0], uid_next=row[1], highest_modseq=row[2], messages=row[3], uids=tuple(uids)
+        )
+
+    def put(self, account: str, folder: str, state: FolderSyncState) -> None:
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO folder_sync "
+                "(account, folder, uid_validity, uid_next, highest_modseq, messages, uids) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    account,
+                    folder,
+                    state.uid_validity,
+                    state.uid_next,
+                    state.highest_modseq,
+                    state.messages,
+                    array("I", state.uids).tobytes(),
+                ),
+            )
+
+    def invalidate(self, account: str, folder: str) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM folder_sync WHERE account = ? AND folder = ?", (account, folder))
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,187 @@
+import imaplib
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from imap_tools.errors import ImapToolsError
+
+from inbox_zero.shared.email_reader import ImapConfig, open_mailbox
+from inbox_zero.shared.event_bus import EventBus, MailboxEvent, MailboxEventKind
+from inbox_zero.shared.imap_pool import CONNECTION_ERRORS
+
+
+RENEW_INTERVAL = 29 * 60.0
+WATCH_ERRORS = (imaplib.IMAP4.error, ImapToolsError, *CONNECTION_ERRORS)
+
+NUMBERED_RESPONSE = re.compile(rb"^\* (\d+) (EXISTS|EXPUNGE|FETCH)\b", re.IGNORECASE)
+VANISHED_RESPONSE = re.compile(rb"^\* VANISHED (?:\(EARLIER\) )?([\d:,]+)", re.IGNORECASE)
+BYE_RESPONSE = re.compile(rb"^\* BYE\b", re.IGNORECASE)
+
+NUMBERED_KINDS = {
+    b"EXISTS": MailboxEventKind.EXISTS,
+    b"EXPUNGE": MailboxEventKind.EXPUNGE,
+    b"FETCH": MailboxEventKind.FLAGS,
+}
+
+
+def parse_idle_response(response: bytes) -> Optional[Tuple[MailboxEventKind, str]]:
+    match = NUMBERED_RESPONSE.match(response)
+    if match is not None:
+        return NUMBERED_KINDS[match.group(2).upper()], match.group(1).decode()
+    match = VANISHED_RESPONSE.match(response)
+    if match is not None:
+        return MailboxEventKind.VANISHED, match.group(1).decode()
+    return None
+
+
+class IdleWatcher:
+    def __init__(
+        self,
+        config: ImapConfig,
+        folder: str,
+        bus: EventBus,
+        connect: Callable[[ImapConfig], Any] = open_mailbox,
+        renew_interval: float = RENEW_INTERVAL,
+        poll_interval: float = 1.0,
+        min_backoff: float = 1.0,
+        max_backoff: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._config = config
+        self._folder = folder
+        self._bus = bus
+        self._connect = connect
+        self._renew_interval = renew_interval
+        self._poll_interval = poll_interval
+        self._min_backoff = min_backoff
+        self._max_backoff = max_backoff
+        self._clock = clock
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.connections = 0
+        self.renewals = 0
+        self.idle_sessions = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def folder(self) -> str:
+        return self._folder
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name=f"idle-{self._config.username}-{self._folder}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        backoff = self._min_backoff
+        while not self._stopped.is_set():
+            try:
+                mailbox = self._connect(self._config)
+            except WATCH_ERRORS as error:
+                self.last_error = str(error)
+                self._stopped.wait(backoff)
+                backoff = min(max(backoff * 2, self._min_backoff), self._max_backoff)
+                continue
+
+            idle_sessions = self.idle_sessions
+            try:
+                mailbox.folder.set(self._folder)
+                self.connections += 1
+                if self.connections > 1:
+                    self._publish(MailboxEventKind.RESYNC)
+                self._watch(mailbox)
+            except WATCH_ERRORS as error:
+                self.last_error = str(error)
+            finally:
+                self._logout_quietly(mailbox)
+            if self.idle_sessions > idle_sessions:
+                backoff = self._min_backoff
+            self._stopped.wait(backoff)
+            if self.idle_sessions == idle_sessions:
+                backoff = min(max(backoff * 2, self._min_backoff), self._max_backoff)
+
+    def _watch(self, mailbox: Any) -> None:
+        while not self._stopped.is_set():
+            mailbox.idle.start()
+            self.idle_sessions += 1
+            renew_at = self._clock() + self._renew_interval
+            while not self._stopped.is_set() and self._clock() < renew_at:
+                timeout = min(self._poll_interval, renew_at - self._clock())
+                started = time.monotonic()
+                responses = mailbox.idle.poll(timeout=timeout)
+                if not responses and time.monotonic() - started < timeout / 2:
+                    raise ConnectionError("IDLE connection closed by server")
+                self._handle(responses)
+            mailbox.idle.stop()
+            self.renewals += 1
+
+    def _handle(self, responses: List[bytes]) -> None:
+        for response in responses:
+            if BYE_RESPONSE.match(response):
+                raise ConnectionError(response.decode(errors="replace"))
+            parsed = parse_idle_response(response)
+            if parsed is not None:
+                self._publish(*parsed)
+
+    def _publish(self, kind: MailboxEventKind, value: str = "") -> None:
+        self._bus.publish(MailboxEvent(self._config, self._folder, kind, value))
+
+    def _logout_quietly(self, mailbox: Any) -> None:
+        try:
+            mailbox.logout()
+        except Exception:
+            pass
+
+
+class IdleSupervisor:
+    def __init__(
+        self,
+        bus: EventBus,
+        watcher_factory: Callable[[ImapConfig, str, EventBus], IdleWatcher] = IdleWatcher,
+    ) -> None:
+        self._bus = bus
+        self._watcher_factory = watcher_factory
+        self._lock = threading.Lock()
+        self._watchers: Dict[ImapConfig, IdleWatcher] = {}
+
+    def watch(self, config: ImapConfig, folder: str) -> IdleWatcher:
+        with self._lock:
+            previous = self._watchers.get(config)
+            if previous is not None and previous.folder == folder:
+                previous.start()
+                return previous
+            watcher = self._watcher_factory(config, folder, self._bus)
+            self._watchers[config] = watcher
+            watcher.start()
+        if previous is not None:
+            previous.stop()
+        return watcher
+
+    def unwatch(self, config: ImapConfig, folder: str) -> None:
+        with self._lock:
+            watcher = self._watchers.get(config)
+            if watcher is None or watcher.folder != folder:
+                return
+            del self._watchers[config]
+        watcher.stop()
+
+    def close(self) -> None:
+        with self._lock:
+            watchers = list(self._watchers.values())
+            self._watchers.clear()
+        for watcher in watchers:
+            watcher.stop()
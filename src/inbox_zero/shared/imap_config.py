@@ -0,0 +1,10 @@
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class ImapConfig:
+    host: str
+    port: int
+    username: str
+    password: str = field(repr=False)
+    use_ssl: bool = True
@@ -0,0 +1,283 @@
+import re
+from dataclasses import dataclass
+from email.header import decode_header
+from email.utils import collapse_rfc2231_value, decode_rfc2231
+from itertools import takewhile
+from typing import Any, Dict, Iterable, List, Sequence, Tuple, Union
+from urllib.parse import quote_from_bytes, unquote
+
+from imap_tools.utils import decode_value
+
+
+ImapValue = Union[None, str, bytes, List[Any]]
+
+LITERAL = re.compile(rb"\{(\d+)\}\r\n")
+CONTINUATION = re.compile(r"^(?P<name>[^*]+)\*(?P<index>\d+)(?P<encoded>\*?)$")
+ATOM_DELIMITERS = b" ()\r\n"
+
+
+class ImapParseError(ValueError):
+    pass
+
+
+class _Tokenizer:
+    def __init__(self, raw: bytes) -> None:
+        self._raw = raw
+        self._pos = 0
+
+    def at_end(self) -> bool:
+        self._skip_whitespace()
+        return self._pos >= len(self._raw)
+
+    def read_value(self) -> ImapValue:
+        self._skip_whitespace()
+        if self._pos >= len(self._raw):
+            raise ImapParseError("Unexpected end of IMAP response")
+        char = self._raw[self._pos:self._pos + 1]
+        if char == b"(":
+            return self._read_list()
+        if char == b'"':
+            return self._read_quoted()
+        if char == b"{":
+            return self._read_literal()
+        atom = self._read_atom()
+        return None if atom.upper() == "NIL" else atom
+
+    def _skip_whitespace(self) -> None:
+        while self._pos < len(self._raw) and self._raw[self._pos] in b" \r\n":
+            self._pos += 1
+
+    def _read_list(self) -> List[Any]:
+        self._pos += 1
+        items: List[Any] = []
+        while True:
+            self._skip_whitespace()
+            if self._pos >= len(self._raw):
+                raise ImapParseError("Unterminated IMAP list")
+            if self._raw[self._pos] == ord(")"):
+                self._pos += 1
+                return items
+            items.append(self.read_value())
+
+    def _read_quoted(self) -> bytes:
+        self._pos += 1
+        value = bytearray()
+        while self._pos < len(self._raw):
+            char = self._raw[self._pos]
+            if char == ord("\\"):
+                value.append(self._raw[self._pos + 1])
+                self._pos += 2
+            elif char == ord('"'):
+                self._pos += 1
+                return bytes(value)
+            else:
+                value.append(char)
+                self._pos += 1
+        raise ImapParseError("Unterminated IMAP quoted string")
+
+    def _read_literal(self) -> bytes:
+        match = LITERAL.match(self._raw, self._pos)
+        if match is None:
+            raise ImapParseError(f"Malformed IMAP literal at {self._pos}")
+        start = match.end()
+        end = start + int(match.group(1))
+        self._pos = end
+        return self._raw[start:end]
+
+    def _read_atom(self) -> str:
+        start = self._pos
+        depth = 0
+        while self._pos < len(self._raw):
+            char = self._raw[self._pos]
+            if char == ord("["):
+                depth += 1
+            elif char == ord("]"):
+                depth -= 1
+            elif depth == 0 and char in ATOM_DELIMITERS:
+                break
+            self._pos += 1
+        if self._pos == start:
+            raise ImapParseError(f"Unexpected character at {self._pos}")
+        return self._raw[start:self._pos].decode("ascii", "replace")
+
+
+def parse_values(raw: bytes) -> List[ImapValue]:
+    tokenizer = _Tokenizer(raw)
+    values: List[ImapValue] = []
+    while not tokenizer.at_end():
+        values.append(tokenizer.read_value())
+    return values
+
+
+def join_response(data: Sequence[Any]) -> bytes:
+    parts: List[bytes] = []
+    for item in data:
+        if item is None:
+            continue
+        if isinstance(item, tuple):
+            parts.extend((item[0], b"\r\n", item[1]))
+        else:
+            parts.extend((item, b"\r\n"))
+    return b"".join(parts)
+
+
+def parse_fetch_response(data: Sequence[Any]) -> List[Dict[str, ImapValue]]:
+    values = parse_values(join_response(data))
+    items: List[Dict[str, ImapValue]] = []
+    for index in range(0, len(values) - 1, 2):
+        attributes = values[index + 1]
+        if not isinstance(attributes, list):
+            raise ImapParseError(f"Expected FETCH attribute list, got {attributes!r}")
+        items.append({
+            str(attributes[position]).upper(): attributes[position + 1]
+            for position in range(0, len(attributes) - 1, 2)
+        })
+    return items
+
+
+def format_uid_set(uids: Iterable[str]) -> str:
+    numbers = sorted({int(uid) for uid in uids})
+    ranges: List[str] = []
+    index = 0
+    while index < len(numbers):
+        start = index
+        while index + 1 < len(numbers) and numbers[index + 1] == numbers[index] + 1:
+            index += 1
+        ranges.append(str(numbers[start]) if start == index else f"{numbers[start]}:{numbers[index]}")
+        index += 1
+    return ",".join(ranges)
+
+
+def quote(value: str) -> str:
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def parse_uid_set(uid_set: str) -> List[int]:
+    uids: List[int] = []
+    for uid_range in uid_set.split(","):
+        if not uid_range:
+            continue
+        first, _, last = uid_range.partition(":")
+        low, high = sorted((int(first), int(last or first)))
+        uids.extend(range(low, high + 1))
+    return uids
+
+
+def decode_text(value: ImapValue) -> str:
+    if value is None:
+        return ""
+    raw = value.decode("utf-8", "replace") if isinstance(value, bytes) else str(value)
+    return "".join(decode_value(*part) for part in decode_header(raw)).replace("\r\n", "").replace("\n", "")
+
+
+def first_address(addresses: ImapValue) -> str:
+    if not isinstance(addresses, list):
+        return ""
+    for address in addresses:
+        if isinstance(address, list) and len(address) == 4 and address[2] and address[3]:
+            return f"{decode_text(address[2])}@{decode_text(address[3])}"
+    return ""
+
+
+@dataclass(frozen=True)
+class BodyPart:
+    section: str
+    content_type: str
+    charset: str
+    encoding: str
+    size: int
+    filename: str = ""
+    content_id: str = ""
+    disposition: str = ""
+
+    @property
+    def is_attachment(self) -> bool:
+        return self.disposition == "attachment" or bool(self.filename) or self.content_type == "message/rfc822"
+
+
+def parse_bodystructure(structure: ImapValue) -> List[BodyPart]:
+    if not isinstance(structure, list):
+        raise ImapParseError(f"Expected BODYSTRUCTURE list, got {structure!r}")
+    return _collect_parts(structure, "")
+
+
+def _collect_parts(structure: List[Any], prefix: str) -> List[BodyPart]:
+    if structure and isinstance(structure[0], list):
+        parts: List[BodyPart] = []
+        children = list(takewhile(lambda child: isinstance(child, list), structure))
+        for index, child in enumerate(children, start=1):
+            parts.extend(_collect_parts(child, f"{prefix}.{index}" if prefix else str(index)))
+        return parts
+    return [_single_part(structure, prefix or "1")]
+
+
+def _single_part(structure: List[Any], section: str) -> BodyPart:
+    content_type = f"{decode_text(structure[0])}/{decode_text(structure[1])}".lower()
+    parameters = _parameters(structure[2])
+    extension_index = 7
+    if content_type.startswith("text/"):
+        extension_index = 8
+    elif content_type == "message/rfc822":
+        extension_index = 10
+    disposition = structure[extension_index + 1] if len(structure) > extension_index + 1 else None
+    if not isinstance(disposition, list) or not disposition:
+        disposition = [None, None]
+    disposition_parameters = _parameters(disposition[1]) if len(disposition) > 1 else {}
+    filename = disposition_parameters.get("filename") or parameters.get("name") or ""
+    return BodyPart(
+        section=section,
+        content_type=content_type,
+        charset=parameters.get("charset", ""),
+        encoding=decode_text(structure[5]).lower(),
+        size=int(str(structure[6])) if structure[6] is not None else 0,
+        filename=filename,
+        content_id=decode_text(structure[3]),
+        disposition=decode_text(disposition[0]).lower(),
+    )
+
+
+def _parameters(value: ImapValue) -> Dict[str, str]:
+    if not isinstance(value, list):
+        return {}
+    parameters: Dict[str, str] = {}
+    continuations: Dict[str, Dict[int, Tuple[bool, str]]] = {}
+    for index in range(0, len(value) - 1, 2):
+        name = decode_text(value[index]).lower()
+        continuation = CONTINUATION.match(name)
+        if continuation:
+            segments = continuations.setdefault(continuation["name"], {})
+            segments[int(continuation["index"])] = (bool(continuation["encoded"]), _raw_text(value[index + 1]))
+        elif name.endswith("*"):
+            parameters[name[:-1]] = collapse_rfc2231_value(decode_rfc2231(_raw_text(value[index + 1])))
+        elif name not in parameters:
+            parameters[name] = decode_text(value[index + 1])
+    for name, segments in continuations.items():
+        parameters[name] = _join_continuation([segments[position] for position in sorted(segments)])
+    return parameters
+
+
+def _join_continuation(segments: List[Tuple[bool, str]]) -> str:
+    charset = "utf-8"
+    encoded_first, first = segments[0]
+    if encoded_first and first.count("'") >= 2:
+        declared, _, first = first.split("'", 2)
+        charset = declared or charset
+    pieces = [first if encoded_first else _percent_encode(first, charset)]
+    pieces.extend(text if encoded else _percent_encode(text, charset) for encoded, text in segments[1:])
+    try:
+        return unquote("".join(pieces), encoding=charset, errors="replace")
+    except LookupError:
+        return unquote("".join(pieces), errors="replace")
+
+
+def _percent_encode(text: str, charset: str) -> str:
+    try:
+        return quote_from_bytes(text.encode(charset, "replace"))
+    except LookupError:
+        return quote_from_bytes(text.encode("utf-8"))
+
+
+def _raw_text(value: ImapValue) -> str:
+    if isinstance(value, bytes):
+        return value.decode("utf-8", "replace")
+    return "" if value is None else str(value)
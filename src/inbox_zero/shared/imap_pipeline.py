@@ -0,0 +1,103 @@
+import imaplib
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+
+from inbox_zero.shared.imap_parser import ImapValue, parse_fetch_response
+from inbox_zero.shared.instrumentation import NO_INSTRUMENTATION, Instrumentation
+
+
+PIPELINE_WINDOW = 32
+
+
+@dataclass
+class PipelinedCommand:
+    command: str
+    tag: bytes
+    started_ns: int = 0
+    status: Optional[str] = None
+    data: List[Any] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "OK"
+
+
+class ImapPipeline:
+    def __init__(
+        self,
+        client: imaplib.IMAP4,
+        window: int = PIPELINE_WINDOW,
+        instrumentation: Instrumentation = NO_INSTRUMENTATION,
+    ) -> None:
+        self._client = client
+        self._window = max(1, window)
+        self._instrumentation = instrumentation
+        self._pending: Deque[PipelinedCommand] = deque()
+        self.fetched: List[Dict[str, ImapValue]] = []
+        self.searched: List[int] = []
+
+    def uid(self, command: str, *args: Any) -> PipelinedCommand:
+        while len(self._pending) >= self._window:
+            self._complete(self._pending.popleft())
+        started_ns = time.time_ns()
+        tag = self._client._command("UID", command, *args)
+        pending = PipelinedCommand(command.upper(), tag, started_ns)
+        self._pending.append(pending)
+        self._instrumentation.count("imap_pipelined_commands_total", command=f"UID {pending.command}")
+        return pending
+
+    def drain(self) -> None:
+        while self._pending:
+            self._complete(self._pending.popleft())
+
+    def fetched_by_uid(self) -> Dict[int, Dict[str, ImapValue]]:
+        items: Dict[int, Dict[str, ImapValue]] = {}
+        for item in self.fetched:
+            if "UID" in item:
+                items.setdefault(int(str(item["UID"])), {}).update(item)
+        return items
+
+    def __enter__(self) -> "ImapPipeline":
+        return self
+
+    def __exit__(self, exc_type: Any, exc_value: Any, traceback: Any) -> None:
+        if exc_type is None:
+            self.drain()
+            return
+        try:
+            self.drain()
+        except Exception:
+            pass
+
+    def _complete(self, pending: PipelinedCommand) -> None:
+        try:
+            pending.status, pending.data = self._client._command_complete("UID", pending.tag)
+        except imaplib.IMAP4.abort:
+            raise
+        except imaplib.IMAP4.error as error:
+            pending.status, pending.data = "BAD", [str(error).encode()]
+        finally:
+            self._trace(pending)
+        self._collect()
+
+    def _trace(self, pending: PipelinedCommand) -> None:
+        command = f"UID {pending.command}"
+        self._instrumentation.record_span(
+            f"imap.{command}",
+            pending.started_ns,
+            time.time_ns(),
+            error=None if pending.ok else f"{pending.status or 'ABORT'}: {pending.data!r}",
+            command=command,
+            pipelined=True,
+        )
+
+    def _collect(self) -> None:
+        responses = self._client.untagged_responses
+        fetches = responses.pop("FETCH", [])
+        if fetches:
+            self.fetched.extend(parse_fetch_response(fetches))
+        for line in responses.pop("SEARCH", []):
+            if isinstance(line, bytes):
+                self.searched.extend(int(uid) for uid in line.split() if uid.isdigit())
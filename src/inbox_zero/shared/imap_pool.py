@@ -0,0 +1,194 @@
+import imaplib
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from inbox_zero.shared.email_reader import ImapConfig, open_mailbox
+from inbox_zero.shared.instrumentation import NO_INSTRUMENTATION, Instrumentation
+
+
+CONNECTION_ERRORS = (imaplib.IMAP4.abort, OSError, EOFError)
+
+
+@dataclass
+class PoolMetrics:
+    hits: int = 0
+    misses: int = 0
+    reconnects: int = 0
+    evictions: int = 0
+    handshakes: int = 0
+    handshake_seconds: float = 0.0
+    folder_reuses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses + self.reconnects
+        return self.hits / total if total else 0.0
+
+    @property
+    def average_handshake_seconds(self) -> float:
+        return self.handshake_seconds / self.handshakes if self.handshakes else 0.0
+
+
+@dataclass
+class _PooledSession:
+    mailbox: Any
+    last_used: float
+    folder: Optional[str] = None
+
+
+class ImapConnectionPool:
+    def __init__(
+        self,
+        connect: Optional[Callable[[ImapConfig], Any]] = None,
+        max_sessions_per_account: int = 2,
+        idle_timeout: float = 300.0,
+        keepalive_interval: float = 60.0,
+        acquire_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+        instrumentation: Instrumentation = NO_INSTRUMENTATION,
+    ) -> None:
+        self._connect = connect or partial(open_mailbox, instrumentation=instrumentation)
+        self.instrumentation = instrumentation
+        self._max_sessions_per_account = max_sessions_per_account
+        self._idle_timeout = idle_timeout
+        self._keepalive_interval = keepalive_interval
+        self._acquire_timeout = acquire_timeout
+        self._clock = clock
+        self._idle: Dict[ImapConfig, List[_PooledSession]] = {}
+        self._open_sessions: Dict[ImapConfig, int] = {}
+        self._condition = threading.Condition()
+        self._metrics = PoolMetrics()
+
+    @property
+    def metrics(self) -> PoolMetrics:
+        with self._condition:
+            return replace(self._metrics)
+
+    def open_sessions(self, config: ImapConfig) -> int:
+        with self._condition:
+            return self._open_sessions.get(config, 0)
+
+    @contextmanager
+    def session(self, config: ImapConfig, folder: str) -> Iterator[Any]:
+        pooled = self._acquire(config)
+        try:
+            self._select(pooled, folder)
+            yield pooled.mailbox
+        except CONNECTION_ERRORS:
+            self._discard(config, pooled)
+            raise
+        except BaseException:
+            self._release(config, pooled)
+            raise
+        else:
+            self._release(config, pooled)
+
+    def close(self) -> None:
+        with self._condition:
+            sessions = [pooled for idle in self._idle.values() for pooled in idle]
+            for config, idle in self._idle.items():
+                self._open_sessions[config] -= len(idle)
+            self._idle.clear()
+            self._condition.notify_all()
+        for pooled in sessions:
+            self._logout_quietly(pooled)
+
+    def _acquire(self, config: ImapConfig) -> _PooledSession:
+        deadline = time.monotonic() + self._acquire_timeout
+        pooled: Optional[_PooledSession] = None
+        with self._condition:
+            expired = self._evict_expired()
+            while True:
+                idle = self._idle.get(config)
+                if idle:
+                    pooled = idle.pop()
+                    break
+                if self._open_sessions.get(config, 0) < self._max_sessions_per_account:
+                    self._open_sessions[config] = self._open_sessions.get(config, 0) + 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No IMAP session available for {config.username}@{config.host}")
+                self._condition.wait(remaining)
+        for stale in expired:
+            self._logout_quietly(stale)
+
+        if pooled is not None:
+            if self._is_alive(pooled):
+                with self._condition:
+                    self._metrics.hits += 1
+                return pooled
+            self._logout_quietly(pooled)
+            with self._condition:
+                self._metrics.reconnects += 1
+        else:
+            with self._condition:
+                self._metrics.misses += 1
+
+        try:
+            return self._open(config)
+        except BaseException:
+            with self._condition:
+                self._open_sessions[config] -= 1
+                self._condition.notify()
+            raise
+
+    def _open(self, config: ImapConfig) -> _PooledSession:
+        started = self._clock()
+        mailbox = self._connect(config)
+        finished = self._clock()
+        with self._condition:
+            self._metrics.handshakes += 1
+            self._metrics.handshake_seconds += finished - started
+        return _PooledSession(mailbox=mailbox, last_used=finished)
+
+    def _is_alive(self, pooled: _PooledSession) -> bool:
+        if self._clock() - pooled.last_used < self._keepalive_interval:
+            return True
+        try:
+            typ, _ = pooled.mailbox.client.noop()
+        except (imaplib.IMAP4.error, *CONNECTION_ERRORS):
+            return False
+        return bool(typ == "OK")
+
+    def _select(self, pooled: _PooledSession, folder: str) -> None:
+        if pooled.folder == folder:
+            with self._condition:
+                self._metrics.folder_reuses += 1
+            return
+        pooled.folder = None
+        pooled.mailbox.folder.set(folder)
+        pooled.folder = folder
+
+    def _release(self, config: ImapConfig, pooled: _PooledSession) -> None:
+        pooled.last_used = self._clock()
+        with self._condition:
+            self._idle.setdefault(config, []).append(pooled)
+            self._condition.notify()
+
+    def _discard(self, config: ImapConfig, pooled: _PooledSession) -> None:
+        self._logout_quietly(pooled)
+        with self._condition:
+            self._open_sessions[config] -= 1
+            self._condition.notify()
+
+    def _evict_expired(self) -> List[_PooledSession]:
+        now = self._clock()
+        expired: List[_PooledSession] = []
+        for config, idle in self._idle.items():
+            alive = [pooled for pooled in idle if now - pooled.last_used <= self._idle_timeout]
+            expired.extend(pooled for pooled in idle if now - pooled.last_used > self._idle_timeout)
+            self._open_sessions[config] -= len(idle) - len(alive)
+            idle[:] = alive
+        self._metrics.evictions += len(expired)
+        return expired
+
+    def _logout_quietly(self, pooled: _PooledSession) -> None:
+        try:
+            pooled.mailbox.logout()
+        except Exception:
+            pass
@@ -0,0 +1,362 @@
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, ContextManager, Deque, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+Labels = Tuple[Tuple[str, str], ...]
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRIC_PREFIX = "inbox_zero_"
+SPAN_METRIC = "span_duration_seconds"
+INSTRUMENTED_MARKER = "_inbox_zero_instrumented"
+
+_current_span: ContextVar[Optional[Tuple[str, str]]] = ContextVar("inbox_zero_current_span", default=None)
+
+
+@dataclass(frozen=True)
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int
+    end_ns: int
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def seconds(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e9
+
+
+@dataclass
+class Histogram:
+    bounds: Tuple[float, ...]
+    counts: List[int]
+    count: int = 0
+    total: float = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+
+
+def labels_of(values: Dict[str, Any]) -> Labels:
+    return tuple(sorted((name, str(value)) for name, value in values.items()))
+
+
+class Instrumentation:
+    def __init__(
+        self,
+        enabled: bool = True,
+        max_spans: int = 2000,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        service_name: str = "inbox_zero",
+    ) -> None:
+        self._enabled = enabled
+        self._buckets = tuple(sorted(buckets))
+        self.service_name = service_name
+        self._lock = threading.Lock()
+        self._spans: Deque[Span] = deque(maxlen=max_spans)
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def count(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        if not self._enabled:
+            return
+        key = (name, labels_of(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def observe(self, name: str, seconds: float, **labels: Any) -> None:
+        if not self._enabled:
+            return
+        key = (name, labels_of(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = Histogram(self._buckets, [0] * (len(self._buckets) + 1))
+                self._histograms[key] = histogram
+            histogram.observe(seconds)
+
+    def timer(self, name: str, **labels: Any) -> ContextManager[None]:
+        if not self._enabled:
+            return nullcontext()
+        return self._timer(name, labels)
+
+    def span(self, name: str, **attributes: Any) -> ContextManager[Dict[str, Any]]:
+        if not self._enabled:
+            return nullcontext(attributes)
+        return self._span(name, attributes)
+
+    def record_span(
+        self, name: str, start_ns: int, end_ns: int, error: Optional[str] = None, **attributes: Any
+    ) -> None:
+        if not self._enabled:
+            return
+        parent = _current_span.get()
+        trace_id = parent[0] if parent is not None else os.urandom(16).hex()
+        self._record(Span(
+            name=name,
+            trace_id=trace_id,
+            span_id=os.urandom(8).hex(),
+            parent_id=parent[1] if parent is not None else None,
+            start_ns=start_ns,
+            end_ns=end_ns,
+            attributes=dict(attributes),
+            error=error,
+        ))
+
+    def spans(self) -> List[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def counters(self) -> Dict[Tuple[str, Labels], float]:
+        with self._lock:
+            return dict(self._counters)
+
+    def histograms(self) -> Dict[Tuple[str, Labels], Histogram]:
+        with self._lock:
+            return {
+                key: replace(histogram, counts=list(histogram.counts)) for key, histogram in self._histograms.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._spans.clear()
+            self._counters.clear()
+            self._histograms.clear()
+
+    @contextmanager
+    def _timer(self, name: str, labels: Dict[str, Any]) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    @contextmanager
+    def _span(self, name: str, attributes: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        parent = _current_span.get()
+        trace_id = parent[0] if parent is not None else os.urandom(16).hex()
+        span_id = os.urandom(8).hex()
+        token = _current_span.set((trace_id, span_id))
+        error: Optional[str] = None
+        start_ns = time.time_ns()
+        started = time.perf_counter()
+        try:
+            yield attributes
+        except BaseException as exception:
+            error = f"{type(exception).__name__}: {exception}"
+            raise
+        finally:
+            seconds = time.perf_counter() - started
+            _current_span.reset(token)
+            self._record(Span(
+                name=name,
+                trace_id=trace_id,
+                span_id=span_id,
+                parent_id=parent[1] if parent is not None else None,
+                start_ns=start_ns,
+                end_ns=start_ns + int(seconds * 1e9),
+                attributes=dict(attributes),
+                error=error,
+            ))
+
+    def _record(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+        self.observe(SPAN_METRIC, span.seconds, span=span.name)
+        if span.error is not None:
+            self.count("span_errors_total", span=span.name)
+
+
+NO_INSTRUMENTATION = Instrumentation(enabled=False)
+
+
+def _traced(method: Callable[..., T], instrumentation: Instrumentation, port: str, name: str) -> Callable[..., T]:
+    @functools.wraps(method)
+    def traced(*args: Any, **kwargs: Any) -> T:
+        instrumentation.count("port_calls_total", port=port, method=name)
+        with instrumentation.span(f"{port}.{name}", port=port, method=name):
+            return method(*args, **kwargs)
+
+    setattr(traced, INSTRUMENTED_MARKER, True)
+    return traced
+
+
+def instrument(
+    target: T, instrumentation: Instrumentation, name: Optional[str] = None, methods: Optional[Sequence[str]] = None
+) -> T:
+    if not instrumentation.enabled:
+        return target
+    port = name or type(target).__name__
+    if methods is None:
+        methods = [
+            method for method in dir(type(target))
+            if not method.startswith("_") and callable(getattr(type(target), method))
+        ]
+    for method in methods:
+        bound = getattr(target, method)
+        if not getattr(bound, INSTRUMENTED_MARKER, False):
+            setattr(target, method, _traced(bound, instrumentation, port, method))
+    return target
+
+
+def instrument_client(client: Any, instrumentation: Instrumentation) -> None:
+    if not instrumentation.enabled or getattr(client, INSTRUMENTED_MARKER, False):
+        return
+    send, read, readline, simple_command = client.send, client.read, client.readline, client._simple_command
+
+    def counted_send(data: bytes) -> None:
+        instrumentation.count("imap_bytes_sent_total", len(data))
+        send(data)
+
+    def counted_read(size: int) -> bytes:
+        data: bytes = read(size)
+        instrumentation.count("imap_bytes_received_total", len(data))
+        return data
+
+    def counted_readline() -> bytes:
+        data: bytes = readline()
+        instrumentation.count("imap_bytes_received_total", len(data))
+        return data
+
+    def traced_command(name: str, *args: Any) -> Any:
+        command = f"{name} {args[0]}".upper() if name == "UID" and args else name.upper()
+        instrumentation.count("imap_commands_total", command=command)
+        with instrumentation.span(f"imap.{command}", command=command):
+            return simple_command(name, *args)
+
+    client.send = counted_send
+    client.read = counted_read
+    client.readline = counted_readline
+    client._simple_command = traced_command
+    setattr(client, INSTRUMENTED_MARKER, True)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels, extra: Labels = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in pairs) + "}"
+
+
+def _format_number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+def prometheus_text(instrumentation: Instrumentation) -> str:
+    lines: List[str] = []
+    counters: Dict[str, List[Tuple[Labels, float]]] = {}
+    for (name, labels), value in sorted(instrumentation.counters().items()):
+        counters.setdefault(name, []).append((labels, value))
+    for name, samples in counters.items():
+        metric = f"{METRIC_PREFIX}{name}"
+        lines.append(f"# TYPE {metric} counter")
+        lines.extend(f"{metric}{_format_labels(labels)} {_format_number(value)}" for labels, value in samples)
+
+    histograms: Dict[str, List[Tuple[Labels, Histogram]]] = {}
+    for (name, labels), histogram in sorted(instrumentation.histograms().items(), key=lambda item: item[0]):
+        histograms.setdefault(name, []).append((labels, histogram))
+    for name, series in histograms.items():
+        metric = f"{METRIC_PREFIX}{name}"
+        lines.append(f"# TYPE {metric} histogram")
+        for labels, histogram in series:
+            cumulative = 0
+            for bound, count in zip(histogram.bounds, histogram.counts):
+                cumulative += count
+                lines.append(f"{metric}_bucket{_format_labels(labels, (('le', repr(bound)),))} {cumulative}")
+            lines.append(f"{metric}_bucket{_format_labels(labels, (('le', '+Inf'),))} {histogram.count}")
+            lines.append(f"{metric}_sum{_format_labels(labels)} {histogram.total!r}")
+            lines.append(f"{metric}_count{_format_labels(labels)} {histogram.count}")
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(values: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in values.items()]
+
+
+def _otlp_resource(instrumentation: Instrumentation) -> Dict[str, Any]:
+    return {"attributes": _otlp_attributes({"service.name": instrumentation.service_name})}
+
+
+def otlp_traces(instrumentation: Instrumentation) -> Dict[str, Any]:
+    spans = []
+    for span in instrumentation.spans():
+        exported: Dict[str, Any] = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": 1,
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": _otlp_attributes(span.attributes),
+            "status": {"code": 2, "message": span.error} if span.error is not None else {"code": 1},
+        }
+        if span.parent_id is not None:
+            exported["parentSpanId"] = span.parent_id
+        spans.append(exported)
+    return {
+        "resourceSpans": [{
+            "resource": _otlp_resource(instrumentation),
+            "scopeSpans": [{"scope": {"name": instrumentation.service_name}, "spans": spans}],
+        }]
+    }
+
+
+def otlp_metrics(instrumentation: Instrumentation) -> Dict[str, Any]:
+    now = str(time.time_ns())
+    metrics: Dict[str, Dict[str, Any]] = {}
+    for (name, labels), value in sorted(instrumentation.counters().items()):
+        metric = metrics.setdefault(name, {
+            "name": name,
+            "sum": {"dataPoints": [], "aggregationTemporality": 2, "isMonotonic": True},
+        })
+        metric["sum"]["dataPoints"].append(
+            {"attributes": _otlp_attributes(dict(labels)), "timeUnixNano": now, "asDouble": value}
+        )
+    for (name, labels), histogram in sorted(instrumentation.histograms().items(), key=lambda item: item[0]):
+        metric = metrics.setdefault(name, {"name": name, "unit": "s", "histogram": {
+            "dataPoints": [], "aggregationTemporality": 2,
+        }})
+        metric["histogram"]["dataPoints"].append({
+            "attributes": _otlp_attributes(dict(labels)),
+            "timeUnixNano": now,
+            "count": str(histogram.count),
+            "sum": histogram.total,
+            "bucketCounts": [str(count) for count in histogram.counts],
+            "explicitBounds": list(histogram.bounds),
+        })
+    return {
+        "resourceMetrics": [{
+            "resource": _otlp_resource(instrumentation),
+            "scopeMetrics": [{"scope": {"name": instrumentation.service_name}, "metrics": list(metrics.values())}],
+        }]
+    }
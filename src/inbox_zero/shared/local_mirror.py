@@ -0,0 +1,221 @@
+import os
+import shutil
+import sqlite3
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple, Union
+from urllib.parse import quote
+
+from inbox_zero.shared.email_cache import account_key
+from inbox_zero.shared.email_reader import EmailData, EmailReader, EmailUid, ImapConfig, LazyEmailData
+
+if TYPE_CHECKING:
+    from inbox_zero.shared.imap_pool import ImapConnectionPool
+
+
+OUTBOX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY,
+    account TEXT NOT NULL,
+    folder TEXT NOT NULL,
+    uid_validity INTEGER NOT NULL,
+    uid INTEGER NOT NULL,
+    destination TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT NOT NULL DEFAULT '',
+    UNIQUE (account, folder, uid_validity, uid)
+);
+"""
+MAILDIR_SUBDIRECTORIES = ("cur", "new", "tmp")
+UID_VALIDITY_FILE = "uidvalidity"
+SYNC_CHUNK_SIZE = 200
+MAX_REPLAY_ATTEMPTS = 5
+
+
+@dataclass(frozen=True)
+class MirrorReport:
+    added: int = 0
+    removed: int = 0
+    replayed: int = 0
+    pending: int = 0
+    discarded: int = 0
+    abandoned: int = 0
+    full_resync: bool = False
+
+
+def mirror_name(value: str) -> str:
+    return quote(value, safe="@._-")
+
+
+def message_filename(uid_validity: int, uid: int) -> str:
+    return f"{uid_validity}-{uid}:2,"
+
+
+def message_uid(filename: str) -> Optional[int]:
+    stem = filename.split(":", 1)[0]
+    _, _, uid = stem.partition("-")
+    return int(uid) if uid.isdigit() else None
+
+
+class LocalMirror:
+    def __init__(
+        self,
+        root: Union[str, Path],
+        pool: Optional["ImapConnectionPool"] = None,
+        archive_folder: str = "Archive",
+    ) -> None:
+        self._root = Path(root)
+        self._root.mkdir(parents=True, exist_ok=True)
+        self._pool = pool
+        self._archive_folder = archive_folder
+        self._lock = threading.RLock()
+        self._uids: Dict[Path, List[int]] = {}
+        self._connection = sqlite3.connect(
+            str(self._root / "outbox.sqlite3"), check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(OUTBOX_SCHEMA)
+
+    def first_email(self, config: ImapConfig, folder: str) -> Optional[EmailData]:
+        directory = self._folder(config, folder)
+        with self._lock:
+            uids = self._local_uids(directory)
+            uid_validity = self._uid_validity(directory)
+            if not uids or uid_validity is None:
+                return None
+            path = directory / "cur" / message_filename(uid_validity, uids[0])
+            raw = path.read_bytes()
+        return LazyEmailData(EmailUid(str(uids[0])), raw)
+
+    def archive(self, config: ImapConfig, folder: str, uid: EmailUid) -> bool:
+        directory = self._folder(config, folder)
+        with self._lock:
+            uid_validity = self._uid_validity(directory)
+            uids = self._local_uids(directory)
+            if uid_validity is None or int(uid.value) not in uids:
+                return False
+            self._connection.execute(
+                "INSERT OR IGNORE INTO outbox (account, folder, uid_validity, uid, destination) VALUES (?, ?, ?, ?, ?)",
+                (account_key(config), folder, uid_validity, int(uid.value), self._archive_folder),
+            )
+            (directory / "cur" / message_filename(uid_validity, int(uid.value))).unlink(missing_ok=True)
+            uids.remove(int(uid.value))
+        return True
+
+    def pending(self, config: ImapConfig) -> int:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT COUNT(*) FROM outbox WHERE account = ?", (account_key(config),)
+            ).fetchone()
+        return int(row[0])
+
+    def replay(self, config: ImapConfig) -> MirrorReport:
+        account = account_key(config)
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id, folder, uid_validity, uid, destination FROM outbox WHERE account = ? ORDER BY id",
+                (account,),
+            ).fetchall()
+        batches: Dict[Tuple[str, int, str], Dict[int, int]] = {}
+        for entry_id, folder, uid_validity, uid, destination in rows:
+            batches.setdefault((folder, uid_validity, destination), {})[uid] = entry_id
+
+        reader = EmailReader.from_config(config, pool=self._pool)
+        replayed = discarded = abandoned = 0
+        for (folder, uid_validity, destination), entries in batches.items():
+            if reader.uid_validity(folder) != uid_validity:
+                self._forget(list(entries.values()))
+                discarded += len(entries)
+                continue
+            remaining = set(reader.fetch_uids(folder))
+            self._forget([entry_id for uid, entry_id in entries.items() if uid not in remaining])
+            uids = [EmailUid(str(uid)) for uid in entries if uid in remaining]
+            outcomes = reader.move_many(folder=folder, uids=uids, destination=destination)
+            moved = [entries[int(uid.value)] for uid, done in outcomes.items() if done]
+            self._forget(moved)
+            abandoned += self._failed([entries[int(uid.value)] for uid, done in outcomes.items() if not done])
+            replayed += len(moved)
+        return MirrorReport(replayed=replayed, pending=self.pending(config), discarded=discarded, abandoned=abandoned)
+
+    def sync(self, config: ImapConfig, folder: str) -> MirrorReport:
+        reader = EmailReader.from_config(config, pool=self._pool)
+        directory = self._folder(config, folder)
+        uid_validity = reader.uid_validity(folder)
+        server_uids = reader.fetch_uids(folder)
+
+        with self._lock:
+            full_resync = self._uid_validity(directory) not in (None, uid_validity)
+            if full_resync:
+                shutil.rmtree(directory)
+                self._uids.pop(directory, None)
+            self._prepare(directory, uid_validity)
+            local = set(self._local_uids(directory))
+            archived = self._archived_uids(account_key(config), folder, uid_validity)
+
+        remote = set(server_uids)
+        vanished = sorted(local - remote)
+        missing = [uid for uid in server_uids if uid not in local and uid not in archived]
+        for start in range(0, len(missing), SYNC_CHUNK_SIZE):
+            for uid, raw in reader.fetch_raw_messages(folder, missing[start:start + SYNC_CHUNK_SIZE]).items():
+                self._deliver(directory, uid_validity, uid, raw)
+
+        with self._lock:
+            for uid in vanished:
+                (directory / "cur" / message_filename(uid_validity, uid)).unlink(missing_ok=True)
+            self._uids.pop(directory, None)
+            added = len(set(self._local_uids(directory)) - local)
+        return MirrorReport(added=added, removed=len(vanished), full_resync=full_resync)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _folder(self, config: ImapConfig, folder: str) -> Path:
+        return self._root / mirror_name(account_key(config)) / mirror_name(folder)
+
+    def _prepare(self, directory: Path, uid_validity: int) -> None:
+        for name in MAILDIR_SUBDIRECTORIES:
+            (directory / name).mkdir(parents=True, exist_ok=True)
+        (directory / UID_VALIDITY_FILE).write_text(str(uid_validity))
+
+    def _uid_validity(self, directory: Path) -> Optional[int]:
+        try:
+            return int((directory / UID_VALIDITY_FILE).read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _local_uids(self, directory: Path) -> List[int]:
+        if directory not in self._uids:
+            entries = os.listdir(directory / "cur") if (directory / "cur").is_dir() else []
+            self._uids[directory] = sorted(uid for uid in map(message_uid, entries) if uid is not None)
+        return self._uids[directory]
+
+    def _deliver(self, directory: Path, uid_validity: int, uid: int, raw: bytes) -> None:
+        filename = message_filename(uid_validity, uid)
+        temporary = directory / "tmp" / filename
+        temporary.write_bytes(raw)
+        os.replace(temporary, directory / "cur" / filename)
+
+    def _archived_uids(self, account: str, folder: str, uid_validity: int) -> Set[int]:
+        rows = self._connection.execute(
+            "SELECT uid FROM outbox WHERE account = ? AND folder = ? AND uid_validity = ?",
+            (account, folder, uid_validity),
+        ).fetchall()
+        return {uid for (uid,) in rows}
+
+    def _forget(self, entry_ids: List[int]) -> None:
+        with self._lock:
+            self._connection.executemany("DELETE FROM outbox WHERE id = ?", [(entry_id,) for entry_id in entry_ids])
+
+    def _failed(self, entry_ids: List[int]) -> int:
+        with self._lock:
+            self._connection.executemany(
+                "UPDATE outbox SET attempts = attempts + 1, last_error = ? WHERE id = ?",
+                [("not moved", entry_id) for entry_id in entry_ids],
+            )
+            cursor = self._connection.executemany(
+                "DELETE FROM outbox WHERE id = ? AND attempts >= ?",
+                [(entry_id, MAX_REPLAY_ATTEMPTS) for entry_id in entry_ids],
+            )
+        return max(cursor.rowcount, 0)
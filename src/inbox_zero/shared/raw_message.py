@@ -0,0 +1,89 @@
+import re
+from dataclasses import dataclass
+from email.message import Message
+from email.parser import HeaderParser
+from typing import List, Optional, Tuple
+
+from inbox_zero.shared.imap_parser import BodyPart
+
+
+HEADER_END = re.compile(rb"\r?\n\r?\n")
+MAX_DEPTH = 16
+
+_header_parser = HeaderParser()
+
+
+@dataclass(frozen=True, slots=True)
+class RawPart:
+    part: BodyPart
+    start: int
+    end: int
+
+
+def split_headers(raw: bytes, start: int = 0, end: Optional[int] = None) -> Tuple[Message, int]:
+    end = len(raw) if end is None else end
+    match = HEADER_END.search(raw, start, end)
+    body_start = match.end() if match is not None else end
+    return _header_parser.parsestr(raw[start:body_start].decode("utf-8", "replace")), body_start
+
+
+def index_parts(raw: bytes) -> List[RawPart]:
+    parts: List[RawPart] = []
+    _index(raw, 0, len(raw), "", parts, 0)
+    return parts
+
+
+def _index(raw: bytes, start: int, end: int, section: str, parts: List[RawPart], depth: int) -> None:
+    headers, body_start = split_headers(raw, start, end)
+    boundary = headers.get_boundary()
+    if headers.get_content_maintype() == "multipart" and boundary and depth < MAX_DEPTH:
+        for index, (part_start, part_end) in enumerate(_split_multipart(raw, body_start, end, boundary), start=1):
+            _index(raw, part_start, part_end, f"{section}.{index}" if section else str(index), parts, depth + 1)
+        return
+
+    content_type = headers.get_content_type()
+    part = BodyPart(
+        section=section or "1",
+        content_type=content_type,
+        charset=headers.get_content_charset() or "",
+        encoding=str(headers.get("Content-Transfer-Encoding", "7bit")).strip().lower(),
+        size=end - body_start,
+        filename=headers.get_filename() or "",
+        content_id=str(headers.get("Content-ID", "")).strip(),
+        disposition=headers.get_content_disposition() or "",
+    )
+    parts.append(RawPart(part, body_start, end))
+
+
+def _split_multipart(raw: bytes, start: int, end: int, boundary: str) -> List[Tuple[int, int]]:
+    delimiter = b"--" + boundary.encode("ascii", "replace")
+    spans: List[Tuple[int, int]] = []
+    position = _find_delimiter(raw, delimiter, start, end)
+    while position != -1:
+        if raw.startswith(delimiter + b"--", position):
+            break
+        line_end = raw.find(b"\n", position, end)
+        if line_end == -1:
+            break
+        part_start = line_end + 1
+        following = _find_delimiter(raw, delimiter, part_start, end)
+        part_end = end if following == -1 else _line_start(raw, following, part_start)
+        spans.append((part_start, part_end))
+        position = following
+    return spans
+
+
+def _find_delimiter(raw: bytes, delimiter: bytes, start: int, end: int) -> int:
+    position = raw.find(delimiter, start, end)
+    while position != -1 and position != start and raw[position - 1] != 0x0A:
+        position = raw.find(delimiter, position + 1, end)
+    return position
+
+
+def _line_start(raw: bytes, delimiter_position: int, minimum: int) -> int:
+    position = delimiter_position
+    if position > minimum and raw[position - 1] == 0x0A:
+        position -= 1
+        if position > minimum and raw[position - 1] == 0x0D:
+            position -= 1
+    return position
@@ -0,0 +1,66 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class PeriodicJob:
+    def __init__(self, interval: float, job: Callable[[], Any], name: str = "periodic-job") -> None:
+        self._interval = interval
+        self._job = job
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.runs = 0
+        self.last_result: Any = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive()
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stopped.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self.last_result = self._job()
+                self.last_error = None
+            except Exception as error:
+                self.last_error = str(error)
+            self.runs += 1
+            self._stopped.wait(self._interval)
+
+
+class Scheduler:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._jobs: Dict[Hashable, PeriodicJob] = {}
+
+    def get(self, key: Hashable) -> Optional[PeriodicJob]:
+        with self._lock:
+            return self._jobs.get(key)
+
+    def schedule(self, key: Hashable, interval: float, job: Callable[[], Any]) -> PeriodicJob:
+        self.cancel(key)
+        periodic = PeriodicJob(interval, job, name=f"scheduled-{key}")
+        with self._lock:
+            self._jobs[key] = periodic
+        periodic.start()
+        return periodic
+
+    def cancel(self, key: Hashable) -> None:
+        with self._lock:
+            periodic = self._jobs.pop(key, None)
+        if periodic is not None:
+            periodic.stop()
+
+    def close(self) -> None:
+        with self._lock:
+            jobs = list(self._jobs.values())
+            self._jobs.clear()
+        for periodic in jobs:
+            periodic.stop()
@@ -0,0 +1,143 @@
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Union
+
+from inbox_zero.shared.email_reader import EmailData, EmailUid
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS folders (
+    account TEXT NOT NULL,
+    folder TEXT NOT NULL,
+    uid_validity INTEGER NOT NULL,
+    PRIMARY KEY (account, folder)
+);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    account TEXT NOT NULL,
+    folder TEXT NOT NULL,
+    uid INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    UNIQUE (account, folder, uid)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS message_text USING fts5(
+    subject, sender, body, attachments, tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+SEARCH = """
+SELECT messages.folder, messages.uid, message_text.subject, message_text.sender, messages.date,
+       snippet(message_text, 2, '[', ']', '…', 12)
+FROM message_text JOIN messages ON messages.id = message_text.rowid
+WHERE message_text MATCH ? AND messages.account = ? {folder}
+ORDER BY bm25(message_text, 10.0, 5.0, 1.0, 2.0)
+LIMIT ?
+"""
+TOKEN = re.compile(r"\w+")
+TAG = re.compile(r"<[^>]*>")
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    folder: str
+    uid: EmailUid
+    subject: str
+    sender: str
+    date: str
+    snippet: str
+
+
+def fts_query(text: str) -> str:
+    return " ".join(f'"{token}"*' for token in TOKEN.findall(text))
+
+
+def searchable_body(email: EmailData) -> str:
+    return email.body_text or TAG.sub(" ", email.body_html)
+
+
+class SearchIndex:
+    def __init__(self, path: Union[str, Path] = ":memory:") -> None:
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(SCHEMA)
+
+    def add(self, account: str, folder: str, uid_validity: int, emails: Iterable[EmailData]) -> None:
+        with self._lock:
+            self._connection.execute("BEGIN")
+            try:
+                self._check_uid_validity(account, folder, uid_validity)
+                for email in emails:
+                    self._add(account, folder, email)
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+    def discard(self, account: str, folder: str, uids: Iterable[int]) -> None:
+        with self._lock:
+            for uid in uids:
+                row = self._connection.execute(
+                    "SELECT id FROM messages WHERE account = ? AND folder = ? AND uid = ?", (account, folder, uid)
+                ).fetchone()
+                if row is not None:
+                    self._delete(row[0])
+
+    def search(self, account: str, text: str, folder: Optional[str] = None, limit: int = 50) -> List[SearchHit]:
+        query = fts_query(text)
+        if not query:
+            return []
+        parameters: List[Union[str, int]] = [query, account]
+        if folder is not None:
+            parameters.append(folder)
+        with self._lock:
+            rows = self._connection.execute(
+                SEARCH.format(folder="AND messages.folder = ?" if folder is not None else ""), (*parameters, limit)
+            ).fetchall()
+        return [SearchHit(row[0], EmailUid(str(row[1])), *row[2:]) for row in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return int(self._connection.execute("SELECT COUNT(*) FROM messages").fetchone()[0])
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _add(self, account: str, folder: str, email: EmailData) -> None:
+        row = self._connection.execute(
+            "SELECT id FROM messages WHERE account = ? AND folder = ? AND uid = ?",
+            (account, folder, int(email.uid.value)),
+        ).fetchone()
+        if row is not None:
+            self._delete(row[0])
+        cursor = self._connection.execute(
+            "INSERT INTO messages (account, folder, uid, date) VALUES (?, ?, ?, ?)",
+            (account, folder, int(email.uid.value), email.date),
+        )
+        self._connection.execute(
+            "INSERT INTO message_text (rowid, subject, sender, body, attachments) VALUES (?, ?, ?, ?, ?)",
+            (cursor.lastrowid, email.subject, email.sender, searchable_body(email), " ".join(email.attachments)),
+        )
+
+    def _delete(self, message_id: int) -> None:
+        self._connection.execute("DELETE FROM message_text WHERE rowid = ?", (message_id,))
+        self._connection.execute("DELETE FROM messages WHERE id = ?", (message_id,))
+
+    def _check_uid_validity(self, account: str, folder: str, uid_validity: int) -> None:
+        row = self._connection.execute(
+            "SELECT uid_validity FROM folders WHERE account = ? AND folder = ?", (account, folder)
+        ).fetchone()
+        if row is not None and row[0] == uid_validity:
+            return
+        self._connection.execute(
+            "DELETE FROM message_text WHERE rowid IN (SELECT id FROM messages WHERE account = ? AND folder = ?)",
+            (account, folder),
+        )
+        self._connection.execute("DELETE FROM messages WHERE account = ? AND folder = ?", (account, folder))
+        self._connection.execute(
+            "INSERT OR REPLACE INTO folders (account, folder, uid_validity) VALUES (?, ?, ?)",
+            (account, folder, uid_validity),
+        )
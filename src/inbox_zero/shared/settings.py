@@ -0,0 +1,44 @@
+import os
+from pathlib import Path
+
+
+CACHE_DIRECTORY = Path.home() / ".cache" / "inbox_zero"
+CONFIG_DIRECTORY = Path.home() / ".config" / "inbox_zero"
+
+
+def imap_backend() -> str:
+    return os.environ.get("INBOX_ZERO_IMAP_BACKEND", "imaplib")
+
+
+def data_path(variable: str, default: Path) -> Path:
+    path = Path(os.environ.get(variable, default))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def email_cache_path() -> Path:
+    return data_path("INBOX_ZERO_CACHE", CACHE_DIRECTORY / "messages.sqlite3")
+
+
+def sync_state_path() -> Path:
+    return data_path("INBOX_ZERO_SYNC_STATE", CACHE_DIRECTORY / "sync.sqlite3")
+
+
+def accounts_path() -> Path:
+    return data_path("INBOX_ZERO_ACCOUNTS", CONFIG_DIRECTORY / "accounts.sqlite3")
+
+
+def secret_key_path() -> Path:
+    return data_path("INBOX_ZERO_SECRET_KEY_FILE", accounts_path().parent / "secret.key")
+
+
+def search_index_path() -> Path:
+    return data_path("INBOX_ZERO_SEARCH_INDEX", CACHE_DIRECTORY / "search.sqlite3")
+
+
+def mirror_path() -> Path:
+    return data_path("INBOX_ZERO_MIRROR", CACHE_DIRECTORY / "mirror")
+
+
+def thread_index_path() -> Path:
+    return data_path("INBOX_ZERO_THREAD_INDEX", CACHE_DIRECTORY / "threads.sqlite3")
@@ -0,0 +1,134 @@
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterable, List, Set, Union
+
+from inbox_zero.shared.email_reader import EmailEnvelope
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS folders (
+    account TEXT NOT NULL,
+    folder TEXT NOT NULL,
+    uid_validity INTEGER NOT NULL,
+    PRIMARY KEY (account, folder)
+);
+CREATE TABLE IF NOT EXISTS thread_ids (
+    account TEXT NOT NULL,
+    folder TEXT NOT NULL,
+    message_id TEXT NOT NULL,
+    thread_id TEXT NOT NULL,
+    PRIMARY KEY (account, folder, message_id)
+);
+CREATE INDEX IF NOT EXISTS thread_ids_thread ON thread_ids (account, folder, thread_id);
+CREATE TABLE IF NOT EXISTS thread_messages (
+    account TEXT NOT NULL,
+    folder TEXT NOT NULL,
+    uid INTEGER NOT NULL,
+    message_id TEXT NOT NULL,
+    PRIMARY KEY (account, folder, uid)
+);
+CREATE INDEX IF NOT EXISTS thread_messages_message ON thread_messages (account, folder, message_id);
+"""
+THREAD = """
+SELECT members.uid FROM thread_messages AS message
+JOIN thread_ids AS own ON own.account = message.account AND own.folder = message.folder
+    AND own.message_id = message.message_id
+JOIN thread_ids AS related ON related.account = own.account AND related.folder = own.folder
+    AND related.thread_id = own.thread_id
+JOIN thread_messages AS members ON members.account = related.account AND members.folder = related.folder
+    AND members.message_id = related.message_id
+WHERE message.account = ? AND message.folder = ? AND message.uid = ?
+ORDER BY members.uid
+"""
+
+
+def thread_links(envelope: EmailEnvelope) -> List[str]:
+    own = envelope.message_id or f"<{envelope.uid.value}@uid.inbox-zero>"
+    links = [*envelope.references, envelope.in_reply_to, own]
+    return list(dict.fromkeys(link for link in links if link))
+
+
+class ThreadIndex:
+    def __init__(self, path: Union[str, Path] = ":memory:") -> None:
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(SCHEMA)
+
+    def add(self, account: str, folder: str, uid_validity: int, envelopes: Iterable[EmailEnvelope]) -> None:
+        with self._lock:
+            self._connection.execute("BEGIN")
+            try:
+                self._check_uid_validity(account, folder, uid_validity)
+                for envelope in envelopes:
+                    self._add(account, folder, envelope)
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+    def discard(self, account: str, folder: str, uids: Iterable[int]) -> None:
+        with self._lock:
+            self._connection.executemany(
+                "DELETE FROM thread_messages WHERE account = ? AND folder = ? AND uid = ?",
+                [(account, folder, uid) for uid in uids],
+            )
+
+    def indexed_uids(self, account: str, folder: str, uid_validity: int) -> Set[int]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT uid_validity FROM folders WHERE account = ? AND folder = ?", (account, folder)
+            ).fetchone()
+            if row is None or row[0] != uid_validity:
+                return set()
+            rows = self._connection.execute(
+                "SELECT uid FROM thread_messages WHERE account = ? AND folder = ?", (account, folder)
+            ).fetchall()
+        return {uid for (uid,) in rows}
+
+    def thread(self, account: str, folder: str, uid: int) -> List[int]:
+        with self._lock:
+            rows = self._connection.execute(THREAD, (account, folder, uid)).fetchall()
+        return list(dict.fromkeys(member for (member,) in rows))
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _add(self, account: str, folder: str, envelope: EmailEnvelope) -> None:
+        links = thread_links(envelope)
+        placeholders = ", ".join("?" for _ in links)
+        known = dict(self._connection.execute(
+            f"SELECT message_id, thread_id FROM thread_ids WHERE account = ? AND folder = ? "
+            f"AND message_id IN ({placeholders})",
+            (account, folder, *links),
+        ).fetchall())
+        threads = list(dict.fromkeys(known[link] for link in links if link in known))
+        thread_id = threads[0] if threads else links[0]
+        for merged in threads[1:]:
+            self._connection.execute(
+                "UPDATE thread_ids SET thread_id = ? WHERE account = ? AND folder = ? AND thread_id = ?",
+                (thread_id, account, folder, merged),
+            )
+        self._connection.executemany(
+            "INSERT OR IGNORE INTO thread_ids (account, folder, message_id, thread_id) VALUES (?, ?, ?, ?)",
+            [(account, folder, link, thread_id) for link in links if link not in known],
+        )
+        self._connection.execute(
+            "INSERT OR REPLACE INTO thread_messages (account, folder, uid, message_id) VALUES (?, ?, ?, ?)",
+            (account, folder, int(envelope.uid.value), links[-1]),
+        )
+
+    def _check_uid_validity(self, account: str, folder: str, uid_validity: int) -> None:
+        row = self._connection.execute(
+            "SELECT uid_validity FROM folders WHERE account = ? AND folder = ?", (account, folder)
+        ).fetchone()
+        if row is not None and row[0] == uid_validity:
+            return
+        self._connection.execute("DELETE FROM thread_ids WHERE account = ? AND folder = ?", (account, folder))
+        self._connection.execute("DELETE FROM thread_messages WHERE account = ? AND folder = ?", (account, folder))
+        self._connection.execute(
+            "INSERT OR REPLACE INTO folders (account, folder, uid_validity) VALUES (?, ?, ?)",
+            (account, folder, uid_validity),
+        )
@@ -0,0 +1,37 @@
+from typing import Optional
+from inbox_zero.shared.email_cache import account_key
+from inbox_zero.shared.email_reader import EmailReader, EmailUid, FolderDelta, FolderSyncState, ImapConfig
+from inbox_zero.shared.folder_sync import FolderSyncStateStore
+from inbox_zero.shared.imap_pool import ImapConnectionPool
+from inbox_zero.shared.thread_index import ThreadIndex
+from inbox_zero.sync_folder.port import FolderSynchronizerPort
+
+
+class FolderSynchronizerImap(FolderSynchronizerPort):
+    def __init__(
+        self,
+        store: FolderSyncStateStore,
+        pool: Optional[ImapConnectionPool] = None,
+        threads: Optional[ThreadIndex] = None,
+    ) -> None:
+        self._store = store
+        self._pool = pool
+        self._threads = threads
+
+    def sync(self, config: ImapConfig, folder: str) -> FolderDelta:
+        account = account_key(config)
+        email_reader = EmailReader.from_config(config, pool=self._pool)
+        state, delta = email_reader.sync_folder(folder=folder, previous=self._store.get(account, folder))
+        self._store.put(account, folder, state)
+        if self._threads is not None:
+            self._index_threads(email_reader, self._threads, account, folder, state)
+        return delta
+
+    def _index_threads(
+        self, email_reader: EmailReader, threads: ThreadIndex, account: str, folder: str, state: FolderSyncState
+    ) -> None:
+        current = set(state.uids)
+        indexed = threads.indexed_uids(account, folder, state.uid_validity)
+        threads.discard(account, folder, indexed - current)
+        missing = [EmailUid(str(uid)) for uid in sorted(current - indexed)]
+        threads.add(account, folder, state.uid_validity, email_reader.fetch_envelopes_by_uid(folder, missing))
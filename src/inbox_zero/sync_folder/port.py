@@ -0,0 +1,12 @@
+from abc import ABC, abstractmethod
+from inbox_zero.shared.email_reader import FolderDelta, ImapConfig
+from pyqure import Key
+
+
+class FolderSynchronizerPort(ABC):
+    @abstractmethod
+    def sync(self, config: ImapConfig, folder: str) -> FolderDelta:
+        pass
+
+
+FOLDER_SYNCHRONIZER_PORT_KEY: Key[FolderSynchronizerPort] = Key("folder_synchronizer_port", FolderSynchronizerPort)
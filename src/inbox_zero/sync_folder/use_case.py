@@ -0,0 +1,14 @@
+from inbox_zero.shared.email_reader import FolderDelta, ImapConfig
+from inbox_zero.sync_folder.port import FolderSynchronizerPort, FOLDER_SYNCHRONIZER_PORT_KEY
+from pyqure import pyqure, PyqureMemory
+
+
+class SyncFolderUseCase:
+    synchronizer: FolderSynchronizerPort
+
+    def __init__(self, dependencies: PyqureMemory) -> None:
+        (provide, inject) = pyqure(dependencies)
+        self.synchronizer = inject(FOLDER_SYNCHRONIZER_PORT_KEY)
+
+    def execute(self, config: ImapConfig, folder: str) -> FolderDelta:
+        return self.synchronizer.sync(config, folder)
@@ -0,0 +1,14 @@
+from inbox_zero.shared.email_reader import ImapConfig
+from inbox_zero.shared.local_mirror import LocalMirror, MirrorReport
+from inbox_zero.sync_mirror.port import MirrorSynchronizerPort
+
+
+class MirrorSynchronizerLocal(MirrorSynchronizerPort):
+    def __init__(self, mirror: LocalMirror) -> None:
+        self._mirror = mirror
+
+    def replay(self, config: ImapConfig) -> MirrorReport:
+        return self._mirror.replay(config)
+
+    def sync(self, config: ImapConfig, folder: str) -> MirrorReport:
+        return self._mirror.sync(config, folder)
@@ -0,0 +1,17 @@
+from abc import ABC, abstractmethod
+from inbox_zero.shared.email_reader import ImapConfig
+from inbox_zero.shared.local_mirror import MirrorReport
+from pyqure import Key
+
+
+class MirrorSynchronizerPort(ABC):
+    @abstractmethod
+    def replay(self, config: ImapConfig) -> MirrorReport:
+        pass
+
+    @abstractmethod
+    def sync(self, config: ImapConfig, folder: str) -> MirrorReport:
+        pass
+
+
+MIRROR_SYNCHRONIZER_PORT_KEY: Key[MirrorSynchronizerPort] = Key("mirror_synchronizer_port", MirrorSynchronizerPort)
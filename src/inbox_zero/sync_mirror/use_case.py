@@ -0,0 +1,25 @@
+from inbox_zero.shared.email_reader import ImapConfig
+from inbox_zero.shared.local_mirror import MirrorReport
+from inbox_zero.sync_mirror.port import MirrorSynchronizerPort, MIRROR_SYNCHRONIZER_PORT_KEY
+from pyqure import pyqure, PyqureMemory
+
+
+class SyncMirrorUseCase:
+    synchronizer: MirrorSynchronizerPort
+
+    def __init__(self, dependencies: PyqureMemory) -> None:
+        (provide, inject) = pyqure(dependencies)
+        self.synchronizer = inject(MIRROR_SYNCHRONIZER_PORT_KEY)
+
+    def execute(self, config: ImapConfig, folder: str = "INBOX") -> MirrorReport:
+        replayed = self.synchronizer.replay(config)
+        synced = self.synchronizer.sync(config, folder)
+        return MirrorReport(
+            added=synced.added,
+            removed=synced.removed,
+            replayed=replayed.replayed,
+            pending=replayed.pending,
+            discarded=replayed.discarded,
+            abandoned=replayed.abandoned,
+            full_resync=synced.full_resync,
+        )
@@ -0,0 +1,126 @@
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Set
+import pytest
+from pyqure import pyqure, PyqureMemory
+
+from inbox_zero.shared.archive_rules import ArchiveRule
+from inbox_zero.shared.email_reader import EmailEnvelope, EmailUid, ImapConfig
+from inbox_zero.shared.envelope_table import EnvelopeTable
+from inbox_zero.apply_archive_rules.port import RuleMailboxPort, RULE_MAILBOX_PORT_KEY
+from inbox_zero.apply_archive_rules.use_case import ApplyArchiveRulesUseCase
+
+
+NOW = datetime(2024, 3, 1, tzinfo=timezone.utc)
+
+
+class RuleMailboxForTest(RuleMailboxPort):
+    def __init__(self) -> None:
+        self._folders: Dict[str, List[EmailEnvelope]] = {}
+        self.batches = 0
+        self.moves = 0
+        self.locked: Set[EmailUid] = set()
+
+    def add_email(self, folder: str, uid: int, sender: str) -> None:
+        self._folders.setdefault(folder, []).append(EmailEnvelope(
+            uid=EmailUid(str(uid)),
+            subject=f"Email {uid}",
+            sender=sender,
+            date="2024-01-01T10:00:00+00:00",
+            size=100,
+            attachments=[],
+        ))
+
+    def get_emails_count(self, folder: str) -> int:
+        return len(self._folders.get(folder, []))
+
+    def get_envelope_batches(self, config: ImapConfig, folder: str, batch_size: int) -> Iterator[EnvelopeTable]:
+        emails = list(self._folders.get(folder, []))
+        for start in range(0, len(emails), batch_size):
+            self.batches += 1
+            yield EnvelopeTable.from_envelopes(emails[start:start + batch_size])
+
+    def move_many(
+        self, config: ImapConfig, folder: str, uids: List[EmailUid], destination: str
+    ) -> Dict[EmailUid, bool]:
+        self.moves += 1
+        outcomes = {uid: uid not in self.locked for uid in uids}
+        moved = [email for email in self._folders.get(folder, []) if outcomes.get(email.uid)]
+        self._folders[folder] = [email for email in self._folders.get(folder, []) if not outcomes.get(email.uid)]
+        self._folders.setdefault(destination, []).extend(moved)
+        return outcomes
+
+
+@pytest.fixture
+def dependencies() -> PyqureMemory:
+    memory: PyqureMemory = {}
+    return memory
+
+
+@pytest.fixture
+def mailbox(dependencies: PyqureMemory) -> RuleMailboxForTest:
+    (provide, inject) = pyqure(dependencies)
+    mailbox = RuleMailboxForTest()
+    provide(RULE_MAILBOX_PORT_KEY, mailbox)
+    return mailbox
+
+
+@pytest.fixture
+def config() -> ImapConfig:
+    return ImapConfig(
+        host="localhost",
+        port=993,
+        username="test@test.com",
+        password="password",
+        use_ssl=True
+    )
+
+
+RULES = [
+    ArchiveRule(name="shop", domains=("shop.com",)),
+    ArchiveRule(name="bank", senders=("alerts@bank.com",), destination="Banque"),
+]
+
+
+def test_process_a_large_backlog_in_one_pass(
+    dependencies: PyqureMemory, mailbox: RuleMailboxForTest, config: ImapConfig
+) -> None:
+    for uid in range(1, 50_001):
+        mailbox.add_email("INBOX", uid, ["news@shop.com", "alerts@bank.com", "friend@home.com"][uid % 3])
+
+    sut = ApplyArchiveRulesUseCase(dependencies)
+
+    report = sut.execute(config, "INBOX", RULES, batch_size=1000, now=NOW)
+
+    assert report.scanned == 50_000
+    assert report.matched == {"shop": 16_666, "bank": 16_667}
+    assert report.moved == {"Archive": 16_666, "Banque": 16_667}
+    assert mailbox.batches == 50
+    assert mailbox.moves == 2
+    assert mailbox.get_emails_count("INBOX") == 16_667
+
+
+def test_dry_run_moves_nothing(dependencies: PyqureMemory, mailbox: RuleMailboxForTest, config: ImapConfig) -> None:
+    mailbox.add_email("INBOX", 1, "news@shop.com")
+
+    sut = ApplyArchiveRulesUseCase(dependencies)
+
+    report = sut.execute(config, "INBOX", RULES, dry_run=True, now=NOW)
+
+    assert report.matched == {"shop": 1}
+    assert report.moved == {}
+    assert mailbox.get_emails_count("INBOX") == 1
+
+
+def test_report_emails_that_could_not_be_moved(
+    dependencies: PyqureMemory, mailbox: RuleMailboxForTest, config: ImapConfig
+) -> None:
+    mailbox.add_email("INBOX", 1, "news@shop.com")
+    mailbox.add_email("INBOX", 2, "news@shop.com")
+    mailbox.locked.add(EmailUid("2"))
+
+    sut = ApplyArchiveRulesUseCase(dependencies)
+
+    report = sut.execute(config, "INBOX", RULES, now=NOW)
+
+    assert report.moved == {"Archive": 1}
+    assert report.failed == [EmailUid("2")]
@@ -0,0 +1,110 @@
+from typing import Dict, List, Set
+import pytest
+from pyqure import pyqure, PyqureMemory
+
+from inbox_zero.shared.email_query import EmailQuery
+from inbox_zero.shared.email_reader import EmailEnvelope, EmailUid, ImapConfig
+from inbox_zero.query_emails.port import EmailSearchPort, EMAIL_SEARCH_PORT_KEY
+from inbox_zero.archive_many_emails.port import EmailBatchArchiverPort, EMAIL_BATCH_ARCHIVER_PORT_KEY
+from inbox_zero.archive_by_query.use_case import ArchiveByQueryUseCase
+
+
+class EmailSearchForTest(EmailSearchPort):
+    def __init__(self) -> None:
+        self._senders: Dict[EmailUid, str] = {}
+
+    def add_email(self, uid: EmailUid, sender: str) -> None:
+        self._senders[uid] = sender
+
+    def search(self, config: ImapConfig, folder: str, query: EmailQuery) -> List[EmailUid]:
+        return [uid for uid, sender in self._senders.items() if query.sender in sender]
+
+    def get_envelopes(self, config: ImapConfig, folder: str, uids: List[EmailUid]) -> List[EmailEnvelope]:
+        return []
+
+
+class EmailBatchArchiverForTest(EmailBatchArchiverPort):
+    def __init__(self) -> None:
+        self.archived: Set[EmailUid] = set()
+        self.missing: Set[EmailUid] = set()
+
+    def archive_many(self, config: ImapConfig, folder: str, uids: List[EmailUid]) -> Dict[EmailUid, bool]:
+        outcomes = {uid: uid not in self.missing for uid in uids}
+        self.archived.update(uid for uid, archived in outcomes.items() if archived)
+        return outcomes
+
+
+@pytest.fixture
+def dependencies() -> PyqureMemory:
+    memory: PyqureMemory = {}
+    return memory
+
+
+@pytest.fixture
+def search(dependencies: PyqureMemory) -> EmailSearchForTest:
+    (provide, inject) = pyqure(dependencies)
+    search = EmailSearchForTest()
+    provide(EMAIL_SEARCH_PORT_KEY, search)
+    return search
+
+
+@pytest.fixture
+def batch_archiver(dependencies: PyqureMemory) -> EmailBatchArchiverForTest:
+    (provide, inject) = pyqure(dependencies)
+    archiver = EmailBatchArchiverForTest()
+    provide(EMAIL_BATCH_ARCHIVER_PORT_KEY, archiver)
+    return archiver
+
+
+@pytest.fixture
+def config() -> ImapConfig:
+    return ImapConfig(host="localhost", port=993, username="test@test.com", password="password", use_ssl=True)
+
+
+def test_archive_emails_matching_query(
+    dependencies: PyqureMemory,
+    search: EmailSearchForTest,
+    batch_archiver: EmailBatchArchiverForTest,
+    config: ImapConfig,
+) -> None:
+    for uid in range(1, 1_001):
+        search.add_email(EmailUid(str(uid)), "news@shop.com" if uid % 2 else "friend@mail.com")
+    batch_archiver.missing.add(EmailUid("1"))
+
+    sut = ArchiveByQueryUseCase(dependencies)
+
+    report = sut.execute(config, "INBOX", EmailQuery(sender="shop.com"))
+
+    assert report.matched == 500
+    assert report.archived == 499
+    assert report.failed == [EmailUid("1")]
+    assert len(batch_archiver.archived) == 499
+
+
+def test_dry_run_does_not_archive(
+    dependencies: PyqureMemory,
+    search: EmailSearchForTest,
+    batch_archiver: EmailBatchArchiverForTest,
+    config: ImapConfig,
+) -> None:
+    search.add_email(EmailUid("1"), "news@shop.com")
+
+    sut = ArchiveByQueryUseCase(dependencies)
+
+    report = sut.execute(config, "INBOX", EmailQuery(sender="shop.com"), dry_run=True)
+
+    assert report.matched == 1
+    assert report.archived == 0
+    assert not batch_archiver.archived
+
+
+def test_refuse_empty_query(
+    dependencies: PyqureMemory,
+    search: EmailSearchForTest,
+    batch_archiver: EmailBatchArchiverForTest,
+    config: ImapConfig,
+) -> None:
+    sut = ArchiveByQueryUseCase(dependencies)
+
+    with pytest.raises(ValueError):
+        sut.execute(config, "INBOX", EmailQuery())
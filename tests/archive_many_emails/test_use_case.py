@@ -0,0 +1,96 @@
+from typing import Dict, List, Set
+import pytest
+from pyqure import pyqure, PyqureMemory
+
+from inbox_zero.shared.email_reader import EmailUid, ImapConfig
+from inbox_zero.archive_many_emails.port import EmailBatchArchiverPort, EMAIL_BATCH_ARCHIVER_PORT_KEY
+from inbox_zero.archive_many_emails.use_case import ArchiveManyEmailsUseCase
+
+
+class EmailBatchArchiverForTest(EmailBatchArchiverPort):
+    def __init__(self) -> None:
+        self._emails: Dict[str, Set[EmailUid]] = {}
+        self._archived: Set[EmailUid] = set()
+        self.calls = 0
+
+    def add_email(self, folder: str, uid: EmailUid) -> None:
+        self._emails.setdefault(folder, set()).add(uid)
+
+    def archive_many(self, config: ImapConfig, folder: str, uids: List[EmailUid]) -> Dict[EmailUid, bool]:
+        self.calls += 1
+        emails = self._emails.get(folder, set())
+        outcomes = {uid: uid in emails for uid in uids}
+        self._archived.update(uid for uid, archived in outcomes.items() if archived)
+        emails.difference_update(uids)
+        return outcomes
+
+    def get_emails_count(self, folder: str) -> int:
+        return len(self._emails.get(folder, set()))
+
+    def get_archived_count(self) -> int:
+        return len(self._archived)
+
+
+@pytest.fixture
+def dependencies() -> PyqureMemory:
+    memory: PyqureMemory = {}
+    return memory
+
+
+@pytest.fixture
+def batch_archiver(dependencies: PyqureMemory) -> EmailBatchArchiverForTest:
+    (provide, inject) = pyqure(dependencies)
+    archiver = EmailBatchArchiverForTest()
+    provide(EMAIL_BATCH_ARCHIVER_PORT_KEY, archiver)
+    return archiver
+
+
+@pytest.fixture
+def config() -> ImapConfig:
+    return ImapConfig(
+        host="localhost",
+        port=993,
+        username="test@test.com",
+        password="password",
+        use_ssl=True
+    )
+
+
+def test_archive_many_emails_in_one_call(
+    dependencies: PyqureMemory, batch_archiver: EmailBatchArchiverForTest, config: ImapConfig
+) -> None:
+    uids = [EmailUid(str(uid)) for uid in range(1, 10_001)]
+    for uid in uids:
+        batch_archiver.add_email("INBOX", uid)
+
+    sut = ArchiveManyEmailsUseCase(dependencies)
+
+    result = sut.execute(config, "INBOX", uids)
+
+    assert all(result.values())
+    assert len(result) == 10_000
+    assert batch_archiver.calls == 1
+    assert batch_archiver.get_emails_count("INBOX") == 0
+    assert batch_archiver.get_archived_count() == 10_000
+
+
+def test_report_missing_emails(
+    dependencies: PyqureMemory, batch_archiver: EmailBatchArchiverForTest, config: ImapConfig
+) -> None:
+    batch_archiver.add_email("INBOX", EmailUid("1"))
+
+    sut = ArchiveManyEmailsUseCase(dependencies)
+
+    result = sut.execute(config, "INBOX", [EmailUid("1"), EmailUid("2")])
+
+    assert result == {EmailUid("1"): True, EmailUid("2"): False}
+
+
+def test_archive_nothing_when_no_uids(
+    dependencies: PyqureMemory, batch_archiver: EmailBatchArchiverForTest, config: ImapConfig
+) -> None:
+    sut = ArchiveManyEmailsUseCase(dependencies)
+
+    result = sut.execute(config, "INBOX", [])
+
+    assert result == {}
@@ -0,0 +1,65 @@
+from typing import Dict, List
+import pytest
+from pyqure import pyqure, PyqureMemory
+
+from inbox_zero.archive_thread.port import ThreadMailboxPort, THREAD_MAILBOX_PORT_KEY
+from inbox_zero.archive_thread.use_case import ArchiveThreadUseCase, ThreadArchiveReport
+from inbox_zero.shared.email_reader import EmailUid, ImapConfig
+
+
+class ThreadMailboxForTest(ThreadMailboxPort):
+    def __init__(self) -> None:
+        self.threads: Dict[str, List[EmailUid]] = {"2": [EmailUid("1"), EmailUid("2"), EmailUid("4")]}
+        self.moves: List[List[EmailUid]] = []
+        self.locked = {EmailUid("4")}
+
+    def thread_of(self, config: ImapConfig, folder: str, uid: EmailUid) -> List[EmailUid]:
+        return self.threads.get(uid.value, [])
+
+    def move(self, config: ImapConfig, folder: str, uids: List[EmailUid], destination: str) -> Dict[EmailUid, bool]:
+        self.moves.append(uids)
+        return {uid: uid not in self.locked for uid in uids}
+
+
+@pytest.fixture
+def dependencies() -> PyqureMemory:
+    memory: PyqureMemory = {}
+    return memory
+
+
+@pytest.fixture
+def mailbox(dependencies: PyqureMemory) -> ThreadMailboxForTest:
+    (provide, inject) = pyqure(dependencies)
+    mailbox = ThreadMailboxForTest()
+    provide(THREAD_MAILBOX_PORT_KEY, mailbox)
+    return mailbox
+
+
+@pytest.fixture
+def config() -> ImapConfig:
+    return ImapConfig(
+        host="localhost",
+        port=993,
+        username="test@test.com",
+        password="password",
+    )
+
+
+def test_archive_every_message_of_the_thread_in_one_move(
+    dependencies: PyqureMemory, mailbox: ThreadMailboxForTest, config: ImapConfig
+) -> None:
+    report = ArchiveThreadUseCase(dependencies).execute(config, "INBOX", EmailUid("2"))
+
+    assert mailbox.moves == [[EmailUid("1"), EmailUid("2"), EmailUid("4")]]
+    assert report == ThreadArchiveReport(
+        thread=[EmailUid("1"), EmailUid("2"), EmailUid("4")], archived=[EmailUid("1"), EmailUid("2")]
+    )
+
+
+def test_archive_a_message_missing_from_the_index_alone(
+    dependencies: PyqureMemory, mailbox: ThreadMailboxForTest, config: ImapConfig
+) -> None:
+    report = ArchiveThreadUseCase(dependencies).execute(config, "INBOX", EmailUid("9"))
+
+    assert mailbox.moves == [[EmailUid("9")]]
+    assert report.archived == [EmailUid("9")]
@@ -1,5 +1,8 @@
+from cryptography.fernet import Fernet
+
+from inbox_zero.shared.account_store import AccountStore
 from inbox_zero.shared.email_reader import ImapConfig
-from inbox_zero.create_imap_account.adapter import ImapAccountRepositoryInMemory
+from inbox_zero.create_imap_account.adapter import ImapAccountRepositoryInMemory, ImapAccountRepositorySqlite
 
 
 def test_save_one_account() -> None:
@@ -69,3 +72,12 @@ def test_get_all_when_empty() -> None:
     result = sut.get_all()
 
     assert result == []
+
+
+def test_save_account_in_sqlite_store() -> None:
+    store = AccountStore(Fernet.generate_key())
+    sut = ImapAccountRepositorySqlite(store)
+
+    sut.save(ImapConfig(host="imap.gmail.com", port=993, username="user@gmail.com", password="password123"))
+
+    assert [account.username for account in store.get_all()] == ["user@gmail.com"]
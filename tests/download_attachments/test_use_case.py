@@ -0,0 +1,56 @@
+from pathlib import Path
+from typing import Dict, List
+import pytest
+from pyqure import pyqure, PyqureMemory
+
+from inbox_zero.shared.email_reader import ImapConfig
+from inbox_zero.download_attachments.port import AttachmentDownloaderPort, ATTACHMENT_DOWNLOADER_PORT_KEY
+from inbox_zero.download_attachments.use_case import DownloadAttachmentsUseCase
+
+
+class AttachmentDownloaderForTest(AttachmentDownloaderPort):
+    def __init__(self) -> None:
+        self._attachments: Dict[str, Dict[str, bytes]] = {}
+
+    def add_attachment(self, folder: str, filename: str, content: bytes) -> None:
+        self._attachments.setdefault(folder, {})[filename] = content
+
+    def download(self, config: ImapConfig, folder: str, directory: Path) -> List[Path]:
+        directory.mkdir(parents=True, exist_ok=True)
+        saved: List[Path] = []
+        for filename, content in self._attachments.get(folder, {}).items():
+            (directory / filename).write_bytes(content)
+            saved.append(directory / filename)
+        return saved
+
+
+@pytest.fixture
+def dependencies() -> PyqureMemory:
+    memory: PyqureMemory = {}
+    return memory
+
+
+@pytest.fixture
+def downloader(dependencies: PyqureMemory) -> AttachmentDownloaderForTest:
+    (provide, inject) = pyqure(dependencies)
+    downloader = AttachmentDownloaderForTest()
+    provide(ATTACHMENT_DOWNLOADER_PORT_KEY, downloader)
+    return downloader
+
+
+@pytest.fixture
+def config() -> ImapConfig:
+    return ImapConfig(host="localhost", port=993, username="test@test.com", password="password", use_ssl=True)
+
+
+def test_download_attachments_of_folder(
+    dependencies: PyqureMemory, downloader: AttachmentDownloaderForTest, config: ImapConfig, tmp_path: Path
+) -> None:
+    downloader.add_attachment("INBOX", "invoice.pdf", b"%PDF")
+    downloader.add_attachment("Archive", "old.pdf", b"%PDF")
+
+    sut = DownloadAttachmentsUseCase(dependencies)
+
+    saved = sut.execute(config, "INBOX", tmp_path)
+
+    assert saved == [tmp_path / "invoice.pdf"]
@@ -0,0 +1,132 @@
+from typing import List
+import pytest
+from pyqure import pyqure, PyqureMemory
+
+from inbox_zero.shared.email_reader import EmailEnvelope, EmailUid, ImapConfig
+from inbox_zero.list_emails.port import EmailListerPort, EMAIL_LISTER_PORT_KEY, FolderUidIndex
+from inbox_zero.list_emails.use_case import EmailCursor, ListEmailsUseCase
+
+
+class EmailListerForTest(EmailListerPort):
+    def __init__(self) -> None:
+        self.uid_validity = 1
+        self.uids: List[int] = []
+        self.fetched: List[List[EmailUid]] = []
+        self.seen: List[int] = []
+
+    def get_uid_index(self, config: ImapConfig, folder: str) -> FolderUidIndex:
+        return FolderUidIndex(uid_validity=self.uid_validity, uids=self.uids)
+
+    def get_envelopes(self, config: ImapConfig, folder: str, uids: List[EmailUid]) -> List[EmailEnvelope]:
+        self.fetched.append(uids)
+        return [
+            EmailEnvelope(
+                uid=uid,
+                subject=f"Email {uid.value}",
+                sender="sender@test.com",
+                date="",
+                size=100 * (int(uid.value) % 3),
+                attachments=[],
+                flags=("\\Seen",) if int(uid.value) in self.seen else (),
+            )
+            for uid in uids
+        ]
+
+
+@pytest.fixture
+def dependencies() -> PyqureMemory:
+    memory: PyqureMemory = {}
+    return memory
+
+
+@pytest.fixture
+def lister(dependencies: PyqureMemory) -> EmailListerForTest:
+    (provide, inject) = pyqure(dependencies)
+    lister = EmailListerForTest()
+    provide(EMAIL_LISTER_PORT_KEY, lister)
+    return lister
+
+
+@pytest.fixture
+def config() -> ImapConfig:
+    return ImapConfig(
+        host="localhost",
+        port=993,
+        username="test@test.com",
+        password="password",
+        use_ssl=True
+    )
+
+
+def uids_of(envelopes: List[EmailEnvelope]) -> List[int]:
+    return [int(envelope.uid.value) for envelope in envelopes]
+
+
+def test_walk_a_large_folder_page_by_page(
+    dependencies: PyqureMemory, lister: EmailListerForTest, config: ImapConfig
+) -> None:
+    lister.uids = list(range(1, 200_001))
+    sut = ListEmailsUseCase(dependencies)
+
+    first = sut.execute(config, "INBOX", limit=50)
+    second = sut.execute(config, "INBOX", first.next_cursor, limit=50)
+    last = sut.execute(config, "INBOX", EmailCursor(1, 199_990), limit=50)
+
+    assert uids_of(first.envelopes) == list(range(1, 51))
+    assert uids_of(second.envelopes) == list(range(51, 101))
+    assert second.position == 50
+    assert second.total == 200_000
+    assert uids_of(last.envelopes) == list(range(199_991, 200_001))
+    assert last.next_cursor is None
+    assert [len(uids) for uids in lister.fetched] == [50, 50, 10]
+
+
+def test_cursor_is_stable_when_emails_are_archived(
+    dependencies: PyqureMemory, lister: EmailListerForTest, config: ImapConfig
+) -> None:
+    lister.uids = list(range(1, 11))
+    sut = ListEmailsUseCase(dependencies)
+    first = sut.execute(config, "INBOX", limit=3)
+
+    lister.uids = [uid for uid in lister.uids if uid not in (2, 4, 5)]
+    second = sut.execute(config, "INBOX", first.next_cursor, limit=3)
+
+    assert uids_of(second.envelopes) == [6, 7, 8]
+
+
+def test_restart_when_uid_validity_changes(
+    dependencies: PyqureMemory, lister: EmailListerForTest, config: ImapConfig
+) -> None:
+    lister.uids = list(range(1, 11))
+    sut = ListEmailsUseCase(dependencies)
+    first = sut.execute(config, "INBOX", limit=3)
+
+    lister.uid_validity = 2
+    second = sut.execute(config, "INBOX", first.next_cursor, limit=3)
+
+    assert second.restarted
+    assert uids_of(second.envelopes) == [1, 2, 3]
+
+
+def test_empty_folder(dependencies: PyqureMemory, lister: EmailListerForTest, config: ImapConfig) -> None:
+    sut = ListEmailsUseCase(dependencies)
+
+    page = sut.execute(config, "INBOX")
+
+    assert page.envelopes == []
+    assert page.next_cursor is None
+    assert lister.fetched == []
+
+
+def test_order_a_page_and_count_unseen(
+    dependencies: PyqureMemory, lister: EmailListerForTest, config: ImapConfig
+) -> None:
+    lister.uids = list(range(1, 11))
+    lister.seen = [1, 2, 4]
+    sut = ListEmailsUseCase(dependencies)
+
+    page = sut.execute(config, "INBOX", limit=5, order="size", descending=True)
+
+    assert uids_of(page.envelopes) == [2, 5, 1, 4, 3]
+    assert page.unseen == 2
+    assert page.next_cursor == EmailCursor(1, 5)
@@ -1,5 +1,8 @@
+from cryptography.fernet import Fernet
+
+from inbox_zero.shared.account_store import AccountStore
 from inbox_zero.shared.email_reader import ImapConfig
-from inbox_zero.list_imap_accounts.adapter import ImapAccountReaderInMemory
+from inbox_zero.list_imap_accounts.adapter import ImapAccountReaderInMemory, ImapAccountReaderSqlite
 
 
 def test_get_all_when_empty() -> None:
@@ -65,3 +68,14 @@ def test_get_all_returns_copy() -> None:
     result.clear()
 
     assert len(sut.get_all()) == 1
+
+
+def test_get_account_by_id_from_sqlite_store() -> None:
+    store = AccountStore(Fernet.generate_key())
+    account_id = store.save(
+        ImapConfig(host="imap.gmail.com", port=993, username="user@gmail.com", password="password123")
+    )
+    sut = ImapAccountReaderSqlite(store)
+
+    assert sut.get_by_id(account_id) == sut.get_all()[0]
+    assert sut.get_by_id(account_id + 1) is None
@@ -1,3 +1,5 @@
+from typing import Optional
+
 import pytest
 from pyqure import pyqure, PyqureMemory
 
@@ -19,6 +21,9 @@ class ImapAccountReaderForTest(ImapAccountReaderPort):
     def get_all(self) -> list[ImapConfig]:
         return self._accounts.copy()
 
+    def get_by_id(self, account_id: int) -> Optional[ImapConfig]:
+        return self._accounts[account_id - 1] if 0 < account_id <= len(self._accounts) else None
+
 
 @pytest.fixture
 def dependencies() -> PyqureMemory:
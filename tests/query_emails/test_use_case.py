@@ -0,0 +1,107 @@
+from datetime import date
+from typing import Dict, List
+import pytest
+from pyqure import pyqure, PyqureMemory
+
+from inbox_zero.shared.email_query import EmailQuery
+from inbox_zero.shared.email_reader import EmailEnvelope, EmailUid, ImapConfig
+from inbox_zero.query_emails.port import EmailSearchPort, EMAIL_SEARCH_PORT_KEY
+from inbox_zero.query_emails.use_case import QueryEmailsUseCase
+
+
+class EmailSearchForTest(EmailSearchPort):
+    def __init__(self) -> None:
+        self._emails: Dict[str, List[EmailEnvelope]] = {}
+        self.fetched: List[EmailUid] = []
+
+    def add_email(self, folder: str, uid: str, sender: str, day: date) -> None:
+        self._emails.setdefault(folder, []).append(EmailEnvelope(
+            uid=EmailUid(uid),
+            subject=f"Email {uid}",
+            sender=sender,
+            date=day.isoformat(),
+            size=100,
+            attachments=[],
+        ))
+
+    def search(self, config: ImapConfig, folder: str, query: EmailQuery) -> List[EmailUid]:
+        return [
+            envelope.uid
+            for envelope in self._emails.get(folder, [])
+            if query.sender in envelope.sender
+            and (query.since is None or date.fromisoformat(envelope.date) >= query.since)
+        ]
+
+    def get_envelopes(self, config: ImapConfig, folder: str, uids: List[EmailUid]) -> List[EmailEnvelope]:
+        self.fetched.extend(uids)
+        return [envelope for envelope in self._emails.get(folder, []) if envelope.uid in uids]
+
+
+@pytest.fixture
+def dependencies() -> PyqureMemory:
+    memory: PyqureMemory = {}
+    return memory
+
+
+@pytest.fixture
+def search(dependencies: PyqureMemory) -> EmailSearchForTest:
+    (provide, inject) = pyqure(dependencies)
+    search = EmailSearchForTest()
+    provide(EMAIL_SEARCH_PORT_KEY, search)
+    return search
+
+
+@pytest.fixture
+def config() -> ImapConfig:
+    return ImapConfig(
+        host="localhost",
+        port=993,
+        username="test@test.com",
+        password="password",
+        use_ssl=True
+    )
+
+
+def test_return_only_matching_emails(
+    dependencies: PyqureMemory, search: EmailSearchForTest, config: ImapConfig
+) -> None:
+    search.add_email("INBOX", "1", "news@shop.com", date(2024, 1, 1))
+    search.add_email("INBOX", "2", "boss@work.com", date(2024, 1, 2))
+    search.add_email("INBOX", "3", "news@shop.com", date(2024, 2, 1))
+
+    sut = QueryEmailsUseCase(dependencies)
+
+    result = sut.execute(config, "INBOX", EmailQuery(sender="news@shop.com", since=date(2024, 1, 15)))
+
+    assert [envelope.uid for envelope in result.envelopes] == [EmailUid("3")]
+    assert result.total == 1
+
+
+def test_fetch_envelopes_of_the_requested_page_only(
+    dependencies: PyqureMemory, search: EmailSearchForTest, config: ImapConfig
+) -> None:
+    for uid in range(1, 26):
+        search.add_email("INBOX", str(uid), "news@shop.com", date(2024, 1, 1))
+
+    sut = QueryEmailsUseCase(dependencies)
+
+    first = sut.execute(config, "INBOX", EmailQuery(sender="shop.com"), page=0, page_size=10)
+    last = sut.execute(config, "INBOX", EmailQuery(sender="shop.com"), page=2, page_size=10)
+
+    assert [envelope.uid.value for envelope in first.envelopes] == [str(uid) for uid in range(1, 11)]
+    assert first.has_next
+    assert [envelope.uid.value for envelope in last.envelopes] == [str(uid) for uid in range(21, 26)]
+    assert not last.has_next
+    assert len(search.fetched) == 15
+
+
+def test_empty_page_when_nothing_matches(
+    dependencies: PyqureMemory, search: EmailSearchForTest, config: ImapConfig
+) -> None:
+    sut = QueryEmailsUseCase(dependencies)
+
+    result = sut.execute(config, "INBOX", EmailQuery(sender="nobody"))
+
+    assert result.envelopes == []
+    assert result.total == 0
+    assert search.fetched == []
@@ -0,0 +1,68 @@
+from typing import Dict
+import pytest
+from pyqure import pyqure, PyqureMemory
+
+from inbox_zero.shared.email_reader import EmailBody, EmailEnvelope, EmailUid, ImapConfig
+from inbox_zero.shared.imap_parser import BodyPart
+from inbox_zero.read_email_body.port import EmailBodyReaderPort, EMAIL_BODY_READER_PORT_KEY
+from inbox_zero.read_email_body.use_case import ReadEmailBodyUseCase
+
+
+class EmailBodyReaderForTest(EmailBodyReaderPort):
+    def __init__(self) -> None:
+        self._bodies: Dict[EmailUid, EmailBody] = {}
+        self.requested_sections: list[str] = []
+
+    def add_body(self, uid: EmailUid, body: EmailBody) -> None:
+        self._bodies[uid] = body
+
+    def get_body(self, config: ImapConfig, folder: str, envelope: EmailEnvelope) -> EmailBody:
+        self.requested_sections.extend(part.section for part in envelope.text_parts + envelope.html_parts)
+        return self._bodies.get(envelope.uid, EmailBody(text="", html=""))
+
+
+@pytest.fixture
+def dependencies() -> PyqureMemory:
+    memory: PyqureMemory = {}
+    return memory
+
+
+@pytest.fixture
+def body_reader(dependencies: PyqureMemory) -> EmailBodyReaderForTest:
+    (provide, inject) = pyqure(dependencies)
+    reader = EmailBodyReaderForTest()
+    provide(EMAIL_BODY_READER_PORT_KEY, reader)
+    return reader
+
+
+@pytest.fixture
+def config() -> ImapConfig:
+    return ImapConfig(
+        host="localhost",
+        port=993,
+        username="test@test.com",
+        password="password",
+        use_ssl=True
+    )
+
+
+def test_read_body_of_envelope(
+    dependencies: PyqureMemory, body_reader: EmailBodyReaderForTest, config: ImapConfig
+) -> None:
+    envelope = EmailEnvelope(
+        uid=EmailUid("1"),
+        subject="Test Subject",
+        sender="sender@test.com",
+        date="2024-01-09T10:00:00",
+        size=1200,
+        attachments=["report.pdf"],
+        text_parts=[BodyPart(section="1", content_type="text/plain", charset="utf-8", encoding="7bit", size=9)],
+    )
+    body_reader.add_body(EmailUid("1"), EmailBody(text="Test body", html=""))
+
+    sut = ReadEmailBodyUseCase(dependencies)
+
+    result = sut.execute(config, "INBOX", envelope)
+
+    assert result.text == "Test body"
+    assert body_reader.requested_sections == ["1"]
@@ -0,0 +1,80 @@
+from typing import Optional, Dict, List
+import pytest
+from pyqure import pyqure, PyqureMemory
+
+from inbox_zero.shared.email_reader import EmailEnvelope, EmailUid, ImapConfig
+from inbox_zero.read_first_envelope.port import EnvelopeReaderPort, ENVELOPE_READER_PORT_KEY
+from inbox_zero.read_first_envelope.use_case import ReadFirstEnvelopeUseCase
+
+
+class EnvelopeReaderForTest(EnvelopeReaderPort):
+    def __init__(self) -> None:
+        self._envelopes: Dict[str, List[EmailEnvelope]] = {}
+
+    def add_envelope(self, folder: str, envelope: EmailEnvelope) -> None:
+        if folder not in self._envelopes:
+            self._envelopes[folder] = []
+        self._envelopes[folder].append(envelope)
+
+    def get_first_envelope(self, config: ImapConfig, folder: str) -> Optional[EmailEnvelope]:
+        if folder not in self._envelopes or len(self._envelopes[folder]) == 0:
+            return None
+        return self._envelopes[folder][0]
+
+
+@pytest.fixture
+def dependencies() -> PyqureMemory:
+    memory: PyqureMemory = {}
+    return memory
+
+
+@pytest.fixture
+def envelope_reader(dependencies: PyqureMemory) -> EnvelopeReaderForTest:
+    (provide, inject) = pyqure(dependencies)
+    reader = EnvelopeReaderForTest()
+    provide(ENVELOPE_READER_PORT_KEY, reader)
+    return reader
+
+
+@pytest.fixture
+def config() -> ImapConfig:
+    return ImapConfig(
+        host="localhost",
+        port=993,
+        username="test@test.com",
+        password="password",
+        use_ssl=True
+    )
+
+
+def test_read_first_envelope_from_inbox(
+    dependencies: PyqureMemory, envelope_reader: EnvelopeReaderForTest, config: ImapConfig
+) -> None:
+    envelope = EmailEnvelope(
+        uid=EmailUid("1"),
+        subject="Test Subject",
+        sender="sender@test.com",
+        date="2024-01-09T10:00:00",
+        size=52_000_000,
+        attachments=["video.mp4"]
+    )
+    envelope_reader.add_envelope("INBOX", envelope)
+
+    sut = ReadFirstEnvelopeUseCase(dependencies)
+
+    result = sut.execute(config, "INBOX")
+
+    assert result is not None
+    assert result.subject == "Test Subject"
+    assert result.sender == "sender@test.com"
+    assert result.attachments == ["video.mp4"]
+
+
+def test_read_first_envelope_when_inbox_is_empty(
+    dependencies: PyqureMemory, envelope_reader: EnvelopeReaderForTest, config: ImapConfig
+) -> None:
+    sut = ReadFirstEnvelopeUseCase(dependencies)
+
+    result = sut.execute(config, "INBOX")
+
+    assert result is None
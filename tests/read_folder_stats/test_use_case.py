@@ -0,0 +1,50 @@
+from typing import Dict
+import pytest
+from pyqure import pyqure, PyqureMemory
+
+from inbox_zero.shared.email_reader import ImapConfig
+from inbox_zero.read_folder_stats.port import FolderStats, FolderStatsReaderPort, FOLDER_STATS_READER_PORT_KEY
+from inbox_zero.read_folder_stats.use_case import ReadFolderStatsUseCase
+
+
+class FolderStatsReaderForTest(FolderStatsReaderPort):
+    def __init__(self) -> None:
+        self._stats: Dict[str, FolderStats] = {}
+
+    def add_folder(self, folder: str, stats: FolderStats) -> None:
+        self._stats[folder] = stats
+
+    def get_stats(self, config: ImapConfig, folder: str) -> FolderStats:
+        return self._stats[folder]
+
+
+@pytest.fixture
+def dependencies() -> PyqureMemory:
+    memory: PyqureMemory = {}
+    return memory
+
+
+@pytest.fixture
+def reader(dependencies: PyqureMemory) -> FolderStatsReaderForTest:
+    (provide, inject) = pyqure(dependencies)
+    reader = FolderStatsReaderForTest()
+    provide(FOLDER_STATS_READER_PORT_KEY, reader)
+    return reader
+
+
+@pytest.fixture
+def config() -> ImapConfig:
+    return ImapConfig(host="localhost", port=993, username="test@test.com", password="password", use_ssl=True)
+
+
+def test_read_stats_of_each_folder(
+    dependencies: PyqureMemory, reader: FolderStatsReaderForTest, config: ImapConfig
+) -> None:
+    inbox = FolderStats(messages=120, unseen=4, uid_next=500, uid_validity=1)
+    archive = FolderStats(messages=9_000, unseen=0, uid_next=12_000, uid_validity=2)
+    reader.add_folder("INBOX", inbox)
+    reader.add_folder("Archive", archive)
+
+    sut = ReadFolderStatsUseCase(dependencies)
+
+    assert sut.execute(config, ["INBOX", "Archive"]) == {"INBOX": inbox, "Archive": archive}
@@ -0,0 +1,173 @@
+import time
+from typing import Optional, Dict, List
+import pytest
+from pyqure import pyqure, PyqureMemory
+
+from inbox_zero.shared.email_reader import EmailEnvelope, EmailUid, ImapConfig
+from inbox_zero.list_imap_accounts.port import ImapAccountReaderPort, IMAP_ACCOUNT_READER_PORT_KEY
+from inbox_zero.read_unified_inbox.port import AccountEnvelopesReaderPort, ACCOUNT_ENVELOPES_READER_PORT_KEY
+from inbox_zero.read_unified_inbox.use_case import ReadUnifiedInboxUseCase
+
+
+class ImapAccountReaderForTest(ImapAccountReaderPort):
+    def __init__(self) -> None:
+        self._accounts: list[ImapConfig] = []
+
+    def add_account(self, config: ImapConfig) -> None:
+        self._accounts.append(config)
+
+    def get_all(self) -> list[ImapConfig]:
+        return self._accounts.copy()
+
+    def get_by_id(self, account_id: int) -> Optional[ImapConfig]:
+        return self._accounts[account_id - 1] if 0 < account_id <= len(self._accounts) else None
+
+
+class AccountEnvelopesReaderForTest(AccountEnvelopesReaderPort):
+    def __init__(self) -> None:
+        self._envelopes: Dict[str, List[EmailEnvelope]] = {}
+        self._delays: Dict[str, float] = {}
+        self._errors: Dict[str, Exception] = {}
+        self.timeouts: List[float] = []
+
+    def add_email(self, config: ImapConfig, uid: str, date: str) -> None:
+        self._envelopes.setdefault(config.username, []).append(EmailEnvelope(
+            uid=EmailUid(uid),
+            subject=f"Email {uid}",
+            sender="sender@test.com",
+            date=date,
+            size=100,
+            attachments=[],
+        ))
+
+    def slow_down(self, config: ImapConfig, seconds: float) -> None:
+        self._delays[config.username] = seconds
+
+    def fail(self, config: ImapConfig, error: Exception) -> None:
+        self._errors[config.username] = error
+
+    def get_oldest_envelopes(self, config: ImapConfig, folder: str, limit: int, timeout: float) -> List[EmailEnvelope]:
+        self.timeouts.append(timeout)
+        time.sleep(self._delays.get(config.username, 0))
+        if config.username in self._errors:
+            raise self._errors[config.username]
+        return self._envelopes.get(config.username, [])[:limit]
+
+
+def account(username: str) -> ImapConfig:
+    return ImapConfig(host="localhost", port=993, username=username, password="password", use_ssl=True)
+
+
+@pytest.fixture
+def dependencies() -> PyqureMemory:
+    memory: PyqureMemory = {}
+    return memory
+
+
+@pytest.fixture
+def accounts(dependencies: PyqureMemory) -> ImapAccountReaderForTest:
+    (provide, inject) = pyqure(dependencies)
+    reader = ImapAccountReaderForTest()
+    provide(IMAP_ACCOUNT_READER_PORT_KEY, reader)
+    return reader
+
+
+@pytest.fixture
+def envelopes(dependencies: PyqureMemory) -> AccountEnvelopesReaderForTest:
+    (provide, inject) = pyqure(dependencies)
+    reader = AccountEnvelopesReaderForTest()
+    provide(ACCOUNT_ENVELOPES_READER_PORT_KEY, reader)
+    return reader
+
+
+def test_return_oldest_email_across_accounts(
+    dependencies: PyqureMemory, accounts: ImapAccountReaderForTest, envelopes: AccountEnvelopesReaderForTest
+) -> None:
+    work, home = account("work@test.com"), account("home@test.com")
+    accounts.add_account(work)
+    accounts.add_account(home)
+    envelopes.add_email(work, "1", "2024-01-09T10:00:00+00:00")
+    envelopes.add_email(home, "7", "2024-01-09T11:30:00+02:00")
+
+    sut = ReadUnifiedInboxUseCase(dependencies)
+
+    result = sut.execute("INBOX", limit=1)
+
+    assert result.first is not None
+    assert result.first.config == home
+    assert result.first.envelope.uid == EmailUid("7")
+
+
+def test_merge_emails_by_date(
+    dependencies: PyqureMemory, accounts: ImapAccountReaderForTest, envelopes: AccountEnvelopesReaderForTest
+) -> None:
+    work, home = account("work@test.com"), account("home@test.com")
+    accounts.add_account(work)
+    accounts.add_account(home)
+    envelopes.add_email(work, "1", "2024-01-01T10:00:00+00:00")
+    envelopes.add_email(work, "2", "2024-01-03T10:00:00+00:00")
+    envelopes.add_email(home, "1", "2024-01-02T10:00:00+00:00")
+    envelopes.add_email(home, "2", "")
+
+    sut = ReadUnifiedInboxUseCase(dependencies)
+
+    result = sut.execute("INBOX", limit=10)
+
+    assert [(item.config.username, item.envelope.uid.value) for item in result.envelopes] == [
+        ("work@test.com", "1"),
+        ("home@test.com", "1"),
+        ("work@test.com", "2"),
+        ("home@test.com", "2"),
+    ]
+
+
+def test_query_accounts_concurrently_and_skip_slow_ones(
+    dependencies: PyqureMemory, accounts: ImapAccountReaderForTest, envelopes: AccountEnvelopesReaderForTest
+) -> None:
+    for index in range(4):
+        config = account(f"user{index}@test.com")
+        accounts.add_account(config)
+        envelopes.add_email(config, "1", f"2024-01-0{index + 1}T10:00:00+00:00")
+        envelopes.slow_down(config, 0.1)
+    stuck = account("stuck@test.com")
+    accounts.add_account(stuck)
+    envelopes.add_email(stuck, "1", "2023-01-01T10:00:00+00:00")
+    envelopes.slow_down(stuck, 2)
+
+    sut = ReadUnifiedInboxUseCase(dependencies, max_workers=8, timeout=0.5)
+
+    started = time.monotonic()
+    result = sut.execute("INBOX", limit=1)
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 1
+    assert result.first is not None
+    assert result.first.config.username == "user0@test.com"
+    assert list(result.failures) == [stuck]
+    assert envelopes.timeouts == [0.5] * 5
+
+
+def test_report_failing_accounts(
+    dependencies: PyqureMemory, accounts: ImapAccountReaderForTest, envelopes: AccountEnvelopesReaderForTest
+) -> None:
+    work, broken = account("work@test.com"), account("broken@test.com")
+    accounts.add_account(work)
+    accounts.add_account(broken)
+    envelopes.add_email(work, "1", "2024-01-09T10:00:00+00:00")
+    envelopes.fail(broken, ConnectionRefusedError("connection refused"))
+
+    sut = ReadUnifiedInboxUseCase(dependencies)
+
+    result = sut.execute("INBOX", limit=1)
+
+    assert result.first is not None
+    assert result.first.config == work
+    assert result.failures == {broken: "connection refused"}
+
+
+def test_empty_when_no_account(
+    dependencies: PyqureMemory, accounts: ImapAccountReaderForTest, envelopes: AccountEnvelopesReaderForTest
+) -> None:
+    sut = ReadUnifiedInboxUseCase(dependencies)
+
+    assert sut.execute("INBOX").first is None
@@ -0,0 +1,79 @@
+from typing import List, Optional, Tuple
+import pytest
+from pyqure import pyqure, PyqureMemory
+
+from inbox_zero.shared.email_reader import EmailUid, ImapConfig
+from inbox_zero.shared.search_index import SearchHit
+from inbox_zero.search_emails.port import EmailIndexPort, EMAIL_INDEX_PORT_KEY
+from inbox_zero.search_emails.use_case import SearchEmailsUseCase
+
+
+class EmailIndexForTest(EmailIndexPort):
+    def __init__(self) -> None:
+        self._hits: List[SearchHit] = []
+        self.queries: List[Tuple[str, Optional[str], int]] = []
+
+    def add_hit(self, folder: str, uid: str, subject: str) -> None:
+        self._hits.append(SearchHit(folder, EmailUid(uid), subject, "sender@test.com", "2024-01-09T10:00:00", ""))
+
+    def search(self, config: ImapConfig, text: str, folder: Optional[str], limit: int) -> List[SearchHit]:
+        self.queries.append((text, folder, limit))
+        return [
+            hit for hit in self._hits
+            if text.lower() in hit.subject.lower() and (folder is None or hit.folder == folder)
+        ][:limit]
+
+
+@pytest.fixture
+def dependencies() -> PyqureMemory:
+    memory: PyqureMemory = {}
+    return memory
+
+
+@pytest.fixture
+def index(dependencies: PyqureMemory) -> EmailIndexForTest:
+    (provide, inject) = pyqure(dependencies)
+    index = EmailIndexForTest()
+    provide(EMAIL_INDEX_PORT_KEY, index)
+    return index
+
+
+@pytest.fixture
+def config() -> ImapConfig:
+    return ImapConfig(
+        host="localhost",
+        port=993,
+        username="test@test.com",
+        password="password",
+    )
+
+
+def test_search_every_folder_by_default(
+    dependencies: PyqureMemory, index: EmailIndexForTest, config: ImapConfig
+) -> None:
+    index.add_hit("INBOX", "1", "Facture EDF")
+    index.add_hit("Archive", "7", "Facture eau")
+    index.add_hit("INBOX", "2", "Réunion")
+
+    hits = SearchEmailsUseCase(dependencies).execute(config, "facture")
+
+    assert [(hit.folder, hit.uid) for hit in hits] == [("INBOX", EmailUid("1")), ("Archive", EmailUid("7"))]
+
+
+def test_restrict_search_to_a_folder(
+    dependencies: PyqureMemory, index: EmailIndexForTest, config: ImapConfig
+) -> None:
+    index.add_hit("INBOX", "1", "Facture EDF")
+    index.add_hit("Archive", "7", "Facture eau")
+
+    hits = SearchEmailsUseCase(dependencies).execute(config, "  facture ", folder="Archive", limit=10)
+
+    assert [hit.uid for hit in hits] == [EmailUid("7")]
+    assert index.queries == [("facture", "Archive", 10)]
+
+
+def test_skip_the_index_for_blank_text(
+    dependencies: PyqureMemory, index: EmailIndexForTest, config: ImapConfig
+) -> None:
+    assert SearchEmailsUseCase(dependencies).execute(config, "   ") == []
+    assert index.queries == []
@@ -0,0 +1,49 @@
+from pathlib import Path
+
+import pytest
+from cryptography.fernet import Fernet
+
+from inbox_zero.shared.account_store import AccountStore, AccountStoreError, load_or_create_key
+from inbox_zero.shared.email_reader import ImapConfig
+
+
+def test_persist_accounts_with_encrypted_password(tmp_path: Path) -> None:
+    key = load_or_create_key(tmp_path / "secret.key")
+    path = tmp_path / "accounts.sqlite3"
+    store = AccountStore(key, path)
+    account_id = store.save(ImapConfig(host="imap.gmail.com", port=993, username="user@gmail.com", password="s3cr3t"))
+    store.close()
+
+    assert b"s3cr3t" not in path.read_bytes()
+    reopened = AccountStore(load_or_create_key(tmp_path / "secret.key"), path)
+    assert reopened.get(account_id) == ImapConfig(
+        host="imap.gmail.com", port=993, username="user@gmail.com", password="s3cr3t"
+    )
+
+
+def test_update_account_with_same_host_and_username() -> None:
+    store = AccountStore(Fernet.generate_key())
+    first = store.save(ImapConfig(host="imap.gmail.com", port=993, username="user@gmail.com", password="old"))
+    second = store.save(ImapConfig(host="imap.gmail.com", port=993, username="user@gmail.com", password="new"))
+    other = store.save(ImapConfig(host="imap.outlook.com", port=993, username="user@gmail.com", password="other"))
+
+    assert first == second
+    assert other != first
+    assert [config.password for config in store.get_all()] == ["new", "other"]
+
+
+def test_refuse_to_open_with_another_key(tmp_path: Path) -> None:
+    path = tmp_path / "accounts.sqlite3"
+    store = AccountStore(Fernet.generate_key(), path)
+    store.save(ImapConfig(host="imap.gmail.com", port=993, username="user@gmail.com", password="s3cr3t"))
+    store.close()
+
+    with pytest.raises(AccountStoreError):
+        AccountStore(Fernet.generate_key(), path)
+
+
+def test_create_key_file_readable_only_by_owner(tmp_path: Path) -> None:
+    key = load_or_create_key(tmp_path / "keys" / "secret.key")
+
+    assert (tmp_path / "keys" / "secret.key").stat().st_mode & 0o777 == 0o600
+    assert load_or_create_key(tmp_path / "keys" / "secret.key") == key
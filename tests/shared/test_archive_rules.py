@@ -0,0 +1,98 @@
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pytest
+
+from inbox_zero.shared.archive_rules import ArchiveRule, CompiledRules, load_rules, rule_from_dict, sender_domains
+from inbox_zero.shared.email_reader import EmailEnvelope, EmailUid, parse_envelope
+from inbox_zero.shared.imap_parser import parse_values
+
+
+NOW = datetime(2024, 3, 1, tzinfo=timezone.utc)
+
+
+def envelope(
+    uid: str, sender: str, subject: str = "Hello", date: str = "2024-02-28T10:00:00+00:00", list_id: str = ""
+) -> EmailEnvelope:
+    return EmailEnvelope(
+        uid=EmailUid(uid), subject=subject, sender=sender, date=date, size=100, attachments=[], list_id=list_id
+    )
+
+
+def matching_rule(sut: CompiledRules, email: EmailEnvelope) -> Optional[str]:
+    rule = sut.match(email, NOW)
+    return rule.name if rule else None
+
+
+def test_list_parent_domains_of_sender() -> None:
+    assert sender_domains("news@mail.shop.com") == ["mail.shop.com", "shop.com"]
+    assert sender_domains("") == []
+
+
+def test_match_sender_domain_and_subdomains() -> None:
+    sut = CompiledRules([ArchiveRule(name="shop", domains=("shop.com",))])
+
+    assert matching_rule(sut, envelope("1", "news@shop.com")) == "shop"
+    assert matching_rule(sut, envelope("2", "news@mail.SHOP.com")) == "shop"
+    assert matching_rule(sut, envelope("3", "news@notshop.com")) is None
+
+
+def test_all_conditions_of_a_rule_must_match() -> None:
+    sut = CompiledRules([
+        ArchiveRule(
+            name="old promos", domains=("shop.com",), subject_patterns=(r"promo", r"\d+ ?%"), older_than_days=7
+        )
+    ])
+
+    assert matching_rule(sut, envelope("1", "a@shop.com", "-50% today", "2024-02-01T10:00:00+00:00")) == "old promos"
+    assert matching_rule(sut, envelope("2", "a@shop.com", "-50% today")) is None
+    assert matching_rule(sut, envelope("3", "a@shop.com", "Invoice", "2024-02-01T10:00:00+00:00")) is None
+    assert matching_rule(sut, envelope("4", "a@other.com", "PROMO", "2024-02-01T10:00:00+00:00")) is None
+
+
+def test_first_matching_rule_wins() -> None:
+    sut = CompiledRules([
+        ArchiveRule(name="newsletters", destination="Newsletters", list_ids=("<news.shop.com>",)),
+        ArchiveRule(name="everything old", older_than_days=7),
+    ])
+
+    matches = sut.evaluate([
+        envelope("1", "a@shop.com", list_id="news.shop.com", date="2024-01-01T10:00:00+00:00"),
+        envelope("2", "b@other.com", date="2024-01-01T10:00:00+00:00"),
+        envelope("3", "c@other.com"),
+    ], NOW)
+
+    assert matches.by_destination == {"Newsletters": [EmailUid("1")], "Archive": [EmailUid("2")]}
+    assert matches.by_rule == {"newsletters": 1, "everything old": 1}
+
+
+def test_never_age_out_mail_with_an_unparseable_date() -> None:
+    item = parse_values(
+        b'(UID 4 ENVELOPE ("not a date" "Hello" (("Shop" NIL "news" "shop.com")) NIL NIL NIL NIL NIL NIL NIL)'
+        b' BODYSTRUCTURE ("TEXT" "PLAIN" ("CHARSET" "utf-8") NIL NIL "7BIT" 10 1 NIL NIL NIL NIL))'
+    )[0]
+    assert isinstance(item, list)
+    undated = parse_envelope(dict(zip(map(str, item[::2]), item[1::2])))
+    sut = CompiledRules([ArchiveRule(name="everything old", older_than_days=7)])
+
+    assert undated.date == ""
+    assert matching_rule(sut, undated) is None
+
+
+def test_load_rules_from_json(tmp_path: Path) -> None:
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps([{"name": "shop", "domains": ["shop.com"], "destination": "Promotions"}]))
+
+    assert load_rules(path) == [ArchiveRule(name="shop", domains=("shop.com",), destination="Promotions")]
+
+
+@pytest.mark.parametrize("data", [
+    {"name": "shop", "domains": "shop.com"},
+    {"name": "shop", "senders": ["a@shop.com", 3]},
+    {"name": "old", "older_than_days": "7"},
+])
+def test_reject_malformed_rules(data: Dict[str, Any]) -> None:
+    with pytest.raises(ValueError, match="rule"):
+        rule_from_dict(data)
@@ -0,0 +1,225 @@
+import asyncio
+from typing import Dict, List
+import pytest
+
+from inbox_zero.shared.async_email_reader import AsyncEmailReader, AsyncEmailReaders, BackgroundEventLoop
+from inbox_zero.shared.async_imap import AsyncImapError, AsyncImapSessions
+from inbox_zero.shared.email_reader import EmailUid, ImapConfig
+from inbox_zero.shared.event_bus import MailboxEventKind
+from inbox_zero.archive_email.adapter import EmailArchiverAsync
+from inbox_zero.read_first_email.adapter import EmailReaderAsync
+
+
+MESSAGE = (
+    b'ENVELOPE ("Tue, 09 Jan 2024 10:00:00 +0000" "Hello" (("Sender" NIL "sender" "test.com")) '
+    b'NIL NIL NIL NIL NIL NIL "<1@test.com>") '
+    b'BODYSTRUCTURE ("text" "plain" ("charset" "utf-8") NIL NIL "7bit" 5 1) RFC822.SIZE 120'
+)
+
+RAW = b"From: sender@test.com\r\nSubject: Hello\r\n\r\nHello\r\n"
+
+
+class ImapServerForTest:
+    def __init__(self, capabilities: str = "IMAP4rev1 MOVE") -> None:
+        self.capabilities = capabilities
+        self.folders: Dict[str, List[int]] = {"INBOX": [1, 2, 3], "Archive": []}
+        self.logins = 0
+        self.commands: List[str] = []
+        self._server: asyncio.AbstractServer
+
+    async def start(self) -> int:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return int(self._server.sockets[0].getsockname()[1])
+
+    async def stop(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        selected = "INBOX"
+        writer.write(f"* OK [CAPABILITY {self.capabilities}] ready\r\n".encode())
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            tag, name, *args = line.decode().strip().split(" ")
+            self.commands.append(" ".join([name, *args[:1]]))
+            if name == "LOGIN":
+                self.logins += 1
+            elif name == "SELECT":
+                selected = args[0].strip('"')
+            elif name == "IDLE":
+                writer.write(b"+ idling\r\n* 4 EXISTS\r\n")
+                await writer.drain()
+                await reader.readline()
+            elif name == "UID" and args[0] == "SEARCH":
+                uids = self._uids(selected, args[-1] if args[1] == "UID" else "1:*")
+                writer.write(("* SEARCH " + " ".join(map(str, uids))).strip().encode() + b"\r\n")
+            elif name == "UID" and args[0] == "FETCH":
+                for index, uid in enumerate(self._uids(selected, args[1]), start=1):
+                    if "ENVELOPE" in line.decode():
+                        writer.write(f"* {index} FETCH (UID {uid} ".encode() + MESSAGE + b")\r\n")
+                    elif "BODY[]" in line.decode():
+                        writer.write(f"* {index} FETCH (UID {uid} BODY[] {{{len(RAW)}}}\r\n".encode() + RAW + b")\r\n")
+                    else:
+                        writer.write(f"* {index} FETCH (UID {uid} BODY[1] {{5}}\r\nHello)\r\n".encode())
+            elif name == "UID" and args[0] == "MOVE":
+                moved = self._uids(selected, args[1])
+                self.folders[selected] = [uid for uid in self.folders[selected] if uid not in moved]
+                self.folders[args[2].strip('"')].extend(moved)
+            elif name == "LOGOUT":
+                writer.write(f"* BYE\r\n{tag} OK bye\r\n".encode())
+                await writer.drain()
+                break
+            writer.write(f"{tag} OK done\r\n".encode())
+            await writer.drain()
+        writer.close()
+
+    def _uids(self, folder: str, uid_set: str) -> List[int]:
+        wanted: List[int] = []
+        for uid_range in uid_set.split(","):
+            low, _, high = uid_range.partition(":")
+            top = max(self.folders[folder], default=0) if high == "*" else int(high or low)
+            wanted.extend(range(int(low), top + 1))
+        return [uid for uid in self.folders[folder] if uid in wanted]
+
+
+def config(port: int, username: str = "test@test.com") -> ImapConfig:
+    return ImapConfig(host="127.0.0.1", port=port, username=username, password="password", use_ssl=False)
+
+
+def test_fetch_envelopes_and_body() -> None:
+    async def scenario() -> None:
+        server = ImapServerForTest()
+        sut = AsyncEmailReader(config(await server.start()))
+
+        envelopes = await sut.fetch_envelopes("INBOX", limit=2)
+        body = await sut.fetch_body(envelopes[0], "INBOX")
+        await server.stop()
+
+        assert [envelope.uid for envelope in envelopes] == [EmailUid("1"), EmailUid("2")]
+        assert envelopes[0].subject == "Hello"
+        assert envelopes[0].sender == "sender@test.com"
+        assert body.text == "Hello"
+
+    asyncio.run(scenario())
+
+
+def test_archive_many_with_move() -> None:
+    async def scenario() -> None:
+        server = ImapServerForTest()
+        sut = AsyncEmailReader(config(await server.start()))
+
+        result = await sut.archive_many("INBOX", [EmailUid("1"), EmailUid("3"), EmailUid("9")])
+        await server.stop()
+
+        assert result == {EmailUid("1"): True, EmailUid("3"): True, EmailUid("9"): False}
+        assert server.folders == {"INBOX": [2], "Archive": [1, 3]}
+
+    asyncio.run(scenario())
+
+
+def test_drive_many_accounts_concurrently_on_one_loop() -> None:
+    async def scenario() -> None:
+        server = ImapServerForTest()
+        port = await server.start()
+        sessions = AsyncImapSessions()
+        readers = [AsyncEmailReader(config(port, f"user{index}@test.com"), sessions) for index in range(50)]
+
+        results = await asyncio.gather(*(reader.fetch_uids("INBOX") for reader in readers))
+        again = await readers[0].fetch_uids("INBOX")
+        await sessions.close()
+        await server.stop()
+
+        assert all(uids == ["1", "2", "3"] for uids in results)
+        assert again == ["1", "2", "3"]
+        assert server.logins == 50
+
+    asyncio.run(scenario())
+
+
+def test_idle_yields_mailbox_events() -> None:
+    async def scenario() -> None:
+        server = ImapServerForTest()
+        sut = AsyncEmailReader(config(await server.start()))
+
+        events = sut.idle("INBOX", timeout=1)
+        event = await events.__anext__()
+        await events.aclose()
+        await server.stop()
+
+        assert event == (MailboxEventKind.EXISTS, "4")
+
+    asyncio.run(scenario())
+
+
+def test_run_coroutines_from_synchronous_code() -> None:
+    server = ImapServerForTest()
+    loop = BackgroundEventLoop()
+    readers = AsyncEmailReaders(loop)
+    port = loop.run(server.start())
+
+    uids = readers.run(readers.reader(config(port)).fetch_uids("INBOX"))
+    readers.close()
+    loop.run(server.stop())
+    loop.close()
+
+    assert uids == ["1", "2", "3"]
+
+
+def test_reuse_session_after_server_error() -> None:
+    async def scenario() -> None:
+        server = ImapServerForTest()
+        port = await server.start()
+        sessions = AsyncImapSessions()
+
+        with pytest.raises(AsyncImapError):
+            async with sessions.session(config(port), "INBOX"):
+                raise AsyncImapError("NO failed")
+        async with sessions.session(config(port), "INBOX") as client:
+            uids = await client.uid("SEARCH", "ALL")
+        await sessions.close()
+        await server.stop()
+
+        assert uids.ok
+        assert server.logins == 1
+
+    asyncio.run(scenario())
+
+
+def test_close_session_after_cancelled_command() -> None:
+    async def scenario() -> None:
+        server = ImapServerForTest()
+        port = await server.start()
+        sessions = AsyncImapSessions()
+
+        with pytest.raises(asyncio.CancelledError):
+            async with sessions.session(config(port), "INBOX"):
+                raise asyncio.CancelledError()
+        async with sessions.session(config(port), "INBOX") as client:
+            uids = await client.uid("SEARCH", "ALL")
+        await sessions.close()
+        await server.stop()
+
+        assert uids.ok
+        assert server.logins == 2
+
+    asyncio.run(scenario())
+
+
+def test_adapters_drive_the_async_reader_from_synchronous_code() -> None:
+    server = ImapServerForTest()
+    loop = BackgroundEventLoop()
+    readers = AsyncEmailReaders(loop)
+    port = loop.run(server.start())
+
+    email = EmailReaderAsync(readers).get_first_email(config(port), "INBOX")
+    archived = EmailArchiverAsync(readers).archive_email(config(port), "INBOX", EmailUid("1"))
+    readers.close()
+    loop.run(server.stop())
+    loop.close()
+
+    assert email is not None
+    assert email.uid == EmailUid("1")
+    assert archived
+    assert server.folders == {"INBOX": [2, 3], "Archive": [1]}
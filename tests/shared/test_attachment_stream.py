@@ -0,0 +1,131 @@
+import base64
+import quopri
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+import pytest
+
+from inbox_zero.shared.attachment_stream import AttachmentWriter, safe_filename, stream_decoder
+from inbox_zero.shared.email_reader import EmailReader, ImapConfig
+from inbox_zero.shared.imap_pool import ImapConnectionPool
+
+
+def decode_in_chunks(encoding: str, data: bytes, size: int) -> bytes:
+    decoder = stream_decoder(encoding)
+    decoded = b"".join(decoder.decode(data[index:index + size]) for index in range(0, len(data), size))
+    return decoded + decoder.flush()
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 76, 4096])
+def test_decode_base64_across_chunk_boundaries(size: int) -> None:
+    payload = bytes(range(256)) * 20
+
+    assert decode_in_chunks("base64", base64.encodebytes(payload), size) == payload
+
+
+@pytest.mark.parametrize("size", [1, 5, 80])
+def test_decode_quoted_printable_across_chunk_boundaries(size: int) -> None:
+    payload = "Déjà vu, été = ça !\n".encode("utf-8") * 30
+
+    assert decode_in_chunks("quoted-printable", quopri.encodestring(payload), size) == payload
+
+
+def test_keep_only_the_file_name() -> None:
+    assert safe_filename("../../etc/passwd", "fallback") == "passwd"
+    assert safe_filename("C:\\temp\\report.pdf", "fallback") == "report.pdf"
+    assert safe_filename("", "fallback") == "fallback"
+
+
+def test_deduplicate_identical_attachments(tmp_path: Path) -> None:
+    (tmp_path / "existing.txt").write_bytes(b"same content")
+    sut = AttachmentWriter(tmp_path)
+
+    first = sut.open("copy.txt", "7bit")
+    first.write(b"same content")
+    second = sut.open("other.txt", "7bit")
+    second.write(b"different")
+
+    assert first.close() == tmp_path / "existing.txt"
+    assert second.close() == tmp_path / "other.txt"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["existing.txt", "other.txt"]
+
+
+def test_rename_different_content_with_same_name(tmp_path: Path) -> None:
+    sut = AttachmentWriter(tmp_path)
+
+    first = sut.open("report.pdf", "7bit")
+    first.write(b"version 1")
+    second = sut.open("report.pdf", "7bit")
+    second.write(b"version 2")
+
+    assert first.close() == tmp_path / "report.pdf"
+    assert second.close() == tmp_path / "report (1).pdf"
+
+
+ATTACHMENT = b"Test file content" * 1000
+STRUCTURES = {
+    1: b'(("text" "plain" ("charset" "utf-8") NIL NIL "7bit" 5 1) '
+       b'("text" "plain" ("name" "test.txt") NIL NIL "base64" 23000 300) "mixed")',
+    2: b'("text" "plain" ("charset" "utf-8") NIL NIL "7bit" 5 1)',
+    3: b'(("text" "plain" ("charset" "utf-8") NIL NIL "7bit" 5 1) '
+       b'("text" "plain" ("name" "copy.txt") NIL NIL "base64" 23000 300) "mixed")',
+}
+PARTIAL_FETCH = re.compile(r"BODY\.PEEK\[(\S+)\]<(\d+)\.(\d+)>")
+
+
+class FakeClient:
+    def __init__(self) -> None:
+        self.fetches: List[str] = []
+        self.untagged_responses: Dict[str, List[Any]] = {}
+        self._completed: Dict[bytes, Tuple[str, List[Any]]] = {}
+        self._encoded = base64.encodebytes(ATTACHMENT)
+
+    def _command(self, name: str, command: str, uid_set: str, items: str) -> bytes:
+        typ, data = self.uid(command, uid_set, items)
+        tag = f"T{len(self.fetches)}".encode()
+        self.untagged_responses.setdefault("FETCH", []).extend(data)
+        self._completed[tag] = (typ, [b"FETCH completed"])
+        return tag
+
+    def _command_complete(self, name: str, tag: bytes) -> Tuple[str, List[Any]]:
+        return self._completed.pop(tag)
+
+    def uid(self, command: str, uid_set: str, items: str) -> Tuple[str, List[Any]]:
+        self.fetches.append(items)
+        if items == "(UID BODYSTRUCTURE)":
+            return "OK", [f"{uid} (UID {uid} BODYSTRUCTURE ".encode() + STRUCTURES[uid] + b")" for uid in STRUCTURES]
+        match = PARTIAL_FETCH.search(items)
+        assert match is not None
+        section, offset, length = match.group(1), int(match.group(2)), int(match.group(3))
+        chunk = self._encoded[offset:offset + length]
+        return "OK", [(f"1 (UID {uid_set} BODY[{section}]<{offset}> {{{len(chunk)}}}".encode(), chunk), b")"]
+
+
+class FakeFolderManager:
+    def set(self, folder: str) -> None:
+        pass
+
+
+class FakeMailbox:
+    def __init__(self) -> None:
+        self.client = FakeClient()
+        self.folder = FakeFolderManager()
+
+    def uids(self) -> List[str]:
+        return [str(uid) for uid in STRUCTURES]
+
+    def logout(self) -> None:
+        pass
+
+
+def test_stream_attachments_in_chunks(tmp_path: Path) -> None:
+    mailbox = FakeMailbox()
+    config = ImapConfig(host="localhost", port=993, username="test@test.com", password="password", use_ssl=True)
+    sut = EmailReader.from_config(config, pool=ImapConnectionPool(connect=lambda _: mailbox))
+
+    saved_files = sut.download_attachments(save_dir=str(tmp_path), chunk_size=4096)
+
+    assert saved_files == [tmp_path / "test.txt"]
+    assert saved_files[0].read_bytes() == ATTACHMENT
+    assert len([items for items in mailbox.client.fetches if "<0.4096>" in items]) == 2
+    assert not any("[1]" in items for items in mailbox.client.fetches)
@@ -0,0 +1,61 @@
+from typing import Any, Dict
+
+import pytest
+from pyqure import Key
+
+from inbox_zero.shared.container import Container, Lifetime, Scope
+from inbox_zero.shared.email_reader import EmailBody, EmailEnvelope, EmailUid, ImapConfig
+from inbox_zero.read_email_body.port import EmailBodyReaderPort, EMAIL_BODY_READER_PORT_KEY
+from inbox_zero.read_email_body.use_case import ReadEmailBodyUseCase
+
+SESSION_KEY: Key[Dict[str, int]] = Key("session_state", dict)
+REQUEST_KEY: Key[Dict[str, int]] = Key("request_state", dict)
+
+
+class EmailBodyReaderForTest(EmailBodyReaderPort):
+    def get_body(self, config: ImapConfig, folder: str, envelope: EmailEnvelope) -> EmailBody:
+        return EmailBody(text=f"Body of {envelope.uid.value}", html="")
+
+
+@pytest.fixture
+def sut() -> Container:
+    container = Container()
+    container.register(EMAIL_BODY_READER_PORT_KEY, lambda scope: EmailBodyReaderForTest())
+    return container
+
+
+def envelope(uid: str) -> EmailEnvelope:
+    return EmailEnvelope(uid=EmailUid(uid), subject="", sender="", date="", size=0, attachments=[])
+
+
+def test_keep_singletons_and_use_cases_across_reruns(sut: Container) -> None:
+    session: Dict[Any, Any] = {}
+
+    first = sut.scope(session).use_case(ReadEmailBodyUseCase)
+    second = sut.scope(session).use_case(ReadEmailBodyUseCase)
+    other_session = sut.scope({}).use_case(ReadEmailBodyUseCase)
+
+    assert first is second is other_session
+    assert first.execute(ImapConfig("host", 993, "user", "pass"), "INBOX", envelope("3")).text == "Body of 3"
+    assert (sut.builds["memory"], sut.builds["ReadEmailBodyUseCase"], sum(sut.builds.values())) == (1, 1, 3)
+
+
+def test_build_session_and_request_values_per_scope(sut: Container) -> None:
+    sut.register(SESSION_KEY, lambda scope: {"reader": id(scope.get(EMAIL_BODY_READER_PORT_KEY))}, Lifetime.SESSION)
+    sut.register(REQUEST_KEY, lambda scope: {}, Lifetime.REQUEST)
+    session: Dict[Any, Any] = {}
+    first, second, other = sut.scope(session), sut.scope(session), sut.scope({})
+
+    assert first.get(SESSION_KEY) is second.get(SESSION_KEY)
+    assert first.get(SESSION_KEY) is not other.get(SESSION_KEY)
+    assert first.get(SESSION_KEY) == other.get(SESSION_KEY)
+    assert first.get(REQUEST_KEY) is first.get(REQUEST_KEY)
+    assert first.get(REQUEST_KEY) is not second.get(REQUEST_KEY)
+    assert first.use_case(ReadEmailBodyUseCase) is not second.use_case(ReadEmailBodyUseCase)
+
+
+def test_reject_unregistered_keys(sut: Container) -> None:
+    scope: Scope = sut.scope({})
+
+    with pytest.raises(KeyError):
+        scope.get(SESSION_KEY)
@@ -0,0 +1,90 @@
+import json
+from dataclasses import asdict
+from pathlib import Path
+import pytest
+
+from inbox_zero.shared.email_cache import EmailCache, account_key
+from inbox_zero.shared.email_reader import EmailData, EmailUid, ImapConfig
+
+
+def email(uid: str, body: str = "Test body") -> EmailData:
+    return EmailData(
+        uid=EmailUid(uid),
+        subject=f"Email {uid}",
+        sender="sender@test.com",
+        date="2024-01-09T10:00:00",
+        body_text=body,
+        body_html=f"<p>{body}</p>",
+        attachments=["test.txt"]
+    )
+
+
+@pytest.fixture
+def sut(tmp_path: Path) -> EmailCache:
+    return EmailCache(tmp_path / "cache.sqlite3")
+
+
+def test_get_cached_email(sut: EmailCache) -> None:
+    sut.put("account", "INBOX", 1, email("1"))
+
+    result = sut.get("account", "INBOX", 1, EmailUid("1"))
+
+    assert result == email("1")
+
+
+def test_miss_unknown_email(sut: EmailCache) -> None:
+    sut.put("account", "INBOX", 1, email("1"))
+
+    assert sut.get("account", "INBOX", 1, EmailUid("2")) is None
+    assert sut.get("account", "SENT", 1, EmailUid("1")) is None
+    assert sut.get("other", "INBOX", 1, EmailUid("1")) is None
+
+
+def test_drop_folder_when_uid_validity_changes(sut: EmailCache) -> None:
+    sut.put("account", "INBOX", 1, email("1"))
+    sut.put("account", "INBOX", 1, email("2"))
+
+    assert sut.get("account", "INBOX", 2, EmailUid("1")) is None
+    assert sut.get("account", "INBOX", 1, EmailUid("2")) is None
+    assert sut.total_bytes == 0
+
+
+def test_evict_least_recently_used_emails(tmp_path: Path) -> None:
+    entry_size = len(json.dumps(asdict(email("1"))).encode("utf-8"))
+    sut = EmailCache(tmp_path / "cache.sqlite3", max_bytes=entry_size * 2)
+
+    sut.put("account", "INBOX", 1, email("1"))
+    sut.put("account", "INBOX", 1, email("2"))
+    sut.get("account", "INBOX", 1, EmailUid("1"))
+    sut.put("account", "INBOX", 1, email("3"))
+
+    assert sut.get("account", "INBOX", 1, EmailUid("1")) is not None
+    assert sut.get("account", "INBOX", 1, EmailUid("2")) is None
+    assert sut.get("account", "INBOX", 1, EmailUid("3")) is not None
+    assert sut.total_bytes == entry_size * 2
+
+
+def test_keep_emails_between_sessions(tmp_path: Path) -> None:
+    EmailCache(tmp_path / "cache.sqlite3").put("account", "INBOX", 1, email("1"))
+
+    sut = EmailCache(tmp_path / "cache.sqlite3")
+
+    assert sut.get("account", "INBOX", 1, EmailUid("1")) == email("1")
+
+
+def test_account_key_identifies_server_and_user() -> None:
+    config = ImapConfig(host="imap.gmail.com", port=993, username="user@gmail.com", password="secret")
+
+    assert account_key(config) == "user@gmail.com@imap.gmail.com:993"
+
+
+def test_discard_vanished_emails(sut: EmailCache) -> None:
+    sut.put("account", "INBOX", 1, email("1"))
+    sut.put("account", "INBOX", 1, email("2"))
+    size = sut.total_bytes
+
+    sut.discard("account", "INBOX", [1, 3])
+
+    assert sut.get("account", "INBOX", 1, EmailUid("1")) is None
+    assert sut.get("account", "INBOX", 1, EmailUid("2")) == email("2")
+    assert sut.total_bytes == size // 2
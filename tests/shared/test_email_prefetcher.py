@@ -0,0 +1,167 @@
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, List
+import pytest
+
+from inbox_zero.shared.email_reader import EmailBody, EmailEnvelope, EmailUid, ImapConfig
+from inbox_zero.shared.email_prefetcher import EmailPrefetcher, PrefetchedEmail
+
+
+class DeferredExecutor(Executor):
+    def __init__(self) -> None:
+        self.pending: List[Callable[[], Any]] = []
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future[Any]:
+        self.pending.append(lambda: fn(*args, **kwargs))
+        return Future()
+
+    def run_pending(self) -> None:
+        pending, self.pending = self.pending, []
+        for task in pending:
+            task()
+
+
+class ServerForTest:
+    def __init__(self) -> None:
+        self.uids: List[str] = []
+        self.loads = 0
+        self.during_load: List[Callable[[], None]] = []
+
+    def load(self, config: ImapConfig, folder: str, limit: int) -> List[PrefetchedEmail]:
+        self.loads += 1
+        if self.during_load:
+            self.during_load.pop(0)()
+            return []
+        return [prefetched(uid) for uid in self.uids[:limit]]
+
+
+def prefetched(uid: str) -> PrefetchedEmail:
+    envelope = EmailEnvelope(
+        uid=EmailUid(uid),
+        subject=f"Email {uid}",
+        sender="sender@test.com",
+        date="2024-01-09T10:00:00",
+        size=100,
+        attachments=[]
+    )
+    return PrefetchedEmail(envelope, EmailBody(text=f"Body {uid}", html=""))
+
+
+@pytest.fixture
+def config() -> ImapConfig:
+    return ImapConfig(
+        host="localhost",
+        port=993,
+        username="test@test.com",
+        password="password",
+        use_ssl=True
+    )
+
+
+@pytest.fixture
+def server() -> ServerForTest:
+    return ServerForTest()
+
+
+@pytest.fixture
+def executor() -> DeferredExecutor:
+    return DeferredExecutor()
+
+
+@pytest.fixture
+def sut(server: ServerForTest, executor: DeferredExecutor) -> EmailPrefetcher:
+    return EmailPrefetcher(server.load, depth=3, executor=executor)
+
+
+def test_load_next_emails_on_first_read(sut: EmailPrefetcher, server: ServerForTest, config: ImapConfig) -> None:
+    server.uids = ["1", "2", "3", "4"]
+
+    result = sut.first(config, "INBOX")
+
+    assert result is not None
+    assert result.envelope.uid == EmailUid("1")
+    assert sut.queue_depth(config, "INBOX") == 3
+    assert sut.metrics.misses == 1
+
+
+def test_serve_next_email_from_memory_after_archive(
+    sut: EmailPrefetcher, server: ServerForTest, executor: DeferredExecutor, config: ImapConfig
+) -> None:
+    server.uids = ["1", "2", "3", "4"]
+    sut.first(config, "INBOX")
+
+    server.uids.remove("1")
+    sut.discard(config, "INBOX", EmailUid("1"))
+    result = sut.first(config, "INBOX")
+
+    assert result is not None
+    assert result.envelope.uid == EmailUid("2")
+    assert server.loads == 1
+    assert sut.metrics.hits == 1
+
+    executor.run_pending()
+
+    assert sut.queue_depth(config, "INBOX") == 3
+    assert server.loads == 2
+
+
+def test_drop_archived_email_returned_by_stale_refill(
+    sut: EmailPrefetcher, server: ServerForTest, executor: DeferredExecutor, config: ImapConfig
+) -> None:
+    server.uids = ["1", "2", "3", "4"]
+    sut.first(config, "INBOX")
+
+    sut.discard(config, "INBOX", EmailUid("1"))
+    executor.run_pending()
+
+    result = sut.first(config, "INBOX")
+    assert result is not None
+    assert result.envelope.uid == EmailUid("2")
+
+
+def test_find_prefetched_body(sut: EmailPrefetcher, server: ServerForTest, config: ImapConfig) -> None:
+    server.uids = ["1", "2"]
+    sut.first(config, "INBOX")
+
+    result = sut.find(config, "INBOX", EmailUid("2"))
+
+    assert result is not None
+    assert result.body.text == "Body 2"
+
+
+def test_reload_after_invalidate(sut: EmailPrefetcher, server: ServerForTest, config: ImapConfig) -> None:
+    server.uids = ["1"]
+    sut.first(config, "INBOX")
+
+    server.uids = ["0", "1"]
+    sut.invalidate(config, "INBOX")
+    result = sut.first(config, "INBOX")
+
+    assert result is not None
+    assert result.envelope.uid == EmailUid("0")
+
+
+def test_return_none_when_folder_is_empty(sut: EmailPrefetcher, config: ImapConfig) -> None:
+    assert sut.first(config, "INBOX") is None
+
+
+def test_reload_when_invalidated_during_the_first_load(
+    sut: EmailPrefetcher, server: ServerForTest, config: ImapConfig
+) -> None:
+    server.uids = ["1", "2"]
+    server.during_load.append(lambda: sut.invalidate(config, "INBOX"))
+
+    result = sut.first(config, "INBOX")
+
+    assert result is not None
+    assert result.envelope.uid == EmailUid("1")
+    assert server.loads == 2
+    assert sut.metrics.misses == 1
+
+
+def test_recognize_expunges_caused_by_our_own_archives(sut: EmailPrefetcher, config: ImapConfig) -> None:
+    sut.discard(config, "INBOX", EmailUid("1"))
+    sut.discard(config, "INBOX", EmailUid("1"))
+
+    assert sut.expunged(config, "INBOX")
+    assert not sut.expunged(config, "INBOX")
+    assert not sut.expunged(config, "Archive")
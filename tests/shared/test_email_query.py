@@ -0,0 +1,100 @@
+from datetime import date
+from typing import Any, Dict, List, Tuple
+import pytest
+
+from inbox_zero.shared.email_query import EmailQuery, compile_gmail_raw, compile_search
+from inbox_zero.shared.email_reader import EmailReader, EmailUid, ImapConfig
+from inbox_zero.shared.imap_pool import ImapConnectionPool
+
+
+def test_compile_empty_query_to_all() -> None:
+    assert compile_search(EmailQuery()) == ["ALL"]
+
+
+def test_compile_search_criteria() -> None:
+    query = EmailQuery(
+        sender="news@shop.com",
+        subject='Soldes "hiver"',
+        since=date(2024, 1, 5),
+        before=date(2024, 2, 1),
+        larger_than=1000,
+        seen=False,
+        flagged=True,
+        has_attachment=True,
+    )
+
+    assert compile_search(query) == [
+        "FROM", '"news@shop.com"', "SUBJECT", '"Soldes \\"hiver\\""', "SINCE", "05-Jan-2024", "BEFORE", "01-Feb-2024",
+        "LARGER", "1000", "UNSEEN", "FLAGGED",
+    ]
+
+
+def test_compile_non_ascii_values_to_literals() -> None:
+    assert compile_search(EmailQuery(sender="élise@test.com", subject="Réunion")) == [
+        "FROM", "élise@test.com".encode("utf-8"), "SUBJECT", "Réunion".encode("utf-8")
+    ]
+
+
+def test_compile_gmail_raw_query() -> None:
+    query = EmailQuery(sender="news@shop.com", since=date(2024, 1, 5), seen=False, has_attachment=True)
+
+    assert compile_gmail_raw(query) == "from:(news@shop.com) after:2024/01/05 is:unread has:attachment"
+
+
+class FakeClient:
+    def __init__(self, capabilities: Tuple[str, ...]) -> None:
+        self.capabilities = capabilities
+        self.untagged_responses: Dict[str, List[bytes]] = {}
+        self.searches: List[Tuple[Any, ...]] = []
+        self.literal: Any = None
+
+    def uid(self, command: str, *args: Any) -> Tuple[str, List[Any]]:
+        self.searches.append(args)
+        if "RETURN" in args:
+            self.untagged_responses["ESEARCH"] = [b'(TAG "A4") UID ALL 3:4,9']
+            return "OK", [None]
+        return "OK", [b"9 3 4"]
+
+
+class FakeFolderManager:
+    def set(self, folder: str) -> None:
+        pass
+
+
+class FakeMailbox:
+    def __init__(self, client: FakeClient) -> None:
+        self.client = client
+        self.folder = FakeFolderManager()
+
+    def logout(self) -> None:
+        pass
+
+
+def reader(client: FakeClient) -> EmailReader:
+    mailbox = FakeMailbox(client)
+    config = ImapConfig(host="localhost", port=993, username="test@test.com", password="password", use_ssl=True)
+    return EmailReader.from_config(config, pool=ImapConnectionPool(connect=lambda _: mailbox))
+
+
+@pytest.mark.parametrize("capabilities", [("IMAP4REV1",), ("IMAP4REV1", "ESEARCH")])
+def test_search_returns_sorted_uids(capabilities: Tuple[str, ...]) -> None:
+    sut = reader(FakeClient(capabilities))
+
+    assert sut.search("INBOX", EmailQuery(seen=False)) == [EmailUid("3"), EmailUid("4"), EmailUid("9")]
+
+
+def test_search_gmail_with_raw_query() -> None:
+    client = FakeClient(("IMAP4REV1", "X-GM-EXT-1"))
+
+    reader(client).search("INBOX", EmailQuery(seen=False))
+
+    assert client.searches == [("CHARSET", "UTF-8", "X-GM-RAW", '"is:unread"')]
+
+
+def test_send_non_ascii_gmail_query_as_a_literal() -> None:
+    client = FakeClient(("IMAP4REV1", "X-GM-EXT-1"))
+
+    reader(client).search("INBOX", EmailQuery(subject="été"))
+
+    assert client.searches == [("CHARSET", "UTF-8", "X-GM-RAW", "{15}")]
+    assert client.literal(b"") == "subject:(été)".encode("utf-8")
@@ -164,3 +164,47 @@ def test_download_attachments(greenmail, tmp_path):
     assert len(saved_files) == 1
     assert saved_files[0].name == "test.txt"
     assert saved_files[0].read_bytes() == b"Test file content"
+
+
+def test_fetch_envelopes_without_bodies(greenmail):
+    smtp_port = greenmail.get_exposed_port(3025)
+    imap_port = greenmail.get_exposed_port(3143)
+
+    send_test_email_with_attachment(smtp_port)
+
+    reader = EmailReader(
+        host="localhost",
+        port=imap_port,
+        username="test@test.com",
+        password="test",
+        use_ssl=False
+    )
+
+    envelopes = reader.fetch_envelopes()
+
+    assert len(envelopes) == 1
+    assert envelopes[0].subject == "Email with Attachment"
+    assert envelopes[0].sender == "sender@test.com"
+    assert envelopes[0].attachments == ["test.txt"]
+    assert envelopes[0].size > 0
+
+
+def test_fetch_body_of_envelope(greenmail):
+    smtp_port = greenmail.get_exposed_port(3025)
+    imap_port = greenmail.get_exposed_port(3143)
+
+    send_test_email_with_attachment(smtp_port)
+
+    reader = EmailReader(
+        host="localhost",
+        port=imap_port,
+        username="test@test.com",
+        password="test",
+        use_ssl=False
+    )
+
+    envelope = reader.fetch_envelopes()[0]
+    body = reader.fetch_body(envelope)
+
+    assert "Email with attachment" in body.text
+    assert body.html == ""
@@ -0,0 +1,73 @@
+from typing import Tuple
+
+import pytest
+
+from inbox_zero.shared.email_reader import EmailEnvelope, EmailUid
+from inbox_zero.shared.envelope_table import NO_DATE, EnvelopeFlag, EnvelopeTable, epoch_seconds
+
+
+def envelope(
+    uid: int, sender: str, date: str = "2024-02-28T10:00:00+00:00", subject: str = "Hello", flags: Tuple[str, ...] = ()
+) -> EmailEnvelope:
+    return EmailEnvelope(
+        uid=EmailUid(str(uid)), subject=subject, sender=sender, date=date, size=100 * uid, attachments=[], flags=flags
+    )
+
+
+@pytest.fixture
+def sut() -> EnvelopeTable:
+    return EnvelopeTable.from_envelopes([
+        envelope(3, "news@shop.com", "2024-01-10T08:00:00+00:00", "Soldes d'été", ("\\Seen",)),
+        envelope(5, "alice@test.com", "2024-02-01T08:00:00", "Réunion", ("\\Flagged", "$Label1")),
+        envelope(8, "news@shop.com", "", "Nouveautés"),
+    ])
+
+
+def test_convert_dates_to_epoch_seconds() -> None:
+    assert epoch_seconds("1970-01-02T00:00:00+00:00") == 86400
+    assert epoch_seconds("1970-01-02T01:00:00+01:00") == 86400
+    assert epoch_seconds("") == NO_DATE
+
+
+def test_intern_senders_and_round_trip_envelopes(sut: EnvelopeTable) -> None:
+    restored = sut.envelope(1)
+
+    assert len(sut) == 3 and len(sut.sender_names) == 2
+    assert (restored.uid, restored.sender, restored.subject) == (EmailUid("5"), "alice@test.com", "Réunion")
+    assert restored.size == 500
+    assert restored.date == "2024-02-01T08:00:00+00:00"
+    assert restored.flags == ("\\Flagged",)
+    assert sut.envelope(2).date == ""
+
+
+def test_select_rows_by_sender_date_and_flags(sut: EnvelopeTable) -> None:
+    shop = sut.sender_names.ids(lambda sender: sender.endswith("@shop.com"))
+
+    assert list(sut.select(senders=shop)) == [0, 2]
+    assert list(sut.select(before=epoch_seconds("2024-01-31T00:00:00+00:00"))) == [0]
+    assert list(sut.select(without_flags=EnvelopeFlag.SEEN)) == [1, 2]
+    assert list(sut.select(senders=shop, with_flags=EnvelopeFlag.SEEN)) == [0]
+
+
+def test_order_rows_by_column(sut: EnvelopeTable) -> None:
+    assert sut.order(by="date", descending=True) == [1, 0, 2]
+    assert sut.order(by="subject") == [2, 1, 0]
+    with pytest.raises(ValueError):
+        sut.order(by="body")
+
+
+def test_discard_uids_and_keep_subjects_aligned(sut: EnvelopeTable) -> None:
+    sut.discard({3})
+
+    assert list(sut.uids) == [5, 8]
+    assert [sut.subject(row) for row in range(len(sut))] == ["Réunion", "Nouveautés"]
+
+
+def test_stay_compact_for_large_mailboxes() -> None:
+    sut = EnvelopeTable.from_envelopes(
+        envelope(uid, f"sender{uid % 500}@domain{uid % 50}.com", subject=f"Newsletter {uid % 1000}")
+        for uid in range(1, 50_001)
+    )
+
+    assert len(sut) == 50_000
+    assert sut.nbytes < 50 * len(sut)
@@ -0,0 +1,177 @@
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import pytest
+
+from inbox_zero.shared.email_reader import EmailReader, EmailUid, FolderSyncState, ImapConfig
+from inbox_zero.shared.folder_sync import FolderSyncStateStore
+from inbox_zero.shared.imap_pool import ImapConnectionPool
+
+
+class FakeClient:
+    def __init__(self, capabilities: Tuple[str, ...]) -> None:
+        self.capabilities = capabilities
+        self.untagged_responses: Dict[str, List[bytes]] = {}
+        self.uid_validity = 1
+        self.modseq = 10
+        self.emails: Dict[int, Tuple[int, Tuple[str, ...]]] = {}
+        self.uid_next = 1
+        self.commands: List[str] = []
+
+    def add(self, flags: Tuple[str, ...] = ()) -> None:
+        self.modseq += 1
+        self.emails[self.uid_next] = (self.modseq, flags)
+        self.uid_next += 1
+
+    def flag(self, uid: int, flags: Tuple[str, ...]) -> None:
+        self.modseq += 1
+        self.emails[uid] = (self.modseq, flags)
+
+    def expunge(self, uid: int) -> None:
+        self.modseq += 1
+        del self.emails[uid]
+
+    def _simple_command(self, name: str, *args: str) -> Tuple[str, List[bytes]]:
+        self.commands.append(name)
+        status = (
+            f"INBOX (UIDVALIDITY {self.uid_validity} UIDNEXT {self.uid_next} "
+            f"MESSAGES {len(self.emails)} HIGHESTMODSEQ {self.modseq})"
+        )
+        self.untagged_responses["STATUS"] = [status.encode()]
+        return "OK", [b"STATUS completed"]
+
+    def _untagged_response(self, typ: str, data: List[bytes], name: str) -> Tuple[str, List[bytes]]:
+        return typ, self.untagged_responses.pop(name, [])
+
+    def uid(self, command: str, *args: str) -> Tuple[str, List[Any]]:
+        self.commands.append(f"UID {command}")
+        if command == "SEARCH":
+            low = int(args[1].split(":")[0])
+            return "OK", [" ".join(str(uid) for uid in sorted(self.emails) if uid >= low).encode()]
+        modseq = int(args[2].strip("()").split()[1])
+        lines = [
+            f"{index} (UID {uid} FLAGS ({' '.join(flags)}) MODSEQ ({changed}))".encode()
+            for index, (uid, (changed, flags)) in enumerate(sorted(self.emails.items()), start=1)
+            if changed > modseq
+        ]
+        return "OK", lines
+
+
+class FakeFolderManager:
+    def set(self, folder: str) -> None:
+        pass
+
+
+class FakeMailbox:
+    def __init__(self, client: FakeClient) -> None:
+        self.client = client
+        self.folder = FakeFolderManager()
+
+    def uids(self) -> List[str]:
+        self.client.commands.append("UID SEARCH ALL")
+        return [str(uid) for uid in sorted(self.client.emails)]
+
+    def logout(self) -> None:
+        pass
+
+
+@pytest.fixture
+def config() -> ImapConfig:
+    return ImapConfig(
+        host="localhost",
+        port=993,
+        username="test@test.com",
+        password="password",
+        use_ssl=True
+    )
+
+
+def reader(config: ImapConfig, client: FakeClient) -> EmailReader:
+    mailbox = FakeMailbox(client)
+    return EmailReader.from_config(config, pool=ImapConnectionPool(connect=lambda _: mailbox))
+
+
+def sync(email_reader: EmailReader, previous: Optional[FolderSyncState]) -> Any:
+    return email_reader.sync_folder("INBOX", previous)
+
+
+def test_store_round_trip(tmp_path: Path) -> None:
+    sut = FolderSyncStateStore(tmp_path / "sync.sqlite3")
+    state = FolderSyncState(uid_validity=1, uid_next=5, highest_modseq=42, messages=3, uids=(1, 2, 4))
+
+    sut.put("account", "INBOX", state)
+
+    assert sut.get("account", "INBOX") == state
+    assert sut.get("account", "SENT") is None
+
+
+def test_first_sync_lists_all_uids(config: ImapConfig) -> None:
+    client = FakeClient(("IMAP4REV1", "CONDSTORE"))
+    client.add()
+    client.add()
+
+    state, delta = sync(reader(config, client), None)
+
+    assert delta.full_resync
+    assert delta.added == [EmailUid("1"), EmailUid("2")]
+    assert state.uids == (1, 2)
+
+
+def test_unchanged_folder_costs_one_status(config: ImapConfig) -> None:
+    client = FakeClient(("IMAP4REV1", "CONDSTORE"))
+    client.add()
+    email_reader = reader(config, client)
+    state, _ = sync(email_reader, None)
+    client.commands.clear()
+
+    _, delta = sync(email_reader, state)
+
+    assert delta.is_empty
+    assert client.commands == ["STATUS"]
+
+
+def test_condstore_returns_changed_flags_and_new_uids(config: ImapConfig) -> None:
+    client = FakeClient(("IMAP4REV1", "CONDSTORE"))
+    client.add()
+    client.add()
+    email_reader = reader(config, client)
+    state, _ = sync(email_reader, None)
+    client.flag(1, ("\\Seen",))
+    client.add()
+    client.commands.clear()
+
+    new_state, delta = sync(email_reader, state)
+
+    assert delta.added == [EmailUid("3")]
+    assert delta.changed == {EmailUid("1"): ("\\Seen",)}
+    assert delta.vanished == []
+    assert new_state.uids == (1, 2, 3)
+    assert "UID SEARCH ALL" not in client.commands
+
+
+def test_detect_vanished_without_qresync(config: ImapConfig) -> None:
+    client = FakeClient(("IMAP4REV1", "CONDSTORE"))
+    for _ in range(3):
+        client.add()
+    email_reader = reader(config, client)
+    state, _ = sync(email_reader, None)
+    client.expunge(2)
+
+    new_state, delta = sync(email_reader, state)
+
+    assert delta.vanished == [EmailUid("2")]
+    assert new_state.uids == (1, 3)
+
+
+def test_search_new_uids_without_condstore(config: ImapConfig) -> None:
+    client = FakeClient(("IMAP4REV1",))
+    client.add()
+    email_reader = reader(config, client)
+    state, _ = sync(email_reader, None)
+    client.add()
+    client.commands.clear()
+
+    new_state, delta = sync(email_reader, state)
+
+    assert delta.added == [EmailUid("2")]
+    assert new_state.uids == (1, 2)
+    assert client.commands == ["STATUS", "UID SEARCH"]
@@ -0,0 +1,215 @@
+import imaplib
+import threading
+import time
+from typing import List, Optional
+import pytest
+
+from benchmarks.fake_imap_server import FakeImapServer
+from benchmarks.fake_mailstore import FakeMailStore
+from inbox_zero.shared.email_reader import ImapConfig
+from inbox_zero.shared.event_bus import EventBus, MailboxEvent, MailboxEventKind
+from inbox_zero.shared.idle_watcher import IdleSupervisor, IdleWatcher, parse_idle_response
+
+
+class FakeIdle:
+    def __init__(self, responses: List[List[bytes]], dropped: bool = False) -> None:
+        self._responses = responses
+        self._dropped = dropped
+        self.starts = 0
+        self.stops = 0
+
+    def start(self) -> None:
+        self.starts += 1
+
+    def stop(self) -> None:
+        self.stops += 1
+
+    def poll(self, timeout: Optional[float]) -> List[bytes]:
+        if self._responses:
+            return self._responses.pop(0)
+        if self._dropped:
+            raise imaplib.IMAP4.abort("socket error: EOF")
+        time.sleep(timeout or 0)
+        return []
+
+
+class FakeFolderManager:
+    def set(self, folder: str) -> None:
+        pass
+
+
+class FakeMailbox:
+    def __init__(self, idle: FakeIdle) -> None:
+        self.idle = idle
+        self.folder = FakeFolderManager()
+        self.logged_out = False
+
+    def logout(self) -> None:
+        self.logged_out = True
+
+
+class FakeConnector:
+    def __init__(self, mailboxes: List[FakeMailbox]) -> None:
+        self._mailboxes = mailboxes
+        self.calls = 0
+
+    def __call__(self, config: ImapConfig) -> FakeMailbox:
+        self.calls += 1
+        if not self._mailboxes:
+            raise OSError("connection refused")
+        return self._mailboxes.pop(0)
+
+
+class EventRecorder:
+    def __init__(self, expected: int) -> None:
+        self.events: List[MailboxEvent] = []
+        self._expected = expected
+        self.done = threading.Event()
+
+    def __call__(self, event: MailboxEvent) -> None:
+        self.events.append(event)
+        if len(self.events) >= self._expected:
+            self.done.set()
+
+    def kinds(self) -> List[MailboxEventKind]:
+        return [event.kind for event in self.events]
+
+
+@pytest.fixture
+def config() -> ImapConfig:
+    return ImapConfig(
+        host="localhost",
+        port=993,
+        username="test@test.com",
+        password="password",
+        use_ssl=True
+    )
+
+
+def watcher(
+    config: ImapConfig, bus: EventBus, connector: FakeConnector, renew_interval: float = 60.0, folder: str = "INBOX"
+) -> IdleWatcher:
+    return IdleWatcher(
+        config, folder, bus, connect=connector, renew_interval=renew_interval, poll_interval=0.01, min_backoff=0.0
+    )
+
+
+def test_parse_idle_responses() -> None:
+    assert parse_idle_response(b"* 36 EXISTS") == (MailboxEventKind.EXISTS, "36")
+    assert parse_idle_response(b"* 2 EXPUNGE") == (MailboxEventKind.EXPUNGE, "2")
+    assert parse_idle_response(b"* 5 FETCH (FLAGS (\\Seen))") == (MailboxEventKind.FLAGS, "5")
+    assert parse_idle_response(b"* VANISHED 3:4,9") == (MailboxEventKind.VANISHED, "3:4,9")
+    assert parse_idle_response(b"* 1 RECENT") is None
+
+
+def test_publish_idle_events(config: ImapConfig) -> None:
+    bus = EventBus()
+    recorder = EventRecorder(expected=2)
+    bus.subscribe(recorder)
+    mailbox = FakeMailbox(FakeIdle([[b"* 36 EXISTS", b"* 1 RECENT"], [b"* 2 EXPUNGE"]]))
+    sut = watcher(config, bus, FakeConnector([mailbox]))
+
+    sut.start()
+    assert recorder.done.wait(2)
+    sut.stop(2)
+
+    assert recorder.kinds() == [MailboxEventKind.EXISTS, MailboxEventKind.EXPUNGE]
+    assert bus.version(config, "INBOX") == 2
+    assert mailbox.logged_out
+    assert not sut.running
+
+
+def test_renew_idle_before_server_timeout(config: ImapConfig) -> None:
+    bus = EventBus()
+    idle = FakeIdle([])
+    sut = watcher(config, bus, FakeConnector([FakeMailbox(idle)]), renew_interval=0.02)
+
+    sut.start()
+    deadline = time.monotonic() + 2
+    while sut.renewals < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    sut.stop(2)
+
+    assert sut.renewals >= 2
+    assert idle.starts >= 2
+
+
+def test_reconnect_and_request_resync_after_drop(config: ImapConfig) -> None:
+    bus = EventBus()
+    recorder = EventRecorder(expected=2)
+    bus.subscribe(recorder)
+    dropped = FakeMailbox(FakeIdle([[b"* 3 EXISTS"]], dropped=True))
+    connector = FakeConnector([dropped, FakeMailbox(FakeIdle([]))])
+    sut = watcher(config, bus, connector)
+
+    sut.start()
+    assert recorder.done.wait(2)
+    sut.stop(2)
+
+    assert recorder.kinds() == [MailboxEventKind.EXISTS, MailboxEventKind.RESYNC]
+    assert dropped.logged_out
+    assert sut.connections == 2
+    assert sut.last_error == "socket error: EOF"
+
+
+def test_keep_publishing_when_a_subscriber_fails(config: ImapConfig) -> None:
+    bus = EventBus()
+    recorder = EventRecorder(expected=1)
+
+    def failing(event: MailboxEvent) -> None:
+        raise RuntimeError("boom")
+
+    bus.subscribe(failing)
+    bus.subscribe(recorder)
+
+    bus.publish(MailboxEvent(config, "INBOX", MailboxEventKind.EXISTS, "1"))
+
+    assert recorder.done.is_set()
+    assert bus.errors == 1
+
+
+def test_supervisor_starts_one_watcher_per_folder(config: ImapConfig) -> None:
+    bus = EventBus()
+    connector = FakeConnector([FakeMailbox(FakeIdle([])), FakeMailbox(FakeIdle([]))])
+    sut = IdleSupervisor(bus, lambda config, folder, bus: watcher(config, bus, connector))
+
+    first = sut.watch(config, "INBOX")
+    second = sut.watch(config, "INBOX")
+    sut.close()
+
+    assert first is second
+    assert not first.running
+
+
+def test_supervisor_keeps_one_watcher_per_account(config: ImapConfig) -> None:
+    bus = EventBus()
+    connector = FakeConnector([FakeMailbox(FakeIdle([])), FakeMailbox(FakeIdle([]))])
+    sut = IdleSupervisor(bus, lambda config, folder, bus: watcher(config, bus, connector, folder=folder))
+
+    inbox = sut.watch(config, "INBOX")
+    sent = sut.watch(config, "Sent")
+    sut.unwatch(config, "INBOX")
+
+    assert not inbox.running
+    assert sent.running and sent.folder == "Sent"
+    sut.close()
+    assert not sent.running
+
+
+@pytest.mark.parametrize("folder, capabilities", [
+    ("Missing", "IMAP4rev1 IDLE UIDPLUS MOVE"),
+    ("INBOX", "IMAP4rev1 UIDPLUS MOVE"),
+])
+def test_keep_running_when_the_server_refuses_to_idle(folder: str, capabilities: str) -> None:
+    with FakeImapServer(FakeMailStore({"test": "secret"}), capabilities=capabilities) as server:
+        sut = IdleWatcher(server.config("test", "secret"), folder, EventBus(), poll_interval=0.01, min_backoff=0.01)
+        sut.start()
+        deadline = time.monotonic() + 2
+        while sut.last_error is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        running = sut.running
+        sut.stop(2)
+
+    assert sut.last_error is not None
+    assert running
+    assert sut.idle_sessions == 0
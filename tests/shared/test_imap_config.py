@@ -0,0 +1,8 @@
+from inbox_zero.shared.imap_config import ImapConfig
+
+
+def test_keep_the_password_out_of_the_repr() -> None:
+    config = ImapConfig(host="localhost", port=993, username="test@test.com", password="s3cr3t")
+
+    assert "s3cr3t" not in repr(config)
+    assert "test@test.com" in repr(config)
@@ -0,0 +1,109 @@
+from inbox_zero.shared.imap_parser import (
+    BodyPart,
+    decode_text,
+    first_address,
+    format_uid_set,
+    parse_bodystructure,
+    parse_fetch_response,
+    parse_uid_set,
+    parse_values,
+)
+
+
+MULTIPART_STRUCTURE = (
+    b'((("TEXT" "PLAIN" ("CHARSET" "utf-8") NIL NIL "7BIT" 10 1 NIL NIL NIL NIL)'
+    b'("TEXT" "HTML" ("CHARSET" "utf-8") NIL NIL "QUOTED-PRINTABLE" 20 1 NIL NIL NIL NIL)'
+    b' "ALTERNATIVE" ("BOUNDARY" "b2") NIL NIL NIL)'
+    b'("APPLICATION" "OCTET-STREAM" NIL NIL NIL "BASE64" 24 NIL ("ATTACHMENT" ("FILENAME" "test.txt")) NIL NIL)'
+    b' "MIXED" ("BOUNDARY" "b1") NIL NIL NIL)'
+)
+
+
+def test_parse_nested_lists_quoted_strings_and_nil() -> None:
+    result = parse_values(b'(FLAGS (\\Seen) SUBJECT "say \\"hi\\"" CC NIL)')
+
+    assert result == [["FLAGS", ["\\Seen"], "SUBJECT", b'say "hi"', "CC", None]]
+
+
+def test_parse_fetch_response_with_literal() -> None:
+    data = [
+        (b"1 (UID 5 BODY[HEADER.FIELDS (LIST-ID)] {12}", b"List-Id: x\r\n"),
+        b" RFC822.SIZE 120)",
+        b"2 (UID 7 FLAGS (\\Seen))",
+    ]
+
+    result = parse_fetch_response(data)
+
+    assert result == [
+        {"UID": "5", "BODY[HEADER.FIELDS (LIST-ID)]": b"List-Id: x\r\n", "RFC822.SIZE": "120"},
+        {"UID": "7", "FLAGS": ["\\Seen"]},
+    ]
+
+
+def test_parse_multipart_bodystructure() -> None:
+    structure = parse_values(MULTIPART_STRUCTURE)[0]
+
+    result = parse_bodystructure(structure)
+
+    assert [part.section for part in result] == ["1.1", "1.2", "2"]
+    assert result[1] == BodyPart(
+        section="1.2", content_type="text/html", charset="utf-8", encoding="quoted-printable", size=20
+    )
+    assert result[2].filename == "test.txt"
+    assert result[2].is_attachment
+    assert not result[0].is_attachment
+
+
+def test_parse_single_part_bodystructure() -> None:
+    structure = parse_values(b'("TEXT" "PLAIN" ("CHARSET" "us-ascii") NIL NIL "7BIT" 42 3 NIL NIL NIL NIL)')[0]
+
+    result = parse_bodystructure(structure)
+
+    assert [part.section for part in result] == ["1"]
+    assert result[0].size == 42
+
+
+def test_treat_inline_parts_with_content_id_as_body() -> None:
+    structure = parse_values(b'("IMAGE" "PNG" NIL "<logo@test>" NIL "BASE64" 30 NIL ("INLINE" NIL) NIL NIL)')[0]
+
+    result = parse_bodystructure(structure)
+
+    assert result[0].content_id == "<logo@test>"
+    assert result[0].disposition == "inline"
+    assert not result[0].is_attachment
+
+
+def test_flag_attachment_disposition_without_filename() -> None:
+    structure = parse_values(b'("APPLICATION" "PDF" NIL NIL NIL "BASE64" 30 NIL ("ATTACHMENT" NIL) NIL NIL)')[0]
+
+    result = parse_bodystructure(structure)
+
+    assert result[0].filename == ""
+    assert result[0].is_attachment
+
+
+def test_reassemble_rfc2231_filename_continuations() -> None:
+    structure = parse_values(
+        b'("APPLICATION" "PDF" NIL NIL NIL "BASE64" 30 NIL ("ATTACHMENT" ('
+        b'"FILENAME*1*" "%C3%A9" "FILENAME*0*" "utf-8\'fr\'%C3%A9t" "FILENAME*2" " 2024.pdf")) NIL NIL)'
+    )[0]
+
+    result = parse_bodystructure(structure)
+
+    assert result[0].filename == "été 2024.pdf"
+
+
+def test_decode_encoded_words_and_addresses() -> None:
+    envelope = parse_values(b'("=?utf-8?q?H=C3=A9llo?=" (("Bob" NIL "bob" "test.com")))')[0]
+
+    assert isinstance(envelope, list)
+    assert decode_text(envelope[0]) == "Héllo"
+    assert first_address(envelope[1]) == "bob@test.com"
+
+
+def test_format_uid_set_as_ranges() -> None:
+    assert format_uid_set(["7", "1", "2", "3", "5", "8"]) == "1:3,5,7:8"
+
+
+def test_parse_uid_set() -> None:
+    assert parse_uid_set("1:3,5,8:7") == [1, 2, 3, 5, 7, 8]
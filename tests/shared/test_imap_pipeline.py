@@ -0,0 +1,92 @@
+import imaplib
+import time
+from email.message import EmailMessage
+from typing import Iterator
+
+import pytest
+
+from benchmarks.fake_imap_server import FakeImapServer
+from benchmarks.fake_mailstore import FakeMailStore
+from inbox_zero.shared.email_reader import EmailReader, EmailUid
+from inbox_zero.shared.imap_pipeline import ImapPipeline
+
+LATENCY = 0.05
+
+
+def build_message(subject: str) -> bytes:
+    message = EmailMessage()
+    message["From"] = "sender@test.com"
+    message["Subject"] = subject
+    message.set_content(f"Body of {subject}")
+    return message.as_bytes()
+
+
+@pytest.fixture
+def store() -> FakeMailStore:
+    store = FakeMailStore({"test": "secret"})
+    store.create("Archive")
+    for index in range(20):
+        store.append("INBOX", build_message(f"Message {index}"))
+    return store
+
+
+@pytest.fixture
+def server(store: FakeMailStore) -> Iterator[FakeImapServer]:
+    with FakeImapServer(store, latency=LATENCY) as server:
+        yield server
+
+
+@pytest.fixture
+def client(server: FakeImapServer) -> Iterator[imaplib.IMAP4]:
+    client = imaplib.IMAP4(server.host, server.port)
+    client.login("test", "secret")
+    client.select("INBOX")
+    yield client
+    client.logout()
+
+
+def test_send_commands_back_to_back(client: imaplib.IMAP4) -> None:
+    started = time.perf_counter()
+    with ImapPipeline(client) as sut:
+        commands = [sut.uid("FETCH", str(uid), "(UID BODY.PEEK[HEADER.FIELDS (SUBJECT)])") for uid in range(1, 21)]
+    elapsed = time.perf_counter() - started
+
+    assert all(command.ok for command in commands)
+    assert elapsed < 10 * LATENCY
+    subjects = {uid: item["BODY[HEADER.FIELDS (SUBJECT)]"] for uid, item in sut.fetched_by_uid().items()}
+    assert subjects[7] == b"Subject: Message 6\r\n\r\n"
+    assert len(subjects) == 20
+
+
+def test_keep_going_after_a_failed_command(client: imaplib.IMAP4) -> None:
+    with ImapPipeline(client, window=2) as sut:
+        first = sut.uid("FETCH", "1", "(UID FLAGS)")
+        failed = sut.uid("FETCH", "1", "(UNKNOWN)")
+        last = sut.uid("SEARCH", "UID", "18:*")
+
+    assert (first.ok, failed.status, last.ok) == (True, "BAD", True)
+    assert sut.searched == [18, 19, 20]
+
+
+def test_fetch_bodies_in_one_round_trip(server: FakeImapServer) -> None:
+    reader = EmailReader.from_config(server.config("test", "secret"))
+    envelopes = reader.fetch_envelopes()
+
+    bodies = reader.fetch_bodies(envelopes)
+
+    assert [body.text.strip() for body in bodies[:2]] == ["Body of Message 0", "Body of Message 1"]
+    assert server.commands["UID FETCH"] == 1 + len(envelopes)
+
+
+def test_move_chunks_without_move_extension(store: FakeMailStore) -> None:
+    capabilities = "IMAP4rev1 UIDPLUS"
+    with FakeImapServer(store, capabilities=capabilities) as server:
+        reader = EmailReader.from_config(server.config("test", "secret"))
+
+        outcomes = reader.archive_many(uids=[EmailUid(str(uid)) for uid in (2, 3, 5, 8, 99)], chunk_size=2)
+
+    assert [uid.value for uid, moved in outcomes.items() if moved] == ["2", "3", "5", "8"]
+    assert len(store.folders["Archive"].messages) == 4
+    assert len(store.folders["INBOX"].messages) == 16
+    assert server.commands["UID MOVE"] == 0
+    assert server.commands["UID COPY"] == 2
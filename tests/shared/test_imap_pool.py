@@ -0,0 +1,198 @@
+import imaplib
+from typing import List
+import pytest
+
+from inbox_zero.shared.email_reader import ImapConfig
+from inbox_zero.shared.imap_pool import ImapConnectionPool
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeClient:
+    def __init__(self) -> None:
+        self.noops = 0
+        self.alive = True
+
+    def noop(self) -> tuple[str, list[bytes]]:
+        self.noops += 1
+        if not self.alive:
+            raise imaplib.IMAP4.abort("socket error: EOF")
+        return "OK", [b"NOOP completed"]
+
+
+class FakeFolderManager:
+    def __init__(self) -> None:
+        self.selected: List[str] = []
+
+    def set(self, folder: str) -> None:
+        self.selected.append(folder)
+
+
+class FakeMailbox:
+    def __init__(self) -> None:
+        self.client = FakeClient()
+        self.folder = FakeFolderManager()
+        self.logged_out = False
+
+    def logout(self) -> None:
+        self.logged_out = True
+
+
+class FakeConnector:
+    def __init__(self, clock: FakeClock) -> None:
+        self.clock = clock
+        self.mailboxes: List[FakeMailbox] = []
+
+    def __call__(self, config: ImapConfig) -> FakeMailbox:
+        self.clock.now += 0.5
+        mailbox = FakeMailbox()
+        self.mailboxes.append(mailbox)
+        return mailbox
+
+
+@pytest.fixture
+def config() -> ImapConfig:
+    return ImapConfig(
+        host="localhost",
+        port=993,
+        username="test@test.com",
+        password="password",
+        use_ssl=True
+    )
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def connector(clock: FakeClock) -> FakeConnector:
+    return FakeConnector(clock)
+
+
+@pytest.fixture
+def sut(connector: FakeConnector, clock: FakeClock) -> ImapConnectionPool:
+    return ImapConnectionPool(
+        connect=connector,
+        max_sessions_per_account=2,
+        idle_timeout=300.0,
+        keepalive_interval=60.0,
+        acquire_timeout=0.01,
+        clock=clock,
+    )
+
+
+def test_reuse_session_between_calls(sut: ImapConnectionPool, connector: FakeConnector, config: ImapConfig) -> None:
+    with sut.session(config, "INBOX") as first:
+        pass
+    with sut.session(config, "INBOX") as second:
+        pass
+
+    assert first is second
+    assert len(connector.mailboxes) == 1
+    assert sut.metrics.hits == 1
+    assert sut.metrics.misses == 1
+    assert sut.metrics.handshakes == 1
+    assert sut.metrics.average_handshake_seconds == 0.5
+
+
+def test_reuse_selected_folder(sut: ImapConnectionPool, connector: FakeConnector, config: ImapConfig) -> None:
+    with sut.session(config, "INBOX"):
+        pass
+    with sut.session(config, "INBOX"):
+        pass
+    with sut.session(config, "Archive"):
+        pass
+
+    assert connector.mailboxes[0].folder.selected == ["INBOX", "Archive"]
+    assert sut.metrics.folder_reuses == 1
+
+
+def test_send_noop_on_idle_session(
+    sut: ImapConnectionPool, connector: FakeConnector, clock: FakeClock, config: ImapConfig
+) -> None:
+    with sut.session(config, "INBOX"):
+        pass
+    clock.now += 120
+
+    with sut.session(config, "INBOX") as mailbox:
+        pass
+
+    assert mailbox.client.noops == 1
+    assert sut.metrics.hits == 1
+
+
+def test_reconnect_when_server_closed_session(
+    sut: ImapConnectionPool, connector: FakeConnector, clock: FakeClock, config: ImapConfig
+) -> None:
+    with sut.session(config, "INBOX") as first:
+        pass
+    first.client.alive = False
+    clock.now += 120
+
+    with sut.session(config, "INBOX") as second:
+        pass
+
+    assert second is not first
+    assert first.logged_out
+    assert sut.metrics.reconnects == 1
+    assert sut.open_sessions(config) == 1
+
+
+def test_discard_session_on_connection_error(
+    sut: ImapConnectionPool, connector: FakeConnector, config: ImapConfig
+) -> None:
+    with pytest.raises(imaplib.IMAP4.abort):
+        with sut.session(config, "INBOX"):
+            raise imaplib.IMAP4.abort("BYE")
+
+    with sut.session(config, "INBOX"):
+        pass
+
+    assert connector.mailboxes[0].logged_out
+    assert len(connector.mailboxes) == 2
+    assert sut.open_sessions(config) == 1
+
+
+def test_evict_idle_sessions(
+    sut: ImapConnectionPool, connector: FakeConnector, clock: FakeClock, config: ImapConfig
+) -> None:
+    with sut.session(config, "INBOX"):
+        pass
+    clock.now += 600
+
+    with sut.session(config, "INBOX"):
+        pass
+
+    assert connector.mailboxes[0].logged_out
+    assert sut.metrics.evictions == 1
+    assert sut.open_sessions(config) == 1
+
+
+def test_limit_sessions_per_account(sut: ImapConnectionPool, config: ImapConfig) -> None:
+    with sut.session(config, "INBOX"):
+        with sut.session(config, "INBOX"):
+            with pytest.raises(TimeoutError):
+                with sut.session(config, "INBOX"):
+                    pass
+
+    assert sut.open_sessions(config) == 2
+
+
+def test_close_logs_out_idle_sessions(
+    sut: ImapConnectionPool, connector: FakeConnector, config: ImapConfig
+) -> None:
+    with sut.session(config, "INBOX"):
+        pass
+
+    sut.close()
+
+    assert connector.mailboxes[0].logged_out
+    assert sut.open_sessions(config) == 0
@@ -0,0 +1,169 @@
+from email.message import EmailMessage
+from typing import List
+
+import pytest
+
+from benchmarks.fake_imap_server import FakeImapServer
+from benchmarks.fake_mailstore import FakeMailStore
+from inbox_zero.shared.email_reader import EmailReader, EmailUid
+from inbox_zero.shared.imap_pool import ImapConnectionPool
+from inbox_zero.shared.instrumentation import (
+    NO_INSTRUMENTATION,
+    Instrumentation,
+    instrument,
+    otlp_metrics,
+    otlp_traces,
+    prometheus_text,
+)
+
+
+class EmailListerForTest:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def list(self, folder: str) -> List[str]:
+        self.calls += 1
+        if folder == "missing":
+            raise ValueError("unknown folder")
+        return [folder]
+
+
+def test_nest_spans_in_the_same_trace() -> None:
+    sut = Instrumentation()
+
+    with sut.span("outer", page="inbox"):
+        with sut.span("inner") as attributes:
+            attributes["messages"] = 3
+
+    inner, outer = sut.spans()
+    assert (inner.name, outer.name) == ("inner", "outer")
+    assert inner.trace_id == outer.trace_id
+    assert inner.parent_id == outer.span_id
+    assert outer.parent_id is None
+    assert inner.attributes == {"messages": 3}
+
+
+def test_record_span_errors() -> None:
+    sut = Instrumentation()
+
+    with pytest.raises(ValueError):
+        with sut.span("failing"):
+            raise ValueError("boom")
+
+    assert sut.spans()[0].error == "ValueError: boom"
+    assert sut.counters()[("span_errors_total", (("span", "failing"),))] == 1
+
+
+def test_disabled_instrumentation_records_nothing() -> None:
+    lister = EmailListerForTest()
+
+    with NO_INSTRUMENTATION.span("ignored"), NO_INSTRUMENTATION.timer("ignored"):
+        NO_INSTRUMENTATION.count("ignored")
+
+    assert instrument(lister, NO_INSTRUMENTATION).list("INBOX") == ["INBOX"]
+    assert NO_INSTRUMENTATION.spans() == []
+    assert NO_INSTRUMENTATION.counters() == {}
+
+
+def test_instrument_port_methods_once() -> None:
+    sut = Instrumentation()
+    lister = EmailListerForTest()
+
+    instrument(instrument(lister, sut), sut)
+    lister.list("INBOX")
+    with pytest.raises(ValueError):
+        lister.list("missing")
+
+    assert lister.calls == 2
+    assert [span.name for span in sut.spans()] == ["EmailListerForTest.list", "EmailListerForTest.list"]
+    assert sut.counters()[("port_calls_total", (("method", "list"), ("port", "EmailListerForTest")))] == 2
+
+
+def test_export_prometheus_text() -> None:
+    sut = Instrumentation(buckets=(0.1, 1.0))
+    sut.count("imap_commands_total", command='UID "FETCH"')
+    sut.observe("mime_parse_seconds", 0.5, kind="body")
+
+    assert prometheus_text(sut).splitlines() == [
+        "# TYPE inbox_zero_imap_commands_total counter",
+        'inbox_zero_imap_commands_total{command="UID \\"FETCH\\""} 1',
+        "# TYPE inbox_zero_mime_parse_seconds histogram",
+        'inbox_zero_mime_parse_seconds_bucket{kind="body",le="0.1"} 0',
+        'inbox_zero_mime_parse_seconds_bucket{kind="body",le="1.0"} 1',
+        'inbox_zero_mime_parse_seconds_bucket{kind="body",le="+Inf"} 1',
+        'inbox_zero_mime_parse_seconds_sum{kind="body"} 0.5',
+        'inbox_zero_mime_parse_seconds_count{kind="body"} 1',
+    ]
+
+
+def test_export_opentelemetry_json() -> None:
+    sut = Instrumentation()
+    with sut.span("outer"):
+        with sut.span("inner", uid=42):
+            pass
+
+    spans = otlp_traces(sut)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    metrics = otlp_metrics(sut)["resourceMetrics"][0]["scopeMetrics"][0]["metrics"]
+
+    assert spans[0]["attributes"] == [{"key": "uid", "value": {"intValue": "42"}}]
+    assert spans[0]["parentSpanId"] == spans[1]["spanId"]
+    assert "parentSpanId" not in spans[1]
+    assert metrics[0]["name"] == "span_duration_seconds"
+    assert metrics[0]["histogram"]["dataPoints"][0]["count"] == "1"
+
+
+def test_trace_imap_commands_and_bytes() -> None:
+    store = FakeMailStore({"test": "secret"})
+    message = EmailMessage()
+    message["Subject"] = "Hello"
+    message.set_content("Body")
+    store.append("INBOX", message.as_bytes())
+    sut = Instrumentation()
+
+    with FakeImapServer(store) as server:
+        reader = EmailReader.from_config(server.config("test", "secret"), pool=ImapConnectionPool(instrumentation=sut))
+        reader.fetch_envelopes()
+
+    names = {span.name for span in sut.spans()}
+    counters = sut.counters()
+    assert {"imap.connect", "imap.LOGIN", "imap.SELECT", "imap.UID FETCH"} <= names
+    assert counters[("imap_bytes_received_total", ())] > 0
+    assert counters[("imap_bytes_sent_total", ())] > 0
+    assert counters[("envelopes_parsed_total", ())] == 1
+    assert ("mime_parse_seconds", (("kind", "envelopes"),)) in sut.histograms()
+
+
+def test_split_connect_into_tcp_and_login_spans() -> None:
+    store = FakeMailStore({"test": "secret"})
+    sut = Instrumentation()
+
+    with FakeImapServer(store) as server:
+        EmailReader.from_config(server.config("test", "secret"), instrumentation=sut).fetch_envelopes()
+
+    spans = {span.name: span for span in sut.spans()}
+    connect = spans["imap.connect"]
+    assert spans["imap.tcp"].parent_id == connect.span_id
+    assert spans["imap.LOGIN"].parent_id == connect.span_id
+    assert spans["imap.SELECT"].parent_id is None
+
+
+def test_trace_each_pipelined_command() -> None:
+    store = FakeMailStore({"test": "secret"})
+    store.create("Archive")
+    message = EmailMessage()
+    message["Subject"] = "Hello"
+    message.set_content("Body")
+    for _ in range(3):
+        store.append("INBOX", message.as_bytes())
+    sut = Instrumentation()
+
+    with FakeImapServer(store) as server:
+        reader = EmailReader.from_config(server.config("test", "secret"), instrumentation=sut)
+        with sut.span("archive"):
+            reader.move_many(uids=[EmailUid(str(uid)) for uid in (1, 2, 3)], destination="Archive", chunk_size=1)
+
+    archive = next(span for span in sut.spans() if span.name == "archive")
+    moves = [span for span in sut.spans() if span.name == "imap.UID MOVE"]
+    assert len(moves) == 3
+    assert all(span.attributes["pipelined"] and span.error is None for span in moves)
+    assert all(span.parent_id == archive.span_id and span.end_ns >= span.start_ns for span in moves)
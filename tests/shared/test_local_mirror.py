@@ -0,0 +1,116 @@
+from email.message import EmailMessage
+from pathlib import Path
+
+import pytest
+
+from benchmarks.fake_imap_server import FakeImapServer
+from benchmarks.fake_mailstore import FakeMailStore
+from inbox_zero.shared.email_reader import EmailUid
+from inbox_zero.shared.local_mirror import MAX_REPLAY_ATTEMPTS, LocalMirror, message_uid
+
+
+def build_message(subject: str) -> bytes:
+    message = EmailMessage()
+    message["From"] = "sender@test.com"
+    message["Subject"] = subject
+    message.set_content(f"Body of {subject}")
+    return message.as_bytes()
+
+
+@pytest.fixture
+def store() -> FakeMailStore:
+    store = FakeMailStore({"test": "secret"})
+    store.create("Archive")
+    for index in range(1, 5):
+        store.append("INBOX", build_message(f"Message {index}"))
+    return store
+
+
+@pytest.fixture
+def sut(tmp_path: Path) -> LocalMirror:
+    return LocalMirror(tmp_path / "mirror")
+
+
+def test_parse_uid_from_maildir_filenames() -> None:
+    assert message_uid("7-42:2,S") == 42
+    assert message_uid("1700000000.M1P2.host") is None
+
+
+def test_read_and_archive_from_disk_while_the_server_is_down(sut: LocalMirror, store: FakeMailStore) -> None:
+    with FakeImapServer(store) as server:
+        config = server.config("test", "secret")
+        report = sut.sync(config, "INBOX")
+
+    first = sut.first_email(config, "INBOX")
+    assert report.added == 4
+    assert first is not None and (first.uid, first.subject) == (EmailUid("1"), "Message 1")
+    assert first.body_text.strip() == "Body of Message 1"
+
+    assert sut.archive(config, "INBOX", EmailUid("1"))
+    assert not sut.archive(config, "INBOX", EmailUid("1"))
+    next_email = sut.first_email(config, "INBOX")
+    assert next_email is not None and next_email.subject == "Message 2"
+    assert sut.pending(config) == 1
+
+
+def test_replay_queued_archives_against_the_server(sut: LocalMirror, store: FakeMailStore) -> None:
+    with FakeImapServer(store) as server:
+        config = server.config("test", "secret")
+        sut.sync(config, "INBOX")
+        sut.archive(config, "INBOX", EmailUid("2"))
+        sut.archive(config, "INBOX", EmailUid("3"))
+
+        report = sut.replay(config)
+        sync = sut.sync(config, "INBOX")
+
+    assert (report.replayed, report.pending) == (2, 0)
+    assert [message.uid for message in store.folders["INBOX"].messages] == [1, 4]
+    assert len(store.folders["Archive"].messages) == 2
+    assert (sync.added, sync.removed) == (0, 0)
+
+
+def test_sync_new_and_vanished_messages_without_restoring_queued_ones(sut: LocalMirror, store: FakeMailStore) -> None:
+    with FakeImapServer(store) as server:
+        config = server.config("test", "secret")
+        sut.sync(config, "INBOX")
+        sut.archive(config, "INBOX", EmailUid("1"))
+        store.folders["INBOX"].messages = [m for m in store.folders["INBOX"].messages if m.uid != 2]
+        store.append("INBOX", build_message("Message 5"))
+
+        report = sut.sync(config, "INBOX")
+
+    assert (report.added, report.removed, report.full_resync) == (1, 1, False)
+    first = sut.first_email(config, "INBOX")
+    assert first is not None and first.subject == "Message 3"
+
+
+def test_resync_everything_when_uid_validity_changes(sut: LocalMirror, store: FakeMailStore) -> None:
+    with FakeImapServer(store) as server:
+        config = server.config("test", "secret")
+        sut.sync(config, "INBOX")
+        sut.archive(config, "INBOX", EmailUid("1"))
+        store.folders["INBOX"].uid_validity += 100
+
+        report = sut.sync(config, "INBOX")
+        replay = sut.replay(config)
+
+    assert (report.added, report.full_resync) == (4, True)
+    assert (replay.replayed, replay.pending, replay.discarded) == (0, 0, 1)
+    assert len(store.folders["INBOX"].messages) == 4
+
+
+def test_give_up_on_archives_the_server_keeps_refusing(tmp_path: Path, store: FakeMailStore) -> None:
+    sut = LocalMirror(tmp_path / "mirror", archive_folder="Missing")
+    with FakeImapServer(store) as server:
+        config = server.config("test", "secret")
+        sut.sync(config, "INBOX")
+        sut.archive(config, "INBOX", EmailUid("1"))
+
+        reports = [sut.replay(config) for _ in range(MAX_REPLAY_ATTEMPTS)]
+        sync = sut.sync(config, "INBOX")
+
+    assert [report.pending for report in reports] == [1] * (MAX_REPLAY_ATTEMPTS - 1) + [0]
+    assert reports[-1].abandoned == 1
+    assert sync.added == 1
+    first = sut.first_email(config, "INBOX")
+    assert first is not None and first.uid == EmailUid("1")
@@ -0,0 +1,101 @@
+from email.message import EmailMessage
+
+import pytest
+from imap_tools import MailMessage  # type: ignore[attr-defined]
+
+from benchmarks.corpus import CorpusSpec, generate_corpus
+from benchmarks.fake_imap_server import FakeImapServer
+from benchmarks.fake_mailstore import FakeMailStore
+from inbox_zero.shared.email_cache import EmailCache
+from inbox_zero.shared.email_reader import EmailData, EmailReader, EmailUid, LazyEmailData
+from inbox_zero.shared.raw_message import index_parts
+
+
+def build_nested_message() -> bytes:
+    message = EmailMessage()
+    message["From"] = "=?utf-8?q?Andr=C3=A9?= <andre@test.com>"
+    message["Subject"] = "=?utf-8?q?R=C3=A9union?="
+    message["Date"] = "Tue, 01 Oct 2024 10:00:00 +0200"
+    message.set_content("Bonjour à tous\n", charset="utf-8", cte="quoted-printable")
+    message.add_alternative("<p>Bonjour à tous</p>\n", subtype="html", charset="utf-8", cte="base64")
+    message.add_attachment(b"col1,col2\n", maintype="text", subtype="csv", filename="notes.csv")
+    message.add_attachment(b"\x89PNG", maintype="image", subtype="png", filename="logo.png")
+    return message.as_bytes()
+
+
+def test_index_nested_parts_with_imap_sections() -> None:
+    raw = build_nested_message()
+
+    parts = index_parts(raw)
+
+    assert [(raw_part.part.section, raw_part.part.content_type) for raw_part in parts] == [
+        ("1.1", "text/plain"),
+        ("1.2", "text/html"),
+        ("2", "text/csv"),
+        ("3", "image/png"),
+    ]
+    assert raw[parts[2].start:parts[2].end].strip() == b"Y29sMSxjb2wyCg=="
+
+
+def test_parse_headers_up_front_and_bodies_on_access() -> None:
+    sut = LazyEmailData(EmailUid("7"), build_nested_message())
+
+    assert (sut.subject, sut.sender, sut.date) == ("Réunion", "andre@test.com", "2024-10-01T10:00:00+02:00")
+    assert sut._parts is None
+    assert sut.body_text == "Bonjour à tous\n"
+    assert sut.body_html == "<p>Bonjour à tous</p>\n"
+    assert sut.attachments == ["notes.csv", "logo.png"]
+
+
+def test_leave_unparseable_dates_empty() -> None:
+    raw = b"From: andre@test.com\r\nDate: not a date\r\n\r\nBonjour\r\n"
+
+    assert LazyEmailData(EmailUid("7"), raw).date == ""
+
+
+def test_match_the_eager_parser_on_the_benchmark_corpus() -> None:
+    for _, raw in generate_corpus(CorpusSpec(messages=40, attachment_ratio=0.5, seed=3)):
+        eager = MailMessage.from_bytes(raw)
+        lazy = LazyEmailData(EmailUid("1"), raw)
+
+        assert lazy.subject == eager.subject
+        assert lazy.sender == eager.from_
+        assert lazy.date == eager.date.isoformat()
+        assert lazy.body_text == eager.text
+        assert lazy.body_html == eager.html
+        assert lazy.attachments == [attachment.filename for attachment in eager.attachments]
+
+
+def test_store_in_the_email_cache() -> None:
+    sut = LazyEmailData(EmailUid("7"), build_nested_message())
+    cache = EmailCache()
+
+    cache.put("account", "INBOX", 1, sut)
+
+    assert cache.get("account", "INBOX", 1, EmailUid("7")) == EmailData(
+        uid=EmailUid("7"),
+        subject="Réunion",
+        sender="andre@test.com",
+        date="2024-10-01T10:00:00+02:00",
+        body_text="Bonjour à tous\n",
+        body_html="<p>Bonjour à tous</p>\n",
+        attachments=["notes.csv", "logo.png"],
+    )
+    with pytest.raises(AttributeError):
+        setattr(sut, "unknown", 1)
+
+
+def test_fetch_raw_messages_in_one_round_trip() -> None:
+    store = FakeMailStore({"test": "secret"})
+    for index in range(5):
+        store.append("INBOX", build_nested_message().replace(b"R=C3=A9union", f"Mail_{index}".encode()))
+
+    with FakeImapServer(store) as server:
+        reader = EmailReader.from_config(server.config("test", "secret"))
+        emails = reader.fetch_emails(limit=3)
+        single = reader.fetch_email(uid=EmailUid("5"))
+
+    assert [email.uid.value for email in emails] == ["1", "2", "3"]
+    assert [email.subject for email in emails] == ["Mail 0", "Mail 1", "Mail 2"]
+    assert single is not None and single.attachments == ["notes.csv", "logo.png"]
+    assert server.commands["UID FETCH"] == 2
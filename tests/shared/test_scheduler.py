@@ -0,0 +1,44 @@
+import threading
+
+from inbox_zero.shared.scheduler import Scheduler
+
+
+def test_run_job_periodically_until_cancelled() -> None:
+    done = threading.Event()
+    calls = []
+
+    def job() -> int:
+        calls.append(1)
+        if len(calls) == 3:
+            done.set()
+        return len(calls)
+
+    sut = Scheduler()
+    periodic = sut.schedule("rules", 0.01, job)
+
+    assert done.wait(2)
+    sut.cancel("rules")
+
+    assert not periodic.running
+    assert periodic.runs >= 3
+    assert sut.get("rules") is None
+
+
+def test_keep_running_after_a_failure() -> None:
+    done = threading.Event()
+    calls = []
+
+    def job() -> None:
+        calls.append(1)
+        if len(calls) == 1:
+            raise ConnectionError("server unavailable")
+        done.set()
+
+    sut = Scheduler()
+    periodic = sut.schedule("rules", 0.01, job)
+
+    assert done.wait(2)
+    sut.close()
+
+    assert periodic.runs >= 2
+    assert periodic.last_error is None
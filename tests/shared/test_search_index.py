@@ -0,0 +1,99 @@
+import time
+from typing import List
+
+import pytest
+
+from inbox_zero.shared.email_cache import EmailCache
+from inbox_zero.shared.email_reader import EmailData, EmailUid
+from inbox_zero.shared.search_index import SearchIndex, fts_query
+
+ACCOUNT = "test@test.com@localhost:993"
+
+
+def email(
+    uid: str, subject: str, body: str = "", sender: str = "sender@test.com", attachments: List[str] = []
+) -> EmailData:
+    return EmailData(
+        uid=EmailUid(uid),
+        subject=subject,
+        sender=sender,
+        date="2024-01-09T10:00:00",
+        body_text=body,
+        body_html="",
+        attachments=list(attachments),
+    )
+
+
+@pytest.fixture
+def sut() -> SearchIndex:
+    return SearchIndex()
+
+
+def test_build_prefix_queries_from_free_text() -> None:
+    assert fts_query('facture "EDF" 2024') == '"facture"* "EDF"* "2024"*'
+    assert fts_query("  -*() ") == ""
+
+
+def test_search_subject_sender_body_and_attachments(sut: SearchIndex) -> None:
+    sut.add(ACCOUNT, "INBOX", 1, [
+        email("1", "Réunion de lundi", "Ordre du jour en pièce jointe"),
+        email("2", "Newsletter", "Les nouveautés", sender="news@shop.com"),
+        email("3", "Photos", "", attachments=["vacances-ete.zip"]),
+    ])
+
+    assert [hit.uid.value for hit in sut.search(ACCOUNT, "reunion")] == ["1"]
+    assert [hit.uid.value for hit in sut.search(ACCOUNT, "shop")] == ["2"]
+    assert [hit.uid.value for hit in sut.search(ACCOUNT, "vacances")] == ["3"]
+    assert sut.search(ACCOUNT, "ordre jour")[0].snippet == "[Ordre] du [jour] en pièce jointe"
+    assert sut.search("other@localhost:993", "reunion") == []
+    assert sut.search(ACCOUNT, "reunion", folder="Archive") == []
+
+
+def test_rank_subject_matches_first(sut: SearchIndex) -> None:
+    sut.add(ACCOUNT, "INBOX", 1, [email("1", "Bonjour", "Votre facture est disponible"), email("2", "Facture", "")])
+
+    assert [hit.uid.value for hit in sut.search(ACCOUNT, "facture")] == ["2", "1"]
+
+
+def test_replace_and_discard_messages(sut: SearchIndex) -> None:
+    sut.add(ACCOUNT, "INBOX", 1, [email("1", "Brouillon"), email("2", "Facture")])
+    sut.add(ACCOUNT, "INBOX", 1, [email("1", "Version finale")])
+    sut.discard(ACCOUNT, "INBOX", [2])
+
+    assert sut.search(ACCOUNT, "brouillon") == []
+    assert sut.search(ACCOUNT, "facture") == []
+    assert [hit.subject for hit in sut.search(ACCOUNT, "finale")] == ["Version finale"]
+
+
+def test_drop_folder_when_uid_validity_changes(sut: SearchIndex) -> None:
+    sut.add(ACCOUNT, "INBOX", 1, [email("1", "Ancien")])
+    sut.add(ACCOUNT, "Archive", 1, [email("1", "Ancien")])
+    sut.add(ACCOUNT, "INBOX", 2, [email("5", "Nouveau")])
+
+    assert [hit.uid.value for hit in sut.search(ACCOUNT, "nouveau")] == ["5"]
+    assert [hit.folder for hit in sut.search(ACCOUNT, "ancien")] == ["Archive"]
+
+
+def test_index_emails_put_in_the_cache(sut: SearchIndex) -> None:
+    cache = EmailCache(index=sut)
+
+    cache.put(ACCOUNT, "INBOX", 1, email("1", "Facture"))
+    cache.put(ACCOUNT, "INBOX", 1, email("2", "Facture"))
+    cache.discard(ACCOUNT, "INBOX", [1])
+
+    assert [hit.uid.value for hit in sut.search(ACCOUNT, "facture")] == ["2"]
+
+
+def test_search_a_large_index_quickly(sut: SearchIndex) -> None:
+    words = ["alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel"]
+    sut.add(ACCOUNT, "INBOX", 1, (
+        email(str(uid), f"{words[uid % 8]} {uid}", " ".join(words[(uid + shift) % 8] for shift in range(30)))
+        for uid in range(1, 20_001)
+    ))
+
+    started = time.perf_counter()
+    hits = sut.search(ACCOUNT, "golf 19998")
+    elapsed = time.perf_counter() - started
+
+    assert [hit.subject for hit in hits] == ["golf 19998"]
+    assert elapsed < 0.5
@@ -0,0 +1,119 @@
+from email.message import EmailMessage
+from typing import List, Optional
+
+import pytest
+
+from benchmarks.fake_imap_server import FakeImapServer
+from benchmarks.fake_mailstore import FakeMailStore
+from inbox_zero.archive_thread.adapter import ThreadMailboxImap
+from inbox_zero.sync_folder.adapter import FolderSynchronizerImap
+from inbox_zero.shared.email_cache import account_key
+from inbox_zero.shared.email_reader import EmailEnvelope, EmailUid, message_ids
+from inbox_zero.shared.folder_sync import FolderSyncStateStore
+from inbox_zero.shared.thread_index import ThreadIndex
+
+
+def envelope(uid: int, message_id: str, references: Optional[List[str]] = None) -> EmailEnvelope:
+    return EmailEnvelope(
+        uid=EmailUid(str(uid)),
+        subject="",
+        sender="",
+        date="",
+        size=0,
+        attachments=[],
+        message_id=message_id,
+        in_reply_to=(references or [""])[-1],
+        references=references or [],
+    )
+
+
+def build_message(subject: str, message_id: str, parents: List[str]) -> bytes:
+    message = EmailMessage()
+    message["From"] = "sender@test.com"
+    message["Subject"] = subject
+    message["Message-ID"] = message_id
+    if parents:
+        message["In-Reply-To"] = parents[-1]
+        message["References"] = " ".join(parents)
+    message.set_content(f"Body of {subject}")
+    return message.as_bytes()
+
+
+@pytest.fixture
+def sut() -> ThreadIndex:
+    return ThreadIndex()
+
+
+def test_extract_message_ids_from_headers() -> None:
+    assert message_ids("<a@x> <b@y>\r\n <c@z> garbage") == ["<a@x>", "<b@y>", "<c@z>"]
+
+
+def test_join_replies_arriving_before_their_parent(sut: ThreadIndex) -> None:
+    sut.add("account", "INBOX", 1, [envelope(3, "<c@x>", ["<a@x>", "<b@x>"]), envelope(5, "<z@x>")])
+    sut.add("account", "INBOX", 1, [envelope(7, "<d@x>", ["<b@x>"]), envelope(1, "<a@x>")])
+
+    assert sut.thread("account", "INBOX", 1) == [1, 3, 7]
+    assert sut.thread("account", "INBOX", 5) == [5]
+    assert sut.thread("account", "INBOX", 42) == []
+
+
+def test_merge_threads_linked_by_a_later_message(sut: ThreadIndex) -> None:
+    sut.add("account", "INBOX", 1, [envelope(1, "<a@x>"), envelope(2, "<b@x>", ["<missing@x>"])])
+
+    sut.add("account", "INBOX", 1, [envelope(3, "<c@x>", ["<a@x>", "<missing@x>"])])
+
+    assert sut.thread("account", "INBOX", 2) == [1, 2, 3]
+
+
+def test_forget_threads_when_uid_validity_changes(sut: ThreadIndex) -> None:
+    sut.add("account", "INBOX", 1, [envelope(1, "<a@x>"), envelope(2, "<b@x>", ["<a@x>"])])
+
+    sut.add("account", "INBOX", 2, [envelope(2, "<z@x>")])
+
+    assert sut.indexed_uids("account", "INBOX", 2) == {2}
+    assert sut.thread("account", "INBOX", 1) == []
+
+
+def test_archive_a_whole_thread_in_one_move() -> None:
+    store = FakeMailStore({"test": "secret"})
+    store.create("Archive")
+    store.append("INBOX", build_message("Other", "<other@x>", []))
+    parents: List[str] = []
+    for index in range(40):
+        store.append("INBOX", build_message(f"Re: Budget {index}", f"<budget-{index}@x>", parents))
+        parents = [*parents, f"<budget-{index}@x>"][-10:]
+    index = ThreadIndex()
+    synchronizer = FolderSynchronizerImap(FolderSyncStateStore(), threads=index)
+    sut = ThreadMailboxImap(index)
+
+    with FakeImapServer(store) as server:
+        config = server.config("test", "secret")
+        synchronizer.sync(config, "INBOX")
+        server.commands.clear()
+        thread = sut.thread_of(config, "INBOX", EmailUid("41"))
+        outcomes = sut.move(config, "INBOX", thread, "Archive")
+
+    assert len(thread) == 40 and all(outcomes.values())
+    assert [message.uid for message in store.folders["INBOX"].messages] == [1]
+    assert server.commands["UID MOVE"] == 1
+    assert not server.commands.keys() - {"UID MOVE", "SELECT", "EXAMINE", "LOGIN", "CAPABILITY", "LOGOUT", "NOOP"}
+
+
+def test_sync_keeps_the_thread_index_current() -> None:
+    store = FakeMailStore({"test": "secret"})
+    store.append("INBOX", build_message("Budget", "<budget@x>", []))
+    index = ThreadIndex()
+    sut = FolderSynchronizerImap(FolderSyncStateStore(), threads=index)
+
+    with FakeImapServer(store) as server:
+        config = server.config("test", "secret")
+        sut.sync(config, "INBOX")
+        store.append("INBOX", build_message("Re: Budget", "<reply@x>", ["<budget@x>"]))
+        store.append("INBOX", build_message("Other", "<other@x>", []))
+        sut.sync(config, "INBOX")
+        replied = index.thread(account_key(config), "INBOX", 2)
+        del store.folders["INBOX"].messages[0]
+        sut.sync(config, "INBOX")
+
+    assert replied == [1, 2]
+    assert index.indexed_uids(account_key(config), "INBOX", store.folders["INBOX"].uid_validity) == {2, 3}
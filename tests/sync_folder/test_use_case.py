@@ -0,0 +1,104 @@
+from typing import Dict, Set, Tuple
+import pytest
+from pyqure import pyqure, PyqureMemory
+
+from inbox_zero.shared.email_reader import EmailUid, FolderDelta, ImapConfig
+from inbox_zero.sync_folder.port import FolderSynchronizerPort, FOLDER_SYNCHRONIZER_PORT_KEY
+from inbox_zero.sync_folder.use_case import SyncFolderUseCase
+
+
+class FolderSynchronizerForTest(FolderSynchronizerPort):
+    def __init__(self) -> None:
+        self._emails: Dict[str, Dict[EmailUid, Tuple[str, ...]]] = {}
+        self._known: Dict[str, Dict[EmailUid, Tuple[str, ...]]] = {}
+
+    def add_email(self, folder: str, uid: EmailUid, flags: Tuple[str, ...] = ()) -> None:
+        self._emails.setdefault(folder, {})[uid] = flags
+
+    def remove_email(self, folder: str, uid: EmailUid) -> None:
+        del self._emails[folder][uid]
+
+    def sync(self, config: ImapConfig, folder: str) -> FolderDelta:
+        emails = dict(self._emails.get(folder, {}))
+        known = self._known.get(folder)
+        self._known[folder] = emails
+        if known is None:
+            return FolderDelta(added=sorted(emails, key=lambda uid: int(uid.value)), full_resync=True)
+        current: Set[EmailUid] = set(emails)
+        return FolderDelta(
+            added=sorted(current - set(known), key=lambda uid: int(uid.value)),
+            changed={uid: flags for uid, flags in emails.items() if uid in known and known[uid] != flags},
+            vanished=sorted(set(known) - current, key=lambda uid: int(uid.value)),
+        )
+
+
+@pytest.fixture
+def dependencies() -> PyqureMemory:
+    memory: PyqureMemory = {}
+    return memory
+
+
+@pytest.fixture
+def synchronizer(dependencies: PyqureMemory) -> FolderSynchronizerForTest:
+    (provide, inject) = pyqure(dependencies)
+    synchronizer = FolderSynchronizerForTest()
+    provide(FOLDER_SYNCHRONIZER_PORT_KEY, synchronizer)
+    return synchronizer
+
+
+@pytest.fixture
+def config() -> ImapConfig:
+    return ImapConfig(
+        host="localhost",
+        port=993,
+        username="test@test.com",
+        password="password",
+        use_ssl=True
+    )
+
+
+def test_first_sync_is_a_full_resync(
+    dependencies: PyqureMemory, synchronizer: FolderSynchronizerForTest, config: ImapConfig
+) -> None:
+    synchronizer.add_email("INBOX", EmailUid("1"))
+    synchronizer.add_email("INBOX", EmailUid("2"))
+
+    sut = SyncFolderUseCase(dependencies)
+
+    delta = sut.execute(config, "INBOX")
+
+    assert delta.full_resync
+    assert delta.added == [EmailUid("1"), EmailUid("2")]
+
+
+def test_next_sync_returns_only_changes(
+    dependencies: PyqureMemory, synchronizer: FolderSynchronizerForTest, config: ImapConfig
+) -> None:
+    synchronizer.add_email("INBOX", EmailUid("1"))
+    synchronizer.add_email("INBOX", EmailUid("2"))
+    sut = SyncFolderUseCase(dependencies)
+    sut.execute(config, "INBOX")
+
+    synchronizer.remove_email("INBOX", EmailUid("1"))
+    synchronizer.add_email("INBOX", EmailUid("2"), ("\\Seen",))
+    synchronizer.add_email("INBOX", EmailUid("3"))
+
+    delta = sut.execute(config, "INBOX")
+
+    assert delta == FolderDelta(
+        added=[EmailUid("3")],
+        changed={EmailUid("2"): ("\\Seen",)},
+        vanished=[EmailUid("1")],
+    )
+
+
+def test_unchanged_folder_returns_empty_delta(
+    dependencies: PyqureMemory, synchronizer: FolderSynchronizerForTest, config: ImapConfig
+) -> None:
+    synchronizer.add_email("INBOX", EmailUid("1"))
+    sut = SyncFolderUseCase(dependencies)
+    sut.execute(config, "INBOX")
+
+    delta = sut.execute(config, "INBOX")
+
+    assert delta.is_empty
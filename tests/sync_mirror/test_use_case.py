@@ -0,0 +1,54 @@
+from typing import List
+import pytest
+from pyqure import pyqure, PyqureMemory
+
+from inbox_zero.shared.email_reader import ImapConfig
+from inbox_zero.shared.local_mirror import MirrorReport
+from inbox_zero.sync_mirror.port import MirrorSynchronizerPort, MIRROR_SYNCHRONIZER_PORT_KEY
+from inbox_zero.sync_mirror.use_case import SyncMirrorUseCase
+
+
+class MirrorSynchronizerForTest(MirrorSynchronizerPort):
+    def __init__(self) -> None:
+        self.calls: List[str] = []
+
+    def replay(self, config: ImapConfig) -> MirrorReport:
+        self.calls.append("replay")
+        return MirrorReport(replayed=3, pending=1, discarded=2, abandoned=1)
+
+    def sync(self, config: ImapConfig, folder: str) -> MirrorReport:
+        self.calls.append(f"sync {folder}")
+        return MirrorReport(added=5, removed=2)
+
+
+@pytest.fixture
+def dependencies() -> PyqureMemory:
+    memory: PyqureMemory = {}
+    return memory
+
+
+@pytest.fixture
+def synchronizer(dependencies: PyqureMemory) -> MirrorSynchronizerForTest:
+    (provide, inject) = pyqure(dependencies)
+    synchronizer = MirrorSynchronizerForTest()
+    provide(MIRROR_SYNCHRONIZER_PORT_KEY, synchronizer)
+    return synchronizer
+
+
+@pytest.fixture
+def config() -> ImapConfig:
+    return ImapConfig(
+        host="localhost",
+        port=993,
+        username="test@test.com",
+        password="password",
+    )
+
+
+def test_replay_archives_before_mirroring(
+    dependencies: PyqureMemory, synchronizer: MirrorSynchronizerForTest, config: ImapConfig
+) -> None:
+    report = SyncMirrorUseCase(dependencies).execute(config, "INBOX")
+
+    assert synchronizer.calls == ["replay", "sync INBOX"]
+    assert report == MirrorReport(added=5, removed=2, replayed=3, pending=1, discarded=2, abandoned=1)
@@ -0,0 +1,91 @@
+import json
+import mailbox
+import os
+from email import message_from_bytes
+from itertools import islice
+from pathlib import Path
+
+import pytest
+
+from benchmarks.__main__ import main
+from benchmarks.corpus import CorpusSpec, generate_corpus
+from benchmarks.harness import compare, load_results, measure, percentile
+from benchmarks.suites import benchmark_dependencies
+from inbox_zero.shared.imap_config import ImapConfig
+
+
+def test_generate_the_same_corpus_for_the_same_seed() -> None:
+    spec = CorpusSpec(messages=50, attachment_ratio=0.5, attachment_sizes=((1_000, 1),))
+
+    first = list(generate_corpus(spec))
+
+    assert first == list(generate_corpus(spec))
+    assert first != list(generate_corpus(CorpusSpec(messages=50, seed=7)))
+    with_attachments = [raw for _, raw in first if message_from_bytes(raw).is_multipart()]
+    assert 10 < len(with_attachments) < 40
+
+
+def test_generate_corpus_lazily() -> None:
+    corpus = generate_corpus(CorpusSpec(messages=500_000))
+
+    assert len(list(islice(corpus, 3))) == 3
+
+
+def test_interpolate_percentiles() -> None:
+    latencies = [float(value) for value in range(1, 101)]
+
+    assert percentile(latencies, 0.5) == 50.5
+    assert round(percentile(latencies, 0.99), 2) == 99.01
+    assert percentile([], 0.5) == 0.0
+
+
+def test_measure_throughput_per_message() -> None:
+    result = measure("noop", (lambda: 10 for _ in range(5)))
+
+    assert result.calls == 5
+    assert result.messages == 50
+    assert result.peak_rss_bytes > 0
+
+
+def test_report_regressions_beyond_threshold() -> None:
+    baseline = {"list": {"messages_per_second": 1000.0, "p99_ms": 10.0, "peak_rss_bytes": 100}}
+    current = {"list": {"messages_per_second": 850.0, "p99_ms": 10.5, "peak_rss_bytes": 200}}
+
+    regressions = compare(baseline, current, threshold=0.1)
+
+    assert [(regression.metric, round(regression.change, 2)) for regression in regressions] == [
+        ("messages_per_second", -0.15),
+        ("peak_rss_bytes", 1.0),
+    ]
+
+
+def test_run_the_suite_against_the_fake_server(tmp_path: Path) -> None:
+    output = tmp_path / "bench.json"
+
+    assert main(["run", "--fake", "--messages", "20", "--sample", "2", "--bulk", "5", "--output", str(output)]) == 0
+
+    assert "archive_many" in load_results(output)
+
+
+def test_run_the_suite_on_an_mbox_without_seeding(tmp_path: Path) -> None:
+    corpus = mailbox.mbox(str(tmp_path / "corpus.mbox"))
+    for _, raw in islice(generate_corpus(CorpusSpec(messages=3, seed=7)), 3):
+        corpus.add(raw)
+    corpus.close()
+    output = tmp_path / "bench.json"
+
+    arguments = ["run", "--mbox", str(tmp_path / "corpus.mbox"), "--messages", "20", "--sample", "1", "--bulk", "1"]
+    assert main([*arguments, "--output", str(output)]) == 0
+
+    assert "seed_seconds" not in json.loads(output.read_text())["corpus"]
+
+
+def test_keep_benchmark_state_in_the_given_directory(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("INBOX_ZERO_SYNC_STATE", raising=False)
+    config = ImapConfig(host="imap.unreachable.test", port=993, username="user", password="secret")
+
+    with benchmark_dependencies(config, tmp_path):
+        assert os.environ["INBOX_ZERO_SEARCH_INDEX"] == str(tmp_path / "search.sqlite3")
+
+    assert "INBOX_ZERO_SYNC_STATE" not in os.environ
+    assert {path.name for path in tmp_path.iterdir()} >= {"sync.sqlite3", "search.sqlite3", "threads.sqlite3", "mirror"}
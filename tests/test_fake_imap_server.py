@@ -0,0 +1,263 @@
+import asyncio
+import mailbox
+import threading
+import time
+from email.message import EmailMessage
+from pathlib import Path
+from typing import Iterator, List
+
+import pytest
+
+from benchmarks.corpus import CorpusSpec, generate_corpus
+from benchmarks.fake_imap_server import CAPABILITIES, FakeImapServer
+from benchmarks.fake_mailstore import FakeMailStore
+from inbox_zero.shared.async_email_reader import AsyncEmailReader
+from inbox_zero.shared.email_query import EmailQuery
+from inbox_zero.shared.email_reader import EmailReader, EmailUid
+from inbox_zero.shared.event_bus import EventBus, MailboxEvent, MailboxEventKind
+from inbox_zero.shared.idle_watcher import IdleWatcher
+from inbox_zero.shared.imap_pool import ImapConnectionPool
+
+
+def build_message(
+    subject: str,
+    sender: str = "sender@test.com",
+    attachment: bytes = b"",
+    date: str = "Mon, 06 Jan 2025 10:00:00 +0000",
+) -> bytes:
+    message = EmailMessage()
+    message["From"] = sender
+    message["To"] = "test@test.com"
+    message["Subject"] = subject
+    message["Date"] = date
+    message.set_content(f"Body of {subject}")
+    if attachment:
+        message.add_attachment(attachment, maintype="application", subtype="octet-stream", filename="report.bin")
+    return message.as_bytes()
+
+
+@pytest.fixture
+def store() -> FakeMailStore:
+    store = FakeMailStore({"test": "secret"})
+    store.create("Archive")
+    return store
+
+
+@pytest.fixture
+def server(store: FakeMailStore) -> Iterator[FakeImapServer]:
+    with FakeImapServer(store) as server:
+        yield server
+
+
+@pytest.fixture
+def reader(server: FakeImapServer) -> EmailReader:
+    return EmailReader.from_config(server.config("test", "secret"))
+
+
+def test_fetch_envelopes_and_bodies(store: FakeMailStore, reader: EmailReader) -> None:
+    store.append("INBOX", build_message("Hello"))
+    store.append("INBOX", build_message("Invoice", attachment=b"x" * 2000))
+
+    envelopes = reader.fetch_envelopes()
+    bodies = reader.fetch_bodies(envelopes)
+
+    assert [(envelope.subject, envelope.attachments) for envelope in envelopes] == [
+        ("Hello", []),
+        ("Invoice", ["report.bin"]),
+    ]
+    assert "Body of Invoice" in bodies[1].text
+    assert store.folders["INBOX"].messages[1].flags == set()
+
+
+def test_reject_wrong_credentials(server: FakeImapServer) -> None:
+    reader = EmailReader.from_config(server.config("test", "wrong"))
+
+    with pytest.raises(Exception):
+        reader.fetch_uids()
+
+
+def test_search_with_compiled_query(store: FakeMailStore, reader: EmailReader) -> None:
+    store.append("INBOX", build_message("Weekly newsletter", sender="news@list.test"))
+    store.append("INBOX", build_message("Hello", sender="friend@test.com"), flags={"\\Seen"})
+    store.append("INBOX", build_message("Other newsletter", sender="news@list.test"), flags={"\\Seen"})
+
+    assert reader.search(query=EmailQuery(sender="news@list.test")) == [EmailUid("1"), EmailUid("3")]
+    assert reader.search(query=EmailQuery(subject="newsletter", seen=False)) == [EmailUid("1")]
+
+
+def test_search_non_ascii_values_as_literals(store: FakeMailStore, reader: EmailReader) -> None:
+    store.append("INBOX", build_message("Réunion d'équipe", sender="élise@test.com"))
+    store.append("INBOX", build_message("Reunion", sender="elise@test.com"))
+
+    assert reader.search(query=EmailQuery(sender="élise", subject="Réunion")) == [EmailUid("1")]
+
+
+def test_confirm_attachments_against_the_body_structure(store: FakeMailStore, reader: EmailReader) -> None:
+    store.append("INBOX", build_message("Report", attachment=b"data"))
+    store.append("INBOX", build_message("Plain"))
+    message = EmailMessage()
+    message["Subject"] = "Alternative"
+    message.set_content("Text")
+    message.add_alternative("<p>Text</p>", subtype="html")
+    message.make_mixed()
+    store.append("INBOX", message.as_bytes())
+
+    assert reader.search(query=EmailQuery(has_attachment=True)) == [EmailUid("1")]
+    assert reader.search(query=EmailQuery(has_attachment=False)) == [EmailUid("2"), EmailUid("3")]
+
+
+@pytest.mark.parametrize("capabilities, expected", [
+    (f"{CAPABILITIES} SORT", ["Oldest", "Middle"]),
+    (CAPABILITIES, ["Middle", "Newest"]),
+])
+def test_fetch_oldest_envelopes_by_date_when_the_server_sorts(
+    store: FakeMailStore, capabilities: str, expected: List[str]
+) -> None:
+    store.append("INBOX", build_message("Middle", date="Tue, 07 Jan 2025 10:00:00 +0000"))
+    store.append("INBOX", build_message("Newest", date="Wed, 08 Jan 2025 10:00:00 +0000"))
+    store.append("INBOX", build_message("Oldest", date="Sun, 05 Jan 2025 10:00:00 +0000"))
+
+    with FakeImapServer(store, capabilities=capabilities) as server:
+        envelopes = EmailReader.from_config(server.config("test", "secret")).fetch_oldest_envelopes(limit=2)
+
+    assert [envelope.subject for envelope in envelopes] == expected
+
+
+def test_drop_the_pooled_session_when_a_fetch_times_out(store: FakeMailStore, server: FakeImapServer) -> None:
+    store.append("INBOX", build_message("Slow"))
+    config = server.config("test", "secret")
+    pool = ImapConnectionPool()
+    reader = EmailReader.from_config(config, pool=pool)
+    reader.fetch_oldest_envelopes()
+    server.latency = 0.5
+
+    with pytest.raises(OSError):
+        reader.fetch_oldest_envelopes(timeout=0.1)
+
+    assert pool.open_sessions(config) == 0
+
+
+def test_restore_the_session_timeout_after_fetching_oldest_envelopes(
+    store: FakeMailStore, server: FakeImapServer
+) -> None:
+    store.append("INBOX", build_message("Slow"))
+    config = server.config("test", "secret")
+    pool = ImapConnectionPool()
+    reader = EmailReader.from_config(config, pool=pool)
+    reader.fetch_oldest_envelopes(timeout=0.2)
+    server.latency = 0.3
+
+    envelopes = reader.fetch_envelopes()
+
+    assert [envelope.subject for envelope in envelopes] == ["Slow"]
+    assert pool.open_sessions(config) == 1
+
+
+def test_archive_many_moves_messages(store: FakeMailStore, server: FakeImapServer, reader: EmailReader) -> None:
+    for index in range(5):
+        store.append("INBOX", build_message(f"Message {index}"))
+
+    outcomes = reader.archive_many(uids=[EmailUid("2"), EmailUid("4"), EmailUid("9")])
+
+    assert outcomes == {EmailUid("2"): True, EmailUid("4"): True, EmailUid("9"): False}
+    assert [message.uid for message in store.folders["INBOX"].messages] == [1, 3, 5]
+    assert len(store.folders["Archive"].messages) == 2
+    assert server.commands["UID MOVE"] == 1
+
+
+def test_sync_folder_uses_condstore(store: FakeMailStore, reader: EmailReader) -> None:
+    for index in range(3):
+        store.append("INBOX", build_message(f"Message {index}"))
+    state, delta = reader.sync_folder()
+    store.folders["INBOX"].messages[0].flags.add("\\Seen")
+    store.folders["INBOX"].messages[0].modseq = store.folders["INBOX"].next_modseq()
+    store.append("INBOX", build_message("New"))
+
+    state, delta = reader.sync_folder(previous=state)
+
+    assert delta.added == [EmailUid("4")]
+    assert delta.changed == {EmailUid("1"): ("\\Seen",)}
+    assert state.uids == (1, 2, 3, 4)
+
+
+def test_async_reader_pipelines_against_latency(store: FakeMailStore) -> None:
+    for index in range(4):
+        store.append("INBOX", build_message(f"Message {index}"))
+
+    with FakeImapServer(store, latency=0.05) as server:
+        reader = AsyncEmailReader(server.config("test", "secret"))
+        envelopes = asyncio.run(reader.fetch_envelopes())
+
+    assert [envelope.subject for envelope in envelopes] == [f"Message {index}" for index in range(4)]
+
+
+def test_throttle_bandwidth(store: FakeMailStore) -> None:
+    store.append("INBOX", build_message("Large", attachment=b"x" * 30_000))
+
+    with FakeImapServer(store, bandwidth=200_000) as server:
+        reader = EmailReader.from_config(server.config("test", "secret"))
+        started = time.perf_counter()
+        reader.fetch_emails()
+        elapsed = time.perf_counter() - started
+
+    assert elapsed > 0.2
+    assert server.bytes_sent > 40_000
+
+
+def test_idle_watcher_receives_new_messages(store: FakeMailStore, server: FakeImapServer) -> None:
+    bus = EventBus()
+    events: List[MailboxEvent] = []
+    received = threading.Event()
+
+    def collect(event: MailboxEvent) -> None:
+        events.append(event)
+        received.set()
+
+    bus.subscribe(collect)
+    watcher = IdleWatcher(server.config("test", "secret"), "INBOX", bus, poll_interval=0.05)
+    watcher.start()
+    try:
+        time.sleep(0.3)
+        store.append("INBOX", build_message("Pushed"))
+        assert received.wait(5)
+    finally:
+        watcher.stop(timeout=5)
+
+    assert (events[0].kind, events[0].value) == (MailboxEventKind.EXISTS, "1")
+
+
+def test_load_mbox(tmp_path: Path) -> None:
+    box = mailbox.mbox(str(tmp_path / "inbox.mbox"))
+    message = mailbox.mboxMessage(build_message("From mbox"))
+    message.set_flags("R")
+    box.add(message)
+    box.add(mailbox.mboxMessage(build_message("Unread")))
+    box.flush()
+
+    store = FakeMailStore.from_mbox(tmp_path / "inbox.mbox")
+
+    assert [sorted(message.flags) for message in store.folders["INBOX"].messages] == [["\\Seen"], []]
+    with FakeImapServer(store) as server:
+        subjects = [envelope.subject for envelope in EmailReader.from_config(server.config()).fetch_envelopes()]
+    assert subjects == ["From mbox", "Unread"]
+
+
+def test_load_maildir_with_subfolders(tmp_path: Path) -> None:
+    root = mailbox.Maildir(str(tmp_path / "mail"))
+    root.add(mailbox.MaildirMessage(build_message("Inbox message")))
+    root.add_folder("Archive").add(mailbox.MaildirMessage(build_message("Archived")))
+
+    store = FakeMailStore.from_maildir(tmp_path / "mail")
+
+    assert sorted(store.folders) == ["Archive", "INBOX"]
+    assert len(store.folders["Archive"].messages) == 1
+
+
+def test_serve_a_generated_corpus(store: FakeMailStore, reader: EmailReader) -> None:
+    for _, raw in generate_corpus(CorpusSpec(messages=50, attachment_ratio=0.5)):
+        store.append("INBOX", raw)
+
+    envelopes = reader.fetch_envelopes()
+
+    assert len(envelopes) == 50
+    assert any(envelope.attachments for envelope in envelopes)
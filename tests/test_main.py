@@ -0,0 +1,124 @@
+import io
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from cryptography.fernet import Fernet
+
+from inbox_zero.main import build_parser, main
+
+
+@pytest.fixture
+def account_store(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    path = tmp_path / "accounts.sqlite3"
+    monkeypatch.setenv("INBOX_ZERO_ACCOUNTS", str(path))
+    monkeypatch.setenv("INBOX_ZERO_SECRET_KEY", Fernet.generate_key().decode())
+    return path
+
+
+def test_import_without_loading_imap_client() -> None:
+    code = "import sys, inbox_zero.main; print(sorted(m for m in ('imap_tools', 'streamlit') if m in sys.modules))"
+
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "[]"
+
+
+def test_run_account_commands_without_loading_imap_client(account_store: Path) -> None:
+    code = (
+        "import sys; from inbox_zero.main import main; "
+        "main(['add-account', '--host', 'imap.example.com', '--username', 'user']); main(['accounts']); "
+        "print(sorted(m for m in ('imap_tools', 'imaplib') if m in sys.modules), file=sys.stderr)"
+    )
+
+    result = subprocess.run([sys.executable, "-c", code], input="s3cr3t\n", capture_output=True, text=True, check=True)
+
+    assert result.stderr.strip() == "[]"
+    assert len(result.stdout.splitlines()) == 2
+
+
+def test_add_and_list_accounts_as_json_lines(
+    account_store: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    monkeypatch.setattr(sys, "stdin", io.StringIO("s3cr3t\n"))
+
+    assert main(["add-account", "--host", "imap.example.com", "--username", "user@example.com"]) == 0
+    assert main(["accounts"]) == 0
+
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert lines[1] == {
+        "event": "account",
+        "id": 1,
+        "host": "imap.example.com",
+        "port": 993,
+        "username": "user@example.com",
+        "use_ssl": True,
+    }
+    assert b"s3cr3t" not in account_store.read_bytes()
+
+
+def test_report_errors_as_json_on_stderr(account_store: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    assert main(["stats", "--account", "7"]) == 1
+
+    assert json.loads(capsys.readouterr().err) == {"event": "error", "command": "stats", "error": "unknown account 7"}
+
+
+def test_parse_archive_query_flags() -> None:
+    arguments = build_parser().parse_args(
+        ["archive", "--from", "shop.com", "--since", "2024-01-31", "--unseen", "--has-attachment", "--dry-run"]
+    )
+
+    assert arguments.sender == "shop.com"
+    assert arguments.since.isoformat() == "2024-01-31"
+    assert arguments.seen is False
+    assert arguments.flagged is None
+    assert arguments.has_attachment is True
+
+
+def test_write_prometheus_metrics_for_a_network_command(
+    account_store: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from benchmarks.fake_imap_server import FakeImapServer
+    from benchmarks.fake_mailstore import FakeMailStore
+
+    monkeypatch.setenv("INBOX_ZERO_SYNC_STATE", str(tmp_path / "sync.sqlite3"))
+    monkeypatch.setenv("INBOX_ZERO_SEARCH_INDEX", str(tmp_path / "search.sqlite3"))
+    monkeypatch.setenv("INBOX_ZERO_MIRROR", str(tmp_path / "mirror"))
+    monkeypatch.setenv("INBOX_ZERO_THREAD_INDEX", str(tmp_path / "threads.sqlite3"))
+    metrics = tmp_path / "metrics.prom"
+    with FakeImapServer(FakeMailStore({"user": "s3cr3t"})) as server:
+        monkeypatch.setattr(sys, "stdin", io.StringIO("s3cr3t\n"))
+        main(["add-account", "--host", server.host, "--port", str(server.port), "--username", "user", "--no-ssl"])
+
+        assert main(["stats", "--metrics", str(metrics)]) == 0
+
+    text = metrics.read_text()
+    assert 'inbox_zero_imap_commands_total{command="STATUS"} 1' in text
+    assert 'inbox_zero_port_calls_total{method="get_stats",port="FolderStatsReaderImap"} 1' in text
+
+
+def test_find_emails_in_the_local_index_offline(
+    account_store: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    from inbox_zero.shared.email_reader import EmailData, EmailUid
+    from inbox_zero.shared.search_index import SearchIndex
+
+    monkeypatch.setenv("INBOX_ZERO_SYNC_STATE", str(tmp_path / "sync.sqlite3"))
+    monkeypatch.setenv("INBOX_ZERO_SEARCH_INDEX", str(tmp_path / "search.sqlite3"))
+    monkeypatch.setenv("INBOX_ZERO_MIRROR", str(tmp_path / "mirror"))
+    monkeypatch.setenv("INBOX_ZERO_THREAD_INDEX", str(tmp_path / "threads.sqlite3"))
+    index = SearchIndex(tmp_path / "search.sqlite3")
+    index.add("user@imap.unreachable.test:993", "INBOX", 1, [
+        EmailData(EmailUid("4"), "Facture octobre", "shop@test.com", "2024-10-01T10:00:00", "Montant", "", []),
+    ])
+    index.close()
+    monkeypatch.setattr(sys, "stdin", io.StringIO("s3cr3t\n"))
+    main(["add-account", "--host", "imap.unreachable.test", "--username", "user"])
+    capsys.readouterr()
+
+    assert main(["find", "factur"]) == 0
+
+    record = json.loads(capsys.readouterr().out)
+    assert (record["event"], record["uid"], record["subject"]) == ("hit", 4, "Facture octobre")